@@ -363,29 +363,13 @@ if should_run_job(
     # =========================
     # src database
     # =========================
+    # VACUUM no longer runs when ProxyDB opens a connection
     run_command_with_logging(
         [
-            "sqlite3",
-            str(CWD / "src/database.sqlite"),
-            "PRAGMA wal_checkpoint(TRUNCATE);",
-        ],
-        log_file=CRONTAB_LOG_DIR / "sqlite-wal-src.log",
-    )
-
-    run_command_with_logging(
-        [
-            "sqlite3",
-            str(CWD / "src/database.sqlite"),
-            "PRAGMA wal_checkpoint(SQLITE_CHECKPOINT_TRUNCATE);",
-        ],
-        log_file=CRONTAB_LOG_DIR / "sqlite-wal-truncate-src.log",
-    )
-
-    run_command_with_logging(
-        [
-            "sqlite3",
-            str(CWD / "src/database.sqlite"),
-            "VACUUM;",
+            PYTHON_BIN,
+            str(CWD / "src/db_maintenance.py"),
+            "--vacuum",
+            f"--db={CWD / 'src/database.sqlite'}",
         ],
         log_file=CRONTAB_LOG_DIR / "sqlite-vacuum-src.log",
     )
@@ -134,30 +134,32 @@ async def main(args):
     db = init_readonly_db()
 
     try:
-        for entry, result in results:
-            proxy_val = str(result.get("proxy") or "").strip()
-            if not proxy_val:
-                continue
-
-            update_data = {"status": result.get("status") or "dead"}
-            update_data["private"] = "true" if result.get("private") else "false"
-            if result.get("status") == "active":
-                if result.get("type"):
-                    update_data["type"] = result.get("type")
-                if result.get("https"):
-                    update_data["https"] = "true"
-                if result.get("private"):
-                    update_data["private"] = "true"
-
-            try:
-                db.update_data(
-                    proxy=proxy_val,
-                    data=update_data,
-                    update_time=True,
-                    debug=True,
-                )
-            except Exception as e:
-                print(f"Error updating proxy {proxy_val}: {e}")
+        # Coalesce the per-proxy updates into a few commits
+        with db.batch():
+            for entry, result in results:
+                proxy_val = str(result.get("proxy") or "").strip()
+                if not proxy_val:
+                    continue
+
+                update_data = {"status": result.get("status") or "dead"}
+                update_data["private"] = "true" if result.get("private") else "false"
+                if result.get("status") == "active":
+                    if result.get("type"):
+                        update_data["type"] = result.get("type")
+                    if result.get("https"):
+                        update_data["https"] = "true"
+                    if result.get("private"):
+                        update_data["private"] = "true"
+
+                try:
+                    db.update_data(
+                        proxy=proxy_val,
+                        data=update_data,
+                        update_time=True,
+                        debug=True,
+                    )
+                except Exception as e:
+                    print(f"Error updating proxy {proxy_val}: {e}")
 
         print(f"Checked {len(results)} proxies")
 
@@ -143,7 +143,6 @@ def process_proxy(db: ProxyDB, data: dict[str, Any], driver: str) -> str | None:
 def remover(db: ProxyDB):
     configure_sqlite(db)
 
-    page = 1
     per_page = 1000
 
     driver = f"{db.driver} {f'({to_project_relative_path(db.db_location)})' if db.driver == 'sqlite' else ''}".strip()
@@ -156,12 +155,8 @@ def remover(db: ProxyDB):
     )
 
     try:
-        while True:
-            proxies = db.get_all_proxies(page=page, per_page=per_page)
-
-            if not proxies:
-                break
-
+        # Keyset batches: removing/renaming rows below does not shift later batches
+        for proxies in db.iter_proxies(batch_size=per_page):
             proxy_by_marker: dict[str, dict[str, Any]] = {}
             ordered: list[str] = []
 
@@ -196,8 +191,6 @@ def remover(db: ProxyDB):
                 if result and is_valid_proxy(proxy):
                     marker.mark(result, valid_until=7)
 
-            page += 1
-
     finally:
         marker.close()
 
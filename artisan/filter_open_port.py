@@ -6,7 +6,14 @@ from typing import Any, Dict, List, Optional, TypedDict
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
-from proxy_hunter import Proxy, dict_to_proxy_list, is_port_open
+from proxy_hunter import (
+    PortResult,
+    PortScanner,
+    Proxy,
+    dict_to_proxy_list,
+    get_latency_tracker,
+    parse_target,
+)
 from src.utils.parse_args import parse_args
 from src.database.SQLiteMarker import SQLiteMarker
 from src.func import get_relative_path
@@ -49,58 +56,59 @@ def _update_proxy_status(db: Any, proxy_str: str, status: str) -> None:
     )
 
 
-async def check_proxy_port(
-    proxy: Proxy, db: Any, semaphore: asyncio.Semaphore
+def check_proxy_port(
+    proxy: Proxy, db: Any, port: Optional[PortResult]
 ) -> Optional[CheckResult]:
-    """Check port status for a single proxy concurrently."""
-    async with semaphore:
-        proxy_str = proxy.proxy
-        if not proxy_str:
-            return None
-
-        status = proxy.status
-        if status == "port-open":
-            return {
-                "proxy": proxy_str,
-                "status": "OPEN",
-                "last_check_ago": time_ago(proxy.last_check),
-                "previous_status": status,
-                "updated": False,
-            }
-
-        loop = asyncio.get_running_loop()
-        is_open = await loop.run_in_executor(None, is_port_open, proxy_str)
-
-        last_check = proxy.last_check
-        last_check_ago = time_ago(last_check)
-
-        updated = False
-        next_status = None
+    """Turn the port probe of a proxy into a status update.
 
-        if is_open:
-            if status not in ("port-open", "untested", "active"):
-                next_status = "port-open"
-        elif status != "port-closed":
-            next_status = "port-closed"
-
-        if next_status:
-            _update_proxy_status(db, proxy_str, next_status)
-            updated = True
+    `port` is None for proxies already marked port-open, which are not probed.
+    """
+    proxy_str = proxy.proxy
+    if not proxy_str:
+        return None
 
+    status = proxy.status
+    if port is None:
         return {
             "proxy": proxy_str,
-            "status": "OPEN" if is_open else "CLOSED",
-            "last_check_ago": last_check_ago,
+            "status": "OPEN",
+            "last_check_ago": time_ago(proxy.last_check),
             "previous_status": status,
-            "updated": updated,
+            "updated": False,
         }
 
+    is_open = port.open
+    last_check = proxy.last_check
+    last_check_ago = time_ago(last_check)
+
+    updated = False
+    next_status = None
+
+    if is_open:
+        if status not in ("port-open", "untested", "active"):
+            next_status = "port-open"
+    elif status != "port-closed":
+        next_status = "port-closed"
+
+    if next_status:
+        _update_proxy_status(db, proxy_str, next_status)
+        updated = True
+
+    return {
+        "proxy": proxy_str,
+        "status": "OPEN" if is_open else "CLOSED",
+        "last_check_ago": last_check_ago,
+        "previous_status": status,
+        "updated": updated,
+    }
+
 
 async def process_proxies_async(
     proxies: List[Proxy], db: Any, concurrency: int
 ) -> Stats:
-    """Process all proxies concurrently with concurrency limit."""
-    semaphore = asyncio.Semaphore(max(1, concurrency))
+    """Probe the ports of all proxies on one event loop, `concurrency` at a time."""
+    tracker = get_latency_tracker()
+    scanner = PortScanner(concurrency=concurrency, tracker=tracker)
 
     marker = SQLiteMarker(
         db_filename="filter_open_port.sqlite",
@@ -129,10 +137,6 @@ async def process_proxies_async(
                 "already_checked": unseen.already_checked,
             }
 
-        tasks = [
-            asyncio.create_task(check_proxy_port(proxy, db, semaphore))
-            for proxy in valid_proxies
-        ]
         stats: Stats = {
             "open": 0,
             "closed": 0,
@@ -141,16 +145,15 @@ async def process_proxies_async(
             "already_checked": unseen.already_checked,
         }
 
-        # Log results as they complete, not after all finish
-        for coro in asyncio.as_completed(tasks):
+        def report(proxy: Proxy, port: Optional[PortResult]) -> None:
             try:
-                result = await coro
+                result = check_proxy_port(proxy, db, port)
             except Exception:
                 stats["errors"] += 1
-                continue
+                return
 
             if result is None:
-                continue
+                return
 
             if result["status"] == "OPEN":
                 stats["open"] += 1
@@ -172,13 +175,32 @@ async def process_proxies_async(
                 f"{suffix}"
             )
 
+        # proxies with other credentials on the same IP:PORT share one probe
+        by_address: Dict[str, List[Proxy]] = {}
+        for proxy in valid_proxies:
+            if proxy.status == "port-open":
+                report(proxy, None)
+                continue
+            try:
+                host, port = parse_target(str(proxy.proxy))
+            except ValueError:
+                report(proxy, PortResult(str(proxy.proxy), 0, False, 0.0, "invalid"))
+                continue
+            by_address.setdefault(f"{host}:{port}", []).append(proxy)
+
+        # Log results as they complete, not after all finish; historically
+        # live addresses are probed first
+        async for port in scanner.stream(tracker.order(by_address)):
+            for proxy in by_address[port.address]:
+                report(proxy, port)
+
         return stats
     finally:
         marker.close()
 
 
 if __name__ == "__main__":
-    args = parse_args(default_limit=10, default_concurrency=4)
+    args = parse_args(default_limit=10, default_concurrency=200)
     file_lock_arg = getattr(args, "file_lock", None)
     if file_lock_arg:
         locker = FileLockHelper(file_lock_arg)
@@ -208,11 +230,14 @@ if __name__ == "__main__":
         )
 
         print(
-            f"Checking {len(proxies)} proxies concurrently ({args.concurrency} workers)"
+            f"Checking {len(proxies)} proxies ({args.concurrency} connects in flight)"
         )
 
         typed_proxies: List[Proxy] = dict_to_proxy_list(proxies)
+        # the scanner derives its connect timeouts from the latency history
+        db.load_latency_history()
         stats = asyncio.run(process_proxies_async(typed_proxies, db, args.concurrency))
+        db.save_latency_history()
 
         print(
             f"Finished: open={stats['open']}, closed={stats['closed']}, "
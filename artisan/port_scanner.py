@@ -0,0 +1,9 @@
+# Asynchronous TCP port scanner
+#
+#   python artisan/port_scanner.py 1.2.3.4:8080 5.6.7.8 -p 80,3128,8000-8100
+#   python artisan/port_scanner.py -f proxies.txt --concurrency 2000 --rate 5000
+
+from proxy_hunter.curl.port_scanner import main
+
+if __name__ == "__main__":
+    main()
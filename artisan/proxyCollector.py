@@ -7,7 +7,7 @@ from typing import List, Tuple
 
 # Add parent directory to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from proxy_hunter import extract_proxies
+from proxy_hunter import iter_proxies_from_files
 from src.func import get_relative_path
 from src.shared import init_db
 from src.utils.file.FileLockHelper import FileLockHelper
@@ -145,24 +145,10 @@ def collect(limit_kb: int | float = 800):
             processed_strings = []
 
             try:
-                with open(selected_file, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read()
-            except Exception as e:
-                print(f"Failed to read file {selected_file}: {e}")
-                content = ""
-
-            if not content or not content.strip():
-                print("File content empty after reading")
-                try:
-                    os.remove(selected_file)
-                    print(f"Deleted empty file: {selected_file}")
-                except Exception as e:
-                    print(f"Failed to delete file {selected_file}: {e}")
-                db.close()
-                continue
-
-            try:
-                extracted_proxies = extract_proxies(content)
+                # Streams the file in chunks rather than reading it whole
+                extracted_proxies = list(
+                    iter_proxies_from_files([selected_file], seen=set())
+                )
             except Exception as e:
                 print(f"extract_proxies failed: {e}")
                 extracted_proxies = []
@@ -178,6 +164,7 @@ def collect(limit_kb: int | float = 800):
                 db.close()
                 continue
 
+            extracted_strings = []
             for p in extracted_proxies:
                 if p.username and p.password:
                     proxy_str = f"{p.proxy}@{p.username}:{p.password}"
@@ -186,24 +173,15 @@ def collect(limit_kb: int | float = 800):
 
                 if len(sample_extracted) < 10:
                     sample_extracted.append(proxy_str)
+                extracted_strings.append(proxy_str)
 
-                try:
-                    sel = db.select(proxy_str)
-                    exists = bool(sel)
-                except Exception as e:
-                    print(f"DB select failed for {proxy_str}: {e}")
-                    exists = False
-
-                if exists:
-                    skipped_count += 1
-                    processed_strings.append(proxy_str)
-                else:
-                    try:
-                        db.add(proxy_str)
-                        added_count += 1
-                        processed_strings.append(proxy_str)
-                    except Exception as e:
-                        print(f"Failed to add proxy {proxy_str}: {e}")
+            try:
+                counts = db.add_many(extracted_proxies)
+                added_count = counts["added"]
+                skipped_count = counts["skipped"]
+                processed_strings = extracted_strings
+            except Exception as e:
+                print(f"Failed to bulk add proxies from {selected_file}: {e}")
 
             db.close()
 
@@ -0,0 +1,8 @@
+# Self-hosted proxy judge for the checkers, see PROXY_JUDGE_URL in .env.example
+#
+#   python artisan/proxy_judge.py --port 8899 [--certfile cert.pem --keyfile key.pem]
+
+from proxy_hunter.curl.judge import main
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ import random
 import sys
 from typing import Any, Dict, List, Optional, cast
 
-from proxy_hunter import build_request
+from proxy_hunter import get_async_client
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
@@ -48,18 +48,18 @@ def extract_title(html: Optional[str]) -> Optional[str]:
 
 async def fetch_with_proxy(endpoint: str, proxy: str) -> FetchResult:
     proxy_types = ["socks5", "socks4", "http"]
+    client = get_async_client()
 
     for ptype in proxy_types:
         response = None
         try:
-            # run blocking request in thread (important)
-            response = await asyncio.to_thread(
-                build_request,
-                endpoint=endpoint,
+            response = await client.request(
+                "GET",
+                endpoint,
                 proxy=proxy,
                 proxy_type=ptype,
-                no_cache=True,
                 timeout=5,
+                no_cache=True,
             )
         except Exception as e:
             print(f"{yellow(f'[{ptype}]')} Failed {magenta(proxy)}: {e}")
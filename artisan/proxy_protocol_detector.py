@@ -0,0 +1,146 @@
+import os
+import sys
+import asyncio
+import random
+from typing import Any, Dict, List, Optional
+
+from proxy_hunter import ProtocolFingerprint, detect_protocols
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from src import ProxyDB
+from src.func import get_relative_path
+from src.func_console import cyan, green, magenta, red, yellow
+from src.utils.file.FileLockHelper import FileLockHelper
+from artisan.proxy_getter import (
+    normalize_proxy_value,
+    retrieve_proxies,
+    ProxyRetrievalResult,
+)
+from src.utils.parse_args import ParseArgs, parse_args
+from src.shared import init_db, init_readonly_db
+
+current_filename = os.path.basename(__file__)
+locker: Optional[FileLockHelper] = None
+
+
+async def detect_proxy(
+    proxy: str, timeout: float = 5.0
+) -> Optional[ProtocolFingerprint]:
+    """
+    Fingerprint the protocols of an ``IP:PORT`` proxy from raw handshakes.
+
+    Args:
+        proxy: Proxy in ``IP:PORT`` form.
+        timeout: Seconds allowed for each connect and handshake reply.
+
+    Returns:
+        The fingerprint, or None when `proxy` is not ``IP:PORT``.
+    """
+    host, _, port = proxy.rpartition(":")
+    if not host or not port.isdigit():
+        return None
+    return await detect_protocols(host, int(port), timeout)
+
+
+def fingerprint_to_data(fingerprint: ProtocolFingerprint) -> Dict[str, str]:
+    """
+    Build the ProxyDB columns for a fingerprint.
+
+    Only the detected `type` and the `private` flag are written; the working
+    status is left to the checkers, which now test just these protocols.
+
+    Args:
+        fingerprint: Result of `detect_protocols`.
+
+    Returns:
+        The columns to pass to `ProxyDB.update_data`, empty when nothing was detected.
+    """
+    if not fingerprint.protocols:
+        return {}
+    data = {"type": fingerprint.type}
+    if fingerprint.auth_required:
+        data["private"] = "true"
+    return data
+
+
+async def _worker_detect(
+    data: dict, db: ProxyDB, semaphore: asyncio.Semaphore, timeout: float
+):
+    async with semaphore:
+        # credentials are not needed: the handshakes stop before authenticating
+        proxy = normalize_proxy_value(data.get("proxy", ""))
+        fingerprint = await detect_proxy(proxy, timeout)
+        if fingerprint is None:
+            print(f"{magenta(proxy)} {red('invalid proxy')}")
+            return
+        if not fingerprint.protocols:
+            print(f"{magenta(proxy)} {red('undetected')} ({fingerprint.error})")
+            return
+        columns = fingerprint_to_data(fingerprint)
+        auth = (
+            f" {yellow('auth: ' + '-'.join(fingerprint.auth_required))}"
+            if fingerprint.auth_required
+            else ""
+        )
+        print(
+            f"{magenta(proxy)} {green(fingerprint.type)}{auth} in {cyan(f'{fingerprint.elapsed * 1000:.0f} ms')}"
+        )
+        try:
+            db.update_data(data["proxy"], columns)
+        except Exception as e:
+            print(f"Error updating proxy data for {magenta(proxy)}: {e}")
+
+
+async def main(args: ParseArgs):
+    try:
+        db = init_db()
+    except Exception:
+        db = init_readonly_db()
+
+    def custom_filter(rows: List[dict[str, Any]]) -> List[dict[str, Any]]:
+        # proxies whose type is already known do not need a fingerprint
+        return [row for row in rows if isinstance(row, dict) and not row.get("type")]
+
+    result: ProxyRetrievalResult = retrieve_proxies(
+        db=db, limit=args.limit, custom_filter=custom_filter
+    )
+    proxies = result.proxies[: args.limit]
+    random.shuffle(proxies)
+    print("INFO", f"Proxy source: {result.source_label} ({len(proxies)} candidates)")
+
+    semaphore = asyncio.Semaphore(max(args.concurrency, 1))
+    await asyncio.gather(
+        *(_worker_detect(data, db, semaphore, 5.0) for data in proxies)
+    )
+
+    try:
+        db.close()
+    except Exception:
+        pass
+    print(f"Finished fingerprinting {len(proxies)} proxies.")
+
+
+if __name__ == "__main__":
+    # each proxy costs three short-lived sockets, so this can run wide
+    args = parse_args(default_limit=100, default_concurrency=50)
+
+    file_lock_arg = getattr(args, "file_lock", None)
+    if file_lock_arg:
+        lock_path = file_lock_arg
+    else:
+        lock_name = args.uid if args.uid else current_filename
+        lock_path = get_relative_path(f"tmp/locks/{lock_name}.lock")
+
+    locker = FileLockHelper(lock_path)
+
+    if not locker.lock():
+        print("Another instance is running. Exiting.")
+        sys.exit(0)
+
+    try:
+        asyncio.run(main(args))
+    finally:
+        if locker:
+            locker.unlock()
@@ -4,7 +4,12 @@ import sys
 import random
 from typing import Any, Callable, Iterable, List, Optional
 from urllib.parse import urlsplit
-from proxy_hunter import build_request, extract_proxies
+from proxy_hunter import (
+    build_request,
+    extract_proxies,
+    get_async_client,
+    get_session_pool,
+)
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
@@ -83,6 +88,7 @@ def test_socks5_proxy(proxy_host, proxy_port, username=None, password=None, time
             endpoint="https://httpbin.org/ip",
             timeout=timeout,
             cookie_file=None,
+            session_pool=get_session_pool(),
             verify=True,
             no_cache=True,
         )
@@ -96,6 +102,36 @@ def test_socks5_proxy(proxy_host, proxy_port, username=None, password=None, time
         return {"success": False, "status_code": None, "ip": None, "error": str(e)}
 
 
+async def test_socks5_proxy_async(
+    proxy_host, proxy_port, username=None, password=None, timeout=5
+):
+    """
+    Asyncio counterpart of `test_socks5_proxy`, sent on the shared async client.
+
+    Returns:
+        dict: {success: bool, status_code: int|None, ip: str|None, error: str|None}
+    """
+    try:
+        r = await get_async_client().request(
+            "GET",
+            "https://httpbin.org/ip",
+            proxy=f"{proxy_host}:{proxy_port}",
+            proxy_type="socks5",
+            proxy_username=username,
+            proxy_password=password,
+            timeout=timeout,
+            verify=True,
+        )
+        return {
+            "success": True,
+            "status_code": r.status_code,
+            "ip": r.json().get("origin"),
+            "error": None,
+        }
+    except Exception as e:
+        return {"success": False, "status_code": None, "ip": None, "error": str(e)}
+
+
 def parse_socks5_proxy(
     proxy_url: str,
 ) -> Optional[tuple[str, int, Optional[str], Optional[str]]]:
@@ -208,8 +244,8 @@ async def filter_test_socks5_proxies_async(
 
         async with semaphore:
             print_status("INFO", f"Checking {proxy}...", proxy)
-            result = await asyncio.to_thread(
-                test_socks5_proxy, host, port, username, password, timeout
+            result = await test_socks5_proxy_async(
+                host, port, username, password, timeout
             )
 
         if result["success"]:
@@ -1,11 +1,13 @@
 import asyncio
 import ssl
 import time
-import socks
 import os
 import sys
 import re
 from typing import Any, Callable, Optional, TypedDict, List
+from urllib.parse import urlsplit
+
+from proxy_hunter import get_judge_url, get_latency_tracker, open_proxy_connection
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
@@ -25,10 +27,17 @@ from src.utils.parse_args import parse_args
 from src.geoPlugin import get_geo_ip
 
 TARGET_HOST = "1.1.1.1"
+TARGET_PORT = 80
 TLS_HOST = "www.google.com"
-HTTP_TEST = "http://httpbin.org/ip"
+# a plain-HTTP judge (PROXY_JUDGE_URL) replaces the public stability target
+_judge = urlsplit(get_judge_url() or "")
+if _judge.scheme == "http" and _judge.hostname:
+    TARGET_HOST, TARGET_PORT = _judge.hostname, _judge.port or 80
 
+# Stage timeout for proxies without latency history, see `stage_timeout`
 TIMEOUT = 5
+# Seconds the stability stage keeps the tunnel idle
+HOLD_SECONDS = 5
 TARGET_SCORE = 70
 
 current_filename = os.path.basename(__file__)
@@ -179,36 +188,63 @@ def proxy_to_tuple(proxy: Any) -> tuple[str, int] | None:
 
 
 # ---------- CORE TESTS ----------
+# Every stage runs on asyncio streams so `concurrency` workers really score
+# that many proxies at once. TCP, latency, TLS and stability share a single
+# tunnel per proxy.
+
+
+def stage_timeout(proxy) -> float:
+    """
+    Timeout of one stage for `proxy`, derived from its latency history.
+
+    Every stage takes round trips past the proxy, so live proxies keep at
+    least TIMEOUT and slow ones get longer; proxies that keep failing are cut
+    short to the connect timeout of a dead proxy.
+    """
+    address = f"{proxy[0]}:{proxy[1]}"
+    tracker = get_latency_tracker()
+    stats = tracker.stats(address)
+    if stats is not None and stats.dead:
+        return tracker.connect_timeout(address, TIMEOUT)
+    return tracker.read_timeout(address, TIMEOUT)
+
+
+async def open_socks5_tunnel(
+    proxy, host: str, port: int
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    proxy_host, proxy_port = proxy
+    return await asyncio.wait_for(
+        open_proxy_connection(
+            f"{proxy_host}:{proxy_port}", host, port, proxy_type="socks5"
+        ),
+        stage_timeout(proxy),
+    )
 
 
-async def test_tcp(proxy):
-    host, port = proxy
+async def test_tcp(
+    proxy,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, float] | None:
+    """Open the tunnel to TLS_HOST reused by the later stages, with its connect time."""
     log_test(proxy, "TCP", "start")
     try:
-        s = socks.socksocket()
-        s.set_proxy(socks.SOCKS5, host, int(port))
-        s.settimeout(TIMEOUT)
-        s.connect((TARGET_HOST, 443))
-        s.close()
+        start = time.perf_counter()
+        reader, writer = await open_socks5_tunnel(proxy, TLS_HOST, 443)
+        latency = time.perf_counter() - start
         log_test(proxy, "TCP", "pass")
-        return True
+        return reader, writer, latency
     except Exception as exc:
         log_test(proxy, "TCP", f"fail ({exc})")
-        return False
+        return None
 
 
-async def test_tls(proxy):
-    host, port = proxy
+async def test_tls(proxy, writer: asyncio.StreamWriter) -> bool:
+    """Upgrade the tunnel to TLS in place."""
     log_test(proxy, "TLS", "start")
     try:
-        s = socks.socksocket()
-        s.set_proxy(socks.SOCKS5, host, int(port))
-        s.settimeout(TIMEOUT)
-        s.connect((TLS_HOST, 443))
-
         ctx = ssl.create_default_context()
-        ssl_sock = ctx.wrap_socket(s, server_hostname=TLS_HOST)
-        ssl_sock.close()
+        await asyncio.wait_for(
+            writer.start_tls(ctx, server_hostname=TLS_HOST), stage_timeout(proxy)
+        )
         log_test(proxy, "TLS", "pass")
         return True
     except Exception as exc:
@@ -216,45 +252,50 @@ async def test_tls(proxy):
         return False
 
 
-async def test_stability(proxy):
-    host, port = proxy
+async def test_stability(
+    proxy,
+    reader: asyncio.StreamReader | None = None,
+    writer: asyncio.StreamWriter | None = None,
+    host: str | None = None,
+) -> bool:
+    """
+    Hold the tunnel for HOLD_SECONDS, then check it still carries a request and its
+    response. Without a tunnel, a plain one to TARGET_HOST:TARGET_PORT is opened.
+    """
     log_test(proxy, "STABILITY", "start")
+    owned = writer is None
     try:
-        s = socks.socksocket()
-        s.set_proxy(socks.SOCKS5, host, int(port))
-        s.settimeout(TIMEOUT)
-        s.connect((TARGET_HOST, 443))
+        if reader is None or writer is None:
+            reader, writer = await open_socks5_tunnel(proxy, TARGET_HOST, TARGET_PORT)
 
-        log_test(proxy, "STABILITY", "holding connection for 5s")
-        await asyncio.sleep(5)
+        host = host or TARGET_HOST
+        log_test(proxy, "STABILITY", f"holding connection for {HOLD_SECONDS}s")
+        await asyncio.sleep(HOLD_SECONDS)
 
-        s.send(b"GET / HTTP/1.1\r\nHost: 1.1.1.1\r\n\r\n")
-        s.close()
+        writer.write(
+            f"HEAD / HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), stage_timeout(proxy))
+        if not status_line.startswith(b"HTTP/"):
+            raise ConnectionError("no response after holding the connection")
         log_test(proxy, "STABILITY", "pass")
         return True
     except Exception as exc:
         log_test(proxy, "STABILITY", f"fail ({exc})")
         return False
+    finally:
+        if owned and writer is not None:
+            writer.close()
 
 
-async def test_latency(proxy):
-    host, port = proxy
-    log_test(proxy, "LATENCY", "start")
-    try:
-        start = time.time()
-
-        s = socks.socksocket()
-        s.set_proxy(socks.SOCKS5, host, int(port))
-        s.settimeout(TIMEOUT)
-        s.connect((TARGET_HOST, 443))
-        s.close()
-
-        latency = time.time() - start
-        log_test(proxy, "LATENCY", f"pass ({latency:.3f}s)")
-        return latency
-    except Exception as exc:
-        log_test(proxy, "LATENCY", f"fail ({exc})")
+def test_latency(proxy, latency: float | None) -> float | None:
+    """Report the time the TCP stage took to open the tunnel."""
+    if latency is None:
+        log_test(proxy, "LATENCY", "fail (no connection)")
         return None
+    log_test(proxy, "LATENCY", f"pass ({latency:.3f}s)")
+    return latency
 
 
 # ---------- SCORING ----------
@@ -264,8 +305,8 @@ async def score_proxy(proxy) -> ProxyScoreResult:
     score = 0
     log_test(proxy, "SCORE", "start")
 
-    tcp = await test_tcp(proxy)
-    if not tcp:
+    tunnel = await test_tcp(proxy)
+    if tunnel is None:
         log_test(proxy, "SCORE", "hard fail (tcp)")
         return {
             "score": 0,
@@ -276,23 +317,30 @@ async def score_proxy(proxy) -> ProxyScoreResult:
         }
 
     score += 20
+    reader, writer, connect_time = tunnel
+    try:
+        latency = test_latency(proxy, connect_time)
+
+        tls = await test_tls(proxy, writer)
+        if tls:
+            score += 30
+            stability = await test_stability(proxy, reader, writer, TLS_HOST)
+        else:
+            # a failed handshake leaves the tunnel unusable
+            writer.close()
+            stability = await test_stability(proxy)
+        if stability:
+            score += 25
+    finally:
+        writer.close()
 
-    tls = await test_tls(proxy)
-    if tls:
-        score += 30
-
-    stability = await test_stability(proxy)
-    if stability:
-        score += 25
-
-    latency = await test_latency(proxy)
     if latency:
         if latency < 0.5:
             score += 10
         elif latency < 1.5:
             score += 5
 
-    # NOTE: remote DNS test skipped (can add via aiohttp + socks5h)
+    # TLS_HOST goes to the proxy as a name, so the TCP stage covers remote DNS
 
     log_test(proxy, "SCORE", f"done ({score})")
     return {
@@ -486,6 +534,7 @@ if __name__ == "__main__":
                 )
                 proxies = result.proxies
                 source_label = result.source_label
+                db_local.load_latency_history()
                 source_file = getattr(result, "source_file", None)
                 print(f"{source_label} {len(proxies)} proxies loaded")
 
@@ -520,7 +569,8 @@ if __name__ == "__main__":
                 proxy_by_key[marker_key] = proxy
                 ordered_keys.append(marker_key)
 
-            pending_keys = ordered_keys
+            # historically fast and alive proxies first, see `stage_timeout`
+            pending_keys = get_latency_tracker().order(ordered_keys)
             proxies = [proxy_by_key[key] for key in pending_keys]
             already_checked = 0
             print(
@@ -30,6 +30,17 @@ CREATE TABLE IF NOT EXISTS "added_proxies" ("updated" TEXT, "proxy" TEXT NOT NUL
 
 CREATE TABLE IF NOT EXISTS "meta" (key TEXT PRIMARY KEY, value TEXT);
 
+-- latency history of proxies ('IP:PORT') and /24 subnets ('a.b.c.0/24'), see LatencyTracker
+CREATE TABLE IF NOT EXISTS "proxy_latency" (
+  "key" TEXT PRIMARY KEY,
+  "srtt" REAL,
+  "rttvar" REAL,
+  "alive" REAL,
+  "samples" INTEGER,
+  "last_ok" REAL,
+  "updated" REAL
+);
+
 -- based on django authentication database
 CREATE TABLE IF NOT EXISTS "auth_user" (
   "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
@@ -3,7 +3,7 @@ import sqlite3
 import sys
 
 from django.core.management.base import BaseCommand
-from proxy_hunter import delete_path, extract_proxies, read_all_text_files, read_file
+from proxy_hunter import delete_path, iter_proxies_from_files, list_text_files
 
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../../../"))
 SRC_DIR = os.path.join(BASE_DIR, "src")
@@ -11,6 +11,7 @@ sys.path.append(SRC_DIR)
 
 from src.func import get_relative_path
 from src.func_proxy import blacklist_remover
+from src.ProxyDB import ProxyDB
 from src.geoPlugin import download_databases
 
 
@@ -54,13 +55,17 @@ class Command(BaseCommand):
             columns_info = src_cursor.fetchall()
             columns = [column[1] for column in columns_info if column[1] != "id"]
 
+            # Select columns explicitly: table_info hides generated columns
+            # (ip, port) which `SELECT *` would still return
+            columns_sql = ", ".join(columns)
+
             # Fetch all rows from the source database
-            src_cursor.execute("SELECT * FROM proxies")
+            src_cursor.execute(f"SELECT {columns_sql} FROM proxies")
             src_proxies = src_cursor.fetchall()
 
             # Fetch all rows from the destination database
-            dest_cursor.execute("SELECT * FROM proxies")
-            dest_proxies = {tuple(row[1:]) for row in dest_cursor.fetchall()}
+            dest_cursor.execute(f"SELECT {columns_sql} FROM proxies")
+            dest_proxies = {tuple(row) for row in dest_cursor.fetchall()}
 
             # Prepare insert query for new rows
             placeholders = ", ".join(["?" for _ in columns])
@@ -69,9 +74,7 @@ class Command(BaseCommand):
             # Insert rows into destination database if they don't exist
             new_rows_count = 0
             for row in src_proxies:
-                row_data = [
-                    row[i] for i, col in enumerate(columns_info) if col[1] != "id"
-                ]
+                row_data = list(row)
                 if tuple(row_data) not in dest_proxies:
                     dest_cursor.execute(insert_query, row_data)
                     new_rows_count += 1
@@ -117,7 +120,10 @@ class Command(BaseCommand):
             columns = [column[1] for column in columns_info if column[1] != "id"]
 
             # Fetch active proxies from the source database
-            src_cursor.execute("SELECT * FROM proxies WHERE status = 'active'")
+            columns_sql = ", ".join(columns)
+            src_cursor.execute(
+                f"SELECT {columns_sql} FROM proxies WHERE status = 'active'"
+            )
             src_proxies = src_cursor.fetchall()
 
             # Prepare insert query for replacing rows
@@ -127,10 +133,7 @@ class Command(BaseCommand):
             # Replace rows in destination database
             new_rows_count = 0
             for row in src_proxies:
-                row_data = [
-                    row[i] for i, col in enumerate(columns_info) if col[1] != "id"
-                ]
-                dest_cursor.execute(insert_query, row_data)
+                dest_cursor.execute(insert_query, list(row))
                 new_rows_count += 1
 
             dest_conn.commit()
@@ -155,48 +158,34 @@ class Command(BaseCommand):
         """
         Index proxies from uploaded files and insert them into src and dest databases
         """
-        files_content = read_all_text_files(get_relative_path("assets/proxies"))
+        file_paths = list_text_files(get_relative_path("assets/proxies"))
         if os.path.exists(get_relative_path("proxies.txt")):
-            files_content[get_relative_path("proxies.txt")] = str(
-                read_file(get_relative_path("proxies.txt"))
-            )
-
-        for file_path, content in files_content.items():
-            proxies = extract_proxies(content)
-            self.stdout.write(
-                f"Total proxies extracted from {file_path}: {len(proxies)}"
-            )
+            file_paths.append(get_relative_path("proxies.txt"))
 
-            # Prepare the list of proxies to insert/replace, handling None values
-            proxy_data = [
-                (
-                    item.proxy,
-                    item.username if item.username is not None else "",
-                    item.password if item.password is not None else "",
-                )
-                for item in proxies
-            ]
-
-            # Define the insert or replace query
-            insert_query = "INSERT OR IGNORE INTO proxies (proxy, username, password) VALUES (?, ?, ?)"
-
-            # Function to execute the insert or replace query
-            def execute_insert_or_replace(db_path, proxy_data):
+        for file_path in file_paths:
+            # Bulk insert new proxies (and their credentials) in chunked transactions,
+            # streaming the file instead of reading it into memory
+            def execute_insert_or_replace(db_path, file_path):
                 self.stdout.write(
                     self.style.SUCCESS(
                         f"Starting to insert or replace proxies in {db_path}..."
                     )
                 )
 
-                conn = sqlite3.connect(db_path)
+                db = ProxyDB(db_path, start=True)
 
                 try:
-                    cursor = conn.cursor()
-                    cursor.executemany(insert_query, proxy_data)
-                    conn.commit()
+                    # extracted in this process: no pool forked from Django
+                    counts = db.ingest(iter_proxies_from_files([file_path]))
+                    self.stdout.write(
+                        f"Total proxies extracted from {file_path}: "
+                        f"{counts['added'] + counts['skipped']}"
+                    )
                     self.stdout.write(
                         self.style.SUCCESS(
-                            f"Successfully inserted or replaced {len(proxy_data)} proxies in {db_path}."
+                            f"Successfully inserted {counts['added']} proxies "
+                            f"({counts['skipped']} skipped, {counts['credentials']} "
+                            f"credentials updated) in {db_path}."
                         )
                     )
                 except Exception as e:
@@ -206,11 +195,11 @@ class Command(BaseCommand):
                         )
                     )
                 finally:
-                    conn.close()
+                    db.close()
 
             # Execute the function for both src and dest databases
-            execute_insert_or_replace(src, proxy_data)
-            execute_insert_or_replace(dest, proxy_data)
+            execute_insert_or_replace(src, file_path)
+            execute_insert_or_replace(dest, file_path)
             delete_path(file_path)
 
             blacklist_remover(
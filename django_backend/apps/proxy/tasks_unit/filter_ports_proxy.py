@@ -18,14 +18,31 @@ from django_backend.apps.proxy.tasks_unit.real_check_proxy import (
     result_log_file,
     global_tasks as proxy_checker_threads,
 )
-from django_backend.apps.proxy.utils import execute_select_query, execute_sql_query
+from django_backend.apps.proxy.utils import (
+    execute_select_query,
+    execute_sql_query,
+    get_proxy_db,
+)
 from src.func_console import green, log_file, magenta, orange, red
 from src.func_date import get_current_rfc3339_time
-from proxy_hunter import is_port_open
+from proxy_hunter import parse_target, scan_ports
 
 global_tasks: Set[Union[threading.Thread, concurrent.futures.Future]] = set()
 
 
+def port_address(proxy: Optional[str]) -> Optional[str]:
+    """
+    The 'IP:PORT' a port scan reports for `proxy` (`PortResult.address`).
+
+    Returns:
+        Optional[str]: None when the proxy has no valid port.
+    """
+    try:
+        return "%s:%d" % parse_target(str(proxy or ""))
+    except ValueError:
+        return None
+
+
 def cleanup_threads():
     global global_tasks
     global_tasks = {
@@ -43,17 +60,18 @@ def fetch_proxies_same_ip(
     condition = " OR ".join([f"status = '{s}'" for s in status])
 
     # Define the query to find proxies with the same IP but different ports
+    # (`ip` is a generated, indexed column of the proxies table)
     query = f"""
     SELECT proxy
     FROM proxies
-    WHERE SUBSTR(proxy, 1, INSTR(proxy, ':') - 1) IN (
-        SELECT SUBSTR(proxy, 1, INSTR(proxy, ':') - 1)
+    WHERE ip IN (
+        SELECT ip
         FROM proxies
         WHERE {condition} OR status IS NULL
-        GROUP BY SUBSTR(proxy, 1, INSTR(proxy, ':') - 1)
+        GROUP BY ip
         HAVING COUNT(*) > 1
     )
-    ORDER BY SUBSTR(proxy, 1, INSTR(proxy, ':') - 1), RANDOM()
+    ORDER BY ip, RANDOM()
     LIMIT {limit}
     """
 
@@ -84,6 +102,8 @@ def fetch_proxies_same_ip(
 
 def filter_duplicates_ips(limit: int = 10, callback: Optional[Callable] = None):
     duplicates_ips = fetch_proxies_same_ip(limit=limit)
+    # the scans derive their connect timeouts from the latency history
+    tracker = get_proxy_db().load_latency_history()
 
     def process_ip(ip: str, ip_proxies: List[str]):
         # log_file(result_log_file, f"{ip} has {len(ip_proxies)} duplicates")
@@ -94,7 +114,7 @@ def filter_duplicates_ips(limit: int = 10, callback: Optional[Callable] = None):
             ip_rows = execute_select_query(
                 f"""
                 SELECT rowid, * FROM proxies
-                WHERE SUBSTR(proxy, 1, INSTR(proxy, ':') - 1) = ?
+                WHERE ip = ?
                 AND (status != 'active' AND status != 'port-open' OR status IS NULL)
                 ORDER BY RANDOM() LIMIT 50;
                 """,
@@ -108,6 +128,16 @@ def filter_duplicates_ips(limit: int = 10, callback: Optional[Callable] = None):
             if len(ip_rows) > 1:
                 keep_proxy = None
                 random.shuffle(ip_rows)
+                valid_proxies = {
+                    row["proxy"]
+                    for row in ip_rows
+                    if row["proxy"] and is_valid_proxy(row["proxy"])
+                }
+                # probe all ports of the IP at once instead of one after another
+                open_proxies = {
+                    result.address
+                    for result in scan_ports(valid_proxies, tracker=tracker)
+                }
 
                 for row in ip_rows:
                     proxy = row["proxy"]
@@ -115,8 +145,8 @@ def filter_duplicates_ips(limit: int = 10, callback: Optional[Callable] = None):
                         continue
                     if not keep_proxy:
                         keep_proxy = proxy
-                    valid = is_valid_proxy(proxy)
-                    if is_port_open(proxy) and valid:
+                    valid = proxy in valid_proxies
+                    if valid and port_address(proxy) in open_proxies:
                         log_file(
                             result_log_file,
                             f"[FILTER-PORT] {proxy} \t {green('port open')}",
@@ -167,6 +197,7 @@ def filter_duplicates_ips(limit: int = 10, callback: Optional[Callable] = None):
                 )
         except Exception as e:
             log_file(result_log_file, f"[FILTER-PORT] fail create thread: {e}")
+        get_proxy_db().save_latency_history(tracker)
     if callable(callback):
         callback()
 
@@ -268,16 +299,36 @@ def check_open_ports(limit: int = 10, callback: Optional[Callable] = None):
     """
     proxies_dict = fetch_open_ports(limit)
     if proxies_dict:
+        tracker = get_proxy_db().load_latency_history()
         proxies_dict = proxies_dict[
             1:
         ]  # Exclude the first item (when dead will be deleted in worker_check_open_ports)
         try:
+            # one scan finds the ports closed since, before the protocol checks
+            open_proxies = {
+                result.address
+                for result in scan_ports(
+                    [item["proxy"] for item in proxies_dict],
+                    tracker=tracker,
+                )
+            }
+            for item in proxies_dict:
+                if port_address(item["proxy"]) not in open_proxies:
+                    execute_sql_query(
+                        "UPDATE proxies SET last_check = ?, status = ? WHERE proxy = ?",
+                        (get_current_rfc3339_time(), "port-closed", item["proxy"]),
+                    )
+                    log_file(
+                        result_log_file,
+                        f"[FILTER-PORT] {item['proxy']} from status=port-open {red('port closed')}",
+                    )
             with concurrent.futures.ThreadPoolExecutor(
                 max_workers=settings.WORKER_THREADS
             ) as executor:
                 futures = []
-                for item in proxies_dict[:limit]:
-                    futures.append(executor.submit(worker_check_open_ports, item))
+                for item in proxies_dict:
+                    if port_address(item["proxy"]) in open_proxies:
+                        futures.append(executor.submit(worker_check_open_ports, item))
                 proxy_checker_threads.update(futures)
 
                 for future in concurrent.futures.as_completed(futures):
@@ -290,6 +341,7 @@ def check_open_ports(limit: int = 10, callback: Optional[Callable] = None):
                         )
         except Exception as e:
             log_file(result_log_file, f"[FILTER-PORT] fail create thread: {e}")
+        get_proxy_db().save_latency_history(tracker)
     if callable(callback):
         callback()
 
@@ -18,6 +18,7 @@ from src.func import get_relative_path
 from src.func_console import log_file
 from proxy_hunter import random_windows_ua
 from src.geoPlugin import get_geo_ip
+from src.ProxyDB import GENERATED_COLUMNS
 
 global_tasks: Set[Union[threading.Thread, Future]] = set()
 result_log_file = get_relative_path("proxyChecker.txt")
@@ -103,8 +104,9 @@ def fetch_geo_ip(data: Optional[str] = None):
                 model["useragent"] = useragent
 
         try:
-            # Remove 'id' from the dictionary if it exists
-            model.pop("id", None)
+            # Remove 'id' and the generated columns from the dictionary if they exist
+            for column in ("id", *GENERATED_COLUMNS):
+                model.pop(column, None)
             # Extract column names and values
             columns = ", ".join(model.keys())
             placeholders = ", ".join(["?"] * len(model))
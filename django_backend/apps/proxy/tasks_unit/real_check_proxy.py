@@ -33,11 +33,16 @@ from django_backend.apps.core.models import ProcessStatus
 from django_backend.apps.proxy.models import Proxy
 from django_backend.apps.proxy.models import Proxy as ProxyModel
 from django_backend.apps.proxy.tasks_unit.geolocation import fetch_geo_ip
-from django_backend.apps.proxy.utils import execute_select_query, execute_sql_query
+from django_backend.apps.proxy.utils import (
+    dual_write,
+    execute_select_query,
+    execute_sql_query,
+    get_proxy_db,
+)
 from proxyWorking import ProxyWorkingManager
 from src.func import get_relative_path
 from src.func_console import get_message_exception, green, log_file, red
-from src.func_date import get_current_rfc3339_time, is_date_rfc3339_older_than
+from src.func_date import get_current_rfc3339_time, hours_ago_epoch
 from src.func_platform import is_debug
 from src.func_proxy import upload_proxy
 
@@ -79,6 +84,7 @@ def real_check_proxy(proxy: str, type: str) -> ProxyCheckResult:
                 proxy=proxy,
                 proxy_type=type,
                 endpoint=url,
+                cookie_file=None,
                 headers={
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36",
                     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -148,25 +154,28 @@ def real_check_proxy(proxy: str, type: str) -> ProxyCheckResult:
 def get_proxies_query(
     status: List[str] = ["dead", "port-closed", "untested"],
     limit: Optional[int] = None,
+    stale_hours: Optional[float] = None,
 ):
     # Create a condition string from the status list
     condition = " OR ".join([f"status = '{s}'" for s in status])
+    if (
+        "active" not in status
+        and "untested" not in status
+        and "port-open" not in status
+    ):
+        condition += " OR status IS NULL"
+    condition = f"({condition})"
+    if stale_hours is not None:
+        # Last checked more than [stale_hours] hours ago (indexed epoch column)
+        condition += f" AND last_check_ts < {hours_ago_epoch(stale_hours)}"
 
     # Define the query to find proxies with specific status
-    if "active" in status or "untested" in status or "port-open" in status:
-        query = f"""
-        SELECT *
-        FROM proxies
-        WHERE {condition}
-        ORDER BY SUBSTR(proxy, 1, INSTR(proxy, ':') - 1), RANDOM()
-        """
-    else:
-        query = f"""
-        SELECT *
-        FROM proxies
-        WHERE {condition} OR status IS NULL
-        ORDER BY SUBSTR(proxy, 1, INSTR(proxy, ':') - 1), RANDOM()
-        """
+    query = f"""
+    SELECT *
+    FROM proxies
+    WHERE {condition}
+    ORDER BY ip, RANDOM()
+    """
 
     # Add LIMIT clause if limit is provided
     if limit is not None:
@@ -175,9 +184,11 @@ def get_proxies_query(
 
 
 def get_proxies(
-    status: List[str] = ["dead", "port-closed", "untested"], limit: Optional[int] = 100
+    status: List[str] = ["dead", "port-closed", "untested"],
+    limit: Optional[int] = 100,
+    stale_hours: Optional[float] = None,
 ):
-    result = get_proxies_query(status, limit)
+    result = get_proxies_query(status, limit, stale_hours)
 
     # Create a set of unique proxies based on a unique key (e.g., 'proxy_id')
     unique_proxies = {proxy["proxy"]: proxy for proxy in result}.values()
@@ -206,12 +217,7 @@ def real_check_proxy_async(proxy_data: Optional[str] = ""):
 
     if not proxy_data:
         # Filter by last_check more than 12 hours ago
-        db_items = get_proxies(["active"], sys.maxsize)
-        db_items = [
-            item
-            for item in db_items
-            if is_date_rfc3339_older_than(str(item.get("last_check")), 12)
-        ]
+        db_items = get_proxies(["active"], sys.maxsize, stale_hours=12)
         log_file(
             result_log_file,
             f"[CHECKER-PARALLEL] got {len(db_items)} outdated proxies",
@@ -258,9 +264,12 @@ def real_check_proxy_async(proxy_data: Optional[str] = ""):
             )
             if find:
                 proxies.append(find)
+    # the port checks and requests derive their timeouts from the latency history
+    tracker = get_proxy_db().load_latency_history()
     if proxies:
-        # shuffle items
+        # shuffle items, then check historically fast and alive proxies first
         random.shuffle(proxies)
+        proxies = tracker.order(proxies, key=lambda item: str(item.proxy or ""))
         log_file(result_log_file, f"[CHECKER-PARALLEL] checking {len(proxies)} proxies")
     # iterate [n] proxies
     for proxy_obj in proxies[: settings.LIMIT_PROXIES_CHECK]:
@@ -378,8 +387,10 @@ def real_check_proxy_async(proxy_data: Optional[str] = ""):
             update_query = f"UPDATE proxies SET {update_columns} WHERE proxy = ?;"
             update_params = tuple(update_data.values()) + (proxy_obj.proxy,)
             try:
-                insert_exec = execute_sql_query(insert_query, insert_params)
-                update_exec = execute_sql_query(update_query, update_params)
+                # one transaction per database for both statements
+                with dual_write():
+                    insert_exec = execute_sql_query(insert_query, insert_params)
+                    update_exec = execute_sql_query(update_query, update_params)
                 merge_exec = {**insert_exec, **update_exec}
                 if status == "active":
                     # fetch geo location
@@ -407,6 +418,7 @@ def real_check_proxy_async(proxy_data: Optional[str] = ""):
                     f"[CHECKER-PARALLEL] failed to update {proxy_obj.proxy}: {e}",
                 )
                 traceback.print_exc()
+    get_proxy_db().save_latency_history(tracker)
     move_string_between(
         get_relative_path("proxies.txt"),
         get_relative_path("dead.txt"),
@@ -8,7 +8,14 @@ sys.path.append(
 from django.test import TestCase
 from unittest.mock import patch, MagicMock
 import sqlite3
-from django_backend.apps.proxy.utils import get_db_connections, execute_sql_query
+import threading
+from django_backend.apps.proxy.utils import (
+    ConnectionRegistry,
+    DualWriteError,
+    dual_write,
+    get_db_connections,
+    execute_sql_query,
+)
 
 
 class DatabaseUtilsTests(TestCase):
@@ -71,6 +78,92 @@ class DatabaseUtilsTests(TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0], [(1, "proxy1")])
 
+    @patch("django_backend.apps.proxy.utils.ProxyDB")
+    def test_registry_reuses_thread_connections(self, mock_proxy_db):
+        mock_proxy_db.side_effect = lambda path, start: MagicMock()
+        registry = ConnectionRegistry()
+
+        first = registry.get("proxies.sqlite")
+        self.assertIs(registry.get("proxies.sqlite"), first)
+
+        # other threads get their own connection
+        other = []
+        thread = threading.Thread(
+            target=lambda: other.append(registry.get("proxies.sqlite"))
+        )
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], first)
+        self.assertEqual(mock_proxy_db.call_count, 2)
+
+        registry.close_all()
+        first.close.assert_called_once()
+        other[0].close.assert_called_once()
+
+    @patch("django_backend.apps.proxy.utils.get_db_connections")
+    def test_dual_write_commits_once_per_database(self, mock_get_db_connections):
+        connections = [sqlite3.connect(":memory:"), sqlite3.connect(":memory:")]
+        for conn in connections:
+            conn.execute("CREATE TABLE proxies (proxy TEXT PRIMARY KEY, status TEXT)")
+        mock_get_db_connections.return_value = connections
+
+        with dual_write():
+            execute_sql_query("INSERT INTO proxies (proxy) VALUES (?)", ("1.1.1.1:80",))
+            execute_sql_query(
+                "UPDATE proxies SET status = ? WHERE proxy = ?",
+                ("active", "1.1.1.1:80"),
+            )
+            self.assertTrue(all(conn.in_transaction for conn in connections))
+        for conn in connections:
+            self.assertFalse(conn.in_transaction)
+            self.assertEqual(
+                conn.execute("SELECT status FROM proxies").fetchall(), [("active",)]
+            )
+
+        with self.assertRaises(RuntimeError):
+            with dual_write():
+                execute_sql_query(
+                    "DELETE FROM proxies WHERE proxy = ?", ("1.1.1.1:80",)
+                )
+                raise RuntimeError("boom")
+        for conn in connections:
+            self.assertEqual(
+                conn.execute("SELECT COUNT(*) FROM proxies").fetchone(), (1,)
+            )
+
+    @patch("django_backend.apps.proxy.utils.get_db_connections")
+    def test_dual_write_rolls_back_a_partial_write(self, mock_get_db_connections):
+        connections = [sqlite3.connect(":memory:"), sqlite3.connect(":memory:")]
+        connections[0].execute(
+            "CREATE TABLE proxies (proxy TEXT PRIMARY KEY, status TEXT)"
+        )
+        # the second database lacks the column, so its update fails
+        connections[1].execute("CREATE TABLE proxies (proxy TEXT PRIMARY KEY)")
+        for conn in connections:
+            conn.execute("INSERT INTO proxies (proxy) VALUES ('1.1.1.1:80')")
+            conn.commit()
+        mock_get_db_connections.return_value = connections
+
+        with self.assertRaises(DualWriteError):
+            with dual_write():
+                execute_sql_query(
+                    "DELETE FROM proxies WHERE proxy = ?", ("2.2.2.2:80",)
+                )
+                execute_sql_query(
+                    "UPDATE proxies SET status = ? WHERE proxy = ?",
+                    ("active", "1.1.1.1:80"),
+                )
+        self.assertFalse(connections[0].in_transaction)
+        self.assertEqual(
+            connections[0].execute("SELECT status FROM proxies").fetchall(), [(None,)]
+        )
+
+        # outside a block the error is still collected, not raised
+        result = execute_sql_query(
+            "UPDATE proxies SET status = ? WHERE proxy = ?", ("dead", "1.1.1.1:80")
+        )
+        self.assertEqual(len(result["error"]), 1)
+
     # @patch("django_backend.apps.proxy.utils.get_db_connections")
     # def test_execute_sql_query_failure(self, mock_get_db_connections):
     #     # Setup mock for get_db_connections
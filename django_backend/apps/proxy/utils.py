@@ -1,12 +1,15 @@
+import atexit
 import os
 import sys
-from typing import List, Optional, Tuple, Union
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
 from django.conf import settings
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../")))
 
-import sqlite3
 
 from django.db import connection
 from proxy_checker import *
@@ -32,12 +35,77 @@ def print_db_error(conn: MyDatabaseConnection, sql: str, error: Exception):
     return msg
 
 
+class ConnectionRegistry:
+    """
+    Per-thread ProxyDB connections shared by every query of a thread.
+
+    Each thread opens its connection to a database once and keeps it, so the
+    sqlite3 statement cache of that connection is reused across queries.
+    Connections are closed when their thread is garbage collected, by
+    `close_thread()`, and by `close_all()` when the process exits.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # every open ProxyDB, so `close_all()` can reach other threads' connections
+        self._open: List[ProxyDB] = []
+
+    def _thread_dbs(self) -> Dict[str, ProxyDB]:
+        dbs = getattr(self._local, "dbs", None)
+        if dbs is None:
+            dbs = self._local.dbs = {}
+            # close this thread's connections once the thread is gone
+            weakref.finalize(threading.current_thread(), self._close_dbs, dbs)
+        return dbs
+
+    def get(self, database_path: str) -> ProxyDB:
+        """Return the calling thread's ProxyDB for `database_path`, opening it once."""
+        dbs = self._thread_dbs()
+        db = dbs.get(database_path)
+        if db is None:
+            db = ProxyDB(database_path, True)
+            dbs[database_path] = db
+            with self._lock:
+                self._open.append(db)
+        return db
+
+    def _close_dbs(self, dbs: Dict[str, ProxyDB]) -> None:
+        for db in list(dbs.values()):
+            with self._lock:
+                if db in self._open:
+                    self._open.remove(db)
+            db.close()
+        dbs.clear()
+
+    def close_thread(self) -> None:
+        """Close the calling thread's connections."""
+        dbs = getattr(self._local, "dbs", None)
+        if dbs:
+            self._close_dbs(dbs)
+
+    def close_all(self) -> None:
+        """Close the connections of every thread."""
+        with self._lock:
+            dbs, self._open = self._open, []
+        for db in dbs:
+            db.close()
+
+
+_registry = ConnectionRegistry()
+atexit.register(_registry.close_all)
+# True while the calling thread is inside `dual_write()`
+_dual_write = threading.local()
+
+
 def get_connection(database_path: str):
     """
-    Helper function to retrieve a database connection.
+    Helper function to retrieve the calling thread's database connection.
+
+    The connection is shared by later calls of the same thread; do not close it.
     """
     try:
-        db = ProxyDB(database_path, True)
+        db = _registry.get(database_path)
         return db.db.conn if db.db is not None else None
     except Exception as e:
         print(f"Error accessing database at {database_path}: {e}")
@@ -46,7 +114,7 @@ def get_connection(database_path: str):
 
 def get_db_connections() -> List[MyDatabaseConnection]:
     """
-    Retrieves a list of active database connections.
+    Retrieves the calling thread's connections to the Django and proxy databases.
     """
     connections = []
     # Django database connection
@@ -64,6 +132,62 @@ def get_db_connections() -> List[MyDatabaseConnection]:
     return connections
 
 
+def close_db_connections() -> None:
+    """Close the calling thread's connections, e.g. at the end of a worker task."""
+    _registry.close_thread()
+
+
+def get_proxy_db() -> ProxyDB:
+    """
+    The calling thread's ProxyDB of the PHP Proxy Hunter database.
+
+    Use it for the ProxyDB helpers, e.g. `get_proxy_db().load_latency_history()`.
+    """
+    return _registry.get(get_relative_path("src/database.sqlite"))
+
+
+class DualWriteError(RuntimeError):
+    """A statement of a `dual_write()` block failed on one of the databases."""
+
+
+@contextmanager
+def dual_write() -> Iterator[None]:
+    """
+    Group the `execute_sql_query()` writes of the block into one transaction per database.
+
+    Both databases are committed when the block exits and rolled back when it
+    raises. Inside the block `execute_sql_query()` raises `DualWriteError`
+    instead of collecting errors, so a write that fails on either database
+    rolls back both. Nested blocks join the outer one.
+
+    Example:
+        >>> with dual_write():
+        ...     execute_sql_query("DELETE FROM proxies WHERE proxy = ?", (proxy,))
+        ...     execute_sql_query("UPDATE proxies SET status = ? WHERE proxy = ?", ("dead", other))
+    """
+    if getattr(_dual_write, "active", False):
+        yield
+        return
+    _dual_write.active = True
+    try:
+        yield
+    except BaseException:
+        for conn in get_db_connections():
+            try:
+                conn.rollback()
+            except Exception as e:
+                print_db_error(conn=conn, sql="ROLLBACK", error=e)
+        raise
+    else:
+        for conn in get_db_connections():
+            try:
+                conn.commit()
+            except Exception as e:
+                print_db_error(conn=conn, sql="COMMIT", error=e)
+    finally:
+        _dual_write.active = False
+
+
 def format_query(query: str, params: Optional[Tuple] = None) -> str:
     """
     Formats an SQL query by substituting placeholders with actual parameter values.
@@ -148,9 +272,6 @@ def execute_select_query(
                 cursor.close()
             except Exception as e:
                 print_db_error(conn=conn, sql=sql, error=e)
-            finally:
-                if isinstance(conn, sqlite3.Connection):
-                    conn.close()
         else:
             print(f"Connection {conn} is None")
 
@@ -237,6 +358,8 @@ def execute_sql_query(
         if sql.lower().strip().startswith("insert"):
             sql, params = adjust_sql_insert_query(sql, params)
     except ValueError as e:
+        if getattr(_dual_write, "active", False):
+            raise DualWriteError(str(e)) from e
         results["error"].append(str(e))
         return results
 
@@ -267,7 +390,9 @@ def execute_sql_query(
                     if debug:
                         print(f"[SQLite] Fetched results: {query_results}")
                 else:
-                    conn.commit()
+                    # inside `dual_write()` the block commits once at the end
+                    if not getattr(_dual_write, "active", False):
+                        conn.commit()
                     results["items"].append(cursor.rowcount)
                     if debug:
                         print(f"[SQLite] Affected rows: {cursor.rowcount}")
@@ -275,13 +400,12 @@ def execute_sql_query(
                 cursor.close()
             except Exception as e:
                 error_message = print_db_error(conn=conn, sql=sql, error=e)
+                if getattr(_dual_write, "active", False):
+                    raise DualWriteError(error_message) from e
                 results["error"].append(error_message)
-            finally:
-                if hasattr(conn, "close"):
-                    conn.close()
-                    if debug:
-                        print(f"[SQLite] Closed {conn_info}")
         else:
+            if getattr(_dual_write, "active", False):
+                raise DualWriteError(f"{conn_info} has no connection")
             results["error"].append(f"{conn_info} has no connection")
 
     return results
@@ -1,12 +1,71 @@
 import json
+import sys
 from typing import Any, Dict, List, Optional
 
+# Attributes of a proxies table row, in the order `to_dict()` lists them
+PROXY_FIELDS = (
+    "id",
+    "proxy",
+    "latency",
+    "type",
+    "region",
+    "city",
+    "country",
+    "last_check",
+    "anonymity",
+    "status",
+    "timezone",
+    "longitude",
+    "private",
+    "latitude",
+    "lang",
+    "useragent",
+    "webgl_vendor",
+    "webgl_renderer",
+    "browser_vendor",
+    "username",
+    "password",
+    "https",
+    "tun2socks",
+)
+
+# Low-cardinality text columns; interning shares one string object per
+# distinct value across all loaded proxies
+INTERNED_FIELDS = frozenset(
+    (
+        "type",
+        "region",
+        "city",
+        "country",
+        "anonymity",
+        "status",
+        "timezone",
+        "private",
+        "lang",
+        "webgl_vendor",
+        "webgl_renderer",
+        "browser_vendor",
+        "https",
+    )
+)
+
+
+def intern_value(value: Any) -> Any:
+    """Intern `value` when it is a string, return it unchanged otherwise."""
+    return sys.intern(value) if type(value) is str else value
+
 
 class Proxy:
     """
     Proxy table data class
+
+    Uses `__slots__` for the table columns, so a loaded proxy costs a fraction
+    of a dict-backed object. Attributes outside `PROXY_FIELDS` can still be set
+    (they go to a per-instance `__dict__`, created on first use).
     """
 
+    __slots__ = PROXY_FIELDS + ("__dict__",)
+
     def __init__(
         self,
         proxy: str,
@@ -63,25 +122,25 @@ class Proxy:
         self.id = id
         self.proxy = proxy
         self.latency = latency
-        self.type = type
-        self.region = region
-        self.city = city
-        self.country = country
+        self.type = intern_value(type)
+        self.region = intern_value(region)
+        self.city = intern_value(city)
+        self.country = intern_value(country)
         self.last_check = last_check
-        self.anonymity = anonymity
-        self.status = status
-        self.timezone = timezone
+        self.anonymity = intern_value(anonymity)
+        self.status = intern_value(status)
+        self.timezone = intern_value(timezone)
         self.longitude = longitude
-        self.private = private
+        self.private = intern_value(private)
         self.latitude = latitude
-        self.lang = lang
+        self.lang = intern_value(lang)
         self.useragent = useragent
-        self.webgl_vendor = webgl_vendor
-        self.webgl_renderer = webgl_renderer
-        self.browser_vendor = browser_vendor
+        self.webgl_vendor = intern_value(webgl_vendor)
+        self.webgl_renderer = intern_value(webgl_renderer)
+        self.browser_vendor = intern_value(browser_vendor)
         self.username = username
         self.password = password
-        self.https = https
+        self.https = intern_value(https)
         self.tun2socks = tun2socks
 
     def has_credentials(self) -> bool:
@@ -93,11 +152,15 @@ class Proxy:
         )
 
     def __str__(self):
-        attributes = ", ".join(f"{key}: {value}" for key, value in vars(self).items())
+        attributes = ", ".join(
+            f"{key}: {value}" for key, value in self.to_dict().items()
+        )
         return f"Proxy({attributes})"
 
     def __repr__(self):
-        attributes = ", ".join(f"{key}: {value}" for key, value in vars(self).items())
+        attributes = ", ".join(
+            f"{key}: {value}" for key, value in self.to_dict().items()
+        )
         return f"Proxy({attributes})"
 
     def format(self) -> str:
@@ -123,6 +186,8 @@ class Proxy:
             print(Proxy("ip:port").from_dict(**dictionary))
         """
         for key, value in kwargs.items():
+            if key in INTERNED_FIELDS:
+                value = intern_value(value)
             setattr(self, key, value)
         return self
 
@@ -130,9 +195,9 @@ class Proxy:
         """
         Transform current result into dict ProxyDB
         """
-        properties = {}
-        for attr, value in vars(self).items():
-            properties[attr] = value
+        properties = {attr: getattr(self, attr) for attr in PROXY_FIELDS}
+        # attributes set outside the table columns, e.g. via `from_dict()`
+        properties.update(self.__dict__)
         return properties
 
     def to_json(self) -> str:
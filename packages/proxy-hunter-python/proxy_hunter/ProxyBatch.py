@@ -0,0 +1,142 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from proxy_hunter.Proxy import INTERNED_FIELDS, PROXY_FIELDS, Proxy, intern_value
+from proxy_hunter.ip_ranges import int_to_ip, ip_to_int
+from proxy_hunter.utils.index_utils import is_valid_ipv4
+
+# Derived from `proxy` (generated columns in the database), never stored twice
+_DERIVED_COLUMNS = ("ip", "port")
+
+
+class ProxyBatch:
+    """
+    Columnar container for many proxies.
+
+    IPv4 `host:port` proxies are stored as parallel `uint32` ip and `uint16`
+    port arrays and `id` as an `int64` array; other proxies (hostnames, IPv6)
+    keep their string. Every other column is a list, with low-cardinality text
+    values interned. A row costs tens of bytes instead of a dict or a `Proxy`
+    per row; `Proxy` objects are only built on access.
+
+    Example:
+        batch = ProxyBatch(["status"])
+        batch.append("1.2.3.4:8080", status="active")
+        batch[0].proxy  # '1.2.3.4:8080'
+    """
+
+    __slots__ = ("ids", "ips", "ports", "columns", "_hosts")
+
+    def __init__(self, columns: Iterable[str] = ()):
+        """
+        Args:
+            columns (Iterable[str]): Extra columns to keep besides `id` and
+                `proxy`, usually from `PROXY_FIELDS`.
+        """
+        self.ids = array("q")
+        self.ips = array("I")
+        self.ports = array("H")
+        # row index -> proxy string, for rows that are not IPv4 host:port
+        self._hosts: Dict[int, str] = {}
+        self.columns: Dict[str, List[Any]] = {
+            name: []
+            for name in columns
+            if name not in ("id", "proxy") and name not in _DERIVED_COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return len(self.ports)
+
+    def _append_proxy(self, proxy: str, id: Optional[int]) -> None:
+        index = len(self.ports)
+        host, _, port = proxy.rpartition(":")
+        # only canonical forms, so `proxy_at()` gives back the same string
+        if (
+            is_valid_ipv4(host)
+            and port.isdigit()
+            and (port[0] != "0" or port == "0")
+            and int(port) <= 65535
+        ):
+            self.ips.append(ip_to_int(host))
+            self.ports.append(int(port))
+        else:
+            self.ips.append(0)
+            self.ports.append(0)
+            self._hosts[index] = proxy
+        # 0 stands for "no id"; database ids start at 1
+        self.ids.append(id or 0)
+
+    def append(self, proxy: Union[str, Proxy, Dict[str, Any]], **values: Any) -> None:
+        """
+        Add one proxy.
+
+        Args:
+            proxy (Union[str, Proxy, Dict[str, Any]]): A `host:port` string, a
+                `Proxy` or a row dict.
+            **values: Column values when `proxy` is a string.
+        """
+        if isinstance(proxy, Proxy):
+            values = {name: getattr(proxy, name) for name in PROXY_FIELDS}
+        elif isinstance(proxy, dict):
+            values = proxy
+        else:
+            values = dict(values, proxy=proxy)
+        self._append_proxy(str(values.get("proxy") or ""), values.get("id"))
+        for name, column in self.columns.items():
+            value = values.get(name)
+            column.append(intern_value(value) if name in INTERNED_FIELDS else value)
+
+    def extend_rows(self, names: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+        """
+        Add raw row tuples straight from a database cursor.
+
+        Args:
+            names (Sequence[str]): Column names of the rows; must include `proxy`.
+            rows (Iterable[Sequence[Any]]): Row tuples in `names` order.
+        """
+        proxy_index = list(names).index("proxy")
+        id_index = list(names).index("id") if "id" in names else None
+        targets = [
+            (i, self.columns[name], name in INTERNED_FIELDS)
+            for i, name in enumerate(names)
+            if name in self.columns
+        ]
+        for row in rows:
+            self._append_proxy(
+                str(row[proxy_index] or ""),
+                row[id_index] if id_index is not None else None,
+            )
+            for i, column, interned in targets:
+                column.append(intern_value(row[i]) if interned else row[i])
+
+    def proxy_at(self, index: int) -> str:
+        """Return the `host:port` string of row `index`."""
+        if index < 0:
+            index += len(self)
+        host = self._hosts.get(index)
+        if host is not None:
+            return host
+        return f"{int_to_ip(self.ips[index])}:{self.ports[index]}"
+
+    def __getitem__(self, index: int) -> Proxy:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ProxyBatch index out of range")
+        proxy = Proxy(proxy=self.proxy_at(index), id=self.ids[index] or None)
+        for name, column in self.columns.items():
+            setattr(proxy, name, column[index])
+        return proxy
+
+    def __iter__(self) -> Iterator[Proxy]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def iter_proxies(self) -> Iterator[str]:
+        """Iterate the `host:port` strings without building `Proxy` objects."""
+        for index in range(len(self)):
+            yield self.proxy_at(index)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Rows as dicts, like `ProxyDB.select` returns them."""
+        return [proxy.to_dict() for proxy in self]
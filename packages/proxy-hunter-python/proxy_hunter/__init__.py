@@ -1,33 +1,73 @@
 from .check_host import check_host
-from .cidr2ips import list_ips_from_cidr
+from .cidr2ips import iter_ips_from_cidr, list_ips_from_cidr
 from .curl import (
+    AsyncProxyClient,
+    AsyncProxyError,
+    AsyncResponse,
+    CheckPipeline,
+    CookieStore,
     DebugSession,
+    FetchSummary,
+    JudgeServer,
+    LatencyStats,
+    LatencyTracker,
+    PipelineResult,
+    PortResult,
+    PortScanner,
+    ProtocolFingerprint,
     ProxyCheckResult,
+    SessionPool,
+    StageResult,
+    StageTimings,
+    async_check_proxies,
+    async_check_proxy,
     build_request,
     check_proxy,
+    classify_anonymity,
+    detect_protocols,
+    detect_protocols_sync,
+    flush_cookie_stores,
     generate_netscape_cookie_jar,
+    get_async_client,
+    get_check_pipeline,
+    get_cookie_store,
     get_device_ip,
+    get_judge_url,
+    get_latency_tracker,
     get_pc_useragent,
     get_requests_error,
+    get_session_pool,
     is_port_open,
     is_prox,
     join_header_words,
     lwp_cookie_str,
     merge_certificates,
+    open_proxy_connection,
+    parse_ports,
+    parse_target,
+    protocols_from_type,
     random_windows_ua,
+    run_judge,
+    scan_ports,
     time2isoz,
     update_cookie_jar,
 )
 from .extractor import extract_ips, extract_url
 from .ip2cidr import calculate_cidr
-from .ip2proxy_list import generate_ip_port_pairs
+from .ip2proxy_list import generate_ip_port_pairs, ip_port_grid
+from .ip_ranges import IPRange, TargetGrid, format_targets, int_to_ip, ip_to_int
 from .ip2subnet import get_default_subnet_mask, get_subnet_mask
 from .Proxy import Proxy, dict_to_proxy_list
+from .ProxyBatch import ProxyBatch
 from .proxyhunter import scan, target
 from .proxyhunter2 import gen_ports, iterate_gen_ports, log, proxy_hunter2
 from .utils import (
+    BloomFilter,
     ConfigDB,
+    DiskStringSet,
     IterationHelper,
+    QueueItem,
+    WorkQueue,
     base64_decode,
     base64_encode,
     check_raw_headers_keywords,
@@ -58,12 +98,14 @@ from .utils import (
     is_valid_hostname,
     is_valid_ip,
     is_valid_ip_connection,
+    is_valid_ipv4,
     is_valid_proxy,
     is_valid_url,
     is_vps,
     iterationHelper,
     keep_alphanumeric_and_remove_spaces,
     list_files_in_directory,
+    list_text_files,
     load_tuple_from_file,
     md5,
     move_string_between,
@@ -74,6 +116,7 @@ from .utils import (
     remove_duplicate_line_from_file,
     remove_non_ascii,
     remove_string_from_file,
+    remove_strings_from_file,
     remove_trailing_hyphens,
     resolve_folder,
     resolve_parent_folder,
@@ -88,5 +131,12 @@ from .utils import (
     write_json,
     append_file,
 )
-from .utils.extractor.proxies.extract_proxies import extract_proxies
-from .utils.extractor.proxies.extract_proxies_from_file import extract_proxies_from_file
+from .utils.extractor.proxies.extract_proxies import (
+    extract_proxies,
+    iter_extract_proxies,
+)
+from .utils.extractor.proxies.extract_proxies_from_file import (
+    extract_proxies_from_file,
+    iter_file_chunks,
+    iter_proxies_from_files,
+)
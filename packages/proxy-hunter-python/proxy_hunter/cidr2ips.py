@@ -1,19 +1,39 @@
 import ipaddress
-from typing import List
+from typing import Iterator, List
+
+from proxy_hunter.ip_ranges import IPRange
+
+
+def iter_ips_from_cidr(cidr: str) -> Iterator[str]:
+    """
+    Lazily yields the host addresses of a CIDR block, formatting one at a time.
+
+    Args:
+        cidr (str): The CIDR block (e.g., '10.0.0.0/16').
+
+    Returns:
+        Iterator[str]: The IP addresses as strings.
+    """
+    network = ipaddress.ip_network(cidr)
+    if network.version == 4:
+        return IPRange.from_cidr(cidr).iter_strings()
+    return map(str, network.hosts())
 
 
 def list_ips_from_cidr(cidr: str) -> List[str]:
     """
     Generates a list of IP addresses within a given CIDR block.
 
+    For large blocks prefer `iter_ips_from_cidr`, or `IPRange` to keep the
+    addresses as integers.
+
     Args:
         cidr (str): The CIDR block (e.g., '192.168.1.0/28').
 
     Returns:
         List[str]: A list of IP addresses as strings.
     """
-    network = ipaddress.ip_network(cidr)
-    return [str(ip) for ip in network.hosts()]
+    return list(iter_ips_from_cidr(cidr))
 
 
 if __name__ == "__main__":
@@ -1,5 +1,38 @@
+from .async_client import (
+    AsyncProxyClient,
+    AsyncProxyError,
+    AsyncResponse,
+    async_check_proxies,
+    async_check_proxy,
+    get_async_client,
+    open_proxy_connection,
+    parse_proxy,
+)
+from .check_pipeline import (
+    CheckPipeline,
+    FetchSummary,
+    PipelineResult,
+    StageResult,
+    StageTimings,
+    get_check_pipeline,
+)
+from .fingerprint import (
+    ProtocolFingerprint,
+    detect_protocols,
+    detect_protocols_sync,
+    protocols_from_type,
+)
 from .certificates import last_merged_certificates_path, merge_certificates
 from .DebugSession import DebugSession
+from .judge import JudgeServer, classify_anonymity, get_judge_url, run_judge
+from .latency import LatencyStats, LatencyTracker, get_latency_tracker
+from .port_scanner import (
+    PortResult,
+    PortScanner,
+    parse_ports,
+    parse_target,
+    scan_ports,
+)
 from .func_useragent import get_pc_useragent, random_windows_ua
 from .prox_check import is_prox
 from .proxy_utils import (
@@ -10,10 +43,14 @@ from .proxy_utils import (
     is_port_open,
 )
 from .request_helper import (
+    CookieStore,
     build_request,
+    flush_cookie_stores,
     generate_netscape_cookie_jar,
+    get_cookie_store,
     join_header_words,
     lwp_cookie_str,
     time2isoz,
     update_cookie_jar,
 )
+from .session_pool import SessionPool, get_session_pool
@@ -0,0 +1,805 @@
+import asyncio
+import contextlib
+import ipaddress
+import json
+import re
+import secrets
+import socket
+import ssl
+import struct
+import time
+import weakref
+import zlib
+from base64 import b64encode
+from datetime import timedelta
+from string import ascii_letters, digits
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import unquote, urlencode, urljoin, urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from proxy_hunter.curl.judge import get_judge_url
+from proxy_hunter.curl.proxy_utils import ProxyCheckResult, get_requests_error
+
+PROXY_TYPES = ("http", "socks4", "socks5")
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/81.0.4044.138 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+}
+
+_IPV4_PORT = re.compile(r"^\d{1,3}(?:\.\d{1,3}){3}:\d+$")
+_STATUS_LINE = re.compile(rb"^HTTP/\d(?:\.\d)? (\d{3})(?: (.*))?$")
+_CHARSET = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+_SOCKS5_ERRORS = {
+    1: "general SOCKS server failure",
+    2: "connection not allowed by ruleset",
+    3: "network unreachable",
+    4: "host unreachable",
+    5: "connection refused",
+    6: "TTL expired",
+    7: "command not supported",
+    8: "address type not supported",
+}
+
+# the global semaphore of an event loop and its per-host semaphores
+_Limits = Tuple[
+    asyncio.Semaphore, "weakref.WeakValueDictionary[str, asyncio.Semaphore]"
+]
+
+
+class AsyncProxyError(Exception):
+    """A request through a proxy failed."""
+
+
+class ProxyConnectError(AsyncProxyError):
+    """The proxy itself could not be reached."""
+
+
+class ProxyAddress(NamedTuple):
+    type: str
+    host: str
+    port: int
+    username: Optional[str] = None
+    password: Optional[str] = None
+
+
+def parse_proxy(
+    proxy: str,
+    proxy_type: Optional[str] = None,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+) -> ProxyAddress:
+    """
+    Parse a proxy in any of the formats accepted by `build_request`.
+
+    Args:
+        proxy (str): 'IP:PORT', 'user:pass@IP:PORT', 'IP:PORT@user:pass' or a
+            proxy URL such as 'socks5://user:pass@IP:PORT'.
+        proxy_type (Optional[str]): 'http', 'socks4' or 'socks5'. Defaults to
+            the URL scheme, or 'http' without one.
+        username (Optional[str]): Username, when not part of `proxy`.
+        password (Optional[str]): Password, when not part of `proxy`.
+
+    Raises:
+        ValueError: If the type or the address is invalid.
+    """
+    scheme, sep, rest = proxy.strip().partition("://")
+    if not sep:
+        scheme, rest = "", scheme
+    if proxy_type is None:
+        scheme = scheme.lower()
+        proxy_type = "http" if scheme in ("", "http", "https") else scheme
+    proxy_type = proxy_type.lower()
+    if proxy_type not in PROXY_TYPES:
+        raise ValueError(
+            "Invalid proxy type. Supported types are 'http', 'socks4', and 'socks5'."
+        )
+    rest = rest.rstrip("/")
+    if "@" in rest:
+        credentials, rest = rest.rsplit("@", 1)
+        # 'IP:PORT@user:pass' puts the credentials last
+        if _IPV4_PORT.match(credentials) and not _IPV4_PORT.match(rest):
+            credentials, rest = rest, credentials
+        user, _, secret = credentials.partition(":")
+        username = username or unquote(user)
+        password = password or unquote(secret)
+    host, _, port = rest.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Invalid proxy address: {proxy}")
+    return ProxyAddress(
+        proxy_type, host.strip("[]"), int(port), username or None, password or None
+    )
+
+
+class AsyncResponse:
+    """The parts of `requests.Response` the proxy checkers read."""
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        reason: str,
+        headers: CaseInsensitiveDict,
+        content: bytes,
+        elapsed: timedelta,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.elapsed = elapsed
+        self.history: List["AsyncResponse"] = []
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def encoding(self) -> str:
+        match = _CHARSET.search(self.headers.get("Content-Type", ""))
+        return match.group(1) if match else "utf-8"
+
+    @property
+    def text(self) -> str:
+        try:
+            return self.content.decode(self.encoding, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def __repr__(self):
+        return f"<AsyncResponse [{self.status_code}]>"
+
+
+class AsyncProxyClient:
+    """
+    HTTP client speaking HTTP, SOCKS4 and SOCKS5 proxies on asyncio streams,
+    so thousands of checks run concurrently on one event loop without a
+    thread each.
+
+    Every request opens its own connection, bounded by `limit` connections
+    overall and `limit_per_host` per proxy (or per target without a proxy).
+
+    Example:
+        client = AsyncProxyClient(limit=2000)
+        response = await client.request(
+            "GET", "https://httpbin.org/ip", proxy="socks5://1.2.3.4:1080"
+        )
+    """
+
+    def __init__(
+        self,
+        limit: int = 1000,
+        limit_per_host: int = 8,
+        timeout: float = 10.0,
+        connect_timeout: Optional[float] = None,
+        verify: bool = False,
+        max_redirects: int = 5,
+        max_body: int = 1 << 20,
+    ):
+        """
+        Args:
+            limit (int): Connections open at once across all hosts.
+            limit_per_host (int): Connections open at once per proxy.
+            timeout (float): Seconds allowed for each request, redirect hops included separately.
+            connect_timeout (Optional[float]): Seconds allowed to reach the target through the proxy. Defaults to `timeout`.
+            verify (bool): Verify TLS certificates, off like `build_request`.
+            max_redirects (int): Redirects followed before giving up.
+            max_body (int): Bytes of body kept; the rest is dropped.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.verify = verify
+        self.max_redirects = max_redirects
+        self.max_body = max_body
+        # per event loop: the global semaphore and the per-host ones, which
+        # live while a request holds them
+        self._limits: (
+            "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Limits]"
+        ) = weakref.WeakKeyDictionary()
+        self._ssl_contexts: Dict[bool, ssl.SSLContext] = {}
+
+    @contextlib.asynccontextmanager
+    async def _slot(self, key: str) -> AsyncIterator[None]:
+        loop = asyncio.get_running_loop()
+        # semaphores belong to one loop, and the client may be shared by
+        # several (asyncio.run() starts a new one each time)
+        limits = self._limits.get(loop)
+        if limits is None:
+            limits = (asyncio.Semaphore(self.limit), weakref.WeakValueDictionary())
+            self._limits[loop] = limits
+        limiter, hosts = limits
+        host_limiter = hosts.get(key)
+        if host_limiter is None:
+            host_limiter = asyncio.Semaphore(self.limit_per_host)
+            hosts[key] = host_limiter
+        # wait for the host first so a busy proxy does not hold global slots
+        async with host_limiter:
+            async with limiter:
+                yield
+
+    def _ssl_context(self, verify: bool) -> ssl.SSLContext:
+        context = self._ssl_contexts.get(verify)
+        if context is None:
+            context = ssl.create_default_context()
+            if not verify:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+            self._ssl_contexts[verify] = context
+        return context
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        proxy: Optional[str] = None,
+        proxy_type: Optional[str] = None,
+        proxy_username: Optional[str] = None,
+        proxy_password: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[Union[Dict[str, str], str, bytes]] = None,
+        timeout: Optional[float] = None,
+        verify: Optional[bool] = None,
+        follow_redirects: bool = True,
+        no_cache: bool = False,
+    ) -> AsyncResponse:
+        """
+        Send a request, through `proxy` when given.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): An http:// or https:// URL.
+            proxy (Optional[str]): The proxy, see `parse_proxy`. Defaults to a direct request.
+            proxy_type (Optional[str]): 'http', 'socks4' or 'socks5'.
+            proxy_username (Optional[str]): Username for proxy authentication.
+            proxy_password (Optional[str]): Password for proxy authentication.
+            headers (Optional[Dict[str, str]]): Headers added to `DEFAULT_HEADERS`.
+            data (Optional[Union[Dict[str, str], str, bytes]]): The request body, a dict is form encoded.
+            timeout (Optional[float]): Overrides the client timeout.
+            verify (Optional[bool]): Overrides the client TLS verification.
+            follow_redirects (bool): Follow 3xx responses like `requests` does.
+            no_cache (bool): Bypass caches by appending a unique query
+                parameter, like `build_request`.
+
+        Returns:
+            AsyncResponse: The final response, earlier redirects in `history`.
+
+        Raises:
+            AsyncProxyError: If the proxy or the target fails or times out.
+            ValueError: If the proxy or the URL is invalid.
+        """
+        address = (
+            parse_proxy(proxy, proxy_type, proxy_username, proxy_password)
+            if proxy
+            else None
+        )
+        if no_cache:
+            unique = "".join(secrets.choice(ascii_letters + digits) for _ in range(5))
+            url += ("&" if "?" in url else "?") + f"nocache={unique}"
+        merged = dict(DEFAULT_HEADERS)
+        if headers:
+            merged.update(headers)
+        body = b""
+        if isinstance(data, dict):
+            body = urlencode(data).encode()
+            merged.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        elif isinstance(data, str):
+            body = data.encode("utf-8")
+        elif data:
+            body = data
+        method = method.upper()
+        history: List[AsyncResponse] = []
+        while True:
+            response = await self._send(
+                method,
+                url,
+                address,
+                merged,
+                body,
+                self.timeout if timeout is None else timeout,
+                self.verify if verify is None else verify,
+            )
+            location = response.headers.get("Location")
+            if (
+                not follow_redirects
+                or response.status_code not in REDIRECT_CODES
+                or not location
+            ):
+                response.history = history
+                return response
+            if len(history) >= self.max_redirects:
+                raise AsyncProxyError(f"Exceeded {self.max_redirects} redirects")
+            history.append(response)
+            url = urljoin(url, location)
+            if response.status_code == 303 or (
+                response.status_code in (301, 302) and method == "POST"
+            ):
+                method, body = "GET", b""
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        """Send a GET request, see `request`."""
+        return await self.request("GET", url, **kwargs)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        address: Optional[ProxyAddress],
+        headers: Dict[str, str],
+        body: bytes,
+        timeout: float,
+        verify: bool,
+    ) -> AsyncResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        host = parts.hostname
+        port = parts.port or (443 if scheme == "https" else 80)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        key = f"{address.host}:{address.port}" if address else f"{host}:{port}"
+        async with self._slot(key):
+            try:
+                return await asyncio.wait_for(
+                    self._exchange(
+                        method,
+                        url,
+                        scheme,
+                        host,
+                        port,
+                        target,
+                        address,
+                        headers,
+                        body,
+                        timeout,
+                        verify,
+                    ),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                raise AsyncProxyError(
+                    f"{address.host if address else host} timed out"
+                ) from None
+
+    async def _exchange(
+        self,
+        method: str,
+        url: str,
+        scheme: str,
+        host: str,
+        port: int,
+        target: str,
+        address: Optional[ProxyAddress],
+        headers: Dict[str, str],
+        body: bytes,
+        timeout: float,
+        verify: bool,
+    ) -> AsyncResponse:
+        start = time.perf_counter()
+        reader, writer = await asyncio.wait_for(
+            _open_stream(address, host, port),
+            self.connect_timeout or timeout,
+        )
+        try:
+            request_headers = dict(headers)
+            if address is not None and address.type == "http":
+                if scheme == "https":
+                    await _http_connect(reader, writer, address, host, port)
+                else:
+                    # plain HTTP goes to the proxy with the absolute URL
+                    target = url.split("#", 1)[0]
+                    if address.username:
+                        request_headers["Proxy-Authorization"] = _basic_auth(address)
+            if scheme == "https":
+                await writer.start_tls(self._ssl_context(verify), server_hostname=host)
+            default_port = 443 if scheme == "https" else 80
+            request_headers.setdefault(
+                "Host", host if port == default_port else f"{host}:{port}"
+            )
+            request_headers["Connection"] = "close"
+            if body or method in ("POST", "PUT", "PATCH"):
+                request_headers["Content-Length"] = str(len(body))
+            lines = [f"{method} {target} HTTP/1.1"]
+            lines.extend(f"{name}: {value}" for name, value in request_headers.items())
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+            status, reason, response_headers = await _read_head(reader)
+            elapsed = timedelta(seconds=time.perf_counter() - start)
+            content = await self._read_body(reader, method, status, response_headers)
+            return AsyncResponse(
+                url, status, reason, response_headers, content, elapsed
+            )
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            raise AsyncProxyError(f"Connection closed unexpectedly: {e}") from e
+        except ssl.SSLError as e:
+            raise AsyncProxyError(f"SSL error: {e}") from e
+        finally:
+            writer.close()
+
+    async def _read_body(
+        self,
+        reader: asyncio.StreamReader,
+        method: str,
+        status: int,
+        headers: CaseInsensitiveDict,
+    ) -> bytes:
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            return b""
+        limit = self.max_body
+        chunks: List[bytes] = []
+        size = 0
+        if "chunked" in headers.get("Transfer-Encoding", "").lower():
+            while size < limit:
+                line = await reader.readline()
+                chunk_size = int(line.split(b";", 1)[0].strip() or b"0", 16)
+                if chunk_size == 0:
+                    break
+                chunk = await reader.readexactly(chunk_size)
+                await reader.readexactly(2)
+                chunks.append(chunk)
+                size += chunk_size
+        elif "Content-Length" in headers:
+            length = min(int(headers["Content-Length"]), limit)
+            chunks.append(await reader.readexactly(length))
+        else:
+            # the server closes the connection after the body
+            while size < limit:
+                chunk = await reader.read(limit - size)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+        content = b"".join(chunks)[:limit]
+        encoding = headers.get("Content-Encoding", "").lower()
+        if encoding in ("gzip", "x-gzip"):
+            content = _decompress(content, zlib.MAX_WBITS | 16)
+        elif encoding == "deflate":
+            try:
+                content = _decompress(content, zlib.MAX_WBITS)
+            except zlib.error:
+                content = _decompress(content, -zlib.MAX_WBITS)
+        return content
+
+
+async def _open_stream(
+    address: Optional[ProxyAddress], host: str, port: int
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Open a stream to `host:port`, tunnelled through SOCKS proxies."""
+    if address is None:
+        try:
+            return await asyncio.open_connection(host, port)
+        except OSError as e:
+            raise AsyncProxyError(f"Cannot connect to {host}:{port}: {e}") from e
+    try:
+        reader, writer = await asyncio.open_connection(address.host, address.port)
+    except OSError as e:
+        raise ProxyConnectError(
+            f"Cannot connect to proxy {address.host}:{address.port}: {e}"
+        ) from e
+    try:
+        if address.type == "socks4":
+            await _socks4_connect(reader, writer, address, host, port)
+        elif address.type == "socks5":
+            await _socks5_connect(reader, writer, address, host, port)
+    except (ConnectionError, asyncio.IncompleteReadError) as e:
+        writer.close()
+        raise AsyncProxyError(
+            f"{address.type.upper()} proxy server sent invalid data"
+        ) from e
+    except BaseException:
+        writer.close()
+        raise
+    return reader, writer
+
+
+async def open_proxy_connection(
+    proxy: str,
+    host: str,
+    port: int,
+    proxy_type: Optional[str] = None,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """
+    Open a raw TCP tunnel to `host:port` through a proxy, HTTP proxies via CONNECT.
+
+    Wrap it in `asyncio.wait_for` to bound the time spent; upgrade it with
+    `writer.start_tls` for TLS.
+
+    Args:
+        proxy (str): The proxy, see `parse_proxy`.
+        host (str): The target host.
+        port (int): The target port.
+        proxy_type (Optional[str]): 'http', 'socks4' or 'socks5'.
+        username (Optional[str]): Username for proxy authentication.
+        password (Optional[str]): Password for proxy authentication.
+
+    Raises:
+        AsyncProxyError: If the proxy cannot be reached or refuses the tunnel.
+    """
+    address = parse_proxy(proxy, proxy_type, username, password)
+    reader, writer = await _open_stream(address, host, port)
+    if address.type == "http":
+        try:
+            await _http_connect(reader, writer, address, host, port)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            writer.close()
+            raise AsyncProxyError("Tunnel connection failed") from e
+        except BaseException:
+            writer.close()
+            raise
+    return reader, writer
+
+
+def _decompress(content: bytes, wbits: int) -> bytes:
+    decompressor = zlib.decompressobj(wbits)
+    # a body cut at max_body still yields its beginning
+    return decompressor.decompress(content) + decompressor.flush()
+
+
+def _basic_auth(address: ProxyAddress) -> str:
+    token = f"{address.username}:{address.password or ''}".encode("utf-8")
+    return "Basic " + b64encode(token).decode("ascii")
+
+
+async def _read_head(
+    reader: asyncio.StreamReader,
+) -> Tuple[int, str, CaseInsensitiveDict]:
+    """Read a status line and headers."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            raise AsyncProxyError("Connection closed unexpectedly") from e
+        raise AsyncProxyError("Connection aborted: BadStatusLine") from e
+    except asyncio.LimitOverrunError as e:
+        raise AsyncProxyError("Connection aborted: header too long") from e
+    lines = head.rstrip(b"\r\n").split(b"\r\n")
+    match = _STATUS_LINE.match(lines[0])
+    if not match:
+        raise AsyncProxyError(f"Connection aborted: BadStatusLine {lines[0][:64]!r}")
+    headers: CaseInsensitiveDict = CaseInsensitiveDict()
+    for line in lines[1:]:
+        name, sep, value = line.decode("latin-1").partition(":")
+        if not sep:
+            continue
+        name, value = name.strip(), value.strip()
+        # repeated headers are folded like requests does
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+    return int(match.group(1)), (match.group(2) or b"").decode("latin-1"), headers
+
+
+async def _http_connect(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    address: ProxyAddress,
+    host: str,
+    port: int,
+) -> None:
+    """Open a CONNECT tunnel through an HTTP proxy."""
+    lines = [f"CONNECT {host}:{port} HTTP/1.1", f"Host: {host}:{port}"]
+    if address.username:
+        lines.append(f"Proxy-Authorization: {_basic_auth(address)}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+    status, reason, _ = await _read_head(reader)
+    if status == 407:
+        raise AsyncProxyError("Proxy authentication required (Private)")
+    if status // 100 != 2:
+        raise AsyncProxyError(f"Tunnel connection failed: {status} {reason}".rstrip())
+
+
+async def _socks4_connect(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    address: ProxyAddress,
+    host: str,
+    port: int,
+) -> None:
+    """SOCKS4 CONNECT; the protocol only takes IPv4, so `host` is resolved here."""
+    try:
+        ip = str(ipaddress.IPv4Address(host))
+    except ValueError:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, family=socket.AF_INET, type=socket.SOCK_STREAM
+        )
+        ip = infos[0][4][0]
+    user_id = (address.username or "").encode("utf-8")
+    writer.write(
+        struct.pack(">BBH", 4, 1, port) + socket.inet_aton(ip) + user_id + b"\0"
+    )
+    await writer.drain()
+    reply = await reader.readexactly(8)
+    if reply[0] != 0:
+        raise AsyncProxyError("SOCKS4 proxy server sent invalid data")
+    if reply[1] != 90:
+        raise AsyncProxyError(f"SOCKS4 request rejected or failed ({reply[1]})")
+
+
+async def _socks5_connect(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    address: ProxyAddress,
+    host: str,
+    port: int,
+) -> None:
+    """SOCKS5 CONNECT, with username/password authentication when configured."""
+    methods = b"\x00\x02" if address.username else b"\x00"
+    writer.write(bytes([5, len(methods)]) + methods)
+    await writer.drain()
+    version, method = await reader.readexactly(2)
+    if version != 5:
+        raise AsyncProxyError("SOCKS5 proxy server sent invalid data")
+    if method == 2 and address.username:
+        user = address.username.encode("utf-8")
+        secret = (address.password or "").encode("utf-8")
+        writer.write(bytes([1, len(user)]) + user + bytes([len(secret)]) + secret)
+        await writer.drain()
+        _, status = await reader.readexactly(2)
+        if status != 0:
+            raise AsyncProxyError("SOCKS5 authentication failed (Private)")
+    elif method != 0:
+        raise AsyncProxyError("SOCKS5 authentication methods were rejected")
+    try:
+        packed = bytes([1]) + socket.inet_aton(str(ipaddress.IPv4Address(host)))
+    except ValueError:
+        # let the proxy resolve names, like socks5h://
+        name = host.encode("idna")
+        packed = bytes([3, len(name)]) + name
+    writer.write(b"\x05\x01\x00" + packed + struct.pack(">H", port))
+    await writer.drain()
+    version, reply, _, address_type = await reader.readexactly(4)
+    if version != 5:
+        raise AsyncProxyError("SOCKS5 proxy server sent invalid data")
+    if reply != 0:
+        reason = _SOCKS5_ERRORS.get(reply, f"error {reply}")
+        raise AsyncProxyError(f"SOCKS5 request failed: {reason}")
+    if address_type == 1:
+        await reader.readexactly(4 + 2)
+    elif address_type == 4:
+        await reader.readexactly(16 + 2)
+    elif address_type == 3:
+        length = (await reader.readexactly(1))[0]
+        await reader.readexactly(length + 2)
+    else:
+        raise AsyncProxyError("SOCKS5 proxy server sent invalid data")
+
+
+_default_client: Optional[AsyncProxyClient] = None
+
+
+def get_async_client() -> AsyncProxyClient:
+    """Returns the process-wide `AsyncProxyClient` used by the async checkers."""
+    global _default_client
+    if _default_client is None:
+        _default_client = AsyncProxyClient()
+    return _default_client
+
+
+async def async_check_proxy(
+    proxy: str,
+    proxy_type: str,
+    endpoint: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    callback: Optional[Callable[[ProxyCheckResult], None]] = None,
+    client: Optional[AsyncProxyClient] = None,
+    timeout: Optional[float] = None,
+) -> ProxyCheckResult:
+    """
+    Asyncio counterpart of `check_proxy`, checking the proxy with a single request.
+
+    Args:
+        proxy (str): The proxy address in the format IP:PORT.
+        proxy_type (str): Type of proxy ('http', 'socks4', or 'socks5').
+        endpoint (str, optional): The endpoint URL for the request. Defaults to /headers on the PROXY_JUDGE_URL judge, else httpbin.
+        headers (Dict[str, str], optional): Headers for the request. Defaults to None.
+        callback (Callable[[ProxyCheckResult], None]): Callback function to execute before returning the result.
+        client (AsyncProxyClient, optional): Client to send with. Defaults to `get_async_client()`.
+        timeout (float, optional): Overrides the client timeout. Defaults to None.
+
+    Returns:
+        ProxyCheckResult: An object containing the result of the check.
+    """
+    client = client or get_async_client()
+    endpoint = endpoint or get_judge_url("/headers") or "https://httpbin.org/headers"
+    latency = -1
+    result = False
+    is_private = False
+    status = None
+    error = None
+    response = None
+
+    try:
+        response = await client.request(
+            "GET",
+            endpoint,
+            proxy=proxy,
+            proxy_type=proxy_type,
+            headers=headers,
+            timeout=timeout,
+        )
+        latency = response.elapsed.total_seconds() * 1000  # in milliseconds
+        is_private = (
+            "X-Forwarded-For:" in response.headers
+            or "Proxy-Authorization:" in response.headers
+        )
+        status = response.status_code
+        valid_status_codes = [200, 201, 202, 204, 301, 302, 304]
+        result = response.status_code in valid_status_codes
+    except ProxyConnectError:
+        proxy_ip, _, proxy_port = proxy.rpartition("@")[2].rpartition(":")
+        error = f"{proxy_ip} port {proxy_port} closed"
+    except Exception as e:
+        error = get_requests_error(e)
+
+    if response is not None:
+        if urlsplit(response.url).hostname != urlsplit(endpoint).hostname:
+            # the proxy is private
+            result = False
+            is_private = True
+
+    c_result = ProxyCheckResult(
+        result=result,
+        latency=latency,
+        error=error,
+        status=status,
+        private=is_private,
+        response=response,  # type: ignore[arg-type]
+        proxy=proxy,
+        type=proxy_type,
+    )
+
+    if callback is not None and callable(callback):
+        callback(c_result)
+
+    return c_result
+
+
+async def async_check_proxies(
+    proxies: Iterable[str],
+    proxy_type: str,
+    endpoint: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    callback: Optional[Callable[[ProxyCheckResult], None]] = None,
+    client: Optional[AsyncProxyClient] = None,
+    timeout: Optional[float] = None,
+) -> List[ProxyCheckResult]:
+    """
+    Check many proxies concurrently, bounded by the limits of `client`.
+
+    Returns:
+        List[ProxyCheckResult]: One result per proxy, in the input order.
+    """
+    client = client or get_async_client()
+    return list(
+        await asyncio.gather(
+            *(
+                async_check_proxy(
+                    proxy, proxy_type, endpoint, headers, callback, client, timeout
+                )
+                for proxy in proxies
+            )
+        )
+    )
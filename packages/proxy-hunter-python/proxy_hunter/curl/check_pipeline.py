@@ -0,0 +1,467 @@
+import asyncio
+import html
+import re
+import socket
+import struct
+import threading
+import time
+from base64 import b64encode
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from proxy_hunter.curl.async_client import (
+    AsyncProxyClient,
+    ProxyAddress,
+    get_async_client,
+    parse_proxy,
+)
+from proxy_hunter.curl.latency import LatencyTracker, get_latency_tracker
+from proxy_hunter.curl.proxy_utils import get_requests_error
+from proxy_hunter.utils.index_utils import check_raw_headers_keywords
+
+# Protocols probed by the sniff stage, in the order they are fetched
+PROTOCOL_ORDER = ("socks5", "socks4", "http")
+
+_TITLE = re.compile(rb"<title[^>]*>(.*?)</title\s*>", re.I | re.S)
+_STATUS_LINE = re.compile(rb"HTTP/\d(?:\.\d)? (\d{3})")
+# What web servers answer to CONNECT and absolute-form requests
+_WEB_SERVER_STATUSES = (400, 404, 405, 501)
+
+
+class StageResult(NamedTuple):
+    stage: str
+    ok: bool
+    elapsed: float
+    value: Any = None
+    error: Optional[str] = None
+
+
+class FetchSummary(NamedTuple):
+    """What the fetch stage keeps of a response, instead of the response itself."""
+
+    title: str
+    status_code: int
+    # the page lists the request headers back, like an azenv judge
+    echoes_request: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+
+class StageTimings:
+    """Per-stage run counts, cache hits and wall time of a `CheckPipeline`."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _entry(self, stage: str) -> Dict[str, float]:
+        entry = self.stats.get(stage)
+        if entry is None:
+            entry = {"runs": 0, "ok": 0, "hits": 0, "total": 0.0, "max": 0.0}
+            self.stats[stage] = entry
+        return entry
+
+    def record(self, result: StageResult) -> None:
+        with self.lock:
+            entry = self._entry(result.stage)
+            entry["runs"] += 1
+            entry["ok"] += result.ok
+            entry["total"] += result.elapsed
+            entry["max"] = max(entry["max"], result.elapsed)
+
+    def hit(self, stage: str) -> None:
+        with self.lock:
+            self._entry(stage)["hits"] += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Copy of the stats with the average seconds per run added."""
+        with self.lock:
+            return {
+                stage: dict(
+                    entry, avg=entry["total"] / entry["runs"] if entry["runs"] else 0.0
+                )
+                for stage, entry in self.stats.items()
+            }
+
+    def report(self) -> str:
+        """
+        One line per stage, e.g.
+        'sniff: 120 runs, 31 ok, 40 cached, avg 84 ms, max 1502 ms, total 10.1 s'.
+        """
+        lines = []
+        for stage, entry in self.summary().items():
+            lines.append(
+                f"{stage}: {entry['runs']:.0f} runs, {entry['ok']:.0f} ok, "
+                f"{entry['hits']:.0f} cached, avg {entry['avg'] * 1000:.0f} ms, "
+                f"max {entry['max'] * 1000:.0f} ms, total {entry['total']:.1f} s"
+            )
+        return "\n".join(lines)
+
+
+class PipelineResult:
+    def __init__(self, proxy: str, url: str, stages: List[StageResult]):
+        self.proxy = proxy
+        self.url = url
+        self.stages = stages
+        # protocol -> result of its fetch stage
+        self.fetches: Dict[str, StageResult] = {}
+
+    @property
+    def protocols(self) -> List[str]:
+        """Protocols whose fetch matched the expected title."""
+        return [protocol for protocol, stage in self.fetches.items() if stage.ok]
+
+    @property
+    def result(self) -> bool:
+        return bool(self.protocols)
+
+    @property
+    def title(self) -> str:
+        for stage in self.fetches.values():
+            if stage.value is not None:
+                return stage.value.title
+        return ""
+
+    def __repr__(self):
+        return f"<PipelineResult {self.proxy} {'-'.join(self.protocols) or 'dead'}>"
+
+
+def extract_title(content: bytes) -> str:
+    """The text of the first <title> element, without parsing the whole page."""
+    match = _TITLE.search(content)
+    if not match:
+        return ""
+    title = match.group(1).decode("utf-8", errors="replace")
+    return " ".join(html.unescape(title).split())
+
+
+class CheckPipeline:
+    """
+    Checks proxies in stages, cheapest first, skipping what cannot succeed:
+
+    1. tcp: connect to the proxy port.
+    2. sniff: speak SOCKS5, SOCKS4 and HTTP to it concurrently and keep the
+       protocols that answer like a working proxy.
+    3. fetch: load the page through each detected protocol and match its title.
+
+    Stage results are cached, so checking a proxy against several URLs
+    connects and sniffs it once; the least recently used results are dropped
+    past `max_cache` entries and `clear` forgets them at the end of a run.
+    `timings` collects how long each stage takes. Connect times feed
+    `tracker`, and the timeouts of every stage come from it once the proxy or
+    its subnet has a history; the configured timeouts apply until then.
+
+    Example:
+        pipeline = CheckPipeline()
+        result = pipeline.check_sync("1.2.3.4:1080", "https://bing.com", "bing")
+        result.protocols  # e.g. ['socks5']
+        print(pipeline.timings.report())
+    """
+
+    def __init__(
+        self,
+        client: Optional[AsyncProxyClient] = None,
+        connect_timeout: float = 5.0,
+        sniff_timeout: float = 5.0,
+        fetch_timeout: float = 10.0,
+        sniff_target: Tuple[str, int] = ("1.1.1.1", 80),
+        sniff_tls_port: int = 443,
+        headers: Optional[Dict[str, str]] = None,
+        tracker: Optional[LatencyTracker] = None,
+        max_cache: int = 10000,
+    ):
+        """
+        Args:
+            client (Optional[AsyncProxyClient]): Client of the fetch stage. Defaults to `get_async_client()`.
+            connect_timeout (float): Seconds allowed for the tcp stage.
+            sniff_timeout (float): Seconds allowed for each protocol probe.
+            fetch_timeout (float): Seconds allowed for each fetch.
+            sniff_target (Tuple[str, int]): IPv4 address and port the probes ask the proxy to reach.
+            sniff_tls_port (int): Port of `sniff_target` the CONNECT probe of https checks asks for;
+                proxies commonly refuse CONNECT to anything but 443.
+            headers (Optional[Dict[str, str]]): Headers of the fetch requests.
+            tracker (Optional[LatencyTracker]): Latency history. Defaults to `get_latency_tracker()`.
+            max_cache (int): Stage results kept before the least recently used are dropped.
+        """
+        self.client = client or get_async_client()
+        self.connect_timeout = connect_timeout
+        self.sniff_timeout = sniff_timeout
+        self.fetch_timeout = fetch_timeout
+        self.sniff_target = sniff_target
+        self.sniff_tls_port = sniff_tls_port
+        self.headers = headers
+        self.tracker = tracker if tracker is not None else get_latency_tracker()
+        self.timings = StageTimings()
+        self.lock = threading.Lock()
+        self.max_cache = max(1, max_cache)
+        self.cache: "OrderedDict[Tuple, StageResult]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _cached(self, key: Tuple) -> Optional[StageResult]:
+        with self.lock:
+            result = self.cache.get(key)
+            if result is not None:
+                self.cache.move_to_end(key)
+        if result is not None:
+            self.timings.hit(key[0])
+        return result
+
+    def _store(self, key: Tuple, result: StageResult) -> StageResult:
+        self.timings.record(result)
+        with self.lock:
+            self.cache[key] = result
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_cache:
+                self.cache.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Forget the cached stage results."""
+        with self.lock:
+            self.cache.clear()
+
+    async def tcp(self, proxy: str) -> StageResult:
+        """Stage 1: whether the proxy port accepts connections."""
+        key = ("tcp", proxy)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        address = parse_proxy(proxy)
+        start = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(address.host, address.port),
+                self.tracker.connect_timeout(proxy, self.connect_timeout),
+            )
+            writer.close()
+            result = StageResult("tcp", True, time.perf_counter() - start)
+            self.tracker.record(proxy, result.elapsed)
+        except Exception as e:
+            self.tracker.record(proxy, None)
+            error = f"{address.host} port {address.port} closed"
+            if isinstance(e, asyncio.TimeoutError):
+                error = f"{address.host} timed out"
+            result = StageResult("tcp", False, time.perf_counter() - start, None, error)
+        return self._store(key, result)
+
+    async def sniff(self, proxy: str, https: bool = True) -> StageResult:
+        """
+        Stage 2: the protocols the proxy speaks, in `PROTOCOL_ORDER`.
+
+        Each probe asks the proxy to reach `sniff_target` on its own
+        connection. HTTP proxies are sent a CONNECT to `sniff_tls_port` for
+        `https`, or a plain request otherwise. An HTTP error that a web server
+        would not give (403 of an access rule, 407, 5xx) does not settle it,
+        so the protocol is kept and the fetch decides.
+        """
+        key = ("sniff", proxy, https)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        address = parse_proxy(proxy)
+        start = time.perf_counter()
+        probes = {
+            "socks5": self._probe_socks5,
+            "socks4": self._probe_socks4,
+            "http": self._probe_http_connect if https else self._probe_http_forward,
+        }
+        timeouts = (
+            self.tracker.connect_timeout(proxy, self.connect_timeout),
+            self.tracker.read_timeout(proxy, self.sniff_timeout),
+        )
+        outcomes = await asyncio.gather(
+            *(
+                self._probe(address, probes[protocol], *timeouts)
+                for protocol in PROTOCOL_ORDER
+            )
+        )
+        detected = tuple(
+            protocol for protocol, ok in zip(PROTOCOL_ORDER, outcomes) if ok
+        )
+        result = StageResult(
+            "sniff",
+            bool(detected),
+            time.perf_counter() - start,
+            detected,
+            None if detected else "no proxy protocol detected",
+        )
+        return self._store(key, result)
+
+    async def fetch(
+        self,
+        proxy: str,
+        proxy_type: str,
+        url: str,
+        title_should_be: str,
+    ) -> StageResult:
+        """Stage 3: load `url` through the proxy; ok when the title matches."""
+        key = ("fetch", proxy, proxy_type, url, title_should_be.lower())
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        value = None
+        error = None
+        ok = False
+        try:
+            response = await self.client.request(
+                "GET",
+                url,
+                proxy=proxy,
+                proxy_type=proxy_type,
+                headers=self.headers,
+                timeout=self.tracker.read_timeout(proxy, self.fetch_timeout),
+            )
+            title = extract_title(response.content)
+            value = FetchSummary(
+                title,
+                response.status_code,
+                check_raw_headers_keywords(response.text),
+            )
+            ok = response.ok and title_should_be.lower() in title.lower()
+            if not ok:
+                error = f"status {response.status_code}, title {title!r}"
+        except Exception as e:
+            error = get_requests_error(e)
+        result = StageResult("fetch", ok, time.perf_counter() - start, value, error)
+        return self._store(key, result)
+
+    async def check(
+        self,
+        proxy: str,
+        url: str,
+        title_should_be: str,
+        first_only: bool = False,
+    ) -> PipelineResult:
+        """
+        Run the stages for `proxy`, fetching `url` only through the detected protocols.
+
+        Args:
+            proxy (str): The proxy, see `parse_proxy`.
+            url (str): The page to load.
+            title_should_be (str): Text the page title must contain.
+            first_only (bool): Stop at the first protocol that works.
+        """
+        stages = [await self.tcp(proxy)]
+        result = PipelineResult(proxy, url, stages)
+        if not stages[0].ok:
+            return result
+        sniff = await self.sniff(proxy, url.lower().startswith("https://"))
+        stages.append(sniff)
+        for protocol in sniff.value or ():
+            fetch = await self.fetch(proxy, protocol, url, title_should_be)
+            stages.append(fetch)
+            result.fetches[protocol] = fetch
+            if fetch.ok and first_only:
+                break
+        return result
+
+    def check_sync(
+        self,
+        proxy: str,
+        url: str,
+        title_should_be: str,
+        first_only: bool = False,
+    ) -> PipelineResult:
+        """
+        Blocking `check` for threaded callers.
+
+        The checks of every thread run on one background event loop, so they
+        share the limits of the client.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.check(proxy, url, title_should_be, first_only), self._get_loop()
+        ).result()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self.lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever,
+                    name="check-pipeline",
+                    daemon=True,
+                ).start()
+            return self._loop
+
+    async def _probe(
+        self,
+        address: ProxyAddress,
+        probe,
+        connect_timeout: float,
+        reply_timeout: float,
+    ) -> bool:
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(address.host, address.port),
+                connect_timeout,
+            )
+            return await asyncio.wait_for(probe(reader, writer, address), reply_timeout)
+        except Exception:
+            return False
+        finally:
+            if writer is not None:
+                writer.close()
+
+    async def _probe_socks5(self, reader, writer, address: ProxyAddress) -> bool:
+        # a greeting is enough: the reply names the chosen auth method
+        methods = b"\x00\x02" if address.username else b"\x00"
+        writer.write(bytes([5, len(methods)]) + methods)
+        await writer.drain()
+        version, method = await reader.readexactly(2)
+        return version == 5 and (
+            method == 0 or (method == 2 and bool(address.username))
+        )
+
+    async def _probe_socks4(self, reader, writer, address: ProxyAddress) -> bool:
+        host, port = self.sniff_target
+        user_id = (address.username or "").encode("utf-8")
+        writer.write(
+            struct.pack(">BBH", 4, 1, port) + socket.inet_aton(host) + user_id + b"\0"
+        )
+        await writer.drain()
+        reply = await reader.readexactly(8)
+        return reply[0] == 0 and reply[1] == 90
+
+    async def _probe_http_connect(self, reader, writer, address: ProxyAddress) -> bool:
+        host, port = self.sniff_target[0], self.sniff_tls_port
+        return await self._probe_http(
+            reader, writer, address, f"CONNECT {host}:{port} HTTP/1.1", f"{host}:{port}"
+        )
+
+    async def _probe_http_forward(self, reader, writer, address: ProxyAddress) -> bool:
+        host, port = self.sniff_target
+        return await self._probe_http(
+            reader, writer, address, f"HEAD http://{host}:{port}/ HTTP/1.1", host
+        )
+
+    async def _probe_http(
+        self, reader, writer, address: ProxyAddress, request_line: str, host: str
+    ) -> bool:
+        lines = [request_line, f"Host: {host}", "Connection: close"]
+        if address.username:
+            token = f"{address.username}:{address.password or ''}".encode("utf-8")
+            lines.append(f"Proxy-Authorization: Basic {b64encode(token).decode()}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+        status_line = await reader.readline()
+        match = _STATUS_LINE.match(status_line)
+        # a proxy relays the request (2xx/3xx) or refuses it by policy; web
+        # servers reject the request form itself
+        return bool(match) and int(match.group(1)) not in _WEB_SERVER_STATUSES
+
+
+_default_pipeline: Optional[CheckPipeline] = None
+_default_pipeline_lock = threading.Lock()
+
+
+def get_check_pipeline() -> CheckPipeline:
+    """Returns the process-wide `CheckPipeline`, caching stages for the whole run."""
+    global _default_pipeline
+    with _default_pipeline_lock:
+        if _default_pipeline is None:
+            _default_pipeline = CheckPipeline()
+        return _default_pipeline
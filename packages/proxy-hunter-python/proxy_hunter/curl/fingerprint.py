@@ -0,0 +1,187 @@
+import asyncio
+import re
+import socket
+import struct
+import time
+from typing import Iterable, NamedTuple, Optional, Tuple
+
+from .check_pipeline import PROTOCOL_ORDER
+
+_STATUS_LINE = re.compile(rb"^HTTP/1\.[01] (\d{3})[ \r]")
+
+
+class ProtocolFingerprint(NamedTuple):
+    host: str
+    port: int
+    protocols: Tuple[str, ...]
+    auth_required: Tuple[str, ...]
+    elapsed: float
+    error: Optional[str] = None
+
+    @property
+    def type(self) -> str:
+        """The protocols joined the way ProxyDB stores them, e.g. 'socks5-http'."""
+        return "-".join(self.protocols)
+
+
+def protocols_from_type(value: Optional[str]) -> Tuple[str, ...]:
+    """
+    Parse a ProxyDB `type` value such as 'http-socks5' into known protocols,
+    in `PROTOCOL_ORDER` order. Unknown or empty values give an empty tuple.
+    """
+    parts = {part.strip().lower() for part in str(value or "").split("-")}
+    return tuple(protocol for protocol in PROTOCOL_ORDER if protocol in parts)
+
+
+async def _probe_socks5(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, port: int
+) -> Tuple[bool, bool]:
+    # offer no-auth and username/password; the reply alone identifies SOCKS5
+    writer.write(b"\x05\x02\x00\x02")
+    await writer.drain()
+    version, method = await reader.readexactly(2)
+    if version != 5 or method not in (0x00, 0x02, 0xFF):
+        return False, False
+    return True, method != 0x00
+
+
+async def _probe_socks4(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, port: int
+) -> Tuple[bool, bool]:
+    # CONNECT to the proxy's own port on its loopback: no outside host is
+    # involved, and granted or rejected the reply has the SOCKS4 layout
+    writer.write(
+        struct.pack(">BBH", 4, 1, port) + socket.inet_aton("127.0.0.1") + b"\0"
+    )
+    await writer.drain()
+    reply = await reader.readexactly(8)
+    if reply[0] != 0 or not 90 <= reply[1] <= 93:
+        return False, False
+    # 92/93: identd authentication failed
+    return True, reply[1] in (92, 93)
+
+
+async def _probe_http(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, port: int
+) -> Tuple[bool, bool]:
+    target = f"127.0.0.1:{port}"
+    writer.write(
+        f"CONNECT {target} HTTP/1.1\r\nHost: {target}\r\n\r\n".encode("latin-1")
+    )
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    match = _STATUS_LINE.match(head)
+    if not match:
+        return False, False
+    # Proxies that refuse a loopback CONNECT often answer a bare 403, which
+    # tells them apart from a web server no better than a 405 does. Any HTTP
+    # answer counts, so a mixed proxy is never stored without http; the
+    # request stage of the checker rules out the web servers.
+    return True, int(match.group(1)) == 407
+
+
+_PROBES = {"socks5": _probe_socks5, "socks4": _probe_socks4, "http": _probe_http}
+
+
+async def _run_probe(
+    host: str, port: int, protocol: str, timeout: float
+) -> Tuple[bool, bool, Optional[str]]:
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), timeout
+        )
+    except asyncio.TimeoutError:
+        return False, False, f"{host} timed out"
+    except OSError:
+        return False, False, f"{host} port {port} closed"
+    try:
+        ok, auth = await asyncio.wait_for(
+            _PROBES[protocol](reader, writer, port), timeout
+        )
+        return ok, auth, None
+    except Exception:
+        return False, False, None
+    finally:
+        writer.close()
+
+
+async def detect_protocols(
+    host: str,
+    port: int,
+    timeout: float = 5.0,
+    protocols: Iterable[str] = PROTOCOL_ORDER,
+    grace: float = 3.0,
+) -> ProtocolFingerprint:
+    """
+    Identify the proxy protocols spoken on `host:port` from raw handshakes.
+
+    A SOCKS5 greeting, a SOCKS4 CONNECT and an HTTP CONNECT are sent at once
+    on their own connections, so detection takes one connect plus one round
+    trip. The CONNECT requests target the proxy's own port on its loopback,
+    so no outside site is contacted. Any HTTP/1.x answer to the CONNECT counts
+    as http, web servers included.
+
+    Most proxies ignore handshakes they do not speak instead of rejecting
+    them, so once one probe succeeds the others are only given `grace` times
+    its round trip to answer rather than the full `timeout`.
+
+    Args:
+        host (str): The proxy host.
+        port (int): The proxy port.
+        timeout (float): Seconds allowed for each connect and each reply.
+        protocols (Iterable[str]): Subset of `PROTOCOL_ORDER` to probe.
+        grace (float): Multiple of the first successful probe's duration the
+            remaining probes may still take.
+
+    Returns:
+        ProtocolFingerprint: The detected protocols, and those that demand
+            credentials.
+    """
+    start = time.perf_counter()
+    wanted = set(protocols)
+    tasks = {
+        asyncio.ensure_future(_run_probe(host, port, protocol, timeout)): protocol
+        for protocol in PROTOCOL_ORDER
+        if protocol in wanted
+    }
+    outcomes = {}
+    pending = set(tasks)
+    deadline = None
+    while pending:
+        wait = None if deadline is None else max(deadline - time.perf_counter(), 0)
+        done, pending = await asyncio.wait(
+            pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+        )
+        if not done:
+            break
+        for task in done:
+            outcomes[tasks[task]] = task.result()
+        if deadline is None and any(ok for ok, _, _ in outcomes.values()):
+            elapsed = time.perf_counter() - start
+            deadline = start + max(elapsed * grace, 0.25)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+
+    detected = tuple(p for p in PROTOCOL_ORDER if outcomes.get(p, (False,))[0])
+    auth_required = tuple(p for p in detected if outcomes[p][1])
+    errors = [error for _, _, error in outcomes.values() if error]
+    if detected:
+        error = None
+    elif errors and len(errors) == len(tasks):
+        # not one connection was accepted
+        error = errors[0]
+    else:
+        error = "no proxy protocol detected"
+    return ProtocolFingerprint(
+        host, port, detected, auth_required, time.perf_counter() - start, error
+    )
+
+
+def detect_protocols_sync(
+    host: str, port: int, timeout: float = 5.0
+) -> ProtocolFingerprint:
+    """Blocking `detect_protocols` for code without an event loop."""
+    return asyncio.run(detect_protocols(host, port, timeout))
@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import html
+import json
+import os
+import re
+import ssl
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+# Base URL of a running judge, e.g. "http://judge.example.com:8899/"
+JUDGE_ENV = "PROXY_JUDGE_URL"
+JUDGE_TITLE = "Proxy Hunter Judge"
+DEFAULT_PORT = 8899
+# Request bodies the judge reads and discards; larger requests are dropped
+MAX_BODY = 64 * 1024
+
+# Headers proxies add to forwarded requests, as reported by data/azenv.php
+PROXY_HEADERS = (
+    "Via",
+    "X-Forwarded-For",
+    "Forwarded",
+    "Forwarded-For",
+    "X-Forwarded",
+    "X-Forwarded-Host",
+    "X-Real-Ip",
+    "Client-Ip",
+    "X-Client-Ip",
+    "X-Originating-Ip",
+    "X-Proxy-Id",
+    "Proxy-Connection",
+    "Proxy-Authorization",
+    "X-Bluecoat-Via",
+)
+
+_PROXY_HEADER_NAMES = {name.lower() for name in PROXY_HEADERS}
+_IPV4 = re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}\b")
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def get_judge_url(path: str = "") -> Optional[str]:
+    """
+    URL of `path` on the judge configured through the PROXY_JUDGE_URL variable.
+
+    Args:
+        path (str): Path on the judge, such as '/ip' or '/headers'.
+
+    Returns:
+        Optional[str]: The absolute URL, or None when no judge is configured.
+    """
+    base = os.environ.get(JUDGE_ENV, "").strip()
+    if not base:
+        return None
+    return urljoin(base.rstrip("/") + "/", path.lstrip("/"))
+
+
+def classify_anonymity(
+    headers: Dict[str, str], remote_addr: str, real_ip: Optional[str] = None
+) -> str:
+    """
+    Classify the anonymity of a request the way proxy judges do.
+
+    Args:
+        headers (Dict[str, str]): Headers the judge received.
+        remote_addr (str): Address the request came from, i.e. the proxy.
+        real_ip (str, optional): IP of the checking machine. Without it any
+            forwarded IP other than `remote_addr` counts as leaked.
+
+    Returns:
+        str: 'transparent' when the real IP leaks, 'anonymous' when the proxy
+            announces itself, 'elite' otherwise.
+    """
+    found = [
+        value for name, value in headers.items() if name.lower() in _PROXY_HEADER_NAMES
+    ]
+    leaked = set(_IPV4.findall(" ".join(found))) - {remote_addr}
+    if (real_ip and real_ip in " ".join(headers.values())) or (not real_ip and leaked):
+        return "transparent"
+    return "anonymous" if found else "elite"
+
+
+class JudgeServer:
+    """
+    Self-hosted proxy judge: echoes the client IP and headers, serves a page
+    with a known title and reports the anonymity of the request.
+
+    Routes:
+        /           HTML page titled `title` (title-match checks).
+        /ip         {"ip": ..., "origin": ...} like ipify and httpbin.
+        /headers    {"headers": {...}} like httpbin.
+        /judge      IP, headers, proxy headers and anonymity as JSON; pass
+                    `?ip=<real ip>` to detect transparent proxies exactly.
+        /azenv      The variables data/azenv.php prints, in the same page.
+    """
+
+    def __init__(self, title: str = JUDGE_TITLE):
+        self.title = title
+        self.requests = 0
+
+    async def start(
+        self,
+        host: str = "0.0.0.0",
+        port: int = DEFAULT_PORT,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> asyncio.AbstractServer:
+        """Listen on `host:port` and return the running server."""
+        return await asyncio.start_server(self.handle, host, port, ssl=ssl_context)
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        peer = writer.get_extra_info("peername") or ("", 0)
+        try:
+            # keep-alive: pooled sessions reuse the connection
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers = request
+                self.requests += 1
+                status, content_type, body = self.respond(
+                    method, target, headers, peer[0]
+                )
+                close = any(
+                    name.lower() == "connection" and value.lower() == "close"
+                    for name, value in headers.items()
+                )
+                head = [
+                    f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(body)}",
+                    "Cache-Control: no-store",
+                    f"Connection: {'close' if close else 'keep-alive'}",
+                ]
+                writer.write("\r\n".join(head).encode() + b"\r\n\r\n")
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, Dict[str, str]]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            # closed mid-request, or a head larger than the stream buffer
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, _ = lines[0].split(" ", 2)
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip()] = value.strip()
+        lowered = {name.lower(): value for name, value in headers.items()}
+        length = int(lowered.get("content-length") or 0)
+        if not 0 <= length <= MAX_BODY:
+            return None
+        if length:
+            await reader.readexactly(length)
+        return method, target, headers
+
+    def respond(
+        self, method: str, target: str, headers: Dict[str, str], remote_addr: str
+    ) -> Tuple[int, str, bytes]:
+        """
+        Build the response to a request.
+
+        Returns:
+            Tuple[int, str, bytes]: Status code, content type and body.
+        """
+        if method not in ("GET", "HEAD", "POST"):
+            return 405, "text/plain", b"method not allowed\n"
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = parse_qs(url.query)
+
+        if path == "/":
+            page = (
+                f"<!DOCTYPE html><html><head><title>{html.escape(self.title)}"
+                f"</title></head><body><p>{html.escape(remote_addr)}</p>"
+                "</body></html>"
+            )
+            return 200, "text/html; charset=utf-8", page.encode()
+        if path == "/ip":
+            return self._json({"ip": remote_addr, "origin": remote_addr})
+        if path == "/headers":
+            return self._json({"headers": headers})
+        if path == "/judge":
+            real_ip = (query.get("ip") or [None])[0]
+            proxy_headers = {
+                name: value
+                for name, value in headers.items()
+                if name.lower() in _PROXY_HEADER_NAMES
+            }
+            return self._json(
+                {
+                    "ip": remote_addr,
+                    "headers": headers,
+                    "proxy_headers": proxy_headers,
+                    "anonymity": classify_anonymity(headers, remote_addr, real_ip),
+                }
+            )
+        if path == "/azenv":
+            return (
+                200,
+                "text/html; charset=utf-8",
+                self._azenv(method, target, headers, remote_addr),
+            )
+        return 404, "text/plain", b"not found\n"
+
+    def _json(self, data: dict) -> Tuple[int, str, bytes]:
+        return 200, "application/json", json.dumps(data, indent=2).encode()
+
+    def _azenv(
+        self, method: str, target: str, headers: Dict[str, str], remote_addr: str
+    ) -> bytes:
+        variables: List[Tuple[str, str]] = [
+            ("REMOTE_ADDR", remote_addr),
+            ("REQUEST_METHOD", method),
+            ("REQUEST_URI", target),
+        ]
+        variables += [
+            ("HTTP_" + name.upper().replace("-", "_"), value)
+            for name, value in headers.items()
+        ]
+        lines = "\n".join(f"{name} = {html.escape(value)}" for name, value in variables)
+        return (
+            "<html><head><title>AZ Environment variables 1.04</title></head>"
+            f"<body><pre>\n{lines}\n</pre></body></html>"
+        ).encode()
+
+
+async def run_judge(
+    host: str = "0.0.0.0",
+    port: int = DEFAULT_PORT,
+    certfile: Optional[str] = None,
+    keyfile: Optional[str] = None,
+    title: str = JUDGE_TITLE,
+) -> None:
+    """Serve a `JudgeServer` until cancelled, over TLS when `certfile` is given."""
+    ssl_context = None
+    if certfile:
+        ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ssl_context.load_cert_chain(certfile, keyfile)
+    server = await JudgeServer(title).start(host, port, ssl_context)
+    scheme = "https" if ssl_context else "http"
+    print(f"Proxy judge listening on {scheme}://{host}:{port}/")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a self-hosted proxy judge")
+    parser.add_argument("--host", help="Address to listen on", default="0.0.0.0")
+    parser.add_argument(
+        "--port", type=int, help="Port to listen on", default=DEFAULT_PORT
+    )
+    parser.add_argument("--certfile", help="TLS certificate to serve HTTPS")
+    parser.add_argument("--keyfile", help="Private key of --certfile")
+    parser.add_argument("--title", help="Title of the page at /", default=JUDGE_TITLE)
+    args = parser.parse_args()
+    try:
+        asyncio.run(
+            run_judge(args.host, args.port, args.certfile, args.keyfile, args.title)
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
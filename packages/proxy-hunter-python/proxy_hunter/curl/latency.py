@@ -0,0 +1,360 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# RFC 6298 smoothing of the round trip time and of its variation
+RTT_WEIGHT = 1 / 8
+RTTVAR_WEIGHT = 1 / 4
+# Weight of the latest outcome in the `alive` average; two misses in a row
+# take a fresh entry from 0.5 below DEAD_ALIVE
+ALIVE_WEIGHT = 0.4
+DEAD_ALIVE = 0.2
+# Successes within this many seconds halve the priority key
+RECENT_SECONDS = 24 * 3600
+
+
+def proxy_key(proxy: str) -> str:
+    """Reduce 'scheme://user:pass@IP:PORT' (or 'IP:PORT@user:pass') to 'IP:PORT'."""
+    value = proxy.strip().split("://", 1)[-1]
+    left, _, right = value.partition("@")
+    if right and ":" in right and right.rsplit(":", 1)[1].isdigit():
+        return right
+    return left
+
+
+def subnet_key(proxy: str) -> Optional[str]:
+    """The /24 network of an IPv4 proxy, e.g. '1.2.3.0/24', else None."""
+    octets = proxy_key(proxy).rsplit(":", 1)[0].split(".")
+    if len(octets) != 4 or not all(octet.isdigit() for octet in octets):
+        return None
+    return ".".join(octets[:3]) + ".0/24"
+
+
+def _float(value: Any) -> Optional[float]:
+    return None if value is None or value == "" else float(value)
+
+
+class LatencyStats:
+    """Smoothed connect latency and liveness of one proxy or subnet."""
+
+    __slots__ = ("srtt", "rttvar", "alive", "samples", "last_ok", "updated")
+
+    def __init__(
+        self,
+        srtt: Optional[float] = None,
+        rttvar: Optional[float] = None,
+        alive: float = 0.5,
+        samples: int = 0,
+        last_ok: float = 0.0,
+        updated: float = 0.0,
+    ):
+        self.srtt = srtt
+        self.rttvar = rttvar
+        self.alive = alive
+        self.samples = samples
+        self.last_ok = last_ok
+        self.updated = updated
+
+    def observe(self, latency: Optional[float], now: float) -> None:
+        """Add a connect that took `latency` seconds, or failed when None."""
+        self.samples += 1
+        self.updated = now
+        if latency is None:
+            self.alive -= ALIVE_WEIGHT * self.alive
+            return
+        self.alive += ALIVE_WEIGHT * (1 - self.alive)
+        self.last_ok = now
+        if self.srtt is None or self.rttvar is None:
+            self.srtt, self.rttvar = latency, latency / 2
+        else:
+            self.rttvar += RTTVAR_WEIGHT * (abs(self.srtt - latency) - self.rttvar)
+            self.srtt += RTT_WEIGHT * (latency - self.srtt)
+
+    @property
+    def dead(self) -> bool:
+        return self.samples >= 2 and self.alive < DEAD_ALIVE
+
+    def rto(self) -> Optional[float]:
+        """Retransmission-style timeout: srtt + 4 * rttvar, None without a success."""
+        if self.srtt is None or self.rttvar is None:
+            return None
+        return self.srtt + 4 * self.rttvar
+
+
+class LatencyTracker:
+    """
+    Per-proxy and per-/24 latency history that turns into adaptive timeouts and
+    a check order.
+
+    Proxies without history fall back to their subnet's, then to the caller's
+    default. Proxies (or subnets) that keep failing get `dead_timeout` instead
+    of the full timeout, which is where most of the time of a check run goes;
+    once they went `dead_retry` seconds without a check they get one full try,
+    so a proxy that is merely slower than `dead_timeout` can come back.
+    The tracker is shared between threads and event loops.
+    """
+
+    def __init__(
+        self,
+        min_timeout: float = 1.5,
+        max_timeout: float = 10.0,
+        dead_timeout: float = 2.0,
+        read_factor: float = 4.0,
+        max_read_timeout: float = 30.0,
+        subnet_factor: float = 1.5,
+        max_entries: int = 200_000,
+        dead_retry: float = 3600.0,
+    ):
+        """
+        Args:
+            min_timeout (float): Lower bound of a derived connect timeout in
+                seconds; 1.5 lets a connect survive one SYN retransmission.
+            max_timeout (float): Upper bound of a derived connect timeout in seconds.
+            dead_timeout (float): Connect timeout for proxies that keep failing.
+            read_factor (float): Read timeout as a multiple of the connect timeout.
+            max_read_timeout (float): Upper bound of a derived read timeout.
+            subnet_factor (float): Allowance for a proxy only known by its subnet.
+            max_entries (int): Entries kept per kind; the least recently updated go first.
+            dead_retry (float): Seconds after the last check of a failing entry
+                before it gets the full timeout again.
+        """
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.dead_timeout = dead_timeout
+        self.read_factor = read_factor
+        self.max_read_timeout = max_read_timeout
+        self.subnet_factor = subnet_factor
+        self.max_entries = max_entries
+        self.dead_retry = dead_retry
+        self._proxies: "OrderedDict[str, LatencyStats]" = OrderedDict()
+        self._subnets: "OrderedDict[str, LatencyStats]" = OrderedDict()
+        # keys recorded since their last save, see `mark_saved`
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._proxies)
+
+    def _table(self, key: str) -> "OrderedDict[str, LatencyStats]":
+        """The proxy or subnet entries, by the format of `key`."""
+        return self._subnets if key.endswith("/24") else self._proxies
+
+    def _update(
+        self,
+        table: "OrderedDict[str, LatencyStats]",
+        key: str,
+        latency: Optional[float],
+        now: float,
+    ) -> None:
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = LatencyStats()
+            if len(table) > self.max_entries:
+                self._dirty.discard(table.popitem(last=False)[0])
+        else:
+            table.move_to_end(key)
+        stats.observe(latency, now)
+        self._dirty.add(key)
+
+    def record(
+        self, proxy: str, latency: Optional[float], now: Optional[float] = None
+    ) -> None:
+        """
+        Add the outcome of a connect to the proxy and to its subnet.
+
+        Args:
+            proxy (str): The proxy, in any format `proxy_key` understands.
+            latency (Optional[float]): Connect time in seconds, None when it failed.
+            now (float, optional): Unix time of the outcome. Defaults to now.
+        """
+        now = time.time() if now is None else now
+        subnet = subnet_key(proxy)
+        with self._lock:
+            self._update(self._proxies, proxy_key(proxy), latency, now)
+            if subnet:
+                self._update(self._subnets, subnet, latency, now)
+
+    def stats(self, proxy: str) -> Optional[LatencyStats]:
+        """The history of the proxy itself, None when it was never recorded."""
+        return self._proxies.get(proxy_key(proxy))
+
+    def _history(self, proxy: str) -> Tuple[Optional[LatencyStats], float]:
+        """Usable stats of the proxy, else of its subnet, with their allowance."""
+        own = self._proxies.get(proxy_key(proxy))
+        if own is not None and (own.dead or own.srtt is not None):
+            return own, 1.0
+        subnet = subnet_key(proxy)
+        stats = self._subnets.get(subnet) if subnet else None
+        if stats is not None and (stats.dead or stats.srtt is not None):
+            return stats, self.subnet_factor
+        return None, 1.0
+
+    def _retry_due(self, stats: LatencyStats, now: Optional[float]) -> bool:
+        """Whether a failing entry went `dead_retry` seconds without a check."""
+        now = time.time() if now is None else now
+        return now - stats.updated >= self.dead_retry
+
+    def connect_timeout(
+        self, proxy: str, default: float = 10.0, now: Optional[float] = None
+    ) -> float:
+        """
+        Connect timeout for the proxy derived from its history.
+
+        Args:
+            proxy (str): The proxy.
+            default (float): Timeout without any usable history.
+            now (float, optional): Unix time of the check. Defaults to now.
+
+        Returns:
+            float: `dead_timeout` for proxies that keep failing, `default` when
+                their retry is due, else their srtt + 4 * rttvar within
+                [min_timeout, max_timeout].
+        """
+        stats, allowance = self._history(proxy)
+        rto = stats.rto() if stats is not None else None
+        if stats is not None and stats.dead:
+            if self._retry_due(stats, now):
+                return default
+            return min(self.dead_timeout, default)
+        if rto is None:
+            return default
+        return min(max(rto * allowance, self.min_timeout), self.max_timeout)
+
+    def read_timeout(
+        self, proxy: str, default: float = 10.0, now: Optional[float] = None
+    ) -> float:
+        """
+        Timeout for a request through the proxy.
+
+        Requests take several round trips past the proxy, so a live proxy
+        keeps at least `default`; known slow ones get `read_factor` connect
+        timeouts up to `max_read_timeout`, and failing ones are cut short.
+        """
+        stats, allowance = self._history(proxy)
+        rto = stats.rto() if stats is not None else None
+        if stats is not None and stats.dead:
+            if self._retry_due(stats, now):
+                return default
+            return min(self.dead_timeout * self.read_factor, default)
+        if rto is None:
+            return default
+        return min(
+            max(rto * allowance * self.read_factor, default), self.max_read_timeout
+        )
+
+    def priority(self, proxy: str, now: Optional[float] = None) -> float:
+        """
+        Sort key of the proxy: the expected seconds spent per live result.
+
+        Fast, reliable and recently alive proxies come first, unknown ones next
+        and the ones that keep failing last.
+        """
+        now = time.time() if now is None else now
+        stats = self._proxies.get(proxy_key(proxy))
+        if stats is None:
+            subnet = subnet_key(proxy)
+            stats = self._subnets.get(subnet) if subnet else None
+        if stats is None:
+            stats = LatencyStats()
+        srtt = stats.srtt if stats.srtt is not None else self.max_timeout / 2
+        expected = srtt / max(stats.alive, 0.01)
+        if stats.last_ok and now - stats.last_ok < RECENT_SECONDS:
+            expected /= 2
+        return expected
+
+    def order(
+        self, items: Iterable[T], key: Optional[Callable[[T], str]] = None
+    ) -> List[T]:
+        """
+        Sort proxies, or rows holding them, by `priority`.
+
+        Args:
+            items (Iterable[T]): Proxy strings or rows.
+            key (Callable[[T], str], optional): Gets the proxy out of a row.
+
+        Returns:
+            List[T]: The items, best first. Equal keys keep their order.
+        """
+        now = time.time()
+        get = key or (lambda item: item)  # type: ignore[assignment, return-value]
+        return sorted(items, key=lambda item: self.priority(get(item), now))
+
+    def to_rows(self, dirty_only: bool = False) -> List[Dict[str, Any]]:
+        """
+        Entries as rows for `ProxyDB.save_latency_stats`.
+
+        Args:
+            dirty_only (bool): Only the entries recorded since they were
+                passed to `mark_saved`.
+        """
+        with self._lock:
+            if dirty_only:
+                entries = [(key, self._table(key)[key]) for key in self._dirty]
+            else:
+                entries = list(self._proxies.items()) + list(self._subnets.items())
+            return [
+                {"key": key, **{name: getattr(stats, name) for name in stats.__slots__}}
+                for key, stats in entries
+            ]
+
+    def mark_saved(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Forget the dirty state of rows from `to_rows` once they are stored.
+        Entries recorded again after `to_rows` stay dirty.
+        """
+        with self._lock:
+            for row in rows:
+                key = str(row["key"])
+                stats = self._table(key).get(key)
+                if stats is None or stats.updated <= float(row.get("updated") or 0.0):
+                    self._dirty.discard(key)
+
+    def load_rows(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Restore entries saved with `to_rows`; subnets are keyed 'a.b.c.0/24'.
+
+        Entries updated after the row was saved are kept, so long-running
+        processes can reload the history before every run.
+        """
+        with self._lock:
+            for row in rows:
+                stats = LatencyStats(
+                    srtt=_float(row.get("srtt")),
+                    rttvar=_float(row.get("rttvar")),
+                    alive=float(row.get("alive") or 0.0),
+                    samples=int(row.get("samples") or 0),
+                    last_ok=float(row.get("last_ok") or 0.0),
+                    updated=float(row.get("updated") or 0.0),
+                )
+                key = str(row["key"])
+                table = self._table(key)
+                current = table.get(key)
+                if current is None:
+                    table[key] = stats
+                    if len(table) > self.max_entries:
+                        self._dirty.discard(table.popitem(last=False)[0])
+                elif current.updated <= stats.updated:
+                    table[key] = stats
+                    self._dirty.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._proxies.clear()
+            self._subnets.clear()
+            self._dirty.clear()
+
+
+_tracker: Optional[LatencyTracker] = None
+_tracker_lock = threading.Lock()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Process-wide tracker shared by the checkers."""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = LatencyTracker()
+        return _tracker
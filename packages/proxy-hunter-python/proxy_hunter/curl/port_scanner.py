@@ -0,0 +1,403 @@
+import argparse
+import asyncio
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from typing import (
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .latency import LatencyTracker, proxy_key
+
+Target = Union[str, Tuple[str, int]]
+
+# Close probes with a RST so thousands of them do not pile up in TIME_WAIT
+_LINGER_RST = struct.pack("HH" if sys.platform == "win32" else "ii", 1, 0)
+# File descriptors left for everything else while a scan is running
+_SPARE_FDS = 64
+
+
+class PortResult(NamedTuple):
+    host: str
+    port: int
+    open: bool
+    elapsed: float
+    error: Optional[str] = None
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
+def parse_target(target: Target) -> Tuple[str, int]:
+    """
+    Split a target into host and port.
+
+    Args:
+        target (Target): '(host, port)' or a proxy string such as 'IP:PORT',
+            'scheme://user:pass@IP:PORT' or '[::1]:PORT'.
+
+    Raises:
+        ValueError: When the target has no valid port.
+    """
+    if isinstance(target, tuple):
+        host, port = target
+    else:
+        host, _, port = proxy_key(target).rpartition(":")
+    host, port = str(host).strip("[]"), int(port)
+    if not host or not 0 < port < 65536:
+        raise ValueError(f"invalid target {target!r}")
+    return host, port
+
+
+def parse_ports(spec: str) -> List[int]:
+    """
+    Parse a port list such as '80,8080,3128-3130' in order, without duplicates.
+
+    Raises:
+        ValueError: On anything that is not a port or a range of ports.
+    """
+    ports: Dict[int, None] = {}
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        start, end = int(first), int(last or first)
+        if start > end:
+            start, end = end, start
+        if not 0 < start <= end < 65536:
+            raise ValueError(f"port out of range in {part!r}")
+        ports.update(dict.fromkeys(range(start, end + 1)))
+    return list(ports)
+
+
+def _fd_budget(wanted: int) -> int:
+    """Raise the open files limit toward `wanted` connects and return what fits."""
+    try:
+        import resource
+    except ImportError:
+        # Windows: sockets are not bound by a descriptor limit
+        return wanted
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = wanted + _SPARE_FDS
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError):
+            pass
+    if soft == resource.RLIM_INFINITY:
+        return wanted
+    return max(1, min(wanted, soft - _SPARE_FDS))
+
+
+class _RateLimiter:
+    """Spaces connect attempts `1 / rate` seconds apart, without bursts."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next = 0.0
+
+    async def wait(self) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(self.next, now)
+        self.next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class PortScanner:
+    """
+    Non-blocking TCP connect scanner.
+
+    Thousands of connects are in flight on one event loop instead of one
+    blocking `is_port_open` per thread. `concurrency` caps the connects in
+    flight, `per_host` the ones against a single host and `rate` the connects
+    started per second. Targets are consumed lazily, so whole port ranges can
+    be passed as generators.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 1000,
+        per_host: int = 256,
+        rate: Optional[float] = None,
+        timeout: float = 10.0,
+        tracker: Optional[LatencyTracker] = None,
+    ):
+        """
+        Args:
+            concurrency (int): Connects in flight at once. Lowered to what the
+                open files limit allows.
+            per_host (int): Connects in flight against one host.
+            rate (float, optional): Connects started per second. Unlimited when None.
+            timeout (float): Connect timeout in seconds.
+            tracker (LatencyTracker, optional): When given, timeouts are derived
+                from its history (with `timeout` as default) and every outcome
+                is recorded. Leave it out for port sweeps, whose closed ports
+                say nothing about the proxies of the host.
+        """
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.rate = rate if rate and rate > 0 else None
+        self.timeout = timeout
+        self.tracker = tracker
+
+    async def probe(
+        self, host: str, port: int, limiter: Optional[_RateLimiter] = None
+    ) -> PortResult:
+        """Connect to `host:port` once and close the connection right away."""
+        address = f"{host}:{port}"
+        timeout = self.timeout
+        if self.tracker is not None:
+            timeout = self.tracker.connect_timeout(address, self.timeout)
+        if limiter is not None:
+            await limiter.wait()
+        loop = asyncio.get_running_loop()
+        error = None
+        sock = None
+        start = time.perf_counter()
+        try:
+            family = socket.AF_INET6 if ":" in host else socket.AF_INET
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(sock, (host, port)), timeout)
+        except asyncio.TimeoutError:
+            error = "timed out"
+        except ConnectionRefusedError:
+            error = "refused"
+        except OSError as e:
+            error = e.strerror or str(e)
+        except ValueError as e:
+            # a malformed hostname fails in getaddrinfo with a UnicodeError
+            error = str(e) or "invalid"
+        finally:
+            if sock is not None:
+                if error is None:
+                    try:
+                        sock.setsockopt(
+                            socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RST
+                        )
+                    except OSError:
+                        pass
+                sock.close()
+        elapsed = time.perf_counter() - start
+        if self.tracker is not None:
+            self.tracker.record(address, None if error else elapsed)
+        return PortResult(host, port, error is None, elapsed, error)
+
+    async def stream(
+        self, targets: Iterable[Target], event: Optional[threading.Event] = None
+    ) -> AsyncIterator[PortResult]:
+        """
+        Probe `targets` and yield the results as they complete.
+
+        Args:
+            targets (Iterable[Target]): 'IP:PORT' strings or (host, port) tuples.
+                Invalid ones are yielded as closed with an error.
+            event (threading.Event, optional): Stops the scan when set; connects
+                in flight are dropped without a result.
+        """
+        concurrency = _fd_budget(self.concurrency)
+        limiter = _RateLimiter(self.rate) if self.rate else None
+        source: Iterator[Target] = iter(targets)
+        exhausted = False
+        # connects in flight per host, plus the targets waiting for one of them
+        active: Dict[str, int] = {}
+        deferred: Dict[str, Deque[Tuple[str, int]]] = {}
+        waiting = 0
+        # targets that took over the slot of a finished connect of their host
+        ready: Deque[Tuple[str, int]] = deque()
+        pending: Set["asyncio.Future[PortResult]"] = set()
+        try:
+            while not (event is not None and event.is_set()):
+                while len(pending) < concurrency:
+                    if ready:
+                        host, port = ready.popleft()
+                    elif exhausted or waiting >= concurrency * 4:
+                        # a few busy hosts hold back the rest; let them drain
+                        break
+                    else:
+                        try:
+                            target = next(source)
+                        except StopIteration:
+                            exhausted = True
+                            continue
+                        try:
+                            host, port = parse_target(target)
+                        except (TypeError, ValueError):
+                            yield PortResult(str(target), 0, False, 0.0, "invalid")
+                            continue
+                        if active.get(host, 0) >= self.per_host:
+                            deferred.setdefault(host, deque()).append((host, port))
+                            waiting += 1
+                            continue
+                        active[host] = active.get(host, 0) + 1
+                    pending.add(asyncio.ensure_future(self.probe(host, port, limiter)))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=0.25 if event is not None else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    result = task.result()
+                    queue = deferred.get(result.host)
+                    if queue:
+                        ready.append(queue.popleft())
+                        waiting -= 1
+                        if not queue:
+                            del deferred[result.host]
+                    else:
+                        active[result.host] -= 1
+                        if not active[result.host]:
+                            del active[result.host]
+                    yield result
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def scan(
+        self,
+        targets: Iterable[Target],
+        callback: Optional[Callable[[PortResult], None]] = None,
+        event: Optional[threading.Event] = None,
+    ) -> List[PortResult]:
+        """
+        Probe `targets`, passing every result to `callback` as it completes.
+
+        Returns:
+            List[PortResult]: The open ports, in the order they were found.
+        """
+        found: List[PortResult] = []
+        async for result in self.stream(targets, event):
+            if result.open:
+                found.append(result)
+            if callback is not None:
+                callback(result)
+        return found
+
+
+def scan_ports(
+    targets: Iterable[Target],
+    callback: Optional[Callable[[PortResult], None]] = None,
+    event: Optional[threading.Event] = None,
+    **options,
+) -> List[PortResult]:
+    """
+    Blocking `PortScanner.scan` for synchronous code and worker threads.
+
+    Args:
+        targets (Iterable[Target]): 'IP:PORT' strings or (host, port) tuples.
+        callback (Callable[[PortResult], None], optional): Called with every
+            result as it completes, on the calling thread.
+        event (threading.Event, optional): Stops the scan when set.
+        **options: `PortScanner` arguments.
+
+    Returns:
+        List[PortResult]: The open ports.
+    """
+    return asyncio.run(PortScanner(**options).scan(targets, callback, event))
+
+
+def _iter_cli_targets(tokens: Iterable[str], ports: List[int]) -> Iterator[Target]:
+    for token in tokens:
+        token = token.strip()
+        if not token or token.startswith("#"):
+            continue
+        try:
+            yield parse_target(token)
+        except ValueError:
+            # a bare host: sweep it over --ports
+            for port in ports:
+                yield token, port
+
+
+def _read_tokens(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if path == "-":
+            for line in sys.stdin:
+                yield from line.split()
+        else:
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    yield from line.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asynchronous TCP port scanner")
+    parser.add_argument(
+        "targets", nargs="*", help="IP:PORT, or a host to scan over --ports"
+    )
+    parser.add_argument(
+        "-f", "--file", action="append", default=[], help="Read targets ('-': stdin)"
+    )
+    parser.add_argument(
+        "-p",
+        "--ports",
+        default="80,443,1080,3128,8080,8888",
+        help="Ports for bare hosts, e.g. 80,8000-8100",
+    )
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--per-host", type=int, default=256)
+    parser.add_argument("--rate", type=float, help="Connects per second")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--all", action="store_true", help="Print closed ports too")
+    args = parser.parse_args()
+
+    tokens: Iterable[str] = args.targets
+    if args.file:
+        tokens = list(args.targets) + list(_read_tokens(args.file))
+    try:
+        ports = parse_ports(args.ports)
+    except ValueError as e:
+        parser.error(str(e))
+    scanner = PortScanner(
+        concurrency=args.concurrency,
+        per_host=args.per_host,
+        rate=args.rate,
+        timeout=args.timeout,
+    )
+    counts = {"scanned": 0, "open": 0}
+
+    def report(result: PortResult) -> None:
+        counts["scanned"] += 1
+        if result.open:
+            counts["open"] += 1
+            print(f"{result.address}\topen\t{result.elapsed * 1000:.1f}ms", flush=True)
+        elif args.all:
+            print(f"{result.address}\tclosed\t{result.error}", flush=True)
+
+    start = time.perf_counter()
+    try:
+        asyncio.run(scanner.scan(_iter_cli_targets(tokens, ports), report))
+    except KeyboardInterrupt:
+        pass
+    elapsed = time.perf_counter() - start
+    print(
+        f"Scanned {counts['scanned']} ports, {counts['open']} open, in {elapsed:.1f}s "
+        f"({counts['scanned'] / max(elapsed, 1e-9):.0f}/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
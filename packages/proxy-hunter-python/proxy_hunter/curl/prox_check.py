@@ -3,6 +3,7 @@ from typing import Optional
 
 from colorama import Fore, Style
 
+from proxy_hunter.curl.judge import get_judge_url
 from proxy_hunter.curl.request_helper import build_request
 
 
@@ -16,10 +17,15 @@ def is_prox(proxy_server: str, debug: bool = False) -> Optional[str]:
     Returns:
         Optional[str]: The proxy server if it is working, otherwise None.
     """
-    endpoints = [
-        "https://ip-get-geolocation.com/api/json",
-        "http://api.ipify.org/?format=json",
-    ]
+    judge = get_judge_url("/ip")
+    endpoints = (
+        [judge]
+        if judge
+        else [
+            "https://ip-get-geolocation.com/api/json",
+            "http://api.ipify.org/?format=json",
+        ]
+    )
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows; U; Windows NT 6.1; en-US; rv:1.9.1.5) Gecko/20091102 Firefox/3.5.5 (.NET CLR 3.5.30729)"
     }
@@ -36,6 +42,7 @@ def is_prox(proxy_server: str, debug: bool = False) -> Optional[str]:
                 post_data=None,
                 endpoint=endpoint,
                 headers=headers,
+                cookie_file=None,
             )
             if response and response.ok:
                 response_json = response.json()
@@ -1,6 +1,7 @@
 import re
 import socket
 import threading
+import time
 from typing import Union, Dict, Any, Callable, Optional
 from urllib.parse import urlparse
 
@@ -9,7 +10,10 @@ import requests
 
 from proxy_checker import ProxyChecker
 from proxy_hunter.curl.func_useragent import get_pc_useragent
+from proxy_hunter.curl.judge import get_judge_url
+from proxy_hunter.curl.latency import LatencyTracker, get_latency_tracker
 from proxy_hunter.curl.request_helper import build_request
+from proxy_hunter.curl.session_pool import SessionPool
 from proxy_hunter.utils.regex_utils import find_substring_from_regex
 from proxy_checker.utils.get_device_ip import get_device_ip as checker_get_device_ip
 
@@ -71,6 +75,7 @@ def check_proxy(
     headers: Optional[Dict[str, str]] = None,
     callback: Optional[Callable[[ProxyCheckResult], None]] = None,
     cancel_event: Optional[threading.Event] = None,
+    session_pool: Optional[SessionPool] = None,
 ) -> ProxyCheckResult:
     """
     Checks if the provided proxy is working by sending a request.
@@ -79,9 +84,10 @@ def check_proxy(
         proxy (str): The proxy address in the format IP:PORT.
         proxy_type (str): Type of proxy ('http', 'socks4', or 'socks5').
         callback (Callable[[ProxyCheckResult], None]): Callback function to execute before returning the result.
-        endpoint (str, optional): The endpoint URL for the request. Defaults to None.
+        endpoint (str, optional): The endpoint URL for the request. Defaults to /headers on the PROXY_JUDGE_URL judge, else httpbin.
         headers (Dict[str, str], optional): Headers for the request. Defaults to None.
         cancel_event (threading.Event, optional): Event to signal cancellation. Defaults to None.
+        session_pool (SessionPool, optional): Pool reusing connections per proxy, see `build_request`. Defaults to None.
 
     Returns:
         ProxyCheckResult: An object containing the result of the check.
@@ -89,7 +95,7 @@ def check_proxy(
     default_headers: Dict[str, Any] = {"User-Agent": get_pc_useragent()}
     if headers is not None:
         default_headers.update(headers)
-    endpoint = endpoint or "https://httpbin.org/headers"
+    endpoint = endpoint or get_judge_url("/headers") or "https://httpbin.org/headers"
     latency = -1
     result = False
     is_private = False
@@ -97,7 +103,8 @@ def check_proxy(
     error = None
     response = None
 
-    if is_port_open(proxy):
+    port_open = is_port_open(proxy)
+    if port_open:
         try:
             if cancel_event and cancel_event.is_set():
                 return ProxyCheckResult(
@@ -117,6 +124,8 @@ def check_proxy(
                 method="GET",
                 endpoint=endpoint,
                 headers=default_headers,
+                cookie_file=None,
+                session_pool=session_pool,
             )
             latency = response.elapsed.total_seconds() * 1000  # in milliseconds
             is_private = (
@@ -141,7 +150,8 @@ def check_proxy(
             result = False
             is_private = True
 
-    if not result:
+    # the second, full check cannot succeed on a closed port
+    if not result and port_open:
         try:
             checker = ProxyChecker()
             lib_result = checker.check_proxy(proxy)
@@ -241,18 +251,30 @@ def get_requests_error(
     return error
 
 
-def is_port_open(address: str) -> bool:
+def is_port_open(
+    address: str,
+    timeout: Optional[float] = None,
+    tracker: Optional[LatencyTracker] = None,
+) -> bool:
     """
     Check if a port is open on a given IP address and port number.
 
     Args:
         address (str): A string in the format "IP:PORT".
+        timeout (float, optional): Connect timeout in seconds. Defaults to one
+            derived from the latency history of the address or its subnet, or 10.
+        tracker (LatencyTracker, optional): History to read and update. Defaults to `get_latency_tracker()`.
 
     Returns:
         bool: True if the port is open, False otherwise.
     """
+    if tracker is None:
+        tracker = get_latency_tracker()
+    if timeout is None:
+        timeout = tracker.connect_timeout(address, 10)
     result = False
     s = None
+    start = time.perf_counter()
     try:
         # Split the address into IP and port
         host, port = address.split(":")
@@ -260,15 +282,17 @@ def is_port_open(address: str) -> bool:
         # Create a new socket
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         # Set a timeout to prevent hanging
-        s.settimeout(10)
+        s.settimeout(timeout)
         # Try to connect to the host and port
         s.connect((host, port))
         # debug_log(f"{address} {green('port open')}")
         # If successful, the port is open
         result = True
+        tracker.record(address, time.perf_counter() - start)
     except Exception as e:
         # log_proxy(f"{address} {red('port closed')} {str(e)}")
         result = False
+        tracker.record(address, None)
     finally:
         if s:
             # Close the socket
@@ -3,7 +3,8 @@ import os
 import re
 import ssl
 import certifi
-import time
+import threading
+import atexit
 from http import cookiejar as cookiejar
 from http.cookiejar import Cookie, LWPCookieJar, MozillaCookieJar
 from typing import Dict, List, Optional, Union
@@ -16,6 +17,8 @@ from requests.cookies import RequestsCookieJar
 from proxy_hunter.Proxy import Proxy
 from proxy_hunter.utils import read_file, write_file
 from proxy_hunter.curl.certificates import last_merged_certificates_path
+from proxy_hunter.curl.latency import get_latency_tracker
+from proxy_hunter.curl.session_pool import SessionPool
 
 # Set the certificate file in environment variables
 os.environ["REQUESTS_CA_BUNDLE"] = str(last_merged_certificates_path)
@@ -43,6 +46,7 @@ def build_request(
     no_cache: Optional[bool] = False,
     cookie_file: Optional[str] = "tmp/cookies/default.txt",
     session: Optional[requests.Session] = None,
+    session_pool: Optional[SessionPool] = None,
     keep_headers: Optional[bool] = None,
     retry: int = 0,
     **kwargs,
@@ -60,11 +64,12 @@ def build_request(
         endpoint (str): The endpoint URL for the request. Defaults to 'https://bing.com'.
         headers (Optional[Dict[str, str]]): Headers for the request. Defaults to None.
         no_cache (Optional[bool]): Flag to bypass cache by appending a unique query parameter. Defaults to False.
-        cookie_file (Optional[str]): Path to the cookie file. Defaults to 'tmp/cookies/default.txt'.
+        cookie_file (Optional[str]): Path to the cookie file, shared through `get_cookie_store`. None skips cookie handling entirely, the fast path for proxy checks. Defaults to 'tmp/cookies/default.txt'.
         session (Optional[requests.Session]): An existing session to reuse. If None, a new session is created.
+        session_pool (Optional[SessionPool]): Pool to lease a session for this proxy from when `session` is None, keeping connections open across calls. Defaults to None.
         keep_headers (Optional[bool]): Flag to determine if default headers should be overridden by provided headers. Defaults to None.
         retry (int): Number of extra attempts when a request fails with a transport-level requests exception. Defaults to 0.
-        **kwargs: Additional keyword arguments to pass to the requests method.
+        **kwargs: Additional keyword arguments to pass to the requests method. Without `timeout`, proxied requests get timeouts derived from the latency history of the proxy (`get_latency_tracker()`), others 10 seconds.
 
     Returns:
         requests.Response: The response object from the HTTP request.
@@ -77,11 +82,6 @@ def build_request(
 
     verify_certificate = kwargs.pop("verify", False)
 
-    # Create a new session if one is not provided
-    if session is None:
-        session = requests.Session()
-    session.mount("https://", HTTPAdapter(max_retries=3))
-
     if no_cache:
         # Append a unique query parameter to bypass caches
         unique_param = f"nocache={''.join(secrets.choice(ascii_letters + digits) for _ in range(5))}"
@@ -112,6 +112,7 @@ def build_request(
             elif scheme.startswith("socks5"):
                 proxy_type = "socks5"
 
+    proxy_url: Optional[str] = None
     if proxy_type is not None and proxy is not None:
         # Helper to insert credentials when provided and when missing from proxy
         def insert_creds(scheme: str, hostpart: str) -> str:
@@ -132,7 +133,6 @@ def build_request(
                 proxy_url = insert_creds(scheme, hostpart)
             else:
                 proxy_url = insert_creds("http://", proxy)
-            session.proxies = {"http": proxy_url, "https": proxy_url}
         elif proxy_type.lower() == "socks4":
             if proxy.startswith("socks4://"):
                 m = re.match(r"^(socks4://)(.*)$", proxy)
@@ -145,7 +145,6 @@ def build_request(
                 proxy_url = insert_creds(scheme, hostpart)
             else:
                 proxy_url = insert_creds("socks4://", proxy)
-            session.proxies = {"http": proxy_url, "https": proxy_url}
         elif proxy_type.lower() == "socks5":
             if proxy.startswith("socks5://"):
                 m = re.match(r"^(socks5://)(.*)$", proxy)
@@ -158,134 +157,128 @@ def build_request(
                 proxy_url = insert_creds(scheme, hostpart)
             else:
                 proxy_url = insert_creds("socks5://", proxy)
-            session.proxies = {"http": proxy_url, "https": proxy_url}
         else:
             raise ValueError(
                 "Invalid proxy type. Supported types are 'http', 'socks4', and 'socks5'."
             )
 
-    # Load cookies from the specified cookie file
-    cookie_jar = None
-    cookie_header = None
-    if cookie_file is not None:
-        cookie_str = ""
-        if not os.path.exists(cookie_file):
-            generate_netscape_cookie_jar(cookie_file)
-        if os.path.exists(cookie_file):
-            cookie_str = read_file(cookie_file)
-        if cookie_str is not None and cookie_str != "":
-            try:
-                if "Netscape HTTP Cookie File" in cookie_str:
-                    cookie_jar = MozillaCookieJar(cookie_file)
-                    cookie_header = """# Netscape HTTP Cookie File
-# http://curl.haxx.se/rfc/cookie_spec.html
-# This is a generated file!  Do not edit.
-"""
-                else:
-                    cookie_jar = LWPCookieJar(cookie_file)
-                    cookie_header = "#LWP-Cookies-2.0"
+    # Create a new session if one is not provided, or lease the pooled session
+    # of this proxy so consecutive requests through it reuse its connections
+    pooled = session is None and session_pool is not None
+    if session is None:
+        session = (
+            session_pool.acquire(proxy_url)
+            if session_pool is not None
+            else requests.Session()
+        )
+    released = False
+    try:
+        # a reused session keeps its adapter (and connection pool)
+        if not getattr(session, "_retry_adapter_mounted", False):
+            session.mount("https://", HTTPAdapter(max_retries=3))
+            session._retry_adapter_mounted = True  # type: ignore[attr-defined]
+        if proxy_url is not None:
+            session.proxies = {"http": proxy_url, "https": proxy_url}
 
-                cookie_jar.load(
-                    ignore_discard=True, ignore_expires=True, filename=cookie_file
-                )
-                session.cookies.update(cookie_jar)
-            except Exception as e:
-                print(f"Error loading cookies from file: {e}")
-                # Skip using cookies if loading fails
-                cookie_jar = None
-                cookie_header = None
-
-    # Setup browser headers
-    if headers is None:
-        headers = {}
-    if not keep_headers:
-        default_headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/81.0.4044.138 Safari/537.36",
-            "Cache-Control": "no-cache",
-            "Pragma": "no-cache",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
+        # Cookies come from the per-process store of the cookie file, loaded once
+        cookie_store = None
+        if cookie_file is not None:
+            cookie_store = get_cookie_store(cookie_file)
+            cookie_store.apply(session)
+
+        # Setup browser headers
+        if headers is None:
+            headers = {}
+        if not keep_headers:
+            default_headers = {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/81.0.4044.138 Safari/537.36",
+                "Cache-Control": "no-cache",
+                "Pragma": "no-cache",
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.5",
+            }
+            default_headers.update(headers)
+            session.headers.update(default_headers)
+        else:
+            session.headers.update(headers)
+
+        # Setup request method
+        request_methods = {
+            "POST": session.post,
+            "PUT": session.put,
+            "GET": session.get,
+            "DELETE": session.delete,
+            "HEAD": session.head,
+            "OPTIONS": session.options,
+            "PATCH": session.patch,
         }
-        default_headers.update(headers)
-        session.headers.update(default_headers)
-    else:
-        session.headers.update(headers)
-
-    # Setup request method
-    request_methods = {
-        "POST": session.post,
-        "PUT": session.put,
-        "GET": session.get,
-        "DELETE": session.delete,
-        "HEAD": session.head,
-        "OPTIONS": session.options,
-        "PATCH": session.patch,
-    }
-
-    # Extract timeout from kwargs or use default
-    timeout = kwargs.pop("timeout", 10)
-    # Initialize response to avoid 'possibly unbound' warnings
-    response = None
-    method_upper = method.upper()
-    if method_upper not in request_methods:
-        raise ValueError(f"Unsupported method: {method}")
-
-    def send_request() -> requests.Response:
-        if method_upper in ["POST", "PUT", "PATCH"]:
-            # Use json=post_data if Content-Type is application/json and post_data is dict
-            content_type = session.headers.get("Content-Type", "")
-            if "application/json" in str(content_type) and isinstance(post_data, dict):
+
+        # Extract timeout from kwargs, else derive (connect, read) timeouts from the
+        # latency history of the proxy: 10 seconds for unknown ones
+        timeout = kwargs.pop("timeout", None)
+        if timeout is None:
+            timeout = 10
+            if proxy is not None:
+                tracker = get_latency_tracker()
+                timeout = (
+                    tracker.connect_timeout(proxy, timeout),
+                    tracker.read_timeout(proxy, timeout),
+                )
+        # Initialize response to avoid 'possibly unbound' warnings
+        response = None
+        method_upper = method.upper()
+        if method_upper not in request_methods:
+            raise ValueError(f"Unsupported method: {method}")
+
+        def send_request() -> requests.Response:
+            if method_upper in ["POST", "PUT", "PATCH"]:
+                # Use json=post_data if Content-Type is application/json and post_data is dict
+                content_type = session.headers.get("Content-Type", "")
+                if "application/json" in str(content_type) and isinstance(
+                    post_data, dict
+                ):
+                    return request_methods[method_upper](
+                        endpoint,
+                        json=post_data,
+                        timeout=timeout,
+                        verify=verify_certificate,
+                        **kwargs,
+                    )
                 return request_methods[method_upper](
                     endpoint,
-                    json=post_data,
+                    data=post_data,
                     timeout=timeout,
                     verify=verify_certificate,
                     **kwargs,
                 )
             return request_methods[method_upper](
-                endpoint,
-                data=post_data,
-                timeout=timeout,
-                verify=verify_certificate,
-                **kwargs,
+                endpoint, timeout=timeout, verify=verify_certificate, **kwargs
             )
-        return request_methods[method_upper](
-            endpoint, timeout=timeout, verify=verify_certificate, **kwargs
-        )
 
-    for attempt in range(retry + 1):
-        try:
-            response = send_request()
-            break
-        except requests.RequestException:
-            if attempt >= retry:
-                raise
-    # Ensure we have a response object (static analyzers may not infer the raise above)
-    if response is None:
-        raise requests.RequestException("No response received from send_request()")
-    # Save cookies back to file
-    if cookie_jar is not None and cookie_header is not None:
-        cookies_to_be_saved = [cookie_header]
-        update_cookie_jar(cookie_jar, response.cookies)
-        for cookie in cookie_jar:
-            if isinstance(cookie_jar, MozillaCookieJar):
-                domain = cookie.domain
-                secure = "TRUE" if cookie.secure else "FALSE"
-                initial_dot = "TRUE" if domain.startswith(".") else "FALSE"
-                expires = str(cookie.expires) if cookie.expires is not None else ""
-                name = "" if cookie.value is None else cookie.name
-                value = cookie.value if cookie.value is not None else cookie.name
-                cookie_raw = "\t".join(
-                    [domain, initial_dot, cookie.path, secure, expires, name, value]
-                )
-            else:
-                cookie_raw = "Set-Cookie3: %s" % lwp_cookie_str(cookie)
-            cookies_to_be_saved.append(cookie_raw)
-        write_file(cookie_file, "\n".join(cookies_to_be_saved + [""]))
-        time.sleep(1)
-
-    return response
+        for attempt in range(retry + 1):
+            try:
+                response = send_request()
+                break
+            except requests.RequestException:
+                if attempt >= retry:
+                    raise
+        # Ensure we have a response object (static analyzers may not infer the raise above)
+        if response is None:
+            raise requests.RequestException("No response received from send_request()")
+        # Merge the response cookies; the file is written later by the store
+        if cookie_store is not None:
+            cookie_store.update(response.cookies)
+
+        # Back to the pool only after a response: a failed proxy drops its session
+        if pooled and session_pool is not None:
+            session_pool.release(session)
+            released = True
+        return response
+    finally:
+        # any error, not only a RequestException, closes the leased session
+        if pooled and not released:
+            session.close()
 
 
 def generate_netscape_cookie_jar(file_path):
@@ -378,6 +371,146 @@ def update_cookie_jar(
             cookie_jar.set_cookie(cookie)
 
 
+# Seconds between a cookie change and the write of the cookie file
+DEFAULT_COOKIE_FLUSH_DELAY = 5.0
+
+
+class CookieStore:
+    """
+    In-memory cookie jar of one cookie file, shared by every thread of the
+    process through `get_cookie_store`.
+
+    The file is read once, on first use. Response cookies are merged in memory
+    and written back by a timer at most once per `flush_delay` seconds, and at
+    exit, instead of after every request.
+    """
+
+    def __init__(
+        self, cookie_file: str, flush_delay: float = DEFAULT_COOKIE_FLUSH_DELAY
+    ):
+        self.cookie_file = cookie_file
+        self.flush_delay = flush_delay
+        self.lock = threading.RLock()
+        self._jar: Optional[Union[MozillaCookieJar, LWPCookieJar]] = None
+        self._header: Optional[str] = None
+        self._loaded = False
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        cookie_file = self.cookie_file
+        if not os.path.exists(cookie_file):
+            generate_netscape_cookie_jar(cookie_file)
+        cookie_str = read_file(cookie_file) if os.path.exists(cookie_file) else ""
+        if not cookie_str:
+            return
+        try:
+            if "Netscape HTTP Cookie File" in cookie_str:
+                cookie_jar = MozillaCookieJar(cookie_file)
+                self._header = """# Netscape HTTP Cookie File
+# http://curl.haxx.se/rfc/cookie_spec.html
+# This is a generated file!  Do not edit.
+"""
+            else:
+                cookie_jar = LWPCookieJar(cookie_file)
+                self._header = "#LWP-Cookies-2.0"
+
+            cookie_jar.load(
+                ignore_discard=True, ignore_expires=True, filename=cookie_file
+            )
+            self._jar = cookie_jar
+        except Exception as e:
+            print(f"Error loading cookies from file: {e}")
+            # Skip using cookies if loading fails
+            self._jar = None
+            self._header = None
+
+    def apply(self, session: requests.Session) -> None:
+        """Copy the stored cookies into `session`."""
+        with self.lock:
+            self._load()
+            if self._jar is not None:
+                session.cookies.update(self._jar)
+
+    def update(self, cookies: Union[List[Cookie], RequestsCookieJar]) -> None:
+        """Merge response cookies and schedule a write of the cookie file."""
+        cookies = list(cookies)
+        if not cookies:
+            return
+        with self.lock:
+            self._load()
+            if self._jar is None:
+                return
+            update_cookie_jar(self._jar, cookies)
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes to the cookie file now."""
+        with self.lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty or self._jar is None or self._header is None:
+                return
+            cookies_to_be_saved = [self._header]
+            for cookie in self._jar:
+                if isinstance(self._jar, MozillaCookieJar):
+                    domain = cookie.domain
+                    secure = "TRUE" if cookie.secure else "FALSE"
+                    initial_dot = "TRUE" if domain.startswith(".") else "FALSE"
+                    expires = str(cookie.expires) if cookie.expires is not None else ""
+                    name = "" if cookie.value is None else cookie.name
+                    value = cookie.value if cookie.value is not None else cookie.name
+                    cookie_raw = "\t".join(
+                        [domain, initial_dot, cookie.path, secure, expires, name, value]
+                    )
+                else:
+                    cookie_raw = "Set-Cookie3: %s" % lwp_cookie_str(cookie)
+                cookies_to_be_saved.append(cookie_raw)
+            # written aside and renamed, so readers never see a partial file
+            temp_file = f"{self.cookie_file}.tmp"
+            write_file(temp_file, "\n".join(cookies_to_be_saved + [""]))
+            os.replace(temp_file, self.cookie_file)
+            self._dirty = False
+
+
+_cookie_stores: Dict[str, CookieStore] = {}
+_cookie_stores_lock = threading.Lock()
+
+
+def get_cookie_store(cookie_file: str) -> CookieStore:
+    """
+    Returns the process-wide `CookieStore` of a cookie file.
+
+    Args:
+        cookie_file (str): Path to the cookie file.
+    """
+    cookie_file = os.path.abspath(cookie_file)
+    with _cookie_stores_lock:
+        store = _cookie_stores.get(cookie_file)
+        if store is None:
+            store = _cookie_stores[cookie_file] = CookieStore(cookie_file)
+        return store
+
+
+def flush_cookie_stores() -> None:
+    """Write the pending cookies of every store, also called at exit."""
+    with _cookie_stores_lock:
+        stores = list(_cookie_stores.values())
+    for store in stores:
+        store.flush()
+
+
+atexit.register(flush_cookie_stores)
+
+
 def join_header_words(lists):
     """Do the inverse (almost) of the conversion done by split_header_words.
 
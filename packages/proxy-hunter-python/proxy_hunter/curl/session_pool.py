@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import default_headers
+
+# Key of sessions used without a proxy
+DIRECT = "direct"
+
+
+class SessionPool:
+    """
+    Bounded LRU pool of `requests.Session` objects keyed by proxy URL.
+
+    A session is leased to one thread at a time with `acquire` and handed back
+    with `release`, keeping its open connections (and TLS sessions) to the
+    proxy and targets for the next request through the same proxy. Sessions
+    idle for `idle_timeout` seconds, or beyond `max_sessions`, are closed
+    least recently used first.
+
+    Example:
+        pool = SessionPool()
+        session = pool.acquire("http://1.2.3.4:8080")
+        try:
+            session.get("http://example.com")
+        finally:
+            pool.release(session)
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 128,
+        idle_timeout: float = 60.0,
+        pool_maxsize: int = 4,
+        max_retries: int = 3,
+    ):
+        """
+        Args:
+            max_sessions (int): Idle sessions kept across all proxies.
+            idle_timeout (float): Seconds before an idle session is closed.
+            pool_maxsize (int): Connections kept per host by each session.
+            max_retries (int): Connection retries of the session adapters.
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        # proxy URL -> idle sessions with their release time, LRU first
+        self._idle: "OrderedDict[str, List[Tuple[requests.Session, float]]]" = (
+            OrderedDict()
+        )
+        self._count = 0
+
+    def _new_session(self, key: str) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.max_retries,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session._retry_adapter_mounted = True  # type: ignore[attr-defined]
+        session._pool_key = key  # type: ignore[attr-defined]
+        return session
+
+    def acquire(self, proxy_url: Optional[str] = None) -> requests.Session:
+        """
+        Lease a session for `proxy_url`, reusing an idle one when possible.
+
+        Args:
+            proxy_url (Optional[str]): The proxy URL, None for direct requests.
+        """
+        key = proxy_url or DIRECT
+        with self.lock:
+            expired = self._evict(time.monotonic())
+            entries = self._idle.get(key)
+            session = None
+            if entries:
+                session = entries.pop()[0]
+                self._count -= 1
+                if not entries:
+                    del self._idle[key]
+        self._close(expired)
+        return session if session is not None else self._new_session(key)
+
+    def release(self, session: requests.Session) -> None:
+        """Hand a leased session back, clearing its cookies and headers."""
+        key = getattr(session, "_pool_key", None)
+        if key is None:
+            session.close()
+            return
+        session.cookies.clear()
+        session.headers = default_headers()
+        with self.lock:
+            self._idle.setdefault(key, []).append((session, time.monotonic()))
+            self._idle.move_to_end(key)
+            self._count += 1
+            expired = self._evict(time.monotonic())
+        self._close(expired)
+
+    def _evict(self, now: float) -> List[requests.Session]:
+        """Remove idle and excess sessions; the caller holds the lock."""
+        expired: List[requests.Session] = []
+        deadline = now - self.idle_timeout
+        while self._idle:
+            key, entries = next(iter(self._idle.items()))
+            # the newest session of the least recently used proxy decides
+            if self._count > self.max_sessions or entries[-1][1] < deadline:
+                expired.append(entries.pop(0)[0])
+                self._count -= 1
+                if not entries:
+                    del self._idle[key]
+            else:
+                break
+        return expired
+
+    @staticmethod
+    def _close(sessions: List[requests.Session]) -> None:
+        for session in sessions:
+            session.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        """Close every idle session."""
+        with self.lock:
+            sessions = [s for entries in self._idle.values() for s, _ in entries]
+            self._idle.clear()
+            self._count = 0
+        self._close(sessions)
+
+
+_default_pool: Optional[SessionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """Returns the process-wide `SessionPool` used by the proxy checkers."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SessionPool()
+        return _default_pool
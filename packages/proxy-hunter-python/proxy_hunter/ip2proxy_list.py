@@ -1,31 +1,38 @@
 from typing import List, Tuple
 
+from proxy_hunter.ip_ranges import TargetGrid
 
-def generate_ip_port_pairs(
-    ip: str, start_port: int = 80, max_port: int = 65535
-) -> List[Tuple[str, int]]:
+
+def _validate_ip(ip: str) -> str:
     ip_parts = ip.split(".")
     if len(ip_parts) != 4:
         raise ValueError("Invalid IP address format")
+    return ".".join(str(int(part)) for part in ip_parts)
 
-    base_ip_parts = list(map(int, ip_parts))
-    pairs: List[Tuple[str, int]] = []
 
-    base_ip = (
-        f"{base_ip_parts[0]}.{base_ip_parts[1]}.{base_ip_parts[2]}.{base_ip_parts[3]}"
-    )
+def ip_port_grid(ip: str, start_port: int = 80, max_port: int = 65535) -> TargetGrid:
+    """
+    Returns every `ip:port` target from `start_port` to `max_port` as a lazy
+    grid, formatted only when iterated.
 
-    for port in range(start_port, max_port + 1):
-        pairs.append((base_ip, port))
+    Args:
+        ip (str): The IPv4 address.
+        start_port (int): First port (default: 80).
+        max_port (int): Last port (default: 65535).
+    """
+    return TargetGrid([_validate_ip(ip)], range(start_port, max_port + 1))
 
-    return pairs
+
+def generate_ip_port_pairs(
+    ip: str, start_port: int = 80, max_port: int = 65535
+) -> List[Tuple[str, int]]:
+    base_ip = _validate_ip(ip)
+    return [(base_ip, port) for port in range(start_port, max_port + 1)]
 
 
 if __name__ == "__main__":
     base_ip = "192.168.0.1"
     start_port = 80  # Starting port
 
-    ip_port_pairs = generate_ip_port_pairs(base_ip, start_port)
-
-    for ip, port in ip_port_pairs:
-        print(f"{ip}:{port}")
+    for target in ip_port_grid(base_ip, start_port).iter_targets():
+        print(target)
@@ -0,0 +1,210 @@
+import ipaddress
+import random
+from array import array
+from typing import Iterable, Iterator, Optional, Sequence, Tuple, Union
+
+# Targets generated per chunk by `TargetGrid.iter_chunks`
+DEFAULT_CHUNK_SIZE = 4096
+
+
+def ip_to_int(ip: str) -> int:
+    """Pack a dotted IPv4 address into an unsigned 32-bit integer."""
+    a, b, c, d = ip.split(".")
+    return (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+
+
+def int_to_ip(value: int) -> str:
+    """Format an unsigned 32-bit integer as a dotted IPv4 address."""
+    return f"{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+
+def iter_shuffled_chunks(
+    total: int, chunk_size: int, rng: Optional[random.Random] = None
+) -> Iterator[array]:
+    """
+    Yield every index of `range(total)` once, in random order, as arrays of
+    at most `chunk_size` indices.
+
+    The order of the chunks is shuffled and so is each chunk, which only holds
+    one chunk of indices in memory instead of the whole permutation.
+    """
+    rng = rng or random.Random()
+    starts = list(range(0, total, chunk_size))
+    rng.shuffle(starts)
+    for start in starts:
+        indices = array("q", range(start, min(start + chunk_size, total)))
+        rng.shuffle(indices)
+        yield indices
+
+
+class IPRange:
+    """
+    A contiguous IPv4 range kept as two integers.
+
+    Example:
+        hosts = IPRange.from_cidr("10.0.0.0/16")
+        len(hosts)  # 65534, without building any address
+    """
+
+    __slots__ = ("start", "stop")
+
+    def __init__(self, start: int, stop: int):
+        """
+        Args:
+            start (int): First address as an integer.
+            stop (int): One past the last address.
+        """
+        if not 0 <= start <= stop <= 1 << 32:
+            raise ValueError("IPv4 range out of bounds")
+        self.start = start
+        self.stop = stop
+
+    @classmethod
+    def from_cidr(cls, cidr: str, hosts_only: bool = True) -> "IPRange":
+        """
+        Args:
+            cidr (str): A CIDR block (e.g. '192.168.1.0/24') or a single address.
+            hosts_only (bool): Skip the network and broadcast addresses like
+                `ipaddress.IPv4Network.hosts()` does (default: True).
+
+        Raises:
+            ValueError: If `cidr` is not an IPv4 network.
+        """
+        network = ipaddress.ip_network(cidr.strip(), strict=False)
+        if network.version != 4:
+            raise ValueError(f"Not an IPv4 network: {cidr}")
+        start = int(network.network_address)
+        stop = start + network.num_addresses
+        if hosts_only and network.prefixlen < 31:
+            start, stop = start + 1, stop - 1
+        return cls(start, stop)
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("IPRange index out of range")
+        return self.start + index
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.start, self.stop))
+
+    def to_array(self) -> array:
+        """The addresses as an `array('I')`, 4 bytes each."""
+        return array("I", range(self.start, self.stop))
+
+    def iter_strings(self) -> Iterator[str]:
+        """Format the addresses one at a time."""
+        return map(int_to_ip, range(self.start, self.stop))
+
+    def iter_shuffled(
+        self, chunk_size: int = DEFAULT_CHUNK_SIZE, seed: Optional[int] = None
+    ) -> Iterator[array]:
+        """Yield the addresses in random order as chunks of `array('I')`."""
+        start = self.start
+        for indices in iter_shuffled_chunks(len(self), chunk_size, random.Random(seed)):
+            yield array("I", (start + i for i in indices))
+
+
+class TargetGrid:
+    """
+    Every combination of a set of IPv4 addresses and ports, addressed by
+    index and generated lazily.
+
+    Index `i` maps to address `i % len(ips)` and port `i // len(ips)`, so
+    consecutive targets spread over the addresses rather than hammering one
+    host port after port.
+
+    Example:
+        grid = TargetGrid(IPRange.from_cidr("10.0.0.0/24"), range(80, 65536))
+        for ips, ports in grid.iter_chunks(shuffle=True):
+            for target in format_targets(ips, ports):
+                ...
+    """
+
+    __slots__ = ("ips", "ports")
+
+    def __init__(
+        self,
+        ips: Union[IPRange, Sequence[int], Iterable[str]],
+        ports: Iterable[int],
+    ):
+        """
+        Args:
+            ips (Union[IPRange, Sequence[int], Iterable[str]]): An `IPRange`,
+                integer addresses or dotted addresses.
+            ports (Iterable[int]): Ports to combine with every address.
+        """
+        if isinstance(ips, (IPRange, array)):
+            self.ips = ips
+        else:
+            self.ips = array(
+                "I", (ip_to_int(ip) if isinstance(ip, str) else ip for ip in ips)
+            )
+        self.ports = array("H", ports)
+
+    def __len__(self) -> int:
+        return len(self.ips) * len(self.ports)
+
+    def __getitem__(self, index: int) -> Tuple[int, int]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TargetGrid index out of range")
+        port_index, ip_index = divmod(index, len(self.ips))
+        return self.ips[ip_index], self.ports[port_index]
+
+    def iter_chunks(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        shuffle: bool = False,
+        seed: Optional[int] = None,
+    ) -> Iterator[Tuple[array, array]]:
+        """
+        Yield the targets as pairs of `array('I')` addresses and
+        `array('H')` ports of at most `chunk_size` items.
+
+        Args:
+            chunk_size (int): Targets per chunk.
+            shuffle (bool): Visit the targets in random order.
+            seed (Optional[int]): Seed for a reproducible order.
+        """
+        total = len(self)
+        if shuffle:
+            chunks: Iterable[Iterable[int]] = iter_shuffled_chunks(
+                total, chunk_size, random.Random(seed)
+            )
+        else:
+            chunks = (
+                range(start, min(start + chunk_size, total))
+                for start in range(0, total, chunk_size)
+            )
+        ips, ports = self.ips, self.ports
+        ip_count = len(ips)
+        for indices in chunks:
+            chunk_ips = array("I")
+            chunk_ports = array("H")
+            for index in indices:
+                port_index, ip_index = divmod(index, ip_count)
+                chunk_ips.append(ips[ip_index])
+                chunk_ports.append(ports[port_index])
+            yield chunk_ips, chunk_ports
+
+    def iter_targets(
+        self,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        shuffle: bool = False,
+        seed: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Yield `ip:port` strings, formatted one chunk at a time."""
+        for chunk_ips, chunk_ports in self.iter_chunks(chunk_size, shuffle, seed):
+            yield from format_targets(chunk_ips, chunk_ports)
+
+
+def format_targets(ips: Iterable[int], ports: Iterable[int]) -> Iterator[str]:
+    """Format parallel address and port arrays as `ip:port` strings."""
+    for ip, port in zip(ips, ports):
+        yield f"{int_to_ip(ip)}:{port}"
@@ -3,9 +3,9 @@
 import time
 from socket import socket, AF_INET, SOCK_STREAM
 from typing import List
-from netaddr import IPNetwork
 from colorama import Fore, Style
 import random, os, sys, re
+from .ip_ranges import IPRange, int_to_ip
 
 # some pretty colors for the TERM
 red = Fore.RED
@@ -41,14 +41,16 @@ def scan(ip: str):
     Extract available IPs from supplied network
     """
     hcount = 0
-    hosts = IPNetwork(ip)
+    hosts = IPRange.from_cidr(ip, hosts_only=False)
     print(
         "[{}{}{}{}]: {}{}{}{} available IPs".format(
             bold, blue, ip, reset, bold, green, len(hosts), reset
         ),
         flush=True,
     )
-    for host in map(str, hosts):
+    # integers in shuffled chunks; an address is only formatted when scanned
+    addresses = (int_to_ip(v) for chunk in hosts.iter_shuffled() for v in chunk)
+    for host in addresses:
         print(
             "Scanning: [{}{}{}{}]".format(bold, yellow, host, reset),
             end="\r",
@@ -1,18 +1,20 @@
 import atexit
 import concurrent.futures
 import os
-import random
 import re
 import signal
 import sys
 import threading
 from typing import Callable, Dict, List, Optional
 
+from proxy_hunter.curl.latency import get_latency_tracker
 from proxy_hunter.curl.prox_check import is_prox
+from proxy_hunter.curl.port_scanner import PortResult, parse_target, scan_ports
 from proxy_hunter.curl.proxy_utils import is_port_open
 from proxy_hunter.extractor import extract_ips
-from proxy_hunter.ip2proxy_list import generate_ip_port_pairs
-from proxy_hunter.utils.file import read_file, remove_string_from_file, write_file
+from proxy_hunter.ip2proxy_list import ip_port_grid
+from proxy_hunter.ip_ranges import format_targets
+from proxy_hunter.utils.file.work_queue import QueueItem, WorkQueue
 
 # Define a global counter and lock for controlling output
 print_lock = threading.Lock()
@@ -36,11 +38,32 @@ def log(message: str, end: str = "\n") -> None:
         sys.stdout.flush()
 
 
+# Port queues by IP, shared by every thread and compacted at exit
+queues: Dict[str, WorkQueue] = {}
+queues_lock = threading.Lock()
+# Set on SIGINT/SIGTERM; stops the iterations that were not given their own event
+cancel_event = threading.Event()
+
+
+def get_queue(ip: str) -> WorkQueue:
+    """
+    Returns the queue of ports to check for an IP address, stored in
+    `tmp/ip-ports/{ip}.txt`.
+
+    Args:
+        ip (str): The IP address.
+    """
+    with queues_lock:
+        if ip not in queues:
+            queues[ip] = WorkQueue(f"tmp/ip-ports/{ip}.txt")
+        return queues[ip]
+
+
 def gen_ports(proxy: str, force: bool = False, debug: bool = False) -> None:
     """
     Generates port combinations for given IP addresses extracted from the proxy
-    and saves them to a file. Optionally forces overwriting existing files and
-    enables debug messages.
+    and queues them in random order. Optionally forces overwriting existing
+    queues and enables debug messages.
 
     Args:
         proxy (str): Proxy string containing IP addresses to generate ports for.
@@ -49,16 +72,15 @@ def gen_ports(proxy: str, force: bool = False, debug: bool = False) -> None:
     """
     ips = extract_ips(proxy)
     for ip in ips:
-        ip_port_pairs = generate_ip_port_pairs(ip, 80)
-        ip_ports = [":".join(map(str, item)) for item in ip_port_pairs]
-        file = f"tmp/ip-ports/{ip}.txt"
-        if not os.path.exists(file) or force:
-            write_file(file, "\n".join(ip_ports))
+        queue = get_queue(ip)
+        if not os.path.exists(queue.path) or force:
+            grid = ip_port_grid(ip, 80)
+            queue.clear()
+            # formatted a chunk at a time, straight into the queue file
+            for chunk_ips, chunk_ports in grid.iter_chunks(shuffle=True):
+                queue.push_many(format_targets(chunk_ips, chunk_ports))
             if debug:
-                log(f"Generated {len(ip_ports)} proxies on {file}", end="\n")
-
-
-at_exit_data: Dict[str, List[str]] = {}
+                log(f"Generated {len(grid)} proxies on {queue.path}", end="\n")
 
 
 def process_iterated_proxy(
@@ -67,10 +89,10 @@ def process_iterated_proxy(
     callback: Optional[Callable[[str, bool, bool], None]] = None,
     debug: bool = False,
     event: Optional[threading.Event] = None,
-) -> None:
+    is_open: Optional[bool] = None,
+) -> bool:
     """
     Processes each proxy by checking if its port is open and if it's a valid proxy.
-    Removes the proxy from the corresponding file once processed.
 
     Args:
         proxy (str): The proxy string to process.
@@ -78,14 +100,17 @@ def process_iterated_proxy(
         callback (Optional[Callable[[str, bool, bool], None]]): Optional callback to handle the result.
         debug (bool): Whether to print debug messages (default: False).
         event (Optional[threading.Event]): Event object for cancellation (default: None).
-    """
-    file = f"tmp/ip-ports/{ip}.txt"
+        is_open (Optional[bool]): Port state found by a scan; probed here when None.
 
+    Returns:
+        bool: False if cancelled before the check, so the proxy stays queued.
+    """
     if event and event.is_set():
         log(f"Cancellation requested for {proxy}", end="\n")
-        return  # Exit early if cancellation is requested
+        return False  # Exit early if cancellation is requested
 
-    is_open = is_port_open(proxy)
+    if is_open is None:
+        is_open = is_port_open(proxy)
     is_proxy = False
 
     if debug:
@@ -102,18 +127,7 @@ def process_iterated_proxy(
             )
     if callable(callback):
         callback(proxy, is_open, is_proxy)
-    at_exit_data[ip].append(proxy)
-
-    clone_list = at_exit_data[ip]
-    # Use set for efficient removal
-    clone_set = set(at_exit_data[ip])
-    clone_set.difference_update(clone_list)
-
-    # Update the original list with remaining items
-    at_exit_data[ip] = list(clone_set)
-
-    # remove cloned list string from file
-    remove_string_from_file(file, clone_list, True)
+    return True
 
 
 def iterate_gen_ports(
@@ -121,47 +135,100 @@ def iterate_gen_ports(
     callback: Optional[Callable[[str, bool, bool], None]] = None,
     debug: bool = False,
     event: Optional[threading.Event] = None,
+    batch_size: int = 1000,
+    scan_timeout: float = 5.0,
 ) -> None:
     """
-    Iterates over the generated ports for the given IPs, checking their status
-    in parallel using multithreading.
+    Iterates over the queued ports for the given IPs. Each batch is probed
+    with one asynchronous port scan, and the open ports are checked as proxies
+    in parallel threads. Every checked port is acknowledged in the queue, so
+    an interrupted run resumes where it stopped.
 
     Args:
         proxy (str): The proxy string to generate ports for.
         callback (Optional[Callable[[str, bool, bool], None]]): Optional callback to handle the result.
         debug (bool): Whether to print debug messages (default: False).
-        event (Optional[threading.Event]): Event object for cancellation (default: None).
+        event (Optional[threading.Event]): Event object for cancellation. Defaults to
+            `cancel_event`, which SIGINT and SIGTERM set.
+        batch_size (int): Ports taken from the queue at a time (default: 1000).
+        scan_timeout (float): Connect timeout of the port scan (default: 5.0).
     """
-    global at_exit_data
+    if event is None:
+        event = cancel_event
     ips = extract_ips(proxy)
+    pattern = re.compile(r"^\d{1,3}(\.\d{1,3}){3}:\d+$")
     for ip in ips:
-        if ip not in at_exit_data:
-            at_exit_data[ip] = []
-        file = f"tmp/ip-ports/{ip}.txt"
-        if not os.path.exists(file):
-            log(f"{file} not found", end="\r")
+        queue = get_queue(ip)
+        if not os.path.exists(queue.path):
+            log(f"{queue.path} not found", end="\r")
             return
-        text = read_file(file)
-        lines: List[str] = re.split(r"\r?\n", text) if isinstance(text, str) else []
-        pattern = re.compile(r"^\d{1,3}(\.\d{1,3}){3}:\d+$")
-        filtered_lines = [line for line in lines if pattern.match(line)]
-        random.shuffle(filtered_lines)
-        if debug:
-            log(f"Got {len(filtered_lines)} proxies extracted from {file}", end="\n")
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            futures = []
-            for line_proxy in filtered_lines:
-                futures.append(
-                    executor.submit(
-                        process_iterated_proxy, line_proxy, ip, callback, debug, event
+            while not (event and event.is_set()):
+                items = queue.pop_batch(batch_size)
+                if not items:
+                    break
+                # lines that are not ip:port are never checked
+                queue.ack([item for item in items if not pattern.match(item.value)])
+                filtered_items = [item for item in items if pattern.match(item.value)]
+                if debug:
+                    log(
+                        f"Got {len(filtered_items)} proxies extracted from {queue.path}",
+                        end="\n",
                     )
+
+                by_address: Dict[str, List[QueueItem]] = {}
+                for item in filtered_items:
+                    try:
+                        host, port = parse_target(item.value)
+                    except ValueError:
+                        # port out of range
+                        queue.ack(item)
+                        continue
+                    by_address.setdefault(f"{host}:{port}", []).append(item)
+                futures: Dict[concurrent.futures.Future, List[QueueItem]] = {}
+
+                def on_port(result: PortResult) -> None:
+                    batch = by_address[result.address]
+                    if result.open:
+                        # only open ports wait for a slower proxy check
+                        future = executor.submit(
+                            process_iterated_proxy,
+                            batch[0].value,
+                            ip,
+                            callback,
+                            debug,
+                            event,
+                            True,
+                        )
+                        futures[future] = batch
+                    elif process_iterated_proxy(
+                        batch[0].value, ip, callback, debug, event, False
+                    ):
+                        queue.ack(batch)
+
+                # the whole batch is probed at once, ports known to be alive
+                # first; ports left unprobed on cancellation stay queued
+                scan_ports(
+                    get_latency_tracker().order(by_address),
+                    on_port,
+                    event,
+                    timeout=scan_timeout,
                 )
 
-            # Wait for futures to complete or be cancelled
-            for future in concurrent.futures.as_completed(futures):
-                if event and event.is_set():
-                    break
+                # Wait for futures to complete or be cancelled
+                for future in concurrent.futures.as_completed(futures):
+                    if future.result():
+                        queue.ack(futures[future])
+                    if event and event.is_set():
+                        break
+
+        # the workers are done with this IP: ports left unchecked are popped
+        # again next time, the checked ones are dropped and the reader closed
+        # instead of keeping a file open per IP until exit
+        queue.requeue()
+        queue.compact()
+        queue.close()
 
 
 def proxy_hunter2(
@@ -186,25 +253,36 @@ def proxy_hunter2(
     iterate_gen_ports(data, callback, debug, event)
 
 
-def register_exit(signum=None, frame=None) -> None:
+def register_exit() -> None:
+    """
+    Callback function to clean up at program exit, dropping checked proxies
+    from the queue files.
+    """
+    with queues_lock:
+        for queue in queues.values():
+            queue.compact()
+            queue.close()
+
+
+def request_cancel(signum=None, frame=None) -> None:
     """
-    Callback function to clean up at program exit, removing processed proxies
-    from the files.
+    Signal handler that only asks the workers to stop.
+
+    The queues are compacted by `iterate_gen_ports` once its workers have
+    stopped, and by `register_exit`; compacting here could interrupt a
+    `pop_batch` of the same thread halfway.
 
     Args:
         signum: Signal number (optional).
         frame: Stack frame (optional).
     """
-    global at_exit_data
-    for ip, data in at_exit_data.items():
-        file = f"tmp/ip-ports/{ip}.txt"
-        remove_string_from_file(file, data, True)
+    cancel_event.set()
 
 
 # Register the cleanup function to be called at exit
 atexit.register(register_exit)
-signal.signal(signal.SIGTERM, register_exit)
-signal.signal(signal.SIGINT, register_exit)  # To handle Ctrl+C
+signal.signal(signal.SIGTERM, request_cancel)
+signal.signal(signal.SIGINT, request_cancel)  # To handle Ctrl+C
 
 
 if __name__ == "__main__":
@@ -1,5 +1,9 @@
 from .ansi import contains_ansi_codes, remove_ansi, remove_non_ascii
+from .bloom_filter import BloomFilter
 from .file import (
+    DiskStringSet,
+    QueueItem,
+    WorkQueue,
     copy_file,
     copy_folder,
     count_lines_in_file,
@@ -13,12 +17,14 @@ from .file import (
     is_directory_created_days_ago_or_more,
     is_file_larger_than_kb,
     list_files_in_directory,
+    list_text_files,
     load_tuple_from_file,
     move_string_between,
     read_all_text_files,
     read_file,
     remove_duplicate_line_from_file,
     remove_string_from_file,
+    remove_strings_from_file,
     remove_trailing_hyphens,
     resolve_folder,
     resolve_parent_folder,
@@ -46,6 +52,7 @@ from .index_utils import (
     is_class_has_parameter,
     is_valid_ip,
     is_valid_ip_connection,
+    is_valid_ipv4,
     is_valid_proxy,
     is_valid_url,
     is_valid_hostname,
@@ -0,0 +1,63 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set for de-duplicating very large streams.
+
+    Memory is allocated once from `capacity` and `error_rate`; membership tests
+    never give false negatives, and give false positives with roughly
+    `error_rate` probability while fewer than `capacity` keys were added.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        """
+        Args:
+            capacity (int): Expected number of distinct keys.
+            error_rate (float): Acceptable false positive rate at `capacity`.
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        # Double hashing: k positions from two independent 64-bit halves
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> bool:
+        """
+        Add `key` to the filter.
+
+        Returns:
+            bool: True if `key` was not (probably) present before.
+        """
+        bits = self.bits
+        added = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def __len__(self) -> int:
+        """Approximate number of distinct keys added."""
+        return self.count
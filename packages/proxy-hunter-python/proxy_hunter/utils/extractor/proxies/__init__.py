@@ -1,2 +1,6 @@
-from .extract_proxies import extract_proxies
-from .extract_proxies_from_file import extract_proxies_from_file
+from .extract_proxies import extract_proxies, iter_extract_proxies
+from .extract_proxies_from_file import (
+    extract_proxies_from_file,
+    iter_file_chunks,
+    iter_proxies_from_files,
+)
@@ -1,18 +1,168 @@
+import heapq
 import re
-from typing import List, Optional
-from urllib.parse import urlparse
-from .regex_match import regex_match
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from .regex_match import REGEX, match_parts
 from proxy_hunter.Proxy import Proxy
-from proxy_hunter.utils import is_valid_ip, is_valid_proxy
+from proxy_hunter.utils import is_valid_ip, is_valid_ipv4, is_valid_proxy
+
+# Bracketed IPv6 or IPv4 followed by a port (1-5 digits, including leading zeros)
+# inside a noisy `regex_match` hit like 'XSDn209.1.2.3:80'
+INNER_PATTERN = re.compile(
+    r"(\[[0-9a-fA-F:]+\]|(?:\d{1,3}(?:\.\d{1,3}){3}))[:\s]*(\d{1,5})"
+)
+# IP PORT separated by whitespace - supports bracketed IPv6
+WHITESPACE_PATTERN = re.compile(
+    r"(\[[0-9a-fA-F:]+\]|(?:\d{1,3}(?:\.\d{1,3}){3}))\s+((?!0)\d{2,5})"
+)
+# "ip":"x.x.x.x" or IPv6 followed by "port":"xxxxx" (json)
+JSON_PATTERN = re.compile(r'"ip"\s*:\s*"([^\"]+)"\s*,\s*"port"\s*:\s*"((?!0)\d{2,5})"')
+JSON_USER = re.compile(r'"user"\s*:\s*"([^\"]+)"')
+JSON_PASS = re.compile(r'"pass"\s*:\s*"([^\"]+)"')
+# Whitespace-free tokens containing ':' and two digits. Matches of `REGEX`
+# never contain whitespace and always contain ':\d\d', so running it on these
+# tokens finds exactly what it finds on the whole input while skipping the
+# prose in between.
+TOKEN_PATTERN = re.compile(r"(?<!\S)\S*:\d\d\S*")
+
+# Which of the legacy passes produced a proxy; `extract_proxies` keeps their order
+_REGEX_MATCH, _WHITESPACE, _JSON = 0, 1, 2
+
+# (pass, host:port, username, password)
+_Candidate = Tuple[int, str, Optional[str], Optional[str]]
+
+
+def _strip_log_prefix(ip: str) -> str:
+    # Strip leading 'n' if present in logs (e.g. 'n1.2.3.4' or 'n[2001:db8::1]')
+    if ip and ip.startswith("n") and len(ip) > 1 and (ip[1].isdigit() or ip[1] == "["):
+        return ip[1:]
+    return ip
+
+
+@lru_cache(maxsize=65536)
+def _clean_match(proxy_val: str) -> Optional[str]:
+    """
+    Return the clean `host:port` of a `regex_match` hit, or None when invalid.
+
+    Logs repeat the same hosts over and over, hence the cache.
+    """
+    # Extract a clean host:port from noisy matched strings. Many logs
+    # contain prefixed/trailing characters like 'XSDn209.1.2.3:80' or
+    # "1.1.1.1:80n". Try to find the first IPv4/IPv6 + port pair.
+    m = INNER_PATTERN.search(proxy_val)
+    if m:
+        host, port = m.groups()
+        # Normalize port by removing leading zeros
+        port = str(int(port)) if port != "0" else port
+        if host.startswith("["):
+            valid = is_valid_proxy(f"{host}:{port}")
+        else:
+            # Remove leading zeros from IPv4 octets
+            host = ".".join(str(int(octet)) for octet in host.split("."))
+            valid = is_valid_ipv4(host) and 1 <= int(port) <= 65535
+        return f"{host}:{port}" if valid else None
+
+    # Fallbacks:
+    # 1) If the original proxy_val already looks like a valid proxy (hostname:port), keep it.
+    if is_valid_proxy(proxy_val):
+        return proxy_val
+
+    # 2) Otherwise try simple leading 'n' sanitization (e.g. 'n1.2.3.4')
+    sanitized = _strip_log_prefix(proxy_val)
+    if sanitized is not proxy_val and is_valid_proxy(sanitized):
+        return sanitized
+    return None
+
+
+@lru_cache(maxsize=65536)
+def _clean_ip_port(ip: str, port: str) -> Optional[str]:
+    """Return `ip:port` of a whitespace/json hit, or None when invalid."""
+    ip = _strip_log_prefix(ip)
+    if is_valid_ipv4(ip):
+        valid = 1 <= int(port) <= 65535
+    else:
+        valid = is_valid_ip(ip) and is_valid_proxy(f"{ip}:{port}")
+    return f"{ip}:{port}" if valid else None
+
+
+def _scan_regex_match(string: str) -> Iterator[Tuple[int, _Candidate]]:
+    for token in TOKEN_PATTERN.finditer(string):
+        offset = token.start()
+        for match in REGEX.finditer(token.group()):
+            parts = match_parts(match)
+            if parts is None:
+                continue
+            proxy = _clean_match(parts[0].strip())
+            if proxy is not None:
+                yield offset + match.start(), (_REGEX_MATCH, proxy, parts[1], parts[2])
+
+
+def _scan_whitespace(string: str) -> Iterator[Tuple[int, _Candidate]]:
+    for match in WHITESPACE_PATTERN.finditer(string):
+        proxy = _clean_ip_port(*match.groups())
+        if proxy is not None:
+            yield match.start(), (_WHITESPACE, proxy, None, None)
+
+
+def _scan_json(string: str) -> Iterator[Tuple[int, _Candidate]]:
+    credentials = None
+    for match in JSON_PATTERN.finditer(string):
+        proxy = _clean_ip_port(*match.groups())
+        if proxy is None:
+            continue
+        # Try to extract username/password from surrounding JSON if present,
+        # the first pair in the input applies to every entry
+        if credentials is None:
+            user_m = JSON_USER.search(string)
+            pass_m = JSON_PASS.search(string)
+            if user_m and pass_m:
+                credentials = (user_m.group(1), pass_m.group(1))
+            else:
+                credentials = (None, None)
+        yield match.start(), (_JSON, proxy, credentials[0], credentials[1])
+
+
+_SCANNERS = (_scan_regex_match, _scan_whitespace, _scan_json)
+
+
+def iter_extract_proxies(string: Optional[str]) -> Iterator[Proxy]:
+    """
+    Lazily yield the unique proxies of `string` in the order they appear.
+
+    Finds the same proxies as `extract_proxies` without building the whole
+    result list first, so large inputs can be consumed as results arrive.
+
+    Args:
+        string (Optional[str]): The input string containing IP:PORT pairs.
+
+    Yields:
+        Proxy: Each distinct proxy (with its credentials) once.
+    """
+    if not string or not string.strip():
+        return
+    # Distinct by proxy+username+password so different credentials for the
+    # same host:port are preserved as distinct proxies.
+    seen = set()
+    # Each format is matched by its own compiled pattern; merging the passes on
+    # match position keeps the results in input order.
+    candidates = heapq.merge(*(scan(string) for scan in _SCANNERS))
+    for _, (_, proxy, username, password) in candidates:
+        key = (proxy, username or "", password or "")
+        if key not in seen:
+            seen.add(key)
+            yield Proxy(proxy=proxy, username=username, password=password)
 
 
 def extract_proxies(string: Optional[str]) -> List[Proxy]:
     """
     Extracts IP:PORT pairs from a string, along with optional username and password.
 
+    Supported formats are user:pass@host:port, host:port@user:pass, host:port
+    (also inside noisy log lines), "IP PORT" separated by whitespace and json
+    objects with "ip"/"port" (plus "user"/"pass") fields.
+
     Args:
         string (Optional[str]): The input string containing IP:PORT pairs.
-        write_database (Optional[bool]): Optional flag to determine if the results should be written to the database.
 
     Returns:
         List[Proxy]: A list containing the extracted IP:PORT pairs along with username and password if present.
@@ -20,126 +170,17 @@ def extract_proxies(string: Optional[str]) -> List[Proxy]:
     if not string or not string.strip():
         return []
 
-    results: List[Proxy] = []
-
-    # Use the regex_match helper (covers user:pass@host:port, host:port@user:pass, host:port)
-    regex_match_results = regex_match(string)
-    for p in regex_match_results:
-        # Extract a clean host:port from noisy matched strings. Many logs
-        # contain prefixed/trailing characters like 'XSDn209.1.2.3:80' or
-        # "1.1.1.1:80n". Try to find the first IPv4/IPv6 + port pair and
-        # preserve credentials from the original match.
-        proxy_val = str(getattr(p, "proxy", "") or "").strip()
-        # Pattern matches bracketed IPv6 or IPv4 followed by a port (allow 1-5 digits, including leading zeros)
-        inner_pattern = (
-            r"(\[[0-9a-fA-F:]+\]|(?:\d{1,3}(?:\.\d{1,3}){3}))[:\s]*(\d{1,5})"
-        )
-        m = re.search(inner_pattern, proxy_val)
-        if m:
-            host = m.group(1)
-            port = m.group(2)
-            # Normalize port by removing leading zeros
-            port = str(int(port)) if port and port != "0" else port
-            # Normalize IP if it's IPv4 (not bracketed IPv6)
-            if not host.startswith("["):
-                try:
-                    # Remove leading zeros from IPv4 octets
-                    octets = host.split(".")
-                    host = ".".join(str(int(octet)) for octet in octets)
-                except (ValueError, AttributeError):
-                    pass
-            clean_proxy = f"{host}:{port}"
-            candidate = Proxy(
-                proxy=clean_proxy, username=p.username, password=p.password
-            )
-            if is_valid_proxy(candidate.proxy):
-                results.append(candidate)
-            continue
-
-        # Fallbacks:
-        # 1) If the original proxy_val already looks like a valid proxy (hostname:port), keep it.
-        if is_valid_proxy(proxy_val):
-            results.append(
-                Proxy(proxy=proxy_val, username=p.username, password=p.password)
-            )
-            continue
-
-        # 2) Otherwise try simple leading 'n' sanitization (e.g. 'n1.2.3.4')
-        if (
-            proxy_val.startswith("n")
-            and len(proxy_val) > 1
-            and (proxy_val[1].isdigit() or proxy_val[1] == "[")
-        ):
-            proxy_val = proxy_val[1:]
-            sanitized = Proxy(proxy=proxy_val, username=p.username, password=p.password)
-            if is_valid_proxy(sanitized.proxy):
-                results.append(sanitized)
-
-    # Perform the matching IP PORT (whitespaces) - support bracketed IPv6
-    re_whitespace = r"(\[[0-9a-fA-F:]+\]|(?:\d{1,3}(?:\.\d{1,3}){3}))\s+((?!0)\d{2,5})"
-    matches2 = re.findall(re_whitespace, string)
-
-    # Perform the matching IP PORT (json) to match "ip":"x.x.x.x" or IPv6 and "port":"xxxxx"
-    pattern_json = r'"ip"\s*:\s*"([^\"]+)"\s*,\s*"port"\s*:\s*"((?!0)\d{2,5})"'
-    matches3 = re.findall(pattern_json, string)
-
-    # Process whitespace matches (tuples of (ip, port))
-    for ip, port in matches2:
-        # Strip leading 'n' if present in logs (e.g. 'n1.2.3.4' or 'n[2001:db8::1]')
-        if (
-            ip
-            and ip.startswith("n")
-            and len(ip) > 1
-            and (ip[1].isdigit() or ip[1] == "[")
-        ):
-            ip = ip[1:]
-        if is_valid_ip(ip):
-            proxy = f"{ip}:{port}"
-            if is_valid_proxy(proxy):
-                results.append(Proxy(proxy))
-
-    # Process JSON matches (tuples of (ip, port))
-    for ip, port in matches3:
-        # Strip leading 'n' if present in logs
-        if (
-            ip
-            and ip.startswith("n")
-            and len(ip) > 1
-            and (ip[1].isdigit() or ip[1] == "[")
-        ):
-            ip = ip[1:]
-        if is_valid_ip(ip):
-            proxy = f"{ip}:{port}"
-            if is_valid_proxy(proxy):
-                # Try to extract username/password from surrounding JSON if present
-                user_m = re.search(r'"user"\s*:\s*"([^\"]+)"', string)
-                pass_m = re.search(r'"pass"\s*:\s*"([^\"]+)"', string)
-                if user_m and pass_m:
-                    username = user_m.group(1)
-                    password = pass_m.group(1)
-                    results.append(
-                        Proxy(proxy=proxy, username=username, password=password)
-                    )
-                else:
-                    results.append(Proxy(proxy))
-
-    # (regex_match already processed above)
-
-    # Unique list of proxy
+    # Results are grouped per format (host:port matches, then whitespace, then
+    # json) as the list has always been ordered that way
     # Use a dictionary keyed by proxy+username+password so different credentials
     # for the same host:port are preserved as distinct proxies.
-    unique_proxies = {}
-
-    for p in results:
-        key = f"{p.proxy}|{p.username or ''}|{p.password or ''}"
-        if key in unique_proxies:
-            # If an exact same proxy+credentials exists, prefer the one with credentials
-            if p.has_credentials():
-                unique_proxies[key] = p
-        else:
-            unique_proxies[key] = p
-
-    # Get a list of unique Proxy objects (distinct by proxy+credentials)
-    unique_proxy_list = list(unique_proxies.values())
-
-    return unique_proxy_list
+    unique_proxies: Dict[Tuple[str, str, str], Proxy] = {}
+    for scan in _SCANNERS:
+        for _, (_, proxy, username, password) in scan(string):
+            key = (proxy, username or "", password or "")
+            if key not in unique_proxies:
+                unique_proxies[key] = Proxy(
+                    proxy=proxy, username=username, password=password
+                )
+
+    return list(unique_proxies.values())
@@ -1,6 +1,22 @@
-from typing import List
+import itertools
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Tuple, Union
 from proxy_hunter.Proxy import Proxy
-from .extract_proxies import extract_proxies
+from proxy_hunter.utils.bloom_filter import BloomFilter
+from .extract_proxies import extract_proxies, iter_extract_proxies
+
+# Characters read per chunk; text files are cut on the last line break
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+# Tail of each chunk re-scanned at the start of the next one, so matches that
+# may span a line break ("IP\nPORT", pretty-printed json) are not lost
+DEFAULT_OVERLAP = 4096
+
+_WHITESPACE = re.compile(r"\s")
+_LAST_WHITESPACE = re.compile(r"\s(?=\S*\Z)")
 
 
 def extract_proxies_from_file(filename: str) -> List[Proxy]:
@@ -22,3 +38,139 @@ def extract_proxies_from_file(filename: str) -> List[Proxy]:
         print(f"fail open {filename} {str(e)}")
         pass
     return proxies
+
+
+def iter_file_chunks(
+    filename: Union[str, Path],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+) -> Iterator[str]:
+    """
+    Read a text file in chunks cut on line breaks.
+
+    Each chunk after the first starts with up to `overlap` characters of the
+    previous one (from a whitespace boundary), so a proxy split over the cut
+    is found whole in the next chunk. Proxies inside the overlap are seen
+    twice; de-duplicate downstream.
+
+    Args:
+        filename (Union[str, Path]): The path to the file.
+        chunk_size (int): Approximate number of characters per chunk.
+        overlap (int): Characters carried over from the previous chunk.
+
+    Yields:
+        str: Consecutive chunks of the file.
+    """
+    chunk_size = max(1, int(chunk_size))
+    with open(filename, "r", encoding="utf-8", errors="ignore") as file:
+        carry = ""
+        pending = ""
+        while True:
+            data = file.read(chunk_size)
+            eof = not data
+            buffer = pending + data
+            if eof:
+                cut = len(buffer)
+            else:
+                # Cut after the last line break, or the last whitespace of a
+                # huge single line; never inside a token
+                cut = buffer.rfind("\n") + 1
+                if not cut:
+                    match = _LAST_WHITESPACE.search(buffer)
+                    cut = match.end() if match else 0
+                if not cut:
+                    if len(buffer) < chunk_size * 4:
+                        pending = buffer
+                        continue
+                    cut = len(buffer)
+            chunk, pending = buffer[:cut], buffer[cut:]
+            if chunk.strip():
+                yield carry + chunk
+                if overlap > 0:
+                    match = _WHITESPACE.search(chunk, max(0, len(chunk) - overlap))
+                    carry = chunk[match.end() :] if match else ""
+            if eof:
+                return
+
+
+def _extract_chunk(chunk: str) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    # Runs in pool workers: plain tuples pickle much cheaper than Proxy objects
+    return [(p.proxy, p.username, p.password) for p in iter_extract_proxies(chunk)]
+
+
+def _iter_chunks(
+    paths: Iterable[Union[str, Path]], chunk_size: int, overlap: int
+) -> Iterator[str]:
+    for path in paths:
+        try:
+            yield from iter_file_chunks(path, chunk_size, overlap)
+        except OSError as e:
+            print(f"fail open {path} {str(e)}")
+
+
+def iter_proxies_from_files(
+    paths: Iterable[Union[str, Path]],
+    workers: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    seen: Optional[Union[BloomFilter, Set[str]]] = None,
+) -> Iterator[Proxy]:
+    """
+    Stream the unique proxies found in `paths` without loading whole files.
+
+    Files are read chunk by chunk (see `iter_file_chunks`). With `workers` > 1
+    chunks are extracted by a process pool, keeping at most two chunks per
+    worker in flight so memory stays bounded however large the files are.
+
+    Args:
+        paths (Iterable[Union[str, Path]]): Text files to scan, in order.
+        workers (int): Extraction processes; 0 or 1 extracts in this process.
+        chunk_size (int): Approximate number of characters per chunk.
+        overlap (int): Characters re-scanned across chunk boundaries.
+        seen (Optional[Union[BloomFilter, Set[str]]]): Filter of already yielded proxies. Pass
+            the same filter to several calls to de-duplicate across them. A new
+            `set` (exact, unbounded) is used by default; a `BloomFilter` bounds
+            memory but drops the rare proxy it mistakes for a seen one.
+
+    Yields:
+        Proxy: Each distinct proxy (with its credentials) once.
+    """
+    if seen is None:
+        seen = set()
+    chunks = _iter_chunks(paths, chunk_size, overlap)
+
+    if workers > 1:
+        results = _iter_pooled(chunks, workers)
+    else:
+        results = map(_extract_chunk, chunks)
+
+    for found in results:
+        for proxy, username, password in found:
+            key = f"{proxy}|{username or ''}|{password or ''}"
+            if key in seen:
+                continue
+            seen.add(key)
+            yield Proxy(proxy=proxy, username=username, password=password)
+
+
+def _iter_pooled(
+    chunks: Iterator[str], workers: int
+) -> Iterator[List[Tuple[str, Optional[str], Optional[str]]]]:
+    """Extract chunks on a process pool, yielding results in chunk order."""
+    first = next(chunks, None)
+    if first is None:
+        return
+    second = next(chunks, None)
+    if second is None:
+        # Not worth starting processes for a single chunk
+        yield _extract_chunk(first)
+        return
+    # Executor.map would submit (and read) every chunk up front
+    with ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1)) as pool:
+        in_flight = deque()
+        for chunk in itertools.chain((first, second), chunks):
+            in_flight.append(pool.submit(_extract_chunk, chunk))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
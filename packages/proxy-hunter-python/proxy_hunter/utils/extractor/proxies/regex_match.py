@@ -1,28 +1,41 @@
 import re
-from typing import List
+from typing import List, Optional, Tuple
 from proxy_hunter.Proxy import Proxy
 
 regex = r"(?P<user_pass_host>(?P<username1>[a-zA-Z0-9!$%&*()_+=.-]+):(?P<password1>[a-zA-Z0-9!$%&*()_+=.-]+)@(?P<host1>\d{1,3}(?:\.\d{1,3}){3}|[\w.-]+|\[[0-9a-fA-F:]+\]):(?P<port1>\d{2,5}))|(?P<host_user_pass>(?P<host2>\d{1,3}(?:\.\d{1,3}){3}|[\w.-]+|\[[0-9a-fA-F:]+\]):(?P<port2>\d{2,5})@(?P<username2>[a-zA-Z0-9!$%&*()_+=.-]+):(?P<password2>[a-zA-Z0-9!$%&*()_+=.-]+))|(?P<host_only>(?P<host3>\d{1,3}(?:\.\d{1,3}){3}|[\w.-]+|\[[0-9a-fA-F:]+\]):(?P<port3>\d{2,5}))"
 
 
+REGEX = re.compile(regex, re.MULTILINE)
+
+
+def match_parts(match: re.Match) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+    """Return `(host:port, username, password)` for a match of `REGEX`."""
+    # The outer group of the matching alternative is the last one to close
+    kind = match.lastgroup
+    if kind == "user_pass_host":
+        host, port, username, password = match.group(
+            "host1", "port1", "username1", "password1"
+        )
+    elif kind == "host_user_pass":
+        host, port, username, password = match.group(
+            "host2", "port2", "username2", "password2"
+        )
+    elif kind == "host_only":
+        host, port = match.group("host3", "port3")
+        username = password = None
+    else:
+        return None
+    return f"{host}:{port}", username, password
+
+
 def regex_match(test_str: str) -> List[Proxy]:
-    matches = re.finditer(regex, test_str, re.MULTILINE)
     results = []
 
-    for match in matches:
-        if match.group("user_pass_host"):
-            username = match.group("username1")
-            password = match.group("password1")
-            proxy = f"{match.group('host1')}:{match.group('port1')}"
-        elif match.group("host_user_pass"):
-            username = match.group("username2")
-            password = match.group("password2")
-            proxy = f"{match.group('host2')}:{match.group('port2')}"
-        elif match.group("host_only"):
-            username = password = None
-            proxy = f"{match.group('host3')}:{match.group('port3')}"
-        else:
+    for match in REGEX.finditer(test_str):
+        parts = match_parts(match)
+        if parts is None:
             continue
+        proxy, username, password = parts
         results.append(Proxy(proxy=proxy, username=username, password=password))
     return results
 
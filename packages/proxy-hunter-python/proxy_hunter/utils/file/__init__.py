@@ -9,6 +9,7 @@ from .others import (
     file_move_lines,
     file_remove_empty_lines,
     read_all_text_files,
+    list_text_files,
     serialize,
     truncate_file_content,
     remove_string_from_file,
@@ -17,6 +18,7 @@ from .others import (
     move_string_between,
     sanitize_filename,
 )
+from .remove_strings import DiskStringSet, remove_strings_from_file
 from .size import count_lines_in_file, size_of_list_in_mb, is_file_larger_than_kb
 from .folder import (
     resolve_folder,
@@ -27,5 +29,6 @@ from .folder import (
     join_path,
 )
 from .permissions import fix_permissions
+from .work_queue import QueueItem, WorkQueue
 from .writer import write_file, write_json, append_file
 from .path import realpath
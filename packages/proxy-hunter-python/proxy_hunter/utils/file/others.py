@@ -1,10 +1,10 @@
 import hashlib
+import itertools
 import os
 import pickle
 import random
 import re
 import shutil
-import string
 import tempfile
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
@@ -15,6 +15,7 @@ from filelock import Timeout as FilelockTimeout
 from ..ansi import remove_ansi, remove_non_ascii
 from ..md5 import md5
 from .folder import resolve_parent_folder
+from .remove_strings import remove_strings_from_file
 from .writer import write_file
 
 
@@ -193,6 +194,21 @@ def read_all_text_files(directory: str) -> Dict[str, str]:
     return text_files_content
 
 
+def list_text_files(directory: str) -> List[str]:
+    """
+    List the text files in directory without reading them
+
+    Same selection as `read_all_text_files`, for streaming consumers such as
+    `iter_proxies_from_files`.
+    """
+    os.makedirs(directory, 777, exist_ok=True)
+    return [
+        os.path.join(directory, filename)
+        for filename in sorted(os.listdir(directory))
+        if filename.endswith(".txt")
+    ]
+
+
 def get_random_file(
     dir: Union[str, Path],
     recursive: bool = False,
@@ -231,6 +247,9 @@ def get_random_file(
 
 def serialize(obj):
     """Serialize an object to a dictionary."""
+    # slotted records such as `Proxy` keep their fields outside `__dict__`
+    if callable(getattr(obj, "to_dict", None)):
+        return obj.to_dict()
     if hasattr(obj, "__dict__"):
         return obj.__dict__
     elif isinstance(obj, (int, float, str, bool, type(None))):
@@ -252,14 +271,21 @@ def file_move_lines(source_file: str, destination_file: str, n: int) -> None:
     Returns:
     - None
     """
-    with open(source_file, "r+", encoding="utf-8") as source:
-        lines = source.readlines()
-
-    with open(destination_file, "a+", encoding="utf-8") as destination:
-        destination.writelines(lines[:n])
-
-    with open(source_file, "w+", encoding="utf-8") as source:
-        source.writelines(lines[n:])
+    # Streams the rest of the file; only the moved lines are held in memory
+    with open(source_file, "r", encoding="utf-8") as source:
+        moved = list(itertools.islice(source, max(n, 0)))
+        if not moved:
+            return
+        with open(destination_file, "a+", encoding="utf-8") as destination:
+            destination.writelines(moved)
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(source_file)}.",
+            dir=os.path.dirname(os.path.abspath(source_file)),
+        )
+        with os.fdopen(fd, "w", encoding="utf-8") as temp:
+            shutil.copyfileobj(source, temp)
+    shutil.copymode(source_file, temp_path)
+    os.replace(temp_path, source_file)
 
 
 # list_files_in_directory moved to .folder
@@ -279,6 +305,9 @@ def remove_string_from_file(
     """
     Removes all occurrences of specified strings from a file.
 
+    Lines are checked against a set in a single pass, see
+    `remove_strings_from_file`, so any number of strings can be removed at once.
+
     Args:
         file_path (str): The path to the file.
         strings_to_remove (Union[str, List[str], Set[str]]): The string, list of strings, or set of strings to be removed from the file.
@@ -291,44 +320,18 @@ def remove_string_from_file(
     if not os.path.exists(file_path):
         return
 
-    # Ensure strings_to_remove is a list
-    if isinstance(strings_to_remove, str):
-        strings_to_remove = [strings_to_remove]
-    elif isinstance(strings_to_remove, set):
-        strings_to_remove = list(strings_to_remove)
-
-    # Escape strings and create regex pattern
-    escaped_strings = [re.escape(s) for s in strings_to_remove[:1000]]
-    pattern = "|".join(escaped_strings)
-    if exact_matches:
-        pattern = f"^({pattern})$"
-    regex = re.compile(pattern)
-
-    # Create a temporary file
-    random_string = "".join(random.choice(string.ascii_letters) for _ in range(5))
-    temp_file_path = f"tmp/runners/{random_string}.txt"
-    os.makedirs(os.path.dirname(temp_file_path), exist_ok=True)
-
     # Define a lock file path
     id_file_lock = hashlib.md5(file_path.encode("utf-8")).hexdigest()
     lock_file_path = f"tmp/runners/{id_file_lock}.lock"
+    os.makedirs(os.path.dirname(lock_file_path), exist_ok=True)
     lock = FileLock(lock_file_path)
 
     try:
         # Attempt to acquire the lock with a timeout
         with lock.acquire(timeout=10):  # Timeout after 10 seconds
-            # Open the original file and the temporary file
-            with (
-                open(file_path, "r", encoding="utf-8") as file,
-                open(temp_file_path, "w", encoding="utf-8") as temp_file,
-            ):
-                for line in file:
-                    # Replace all occurrences of the pattern with an empty string
-                    modified_line = regex.sub("", line)
-                    temp_file.write(modified_line)
-
-            # Replace the original file with the temporary file
-            shutil.move(temp_file_path, file_path)
+            remove_strings_from_file(
+                file_path, strings_to_remove, exact_matches=exact_matches
+            )
     except FilelockTimeout:
         print(f"Could not acquire lock for {file_path}. The operation is skipped.")
 
@@ -0,0 +1,272 @@
+import io
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+from typing import Container, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# Letters and digits: one at the edge of a string to remove must not run on
+# into another one, so '1.2.3.4:80' stays in '1.2.3.4:8080'
+_WORD = "0-9A-Za-z"
+_WORD_CHAR = re.compile(f"[{_WORD}]")
+# Zero-width positions where a string to remove may start: after a non-word
+# character (or the line start), or before one for strings starting with it
+_BOUNDARY = re.compile(f"(?<![{_WORD}])|(?![{_WORD}])")
+_TOKEN = re.compile(r"\S+")
+# Longest prefix used to look up candidate lengths
+_MAX_PREFIX = 8
+
+
+class DiskStringSet:
+    """
+    Sorted on-disk string set (an SQLite B-tree) for removal lists too large to
+    keep in memory.
+
+    Example:
+        with DiskStringSet("tmp/processed.sqlite") as processed:
+            processed.update(proxies)
+            remove_strings_from_file("proxies.txt", processed)
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS strings (value TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+
+    def update(self, strings: Iterable[str], chunk_size: int = 10000) -> None:
+        """Add `strings`, inserting `chunk_size` per transaction."""
+        chunk: List[tuple] = []
+        for value in strings:
+            chunk.append((value,))
+            if len(chunk) >= chunk_size:
+                self._insert(chunk)
+                chunk = []
+        if chunk:
+            self._insert(chunk)
+
+    def _insert(self, chunk: List[tuple]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO strings (value) VALUES (?)", chunk
+            )
+
+    def __contains__(self, value: object) -> bool:
+        return (
+            self.conn.execute(
+                "SELECT 1 FROM strings WHERE value = ?", (value,)
+            ).fetchone()
+            is not None
+        )
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM strings").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "DiskStringSet":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+class _Matcher:
+    """Finds the strings to remove in a line with a few hash lookups."""
+
+    def __init__(self, strings: Union[Iterable[str], Container[str]]):
+        self.lookup: Container[str]
+        # prefix -> lengths (longest first) of the strings starting with it
+        self.prefixes: Optional[Dict[str, List[int]]] = None
+        # strings spanning whitespace are rare; replaced in every line as before
+        self.spaced: List[str] = []
+        self.spaced_lookup: Set[str] = set()
+        # and those spanning lines are replaced over the whole text
+        self.multiline: List[str] = []
+        if isinstance(strings, (str, list, tuple, set, frozenset)) or not hasattr(
+            strings, "__contains__"
+        ):
+            if isinstance(strings, str):
+                strings = [strings]
+            values: Set[str] = {str(s) for s in strings if s}
+            self.spaced = [s for s in values if _TOKEN.fullmatch(s) is None]
+            self.spaced_lookup = set(self.spaced)
+            self.multiline = [s for s in self.spaced if "\n" in s]
+            self.spaced = [s for s in self.spaced if "\n" not in s]
+            self.lookup = values.difference(self.spaced_lookup)
+            self.prefix_size = min(
+                [len(s) for s in self.lookup] + [_MAX_PREFIX], default=_MAX_PREFIX
+            )
+            prefixes: Dict[str, Set[int]] = {}
+            for s in self.lookup:
+                prefixes.setdefault(s[: self.prefix_size], set()).add(len(s))
+            self.prefixes = {
+                prefix: sorted(lengths, reverse=True)
+                for prefix, lengths in prefixes.items()
+            }
+        else:
+            # e.g. a DiskStringSet: membership only, whole lines/tokens match
+            self.lookup = strings
+
+    def remove_exact(self, body: str) -> int:
+        return 1 if body in self.lookup or body in self.spaced_lookup else 0
+
+    def remove_multiline(self, text: str) -> Tuple[str, int]:
+        """Remove every occurrence of the strings spanning lines from `text`."""
+        removed = 0
+        for s in self.multiline:
+            count = text.count(s)
+            if count:
+                text = text.replace(s, "")
+                removed += count
+        return text, removed
+
+    def remove_within(self, body: str) -> Tuple[str, int]:
+        """
+        Remove occurrences left to right. A letter or digit at either edge of
+        an occurrence must not run on into another one.
+        """
+        if body in self.lookup:
+            return "", 1
+        removed = 0
+        pieces: List[str] = []
+        last = 0
+        if self.prefixes is None:
+            for token in _TOKEN.finditer(body):
+                if token.group() in self.lookup:
+                    pieces.append(body[last : token.start()])
+                    last = token.end()
+                    removed += 1
+        elif self.prefixes:
+            prefixes = self.prefixes
+            prefix_size = self.prefix_size
+            word_char = _WORD_CHAR.match
+            size = len(body)
+            for boundary in _BOUNDARY.finditer(body):
+                start = boundary.start()
+                if start < last:
+                    continue
+                lengths = prefixes.get(body[start : start + prefix_size])
+                if not lengths:
+                    continue
+                for length in lengths:
+                    end = start + length
+                    # must also end on a boundary: '1.2.3.4:80' stays in '1.2.3.4:8080'
+                    if end < size and word_char(body, end) and word_char(body, end - 1):
+                        continue
+                    if body[start:end] in self.lookup:
+                        pieces.append(body[last:start])
+                        last = end
+                        removed += 1
+                        break
+        if removed:
+            pieces.append(body[last:])
+            body = "".join(pieces)
+        for s in self.spaced:
+            count = body.count(s)
+            if count:
+                body = body.replace(s, "")
+                removed += count
+        return body, removed
+
+
+def remove_strings_from_file(
+    file_path: Union[str, Path],
+    strings: Union[str, Iterable[str], Container[str]],
+    exact_matches: bool = False,
+    clear_trailing_empty_lines: bool = False,
+) -> Dict[str, int]:
+    """
+    Remove strings from a file in one streaming pass.
+
+    Each line is matched against a set, so the cost is linear in the file size
+    whatever the number of strings. The result is written to a temporary file
+    next to `file_path` and moved over it atomically.
+
+    Args:
+        file_path (Union[str, Path]): The file to rewrite.
+        strings (Union[str, Iterable[str], Container[str]]): A string, an
+            iterable of strings, or a container such as `DiskStringSet` for
+            very large lists (containers only match whole lines or
+            whitespace-separated tokens).
+        exact_matches (bool): Only empty lines equal to one of the strings.
+            Otherwise every occurrence is removed, except where a letter or
+            digit at its edge runs on into another one, e.g. '1.2.3.4:80' in
+            '1.2.3.4:8080'. Strings spanning lines are replaced over the whole
+            text, which is then read into memory.
+        clear_trailing_empty_lines (bool): Drop blank lines at the end of the
+            file and end it with a single newline.
+
+    Returns:
+        Dict[str, int]: ``lines`` read, ``changed`` lines and ``removed``
+        occurrences.
+    """
+    file_path = Path(file_path)
+    matcher = _Matcher(strings)
+    counts = {"lines": 0, "changed": 0, "removed": 0}
+    trailing_dropped = False
+
+    fd, temp_path = tempfile.mkstemp(
+        prefix=f".{file_path.name}.", suffix=".tmp", dir=str(file_path.parent)
+    )
+    try:
+        with (
+            open(file_path, "r", encoding="utf-8") as source,
+            os.fdopen(fd, "w", encoding="utf-8") as target,
+        ):
+            blank_lines: List[str] = []
+            last_line = ""
+            lines: Iterable[str] = source
+            if matcher.multiline and not exact_matches:
+                text = source.read()
+                lines_read = len(text.splitlines())
+                text, removed = matcher.remove_multiline(text)
+                counts["removed"] += removed
+                # each occurrence counts as one changed line
+                counts["changed"] += removed
+                lines = io.StringIO(text)
+                # the loop below counts the lines left after the removal
+                counts["lines"] = lines_read - len(text.splitlines())
+            for line in lines:
+                counts["lines"] += 1
+                if line.endswith("\n"):
+                    body, newline = line[:-1], "\n"
+                else:
+                    body, newline = line, ""
+                if exact_matches:
+                    removed = matcher.remove_exact(body)
+                    if removed:
+                        body = ""
+                else:
+                    body, removed = matcher.remove_within(body)
+                if removed:
+                    counts["changed"] += 1
+                    counts["removed"] += removed
+                line = body + newline
+
+                if clear_trailing_empty_lines:
+                    # held back until a non-blank line shows they are not trailing
+                    if not line.strip():
+                        blank_lines.append(line)
+                        continue
+                    target.writelines(blank_lines)
+                    blank_lines = []
+                target.write(line)
+                last_line = line
+
+            if clear_trailing_empty_lines:
+                trailing_dropped = bool(blank_lines)
+                if last_line and not last_line.endswith("\n"):
+                    target.write("\n")
+                    trailing_dropped = True
+
+        if counts["removed"] or trailing_dropped:
+            shutil.copymode(file_path, temp_path)
+            os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return counts
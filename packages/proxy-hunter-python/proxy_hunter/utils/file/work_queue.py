@@ -0,0 +1,224 @@
+import os
+import threading
+from typing import BinaryIO, Dict, Iterable, List, NamedTuple, Optional, Union
+
+from .folder import resolve_parent_folder
+
+# Compact once this many consumed bytes sit at the start of the file
+DEFAULT_COMPACT_BYTES = 1 << 20
+
+
+class QueueItem(NamedTuple):
+    """An item popped from a `WorkQueue`, acknowledged with `WorkQueue.ack`."""
+
+    value: str
+    start: int
+    end: int
+
+
+class WorkQueue:
+    """
+    Line-based work queue backed by an append-only text file.
+
+    Items are appended as lines to `path`; the byte offset of the first
+    unacknowledged line is kept in `<path>.head`. Popping reads forward from
+    the head and acknowledging rewrites only the few bytes of the head file,
+    so consuming an item no longer rewrites the whole queue file. Consumed
+    lines are dropped by `compact`, which runs automatically once they exceed
+    `compact_bytes` and half of the file.
+
+    Delivery is at-least-once: items popped but not acknowledged before a
+    crash are popped again by the next `WorkQueue` on the same file. Plain
+    text files written by older code are valid queues (head 0). One process
+    should own a queue file; within it the queue is thread-safe.
+
+    Example:
+        queue = WorkQueue("tmp/ip-ports/1.2.3.4.txt")
+        queue.push_many(["1.2.3.4:80", "1.2.3.4:81"])
+        for item in queue.pop_batch(100):
+            check(item.value)
+            queue.ack(item)
+    """
+
+    def __init__(self, path: str, compact_bytes: int = DEFAULT_COMPACT_BYTES) -> None:
+        """
+        Args:
+            path (str): The queue file, created on first push.
+            compact_bytes (int): Consumed bytes that trigger a compaction.
+        """
+        self.path = str(path)
+        self.head_path = f"{self.path}.head"
+        self.compact_bytes = compact_bytes
+        self.lock = threading.RLock()
+        self._reader: Optional[BinaryIO] = None
+        self._head = self._read_head()
+        # offset of the next line to pop
+        self._cursor = self._head
+        # start -> end of popped lines not acknowledged yet, in file order
+        self._inflight: Dict[int, int] = {}
+        # start -> end of acknowledged lines past the head
+        self._done: Dict[int, int] = {}
+
+    def _read_head(self) -> int:
+        try:
+            with open(self.head_path, "r", encoding="utf-8") as f:
+                head = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        return head if 0 <= head <= size else 0
+
+    def _write_head(self, head: int) -> None:
+        temp_path = f"{self.head_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(str(head))
+        os.replace(temp_path, self.head_path)
+
+    def _close_reader(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def push(self, item: str) -> None:
+        """Append one item."""
+        self.push_many([item])
+
+    def push_many(self, items: Iterable[str]) -> int:
+        """
+        Append items, one line each.
+
+        Returns:
+            int: The number of items appended.
+        """
+        lines = [str(item).replace("\n", " ") + "\n" for item in items]
+        if not lines:
+            return 0
+        with self.lock:
+            resolve_parent_folder(self.path)
+            with open(self.path, "ab+") as f:
+                prefix = b""
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        # older files may lack the final newline
+                        prefix = b"\n"
+                f.write(prefix + "".join(lines).encode("utf-8"))
+        return len(lines)
+
+    def pop_batch(self, n: int) -> List[QueueItem]:
+        """
+        Take up to `n` items that were not popped yet. Blank lines are skipped.
+
+        Returns:
+            List[QueueItem]: The items, to be passed to `ack` once processed.
+        """
+        items: List[QueueItem] = []
+        with self.lock:
+            if not os.path.exists(self.path):
+                return items
+            if self._reader is None:
+                self._reader = open(self.path, "rb")
+            self._reader.seek(self._cursor)
+            while len(items) < n:
+                raw = self._reader.readline()
+                if not raw:
+                    break
+                start, end = self._cursor, self._cursor + len(raw)
+                self._cursor = end
+                value = raw.decode("utf-8", errors="replace").strip()
+                if value:
+                    self._inflight[start] = end
+                    items.append(QueueItem(value, start, end))
+                else:
+                    self._done[start] = end
+            self._advance()
+        return items
+
+    def ack(self, items: Union[QueueItem, Iterable[QueueItem]]) -> None:
+        """Mark popped items as processed so they are never returned again."""
+        if isinstance(items, QueueItem):
+            items = [items]
+        with self.lock:
+            for item in items:
+                if self._inflight.pop(item.start, None) is not None:
+                    self._done[item.start] = item.end
+            self._advance()
+            if self._head >= self.compact_bytes and not self._inflight:
+                size = os.path.getsize(self.path)
+                if self._head * 2 >= size:
+                    self.compact()
+
+    def _advance(self) -> None:
+        head = self._head
+        while head in self._done:
+            head = self._done.pop(head)
+        if head != self._head:
+            self._head = head
+            self._write_head(head)
+
+    def requeue(self) -> None:
+        """
+        Forget the popped items that were not acknowledged, once nothing will
+        acknowledge them any more; they are popped again from the head, like
+        after a restart.
+        """
+        with self.lock:
+            self._cursor = self._head
+            self._inflight.clear()
+            self._done.clear()
+
+    def compact(self) -> None:
+        """Drop consumed lines from the start of the file."""
+        with self.lock:
+            if self._inflight or self._head == 0 or not os.path.exists(self.path):
+                return
+            temp_path = f"{self.path}.compact"
+            with open(self.path, "rb") as source, open(temp_path, "wb") as target:
+                source.seek(self._head)
+                while True:
+                    block = source.read(1 << 20)
+                    if not block:
+                        break
+                    target.write(block)
+            self._close_reader()
+            shift = self._head
+            # head first: a crash in between re-delivers items instead of losing them
+            self._write_head(0)
+            os.replace(temp_path, self.path)
+            self._head = 0
+            self._cursor -= shift
+            self._done = {
+                start - shift: end - shift for start, end in self._done.items()
+            }
+
+    def pending(self) -> bool:
+        """Whether items remain to be popped."""
+        with self.lock:
+            try:
+                return os.path.getsize(self.path) > self._cursor
+            except OSError:
+                return False
+
+    def clear(self) -> None:
+        """Remove the queue file and its head."""
+        with self.lock:
+            self._close_reader()
+            for path in (self.path, self.head_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._head = self._cursor = 0
+            self._inflight.clear()
+            self._done.clear()
+
+    def close(self) -> None:
+        with self.lock:
+            self._close_reader()
+
+    def __enter__(self) -> "WorkQueue":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
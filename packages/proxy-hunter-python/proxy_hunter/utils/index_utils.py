@@ -16,6 +16,10 @@ import brotli
 import chardet
 import requests
 
+_HOSTNAME_LABEL_RE = re.compile(r"^(?!-)[A-Za-z0-9-]{1,63}(?<!-)$")
+_NUMERIC_DOTTED_RE = re.compile(r"\d+(?:\.\d+)+")
+_PREFIXED_IPV4_RE = re.compile(r"[A-Za-z]+\d+(?:\.\d+){3}")
+
 
 def is_valid_url(url: str) -> bool:
     """
@@ -49,6 +53,32 @@ def is_valid_ip_connection(proxy: Optional[str]) -> bool:
         return False
 
 
+def is_valid_ipv4(ip: str) -> bool:
+    """
+    Validate a dotted-quad IPv4 address without building an `ipaddress` object.
+
+    Accepts exactly what `ipaddress.IPv4Address` accepts: four ASCII decimal
+    octets of 1-3 digits, each at most 255 and without leading zeros.
+
+    Args:
+        ip (str): The address to validate (no surrounding whitespace).
+
+    Returns:
+        bool: True if `ip` is a valid IPv4 address, False otherwise.
+    """
+    octets = ip.split(".")
+    if len(octets) != 4:
+        return False
+    for octet in octets:
+        if not octet or len(octet) > 3 or not (octet.isascii() and octet.isdigit()):
+            return False
+        if len(octet) > 1 and octet[0] == "0":
+            return False
+        if int(octet) > 255:
+            return False
+    return True
+
+
 def is_valid_ip(proxy: Optional[str]) -> bool:
     """
     Validate a given proxy IP address.
@@ -67,6 +97,10 @@ def is_valid_ip(proxy: Optional[str]) -> bool:
     if ip.startswith("[") and ip.endswith("]"):
         ip = ip[1:-1]
 
+    # Without a colon it can only be IPv4; skip the slower ipaddress parser
+    if ":" not in ip:
+        return is_valid_ipv4(ip)
+
     try:
         # Use ipaddress to validate both IPv4 and IPv6
         ipaddress.ip_address(ip)
@@ -89,14 +123,13 @@ def is_valid_hostname(host: str) -> bool:
         return False
     if host.endswith("."):
         host = host[:-1]
-    label_re = re.compile(r"^(?!-)[A-Za-z0-9-]{1,63}(?<!-)$")
     labels = host.split(".")
     if any(len(lbl) == 0 for lbl in labels):
         return False
     # Require at least one dot for typical external hostnames (avoid CSS-like single-labels)
     if host != "localhost" and "." not in host:
         return False
-    return all(label_re.match(lbl) for lbl in labels)
+    return all(_HOSTNAME_LABEL_RE.match(lbl) for lbl in labels)
 
 
 def is_valid_proxy(proxy: Optional[str], validate_credential: bool = True) -> bool:
@@ -133,11 +166,11 @@ def is_valid_proxy(proxy: Optional[str], validate_credential: bool = True) -> bo
 
     # Reject IPv4-like numeric dot notation that is not a valid IPv4 address.
     # Example: 999.999.999.999 should not be accepted as a hostname.
-    if re.fullmatch(r"\d+(?:\.\d+)+", ip) and not is_valid_ip(ip):
+    if _NUMERIC_DOTTED_RE.fullmatch(ip) and not is_valid_ip(ip):
         return False
 
     # Reject prefixed IPv4-like host patterns such as n46.101.95.183.
-    if re.fullmatch(r"[A-Za-z]+\d+(?:\.\d+){3}", ip):
+    if _PREFIXED_IPV4_RE.fullmatch(ip):
         return False
 
     # Accept either a valid IP (IPv4/IPv6) or a valid hostname/domain
@@ -0,0 +1,317 @@
+import asyncio
+import gzip
+import json
+import re
+import shutil
+import ssl
+import struct
+import subprocess
+import sys
+import pytest
+from proxy_hunter import (
+    AsyncProxyClient,
+    AsyncProxyError,
+    async_check_proxies,
+    async_check_proxy,
+)
+from proxy_hunter.curl.async_client import parse_proxy
+
+
+async def read_head(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:] if ": " in line)
+    return lines[0], headers, head
+
+
+async def pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def relay(reader, writer, upstream_reader, upstream_writer):
+    await asyncio.gather(pipe(reader, upstream_writer), pipe(upstream_reader, writer))
+
+
+async def handle_origin(reader, writer):
+    """Echo the request as JSON, with a redirect and a chunked gzip page."""
+    request_line, headers, _ = await read_head(reader)
+    method, target, _ = request_line.split(" ")
+    if target == "/redirect":
+        writer.write(
+            b"HTTP/1.1 302 Found\r\nLocation: /echo\r\nContent-Length: 0\r\n\r\n"
+        )
+    elif target == "/chunked":
+        body = gzip.compress(b"<title>Chunked</title>" * 100)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nContent-Encoding: gzip\r\n\r\n"
+        )
+        for i in range(0, len(body), 50):
+            chunk = body[i : i + 50]
+            writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+        writer.write(b"0\r\n\r\n")
+    else:
+        body = json.dumps({"method": method, "target": target, "headers": headers})
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: %d\r\n\r\n%s" % (len(body), body.encode())
+        )
+    await writer.drain()
+    writer.close()
+
+
+async def handle_silent(reader, writer):
+    await asyncio.sleep(30)
+
+
+class HttpProxy:
+    """Forwards absolute-form requests and tunnels CONNECT."""
+
+    def __init__(self, credentials=None):
+        self.credentials = credentials
+        self.auth_headers = []
+
+    async def __call__(self, reader, writer):
+        request_line, headers, head = await read_head(reader)
+        self.auth_headers.append(headers.get("Proxy-Authorization"))
+        if self.credentials and self.credentials not in str(headers):
+            writer.write(b"HTTP/1.1 407 Proxy Authentication Required\r\n\r\n")
+            writer.close()
+            return
+        method, target, version = request_line.split(" ")
+        if method == "CONNECT":
+            host, port = target.rsplit(":", 1)
+            upstream = await asyncio.open_connection(host, int(port))
+            writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+        else:
+            host_port = target.split("/")[2]
+            host, port = host_port.rsplit(":", 1)
+            upstream = await asyncio.open_connection(host, int(port))
+            path = "/" + target.split("/", 3)[3]
+            rest = head.split(b"\r\n", 1)[1]
+            upstream[1].write(f"{method} {path} {version}\r\n".encode() + rest)
+        await relay(reader, writer, *upstream)
+
+
+class SocksProxy:
+    """SOCKS4 and SOCKS5 server counting the connections open at once."""
+
+    def __init__(self, credentials=None):
+        self.credentials = credentials
+        self.active = 0
+        self.peak = 0
+        self.hosts = []
+
+    async def __call__(self, reader, writer):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            version = (await reader.readexactly(1))[0]
+            if version == 4:
+                _, port = struct.unpack(">BH", await reader.readexactly(3))
+                host = ".".join(map(str, await reader.readexactly(4)))
+                await reader.readuntil(b"\0")
+                upstream = await asyncio.open_connection(host, port)
+                writer.write(b"\x00\x5a" + b"\0" * 6)
+            else:
+                methods = await reader.readexactly((await reader.readexactly(1))[0])
+                if self.credentials:
+                    if 2 not in methods:
+                        writer.write(b"\x05\xff")
+                        return
+                    writer.write(b"\x05\x02")
+                    await reader.readexactly(1)
+                    user = await reader.readexactly((await reader.readexactly(1))[0])
+                    secret = await reader.readexactly((await reader.readexactly(1))[0])
+                    if (user.decode(), secret.decode()) != self.credentials:
+                        writer.write(b"\x01\x01")
+                        return
+                    writer.write(b"\x01\x00")
+                else:
+                    writer.write(b"\x05\x00")
+                _, _, _, address_type = await reader.readexactly(4)
+                if address_type == 3:
+                    name = await reader.readexactly((await reader.readexactly(1))[0])
+                    host = name.decode()
+                else:
+                    host = ".".join(map(str, await reader.readexactly(4)))
+                (port,) = struct.unpack(">H", await reader.readexactly(2))
+                self.hosts.append(host)
+                upstream = await asyncio.open_connection(host, port)
+                writer.write(b"\x05\x00\x00\x01\x7f\x00\x00\x01\x00\x00")
+            # let concurrent checks overlap
+            await asyncio.sleep(0.01)
+            await relay(reader, writer, *upstream)
+        finally:
+            self.active -= 1
+            writer.close()
+
+
+async def serve(handler, ssl_context=None):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0, ssl=ssl_context)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_parse_proxy():
+    assert parse_proxy("1.2.3.4:80") == ("http", "1.2.3.4", 80, None, None)
+    assert parse_proxy("socks5://u:p@1.2.3.4:1080") == (
+        "socks5",
+        "1.2.3.4",
+        1080,
+        "u",
+        "p",
+    )
+    assert parse_proxy("1.2.3.4:1080@u:1234", "socks4") == (
+        "socks4",
+        "1.2.3.4",
+        1080,
+        "u",
+        "1234",
+    )
+    with pytest.raises(ValueError):
+        parse_proxy("1.2.3.4:80", "ftp")
+
+
+def test_direct_redirect_and_chunked_gzip():
+    async def main():
+        origin, port = await serve(handle_origin)
+        client = AsyncProxyClient()
+        response = await client.get(f"http://127.0.0.1:{port}/redirect")
+        assert response.status_code == 200
+        assert response.url.endswith("/echo")
+        assert [r.status_code for r in response.history] == [302]
+        assert response.json()["target"] == "/echo"
+
+        response = await client.get(f"http://127.0.0.1:{port}/echo?a=1", no_cache=True)
+        assert re.fullmatch(r"/echo\?a=1&nocache=\w{5}", response.json()["target"])
+
+        response = await client.get(f"http://127.0.0.1:{port}/chunked")
+        assert response.text == "<title>Chunked</title>" * 100
+        origin.close()
+
+    asyncio.run(main())
+
+
+def test_http_proxy_forward_and_connect(tmp_path):
+    if not shutil.which("openssl"):
+        pytest.skip("openssl is required to create a test certificate")
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+        + ["-subj", "/CN=localhost", "-keyout", str(key), "-out", str(cert)],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+
+    async def main():
+        origin, port = await serve(handle_origin)
+        tls_origin, tls_port = await serve(handle_origin, context)
+        proxy = HttpProxy(credentials="Basic dTpw")
+        proxy_server, proxy_port = await serve(proxy)
+        client = AsyncProxyClient()
+
+        response = await client.get(
+            f"http://127.0.0.1:{port}/echo", proxy=f"http://u:p@127.0.0.1:{proxy_port}"
+        )
+        assert response.json()["target"] == "/echo"
+        assert proxy.auth_headers[-1] == "Basic dTpw"
+
+        response = await client.get(
+            f"https://localhost:{tls_port}/secure",
+            proxy=f"127.0.0.1:{proxy_port}@u:p",
+        )
+        assert response.json()["target"] == "/secure"
+
+        with pytest.raises(AsyncProxyError, match="Private"):
+            await client.get(
+                f"https://localhost:{tls_port}/", proxy=f"127.0.0.1:{proxy_port}"
+            )
+        for server in (origin, tls_origin, proxy_server):
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_socks_proxies():
+    async def main():
+        origin, port = await serve(handle_origin)
+        socks = SocksProxy()
+        socks_server, socks_port = await serve(socks)
+        private = SocksProxy(credentials=("u", "p"))
+        private_server, private_port = await serve(private)
+        client = AsyncProxyClient()
+
+        for proxy_type in ("socks4", "socks5"):
+            response = await client.get(
+                f"http://localhost:{port}/{proxy_type}",
+                proxy=f"127.0.0.1:{socks_port}",
+                proxy_type=proxy_type,
+            )
+            assert response.json()["target"] == f"/{proxy_type}"
+        # SOCKS5 leaves the name to the proxy
+        assert socks.hosts == ["localhost"]
+
+        response = await client.get(
+            f"http://127.0.0.1:{port}/", proxy=f"socks5://u:p@127.0.0.1:{private_port}"
+        )
+        assert response.ok
+        with pytest.raises(AsyncProxyError, match="methods were rejected"):
+            await client.get(
+                f"http://127.0.0.1:{port}/", proxy=f"socks5://127.0.0.1:{private_port}"
+            )
+        for server in (origin, socks_server, private_server):
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_check_results_and_limits():
+    async def main():
+        origin, port = await serve(handle_origin)
+        socks = SocksProxy()
+        socks_server, socks_port = await serve(socks)
+        closed_server, closed_port = await serve(handle_origin)
+        closed_server.close()
+        await closed_server.wait_closed()
+        client = AsyncProxyClient(limit_per_host=4, timeout=2)
+        endpoint = f"http://127.0.0.1:{port}/headers"
+
+        results = await async_check_proxies(
+            [f"127.0.0.1:{socks_port}"] * 200, "socks5", endpoint, client=client
+        )
+        assert all(r.result and r.status == 200 for r in results)
+        assert all(r.latency >= 0 and r.error is None for r in results)
+        assert results[0].type == "socks5"
+        assert socks.peak == 4
+
+        closed = await async_check_proxy(
+            f"127.0.0.1:{closed_port}", "http", endpoint, client=client
+        )
+        assert not closed.result
+        assert closed.error == f"127.0.0.1 port {closed_port} closed"
+
+        silent_server, silent_port = await serve(handle_silent)
+        hanging = await async_check_proxy(
+            f"127.0.0.1:{silent_port}", "http", endpoint, client=client, timeout=0.2
+        )
+        assert not hanging.result
+        assert hanging.error == "127.0.0.1 timed out"
+        for server in (origin, socks_server, silent_server):
+            server.close()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,183 @@
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from proxy_hunter import AsyncProxyClient, CheckPipeline, FetchSummary
+from proxy_hunter.curl.check_pipeline import extract_title
+from tests.test_async_client import HttpProxy, SocksProxy, read_head, serve
+
+PAGE = b"<html><head><title>\n  Stand-in &amp; Page </title></head></html>"
+
+
+async def handle_page(reader, writer):
+    """A web server, not a proxy: it refuses CONNECT and absolute URLs."""
+    request_line, _, _ = await read_head(reader)
+    method, target, _ = request_line.split(" ")
+    if method == "CONNECT" or not target.startswith("/"):
+        writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+    else:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(PAGE))
+        writer.write(PAGE)
+    await writer.drain()
+    writer.close()
+
+
+class SquidProxy(HttpProxy):
+    """Denies CONNECT to anything but `ssl_port`, like `deny CONNECT !SSL_ports`."""
+
+    def __init__(self, ssl_port):
+        super().__init__()
+        self.ssl_port = ssl_port
+        self.connects = []
+
+    async def __call__(self, reader, writer):
+        request_line, _, _ = await read_head(reader)
+        target = request_line.split(" ")[1]
+        self.connects.append(target)
+        if int(target.rsplit(":", 1)[1]) == self.ssl_port:
+            writer.write(b"HTTP/1.1 200 Connection established\r\n\r\n")
+        else:
+            writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+        await writer.drain()
+        writer.close()
+
+
+def test_extract_title():
+    assert extract_title(PAGE) == "Stand-in & Page"
+    assert extract_title(b"<p>no title</p>") == ""
+
+
+def test_stages_skip_what_cannot_work():
+    async def main():
+        page, page_port = await serve(handle_page)
+        socks_server, socks_port = await serve(SocksProxy())
+        http_server, http_port = await serve(HttpProxy())
+        closed, closed_port = await serve(handle_page)
+        closed.close()
+        await closed.wait_closed()
+
+        pipeline = CheckPipeline(
+            client=AsyncProxyClient(),
+            sniff_target=("127.0.0.1", page_port),
+            sniff_tls_port=page_port,
+            connect_timeout=1,
+            sniff_timeout=1,
+        )
+        url = f"http://127.0.0.1:{page_port}/"
+
+        socks = await pipeline.check(f"127.0.0.1:{socks_port}", url, "stand-in")
+        assert socks.result and socks.protocols == ["socks5", "socks4"]
+        assert socks.title == "Stand-in & Page"
+        assert [stage.stage for stage in socks.stages] == [
+            "tcp",
+            "sniff",
+            "fetch",
+            "fetch",
+        ]
+
+        http = await pipeline.check(f"127.0.0.1:{http_port}", url, "stand-in")
+        assert http.protocols == ["http"]
+        # the https sniff needs CONNECT, which the stand-in proxy also accepts
+        sniff = await pipeline.sniff(f"127.0.0.1:{http_port}", https=True)
+        assert sniff.value == ("http",)
+
+        # an open port that is no proxy is never fetched through
+        web = await pipeline.check(f"127.0.0.1:{page_port}", url, "stand-in")
+        assert not web.result
+        assert [stage.stage for stage in web.stages] == ["tcp", "sniff"]
+        assert web.stages[-1].error == "no proxy protocol detected"
+
+        dead = await pipeline.check(f"127.0.0.1:{closed_port}", url, "stand-in")
+        assert not dead.result and len(dead.stages) == 1
+        assert dead.stages[0].error == f"127.0.0.1 port {closed_port} closed"
+
+        wrong = await pipeline.check(f"127.0.0.1:{socks_port}", url, "other title")
+        assert not wrong.result
+        assert "Stand-in" in wrong.fetches["socks5"].error
+
+        summary = pipeline.timings.summary()
+        assert summary["tcp"]["runs"] == 4
+        # the second socks5 check reused the connect and sniff stages
+        assert summary["tcp"]["hits"] == 1 and summary["sniff"]["hits"] == 1
+        assert summary["fetch"]["runs"] == 5 and summary["fetch"]["ok"] == 3
+        assert "fetch: 5 runs, 3 ok" in pipeline.timings.report()
+
+        for server in (page, socks_server, http_server):
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_https_sniff_asks_for_the_tls_port():
+    async def main():
+        squid = SquidProxy(ssl_port=443)
+        server, port = await serve(squid)
+        pipeline = CheckPipeline(client=AsyncProxyClient(), sniff_timeout=1)
+        sniff = await pipeline.sniff(f"127.0.0.1:{port}", https=True)
+        assert sniff.value == ("http",)
+        assert squid.connects == ["1.1.1.1:443"]
+
+        # a refusal by policy leaves it to the fetch stage
+        squid.ssl_port = 8443
+        pipeline.clear()
+        sniff = await pipeline.sniff(f"127.0.0.1:{port}", https=True)
+        assert sniff.ok and sniff.value == ("http",)
+        server.close()
+
+    asyncio.run(main())
+
+
+def test_cache_keeps_summaries_and_is_bounded():
+    async def main():
+        page, page_port = await serve(handle_page)
+        socks_server, socks_port = await serve(SocksProxy())
+        pipeline = CheckPipeline(
+            client=AsyncProxyClient(),
+            sniff_target=("127.0.0.1", page_port),
+            sniff_timeout=1,
+            max_cache=3,
+        )
+        url = f"http://127.0.0.1:{page_port}/"
+
+        check = await pipeline.check(f"127.0.0.1:{socks_port}", url, "stand-in")
+        # the responses themselves are not kept
+        assert check.fetches["socks5"].value == FetchSummary("Stand-in & Page", 200)
+        # tcp and sniff were dropped for the two fetches
+        assert [key[0] for key in pipeline.cache] == ["sniff", "fetch", "fetch"]
+
+        await pipeline.sniff(f"127.0.0.1:{socks_port}", https=False)
+        await pipeline.tcp(f"127.0.0.1:{page_port}")
+        # the sniff was used last, so the oldest fetch went first
+        assert [key[0] for key in pipeline.cache] == ["fetch", "sniff", "tcp"]
+        assert pipeline.timings.summary()["sniff"]["hits"] == 1
+
+        pipeline.clear()
+        assert not pipeline.cache
+        page.close()
+        socks_server.close()
+
+    asyncio.run(main())
+
+
+def test_check_sync_from_threads():
+    loop = asyncio.new_event_loop()
+    page, page_port = loop.run_until_complete(serve(handle_page))
+    socks_server, socks_port = loop.run_until_complete(serve(SocksProxy()))
+    pipeline = CheckPipeline(sniff_target=("127.0.0.1", page_port), sniff_timeout=1)
+    url = f"http://127.0.0.1:{page_port}/"
+
+    def check(_):
+        return pipeline.check_sync(f"127.0.0.1:{socks_port}", url, "stand-in").result
+
+    # the stand-in servers run on their own loop in this thread's executor
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [loop.run_in_executor(executor, check, i) for i in range(8)]
+        results = loop.run_until_complete(asyncio.gather(*futures))
+    assert all(results)
+    page.close()
+    socks_server.close()
+    loop.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,67 @@
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from proxy_hunter import build_request, get_cookie_store
+
+
+class CookieHandler(BaseHTTPRequestHandler):
+    received = []
+
+    def do_GET(self):
+        CookieHandler.received.append(self.headers.get("Cookie", ""))
+        self.send_response(200)
+        self.send_header("Set-Cookie", f"visit={len(CookieHandler.received)}; Path=/")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture()
+def endpoint():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CookieHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    CookieHandler.received = []
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_cookies_are_shared_and_flushed(endpoint, tmp_path):
+    cookie_file = str(tmp_path / "cookies.txt")
+    build_request(endpoint=endpoint, cookie_file=cookie_file)
+    build_request(endpoint=endpoint, cookie_file=cookie_file)
+    # the second request carries the cookie set by the first, from memory
+    assert "visit=1" in CookieHandler.received[1]
+
+    store = get_cookie_store(cookie_file)
+    assert store is get_cookie_store(str(tmp_path / "." / "cookies.txt"))
+    store.flush()
+    content = open(cookie_file, encoding="utf-8").read()
+    assert content.startswith("# Netscape HTTP Cookie File")
+    assert "visit\t2" in content
+
+
+def test_per_check_wall_time(endpoint, tmp_path):
+    cookie_file = str(tmp_path / "bench.txt")
+    timings = {}
+    for label, path in (("cookie file", cookie_file), ("no cookies", None)):
+        start = time.perf_counter()
+        for _ in range(10):
+            assert build_request(endpoint=endpoint, cookie_file=path).ok
+        timings[label] = (time.perf_counter() - start) / 10
+    print(", ".join(f"{k}: {v * 1000:.1f} ms/check" for k, v in timings.items()))
+    # each call used to sleep a full second after rewriting the cookie file
+    assert timings["cookie file"] < 0.5
+    assert timings["no cookies"] < 0.5
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
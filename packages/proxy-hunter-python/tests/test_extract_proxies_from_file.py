@@ -0,0 +1,116 @@
+import json
+import sys
+import tracemalloc
+import pytest
+from proxy_hunter import (
+    BloomFilter,
+    extract_proxies,
+    iter_file_chunks,
+    iter_proxies_from_files,
+)
+
+
+def make_dump(count: int) -> str:
+    lines = []
+    for i in range(count):
+        ip = f"{i % 223 + 1}.{i // 223 % 250}.{i % 7}.{i % 250 + 1}"
+        kind = i % 5
+        if kind == 0:
+            lines.append(f"found {ip}:{1024 + i % 60000} in scrape")
+        elif kind == 1:
+            lines.append(f"user{i % 3}:pass@{ip}:8080")
+        elif kind == 2:
+            # IP and port split over two lines
+            lines.append(f"{ip}\n{2000 + i % 100}")
+        elif kind == 3:
+            lines.append(json.dumps({"ip": ip, "port": "3128"}, indent=2))
+        else:
+            lines.append(f"{ip}:80 duplicated {ip}:80")
+    return "\n".join(lines) + "\n"
+
+
+def as_keys(proxies) -> set:
+    return {(p.proxy, p.username, p.password) for p in proxies}
+
+
+@pytest.fixture()
+def dump_file(tmp_path):
+    path = tmp_path / "dump.txt"
+    content = make_dump(3000)
+    path.write_text(content, encoding="utf-8")
+    return path, content
+
+
+@pytest.mark.parametrize("chunk_size", [97, 1024, 1 << 20])
+def test_chunked_extraction_matches_whole_file(dump_file, chunk_size):
+    path, content = dump_file
+    # json credentials apply file-wide in extract_proxies; there are none here
+    expected = as_keys(extract_proxies(content))
+    # the default `seen` filter is exact, so no proxy is dropped
+    found = list(iter_proxies_from_files([path], chunk_size=chunk_size))
+    assert as_keys(found) == expected
+    assert len(found) == len(expected)
+
+
+def test_chunks_are_cut_between_tokens(dump_file):
+    path, content = dump_file
+    chunks = list(iter_file_chunks(path, chunk_size=100, overlap=0))
+    assert "".join(chunks) == content
+    assert all(chunk.endswith("\n") for chunk in chunks)
+
+
+def test_process_pool_matches_in_process(dump_file, tmp_path):
+    path, _ = dump_file
+    other = tmp_path / "other.txt"
+    other.write_text("8.8.8.8:8080\n1.1.1.1:3128\n", encoding="utf-8")
+    single = list(iter_proxies_from_files([path, other], chunk_size=4096, seen=set()))
+    pooled = list(
+        iter_proxies_from_files([path, other], workers=2, chunk_size=4096, seen=set())
+    )
+    assert [p.proxy for p in pooled] == [p.proxy for p in single]
+
+
+def test_seen_filter_dedupes_across_calls(dump_file, tmp_path):
+    path, _ = dump_file
+    seen = BloomFilter(capacity=10000)
+    first = list(iter_proxies_from_files([path], seen=seen))
+    assert first
+    assert list(iter_proxies_from_files([path], seen=seen)) == []
+    assert list(iter_proxies_from_files([tmp_path / "missing.txt"])) == []
+
+
+def test_memory_is_bounded_by_chunk_size(tmp_path):
+    path = tmp_path / "large.txt"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(200000):
+            f.write(f"noise line {i} without any proxy at all, just text\n")
+        f.write("8.8.8.8:8080\n")
+    size = path.stat().st_size
+
+    tracemalloc.start()
+    try:
+        found = list(iter_proxies_from_files([path], chunk_size=256 * 1024, seen=set()))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert [p.proxy for p in found] == ["8.8.8.8:8080"]
+    # a few chunk-sized buffers, not the 10 MB file
+    assert peak < size / 4, (peak, size)
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    keys = [f"10.0.{i // 256}.{i % 256}:8080" for i in range(5000)]
+    assert all(bloom.add(key) for key in keys[:10])
+    for key in keys[10:]:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(
+        f"10.1.{i // 256}.{i % 256}:8080" in bloom for i in range(5000)
+    )
+    assert false_positives < 5000 * 0.03
+    assert bloom.add(keys[0]) is False
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,141 @@
+import asyncio
+import sys
+import time
+import pytest
+from proxy_hunter import detect_protocols, detect_protocols_sync, protocols_from_type
+from tests.test_async_client import (
+    HttpProxy,
+    SocksProxy,
+    handle_silent,
+    read_head,
+    serve,
+)
+
+
+async def handle_web(reader, writer):
+    """A web server, not a proxy: CONNECT is answered with 405."""
+    await read_head(reader)
+    writer.write(b"HTTP/1.1 405 Method Not Allowed\r\nContent-Length: 0\r\n\r\n")
+    await writer.drain()
+    writer.close()
+
+
+async def handle_mixed(reader, writer):
+    """SOCKS5 proxy that refuses HTTP CONNECT with a bare 403."""
+    first = await reader.readexactly(1)
+    if first == b"\x05":
+        await reader.readexactly((await reader.readexactly(1))[0])
+        writer.write(b"\x05\x00")
+    elif first == b"C":
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+    await writer.drain()
+    writer.close()
+
+
+class UpstreamFailingProxy:
+    """HTTP proxy that cannot reach the target but says who it is."""
+
+    def __init__(self):
+        self.targets = []
+
+    async def __call__(self, reader, writer):
+        request_line, _, _ = await read_head(reader)
+        self.targets.append(request_line.split(" ")[1])
+        writer.write(
+            b"HTTP/1.1 403 Forbidden\r\nVia: 1.1 squid\r\nContent-Length: 0\r\n\r\n"
+        )
+        await writer.drain()
+        writer.close()
+
+
+def test_protocols_from_type():
+    assert protocols_from_type("http-socks5") == ("socks5", "http")
+    assert protocols_from_type("SOCKS4") == ("socks4",)
+    assert protocols_from_type("") == ()
+    assert protocols_from_type(None) == ()
+    assert protocols_from_type("https") == ()
+
+
+def test_detect_protocols():
+    async def main():
+        socks, socks_port = await serve(SocksProxy())
+        private_socks, private_socks_port = await serve(SocksProxy(("u", "p")))
+        http, http_port = await serve(HttpProxy())
+        private_http, private_http_port = await serve(HttpProxy("Basic"))
+        squid = UpstreamFailingProxy()
+        squid_server, squid_port = await serve(squid)
+        web, web_port = await serve(handle_web)
+        mixed, mixed_port = await serve(handle_mixed)
+        silent, silent_port = await serve(handle_silent)
+        closed, closed_port = await serve(handle_web)
+        closed.close()
+        await closed.wait_closed()
+
+        fingerprint = await detect_protocols("127.0.0.1", socks_port, timeout=1)
+        assert fingerprint.protocols == ("socks5", "socks4")
+        assert fingerprint.type == "socks5-socks4"
+        assert fingerprint.auth_required == () and fingerprint.error is None
+
+        fingerprint = await detect_protocols("127.0.0.1", private_socks_port, 1)
+        assert fingerprint.protocols == ("socks5", "socks4")
+        assert fingerprint.auth_required == ("socks5",)
+
+        fingerprint = await detect_protocols("127.0.0.1", http_port, timeout=5)
+        assert fingerprint.type == "http" and not fingerprint.auth_required
+        # the SOCKS probes it never answers are cut short after the HTTP one
+        # instead of waiting out the 5s timeout
+        assert fingerprint.elapsed < 4
+
+        fingerprint = await detect_protocols("127.0.0.1", private_http_port, 1)
+        assert fingerprint.type == "http"
+        assert fingerprint.auth_required == ("http",)
+
+        fingerprint = await detect_protocols("127.0.0.1", squid_port, timeout=1)
+        assert fingerprint.type == "http"
+        # the probe only ever asks for the proxy's own loopback port
+        assert squid.targets == [f"127.0.0.1:{squid_port}"]
+
+        # a bare refusal of the CONNECT still means http
+        fingerprint = await detect_protocols("127.0.0.1", mixed_port, timeout=1)
+        assert fingerprint.type == "socks5-http"
+
+        # so does a web server's; the request stage of the checkers sorts it out
+        fingerprint = await detect_protocols("127.0.0.1", web_port, timeout=1)
+        assert fingerprint.type == "http"
+
+        fingerprint = await detect_protocols("127.0.0.1", silent_port, timeout=0.5)
+        assert fingerprint.protocols == ()
+        assert fingerprint.error == "no proxy protocol detected"
+
+        fingerprint = await detect_protocols("127.0.0.1", closed_port, timeout=1)
+        assert fingerprint.error == f"127.0.0.1 port {closed_port} closed"
+
+        # the probes run side by side: a silent port costs one timeout, not
+        # one per protocol
+        start = time.perf_counter()
+        await detect_protocols("127.0.0.1", silent_port, timeout=1)
+        assert time.perf_counter() - start < 2.5
+
+        for server in (socks, private_socks, http, private_http, squid_server):
+            server.close()
+        for server in (web, mixed, silent):
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_detect_protocols_sync():
+    loop = asyncio.new_event_loop()
+    socks, socks_port = loop.run_until_complete(serve(SocksProxy()))
+    future = loop.run_in_executor(
+        None, detect_protocols_sync, "127.0.0.1", socks_port, 1
+    )
+    fingerprint = loop.run_until_complete(future)
+    assert fingerprint.type == "socks5-socks4"
+    socks.close()
+    loop.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
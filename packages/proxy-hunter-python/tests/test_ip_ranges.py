@@ -0,0 +1,72 @@
+import ipaddress
+import sys
+import tracemalloc
+import pytest
+from proxy_hunter import (
+    IPRange,
+    TargetGrid,
+    generate_ip_port_pairs,
+    int_to_ip,
+    ip_port_grid,
+    ip_to_int,
+    list_ips_from_cidr,
+)
+
+
+@pytest.mark.parametrize("cidr", ["192.168.1.0/28", "10.0.0.0/31", "10.0.0.7/32"])
+def test_ip_range_matches_ipaddress(cidr):
+    network = ipaddress.ip_network(cidr)
+    expected = [str(ip) for ip in network.hosts()]
+    assert list_ips_from_cidr(cidr) == expected
+    hosts = IPRange.from_cidr(cidr)
+    assert len(hosts) == len(expected)
+    assert list(hosts.iter_strings()) == expected
+    shuffled = [
+        int_to_ip(v) for chunk in hosts.iter_shuffled(chunk_size=3) for v in chunk
+    ]
+    assert sorted(shuffled, key=ip_to_int) == expected
+
+    everything = IPRange.from_cidr(cidr, hosts_only=False)
+    assert len(everything) == network.num_addresses
+    with pytest.raises(ValueError):
+        IPRange.from_cidr("2001:db8::/120")
+
+
+def test_grid_visits_every_target_once():
+    grid = TargetGrid(IPRange.from_cidr("10.0.0.0/29"), range(80, 120))
+    assert len(grid) == 6 * 40
+    ordered = list(grid.iter_targets(chunk_size=7))
+    # consecutive targets spread over the addresses
+    assert ordered[:2] == ["10.0.0.1:80", "10.0.0.2:80"]
+    shuffled = list(grid.iter_targets(chunk_size=7, shuffle=True, seed=1))
+    assert shuffled != ordered and sorted(shuffled) == sorted(ordered)
+    assert list(grid.iter_targets(shuffle=True, seed=1, chunk_size=7)) == shuffled
+    assert grid[7] == (ip_to_int("10.0.0.2"), 81)
+
+
+def test_ip_port_grid_matches_pairs():
+    pairs = generate_ip_port_pairs("1.2.3.4", 60000)
+    grid = ip_port_grid("1.2.3.4", 60000)
+    assert list(grid.iter_targets()) == [f"{ip}:{port}" for ip, port in pairs]
+    with pytest.raises(ValueError):
+        ip_port_grid("1.2.3")
+
+
+def test_sweep_memory_is_bounded():
+    # a /16 with 100 ports: 6.5 million targets
+    grid = TargetGrid(IPRange.from_cidr("10.1.0.0/16"), range(8000, 8100))
+    tracemalloc.start()
+    try:
+        chunks = grid.iter_chunks(chunk_size=4096, shuffle=True)
+        for _ in range(20):
+            ips, ports = next(chunks)
+            assert len(ips) == len(ports) == 4096
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # the chunk order and a few chunks, not millions of strings
+    assert peak < 1 << 20, peak
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
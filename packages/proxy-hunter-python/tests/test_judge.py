@@ -0,0 +1,148 @@
+import asyncio
+import sys
+import pytest
+from proxy_hunter import (
+    AsyncProxyClient,
+    JudgeServer,
+    async_check_proxy,
+    classify_anonymity,
+    get_judge_url,
+)
+from proxy_hunter.curl.check_pipeline import extract_title
+from proxy_hunter.curl.judge import JUDGE_TITLE
+from tests.test_async_client import SocksProxy, read_head, relay, serve
+
+
+class ForwardingProxy:
+    """HTTP proxy adding `extra` headers to the requests it forwards."""
+
+    def __init__(self, extra=b""):
+        self.extra = extra
+
+    async def __call__(self, reader, writer):
+        request_line, _, head = await read_head(reader)
+        method, target, version = request_line.split(" ")
+        host, port = target.split("/")[2].rsplit(":", 1)
+        upstream = await asyncio.open_connection(host, int(port))
+        path = "/" + target.split("/", 3)[3]
+        rest = head.split(b"\r\n", 1)[1]
+        upstream[1].write(f"{method} {path} {version}\r\n".encode() + self.extra + rest)
+        await relay(reader, writer, *upstream)
+
+
+def test_classify_anonymity():
+    assert classify_anonymity({"User-Agent": "x"}, "5.6.7.8") == "elite"
+    assert classify_anonymity({"Via": "1.1 squid"}, "5.6.7.8") == "anonymous"
+    # a forwarded address other than the proxy's own leaks the client
+    leaked = {"X-Forwarded-For": "1.2.3.4"}
+    assert classify_anonymity(leaked, "5.6.7.8") == "transparent"
+    assert classify_anonymity({"X-Forwarded-For": "5.6.7.8"}, "5.6.7.8") == (
+        "anonymous"
+    )
+    assert classify_anonymity({"X-Real-Ip": "1.2.3.4"}, "5.6.7.8", "1.2.3.4") == (
+        "transparent"
+    )
+
+
+def test_get_judge_url(monkeypatch):
+    monkeypatch.delenv("PROXY_JUDGE_URL", raising=False)
+    assert get_judge_url("/ip") is None
+    monkeypatch.setenv("PROXY_JUDGE_URL", "http://judge.example:8899")
+    assert get_judge_url("/ip") == "http://judge.example:8899/ip"
+    assert get_judge_url() == "http://judge.example:8899/"
+
+
+def test_judge_routes():
+    async def main():
+        judge = JudgeServer()
+        server, port = await serve(judge.handle)
+        base = f"http://127.0.0.1:{port}"
+        client = AsyncProxyClient()
+
+        response = await client.get(base + "/")
+        assert extract_title(response.content) == JUDGE_TITLE
+        assert (await client.get(base + "/ip")).json() == {
+            "ip": "127.0.0.1",
+            "origin": "127.0.0.1",
+        }
+        headers = (await client.get(base + "/headers")).json()["headers"]
+        assert headers["Host"] == f"127.0.0.1:{port}"
+        azenv = (await client.get(base + "/azenv?a=1")).text
+        assert "AZ Environment" in azenv
+        assert "REMOTE_ADDR = 127.0.0.1" in azenv
+        assert "REQUEST_URI = /azenv?a=1" in azenv
+        assert (await client.get(base + "/missing")).status_code == 404
+
+        # several requests share one keep-alive connection
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for path in ("/ip", "/headers"):
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: judge\r\n\r\n".encode())
+            status_line, response_headers, _ = await read_head(reader)
+            assert status_line.startswith("HTTP/1.1 200")
+            await reader.readexactly(int(response_headers["Content-Length"]))
+        writer.close()
+        assert judge.requests == 7
+
+        # oversized bodies and heads close the connection without a response
+        for request in (
+            b"POST /ip HTTP/1.1\r\nContent-Length: 1000000000\r\n\r\n",
+            b"GET /ip HTTP/1.1\r\nX-Pad: " + b"a" * 200_000 + b"\r\n\r\n",
+        ):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            try:
+                assert await asyncio.wait_for(reader.read(), 5) == b""
+            except ConnectionResetError:
+                # the unread rest of the request turns the close into a reset
+                pass
+            writer.close()
+        assert judge.requests == 7
+
+        server.close()
+
+    asyncio.run(main())
+
+
+def test_anonymity_through_proxies(monkeypatch):
+    async def main():
+        server, port = await serve(JudgeServer().handle)
+        monkeypatch.setenv("PROXY_JUDGE_URL", f"http://127.0.0.1:{port}/")
+        client = AsyncProxyClient()
+        proxies = {
+            "elite": ForwardingProxy(),
+            "anonymous": ForwardingProxy(b"Via: 1.1 stand-in\r\n"),
+            "transparent": ForwardingProxy(b"X-Forwarded-For: 10.9.8.7\r\n"),
+        }
+        for expected, handler in proxies.items():
+            proxy_server, proxy_port = await serve(handler)
+            response = await client.get(
+                get_judge_url("/judge"), proxy=f"127.0.0.1:{proxy_port}"
+            )
+            assert response.json()["anonymity"] == expected
+            proxy_server.close()
+
+        # the real IP given to /judge is found wherever it is forwarded
+        proxy_server, proxy_port = await serve(proxies["transparent"])
+        response = await client.get(
+            get_judge_url("/judge?ip=10.9.8.7"), proxy=f"127.0.0.1:{proxy_port}"
+        )
+        assert response.json()["anonymity"] == "transparent"
+        assert response.json()["proxy_headers"] == {"X-Forwarded-For": "10.9.8.7"}
+        proxy_server.close()
+
+        # checks default to the configured judge instead of httpbin
+        socks, socks_port = await serve(SocksProxy())
+        result = await async_check_proxy(
+            f"127.0.0.1:{socks_port}", "socks5", client=client
+        )
+        assert result.result and result.error is None
+        assert result.response.json()["headers"]["Host"] == f"127.0.0.1:{port}"
+
+        socks.close()
+        server.close()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,185 @@
+import asyncio
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from proxy_hunter import (
+    LatencyTracker,
+    PortResult,
+    PortScanner,
+    is_port_open,
+    parse_ports,
+    parse_target,
+    scan_ports,
+)
+
+
+class ListenerFarm:
+    """Open, closed and filtered (SYN-dropping) ports on 127.0.0.1."""
+
+    def __init__(self, open_count=0, closed_count=0, filtered_count=0):
+        self.sockets = []
+        self.open = [self._listen(64) for _ in range(open_count)]
+        self.closed = []
+        for _ in range(closed_count):
+            sock = socket.socket()
+            sock.bind(("127.0.0.1", 0))
+            self.closed.append(sock.getsockname()[1])
+            sock.close()
+        self.filtered = []
+        for _ in range(filtered_count):
+            # a full backlog that is never accepted drops further SYNs
+            port = self._listen(0)
+            filler = socket.socket()
+            filler.connect(("127.0.0.1", port))
+            self.sockets.append(filler)
+            self.filtered.append(port)
+
+    def _listen(self, backlog):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(backlog)
+        self.sockets.append(sock)
+        return sock.getsockname()[1]
+
+    def close(self):
+        for sock in self.sockets:
+            sock.close()
+
+
+class SleepingScanner(PortScanner):
+    """Probes that take `delay` seconds and track how many run at once."""
+
+    def __init__(self, delay=0.01, **options):
+        super().__init__(**options)
+        self.delay = delay
+        self.active = {}
+        self.peak = {}
+        self.peak_total = 0
+        self.started = []
+
+    async def probe(self, host, port, limiter=None):
+        if limiter is not None:
+            await limiter.wait()
+        self.started.append(time.perf_counter())
+        self.active[host] = self.active.get(host, 0) + 1
+        self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        self.peak_total = max(self.peak_total, sum(self.active.values()))
+        await asyncio.sleep(self.delay)
+        self.active[host] -= 1
+        return PortResult(host, port, port % 2 == 0, self.delay)
+
+
+def test_parse():
+    assert parse_target("1.2.3.4:8080") == ("1.2.3.4", 8080)
+    assert parse_target("socks5://u:p@1.2.3.4:1080") == ("1.2.3.4", 1080)
+    assert parse_target("[::1]:80") == ("::1", 80)
+    assert parse_target(("example.com", "443")) == ("example.com", 443)
+    for invalid in ("1.2.3.4", "1.2.3.4:0", "1.2.3.4:70000"):
+        with pytest.raises(ValueError):
+            parse_target(invalid)
+    assert parse_ports("80, 3128-3130,80,8080") == [80, 3128, 3129, 3130, 8080]
+    with pytest.raises(ValueError):
+        parse_ports("0-10")
+
+
+def test_scan_reports_every_state():
+    farm = ListenerFarm(open_count=3, closed_count=2, filtered_count=1)
+    targets = (
+        [f"127.0.0.1:{port}" for port in farm.open + farm.closed + farm.filtered]
+        + [("127.0.0.1", farm.open[0])]
+        + ["not-a-target", "a..b:80"]
+    )
+    results = []
+    tracker = LatencyTracker()
+    try:
+        found = scan_ports(targets, results.append, timeout=0.5, tracker=tracker)
+    finally:
+        farm.close()
+
+    assert len(results) == len(targets)
+    assert sorted(result.port for result in found) == sorted(farm.open + farm.open[:1])
+    errors = {result.port: result.error for result in results if not result.open}
+    assert [errors[port] for port in farm.closed] == ["refused", "refused"]
+    assert errors[farm.filtered[0]] == "timed out"
+    assert errors[0] == "invalid"
+    # a hostname getaddrinfo rejects is a closed port, not a crashed scan
+    assert errors[80]
+    assert tracker.stats(f"127.0.0.1:{farm.open[1]}").srtt < 0.5
+    assert tracker.stats(f"127.0.0.1:{farm.closed[0]}").srtt is None
+
+
+def test_concurrency_caps():
+    async def main():
+        scanner = SleepingScanner(concurrency=10, per_host=3)
+        targets = [(f"10.0.0.{host}", port) for port in range(1, 21) for host in (1, 2)]
+        targets += [("10.0.0.3", port) for port in range(1, 41)]
+        found = await scanner.scan(iter(targets))
+        assert len(found) == 40
+        assert scanner.peak == {"10.0.0.1": 3, "10.0.0.2": 3, "10.0.0.3": 3}
+        assert scanner.peak_total == 9
+
+        scanner = SleepingScanner(delay=0, rate=200)
+        results = []
+        await scanner.scan(
+            [("10.0.0.1", port) for port in range(1, 51)], results.append
+        )
+        assert len(results) == 50
+        span = scanner.started[-1] - scanner.started[0]
+        assert 49 / 200 * 0.9 <= span < 1.0
+
+    asyncio.run(main())
+
+
+def test_event_stops_the_scan():
+    farm = ListenerFarm(filtered_count=1)
+    event = threading.Event()
+    targets = [("127.0.0.1", farm.filtered[0])] * 50 + [("127.0.0.1", 1)] * 50
+    results = []
+    threading.Timer(0.2, event.set).start()
+    start = time.perf_counter()
+    try:
+        scan_ports(targets, results.append, event, concurrency=50, timeout=5)
+    finally:
+        farm.close()
+    # the filtered connects in flight are dropped instead of timing out
+    assert time.perf_counter() - start < 2
+    assert results == []
+
+
+def test_benchmark_against_thread_fan_out():
+    farm = ListenerFarm(open_count=100, closed_count=100, filtered_count=20)
+    # dead hosts dominate real scans: most targets never answer
+    targets = [f"127.0.0.1:{port}" for port in farm.open + farm.closed]
+    targets += [f"127.0.0.1:{port}" for port in farm.filtered] * 15
+    timeout = 0.5
+    try:
+        tracker = LatencyTracker()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            states = list(
+                executor.map(lambda t: is_port_open(t, timeout, tracker), targets)
+            )
+        threaded = time.perf_counter() - start
+        threaded_open = {target for target, ok in zip(targets, states) if ok}
+
+        start = time.perf_counter()
+        found = scan_ports(targets, concurrency=2000, per_host=2000, timeout=timeout)
+        scanned = time.perf_counter() - start
+    finally:
+        farm.close()
+
+    print(
+        f"\n{len(targets)} targets: 50 threads {threaded:.2f}s "
+        f"({len(targets) / threaded:.0f}/s), "
+        f"async scanner {scanned:.2f}s ({len(targets) / scanned:.0f}/s)"
+    )
+    assert {result.address for result in found} == threaded_open
+    assert len(threaded_open) == 100
+    assert scanned * 3 < threaded
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
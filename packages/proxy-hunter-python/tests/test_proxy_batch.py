@@ -0,0 +1,117 @@
+import json
+import pickle
+import sqlite3
+import sys
+import tracemalloc
+import pytest
+from proxy_hunter import Proxy, ProxyBatch, dict_to_proxy_list
+
+ROWS = 20000
+
+
+def make_rows(count: int) -> list:
+    return [
+        {
+            "id": i + 1,
+            "proxy": f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}:{1024 + i % 50000}",
+            "status": "active" if i % 3 else "dead",
+            "type": "http-socks5",
+            "country": ["Indonesia", "United States", "Germany"][i % 3],
+            "latency": str(100 + i % 900),
+            "last_check": f"2024-01-{i % 28 + 1:02d}T10:{i % 60:02d}:00+07:00",
+        }
+        for i in range(count)
+    ]
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert result is not None
+    return size
+
+
+def test_proxy_attribute_api_is_unchanged():
+    proxy = Proxy("1.2.3.4:8080", status="active", username="u", password="p")
+    assert proxy.status == "active"
+    assert proxy.has_credentials() and proxy.format() == "1.2.3.4:8080@u:p"
+    proxy.status = "dead"
+    # attributes outside the table columns still work
+    proxy.from_dict(last_check_ts=123, status="active")
+    assert proxy.last_check_ts == 123
+    data = proxy.to_dict()
+    assert list(data)[:2] == ["id", "proxy"]
+    assert data["status"] == "active" and data["last_check_ts"] == 123
+    assert json.loads(proxy.to_json())["proxy"] == "1.2.3.4:8080"
+    assert pickle.loads(pickle.dumps(proxy)).to_dict() == data
+    assert "last_check_ts: 123" in str(proxy)
+
+
+def test_proxy_batch_round_trip():
+    rows = make_rows(100) + [
+        {"id": 500, "proxy": "[2001:db8::1]:8080", "status": "active"},
+        {"id": 501, "proxy": "proxy.example.com:3128", "status": "active"},
+        {"id": 502, "proxy": "01.2.3.4:080", "status": "dead"},
+    ]
+    batch = ProxyBatch(["status", "country", "latency", "last_check"])
+    for row in rows:
+        batch.append(row)
+    assert len(batch) == len(rows)
+    assert list(batch.iter_proxies()) == [row["proxy"] for row in rows]
+    assert batch[-1].proxy == "01.2.3.4:080"
+    assert batch[0].country == "Indonesia" and batch[0].id == 1
+    assert [p.status for p in batch] == [row["status"] for row in rows]
+    with pytest.raises(IndexError):
+        batch[len(rows)]
+
+    from_tuples = ProxyBatch(["status"])
+    names = ["id", "proxy", "ip", "status"]
+    from_tuples.extend_rows(
+        names, [(row["id"], row["proxy"], None, row["status"]) for row in rows]
+    )
+    assert [(p.id, p.proxy, p.status) for p in from_tuples] == [
+        (row["id"], row["proxy"], row["status"]) for row in rows
+    ]
+
+
+def test_memory_reduction():
+    columns = ["id", "proxy", "status", "type", "country", "latency", "last_check"]
+    conn = sqlite3.connect(":memory:")
+    conn.execute(f"CREATE TABLE proxies ({', '.join(columns)})")
+    conn.executemany(
+        f"INSERT INTO proxies VALUES ({', '.join('?' * len(columns))})",
+        [tuple(row[c] for c in columns) for row in make_rows(ROWS)],
+    )
+    sql = f"SELECT {', '.join(columns)} FROM proxies"
+
+    def load_dicts():
+        # what ProxyDB.select returns: one dict per row
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(sql)]
+        finally:
+            conn.row_factory = None
+
+    def load_batch():
+        batch = ProxyBatch(columns)
+        batch.extend_rows(columns, conn.execute(sql).fetchall())
+        return batch
+
+    dicts = measure(load_dicts)
+    proxies = measure(lambda: dict_to_proxy_list(load_dicts()))
+    batch = measure(load_batch)
+    print(
+        f"per row: dict {dicts / ROWS:.0f} B, Proxy {proxies / ROWS:.0f} B, "
+        f"ProxyBatch {batch / ROWS:.0f} B"
+    )
+    assert proxies < dicts
+    assert batch * 3 < dicts
+    assert batch * 2 < proxies
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
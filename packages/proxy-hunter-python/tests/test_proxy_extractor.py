@@ -1,6 +1,8 @@
+import os
 import sys
+import time
 import pytest
-from proxy_hunter import extract_proxies
+from proxy_hunter import extract_proxies, iter_extract_proxies
 
 
 def test_extract_proxies_ip_port_only():
@@ -186,5 +188,52 @@ def test_extract_single_proxy_invalid(proxy, reason):
     assert not result, f"Expected invalid proxy for case: {reason}"
 
 
+def test_iter_extract_proxies_yields_in_input_order():
+    input_str = (
+        '{"ip":"10.1.1.1","port":"3128"}\n'
+        "10.2.2.2 8080\n"
+        "u:p@10.3.3.3:1080 10.2.2.2:8080 10.3.3.3:1080\n"
+    )
+    proxies = [
+        (p.proxy, p.username, p.password) for p in iter_extract_proxies(input_str)
+    ]
+    assert proxies == [
+        ("10.1.1.1:3128", None, None),
+        ("10.2.2.2:8080", None, None),
+        ("10.3.3.3:1080", "u", "p"),
+        ("10.3.3.3:1080", None, None),
+    ]
+    # extract_proxies finds the same proxies, grouped per format
+    assert set(proxies) == {
+        (p.proxy, p.username, p.password) for p in extract_proxies(input_str)
+    }
+    assert list(iter_extract_proxies("")) == []
+
+
+@pytest.mark.skipif(
+    not os.environ.get("PROXY_HUNTER_BENCHMARK"),
+    reason="wall-clock benchmark, set PROXY_HUNTER_BENCHMARK=1 to run it",
+)
+def test_extract_proxies_throughput():
+    lines = []
+    for i in range(20000):
+        ip = f"{i % 223 + 1}.{i % 251}.{i % 241}.{i % 239}"
+        lines.append(
+            f"2024-01-01 12:{i % 60:02d}:00 INFO checked {ip}:{1024 + i % 60000} "
+            f"via user{i % 7}:secret@{ip}:8080 latency={i % 900}ms status=ok"
+        )
+        if i % 10 == 0:
+            lines.append(f'{{"ip":"{ip}","port":"3128"}} {ip} 3129')
+    data = "\n".join(lines)
+    start = time.perf_counter()
+    result = extract_proxies(data)
+    elapsed = time.perf_counter() - start
+    megabytes = len(data) / 1_000_000
+    print(f"{megabytes / elapsed:.2f} MB/s, {len(result)} proxies")
+    assert len(result) == len({(p.proxy, p.username) for p in result})
+    # the previous multi-pass implementation managed ~0.25 MB/s on this log
+    assert megabytes / elapsed > 1
+
+
 if __name__ == "__main__":
     sys.exit(pytest.main([__file__]))
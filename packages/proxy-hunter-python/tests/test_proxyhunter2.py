@@ -0,0 +1,53 @@
+import os
+import signal
+import socket
+import sys
+import threading
+import pytest
+from proxy_hunter import proxyhunter2
+
+
+def closed_ports(count):
+    ports = []
+    for _ in range(count):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        ports.append(sock.getsockname()[1])
+        sock.close()
+    return ports
+
+
+def test_signal_only_cancels_and_queues_close_after_the_workers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(proxyhunter2, "queues", {})
+    monkeypatch.setattr(proxyhunter2, "cancel_event", threading.Event())
+    proxies = [f"127.0.0.1:{port}" for port in closed_ports(6)]
+    queue = proxyhunter2.get_queue("127.0.0.1")
+    queue.push_many(proxies)
+    checked = []
+
+    def callback(proxy, is_open, is_proxy):
+        checked.append(proxy)
+        if len(checked) == 3:
+            proxyhunter2.request_cancel(signal.SIGINT, None)
+            # the handler leaves the queue alone while its batch is in flight
+            assert queue._inflight
+
+    proxyhunter2.iterate_gen_ports("127.0.0.1", callback, batch_size=2)
+    assert 3 <= len(checked) < len(proxies)
+    # compacted and closed once the workers stopped
+    assert queue._reader is None
+    with open(queue.path, encoding="utf-8") as f:
+        remaining = f.read().split()
+    assert set(proxies[:2]).isdisjoint(remaining)
+    assert set(proxies) - set(checked) <= set(remaining)
+
+    # a drained queue is left empty, without an open reader
+    proxyhunter2.cancel_event.clear()
+    proxyhunter2.iterate_gen_ports("127.0.0.1", batch_size=2)
+    assert queue._reader is None
+    assert os.path.getsize(queue.path) == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
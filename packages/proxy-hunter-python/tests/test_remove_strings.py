@@ -0,0 +1,118 @@
+import sys
+import time
+import pytest
+from proxy_hunter import (
+    DiskStringSet,
+    remove_string_from_file,
+    remove_strings_from_file,
+)
+
+
+def make_proxies(count: int) -> list:
+    return [
+        f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}:8080" for i in range(count)
+    ]
+
+
+def test_removes_every_string_beyond_the_old_cap(tmp_path):
+    proxies = make_proxies(5000)
+    path = tmp_path / "proxies.txt"
+    path.write_text(
+        "\n".join(f"{p} checked" for p in proxies) + "\nkeep 8.8.8.8:80\n",
+        encoding="utf-8",
+    )
+    counts = remove_strings_from_file(path, proxies[:3000])
+    assert counts == {"lines": 5001, "changed": 3000, "removed": 3000}
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[:3000] == [" checked"] * 3000
+    assert lines[3000:] == [f"{p} checked" for p in proxies[3000:]] + [
+        "keep 8.8.8.8:80"
+    ]
+
+
+def test_matches_on_token_boundaries(tmp_path):
+    path = tmp_path / "mixed.txt"
+    path.write_text(
+        "1.2.3.4:80\n1.2.3.4:8080\nhttp://1.2.3.4:80/x,1.2.3.4:80\nfoo bar baz\n",
+        encoding="utf-8",
+    )
+    remove_strings_from_file(path, {"1.2.3.4:80", "bar baz"})
+    assert path.read_text(encoding="utf-8") == "\n1.2.3.4:8080\nhttp:///x,\nfoo \n"
+
+
+def test_boundary_only_applies_to_alphanumeric_edges(tmp_path):
+    path = tmp_path / "edges.txt"
+    path.write_text(
+        "host:80\nhost:8080\nabc-xyz\nab-xyzw\n1.2.3.4é\nx1.2.3.4\n",
+        encoding="utf-8",
+    )
+    counts = remove_strings_from_file(path, [":80", "-xyz", "1.2.3.4"])
+    # ':80' and '-xyz' may follow anything; letters and digits are ASCII only
+    assert path.read_text(encoding="utf-8") == (
+        "host\nhost:8080\nabc\nab-xyzw\né\nx1.2.3.4\n"
+    )
+    assert counts["removed"] == 3
+
+
+def test_strings_spanning_lines(tmp_path):
+    path = tmp_path / "multi.txt"
+    path.write_text("a\n1.1.1.1:80\n2.2.2.2:80\nb\n", encoding="utf-8")
+    counts = remove_strings_from_file(path, ["1.1.1.1:80\n2.2.2.2:80\n", "b"])
+    assert path.read_text(encoding="utf-8") == "a\n\n"
+    assert counts == {"lines": 4, "changed": 2, "removed": 2}
+
+
+def test_exact_matches_and_trailing_lines(tmp_path):
+    path = tmp_path / "exact.txt"
+    path.write_text("1.1.1.1:80\nx 1.1.1.1:80\n2.2.2.2:80\n\n\n", encoding="utf-8")
+    remove_string_from_file(str(path), ["1.1.1.1:80", "2.2.2.2:80"], exact_matches=True)
+    assert path.read_text(encoding="utf-8") == "\nx 1.1.1.1:80\n\n\n\n"
+
+    counts = remove_strings_from_file(path, [], clear_trailing_empty_lines=True)
+    assert counts["removed"] == 0
+    assert path.read_text(encoding="utf-8") == "\nx 1.1.1.1:80\n"
+
+    # strings with whitespace match whole lines too
+    path.write_text("foo bar\nfoo bar baz\n", encoding="utf-8")
+    counts = remove_strings_from_file(path, ["foo bar"], exact_matches=True)
+    assert counts["removed"] == 1
+    assert path.read_text(encoding="utf-8") == "\nfoo bar baz\n"
+
+
+def test_untouched_file_is_not_rewritten(tmp_path):
+    path = tmp_path / "same.txt"
+    path.write_text("a\nb\n", encoding="utf-8")
+    before = path.stat().st_mtime_ns
+    time.sleep(0.01)
+    assert remove_strings_from_file(path, ["c"])["removed"] == 0
+    assert path.stat().st_mtime_ns == before
+    assert [p.name for p in tmp_path.iterdir()] == ["same.txt"]
+
+
+def test_disk_string_set(tmp_path):
+    proxies = make_proxies(2000)
+    path = tmp_path / "proxies.txt"
+    path.write_text("\n".join(f"{p} ok" for p in proxies) + "\n", encoding="utf-8")
+    with DiskStringSet(tmp_path / "processed.sqlite") as processed:
+        processed.update(proxies[::2], chunk_size=100)
+        assert len(processed) == 1000 and proxies[0] in processed
+        counts = remove_strings_from_file(path, processed)
+    assert counts["removed"] == 1000
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[:2] == [" ok", f"{proxies[1]} ok"]
+
+
+def test_linear_in_number_of_strings(tmp_path):
+    proxies = make_proxies(100000)
+    path = tmp_path / "large.txt"
+    path.write_text("\n".join(proxies) + "\n", encoding="utf-8")
+    start = time.perf_counter()
+    counts = remove_strings_from_file(path, proxies[::2])
+    elapsed = time.perf_counter() - start
+    assert counts["removed"] == 50000
+    # the regex alternation took minutes (and was capped to 1000 strings)
+    assert elapsed < 5, elapsed
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
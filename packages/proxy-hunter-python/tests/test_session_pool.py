@@ -0,0 +1,124 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from proxy_hunter import SessionPool, build_request
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with KeepAliveHandler.lock:
+            KeepAliveHandler.connections += 1
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture()
+def endpoint():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    KeepAliveHandler.connections = 0
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_pooled_requests_reuse_the_connection(endpoint):
+    for _ in range(5):
+        assert build_request(endpoint=endpoint, cookie_file=None).ok
+    assert KeepAliveHandler.connections == 5
+
+    KeepAliveHandler.connections = 0
+    pool = SessionPool()
+    for _ in range(5):
+        assert build_request(endpoint=endpoint, cookie_file=None, session_pool=pool).ok
+    assert KeepAliveHandler.connections == 1
+    assert len(pool) == 1
+    pool.close()
+
+
+def test_sessions_are_leased_exclusively(endpoint):
+    pool = SessionPool()
+    first = pool.acquire("http://1.1.1.1:80")
+    second = pool.acquire("http://1.1.1.1:80")
+    assert first is not second
+    pool.release(first)
+    assert pool.acquire("http://1.1.1.1:80") is first
+    assert pool.acquire("http://2.2.2.2:80") is not first
+
+    def check(_):
+        return build_request(endpoint=endpoint, cookie_file=None, session_pool=pool)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(r.ok for r in executor.map(check, range(40)))
+    assert 1 <= len(pool) <= 8
+
+
+def test_failed_requests_close_their_session(endpoint):
+    closed = []
+
+    class TrackedPool(SessionPool):
+        def acquire(self, proxy_url=None):
+            session = super().acquire(proxy_url)
+            close = session.close
+
+            def tracked_close():
+                closed.append(session)
+                close()
+
+            session.close = tracked_close
+            return session
+
+    pool = TrackedPool()
+    with pytest.raises(ValueError):
+        build_request(endpoint=endpoint, method="BREW", session_pool=pool)
+    with pytest.raises(TypeError):
+        build_request(endpoint=endpoint, cookie_file=None, session_pool=pool, bad=1)
+    with pytest.raises(requests.RequestException):
+        build_request(
+            endpoint="http://127.0.0.1:1/", cookie_file=None, session_pool=pool
+        )
+    assert len(closed) == 3
+
+    assert build_request(endpoint=endpoint, cookie_file=None, session_pool=pool).ok
+    assert len(closed) == 3 and len(pool) == 1
+
+
+def test_eviction():
+    pool = SessionPool(max_sessions=2)
+    sessions = [pool.acquire(f"http://10.0.0.{i}:80") for i in range(3)]
+    for session in sessions:
+        pool.release(session)
+    # the least recently released proxy was dropped
+    assert len(pool) == 2
+    assert pool.acquire("http://10.0.0.0:80") not in sessions
+    assert pool.acquire("http://10.0.0.2:80") is sessions[2]
+
+    idle = SessionPool(idle_timeout=0)
+    session = idle.acquire("http://10.0.0.9:80")
+    session.headers["X-Test"] = "1"
+    idle.release(session)
+    assert len(idle) == 0
+    assert idle.acquire("http://10.0.0.9:80") is not session
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,93 @@
+import os
+import sys
+import pytest
+from proxy_hunter import WorkQueue, file_move_lines
+
+
+def read_head(path: str) -> int:
+    if not os.path.exists(f"{path}.head"):
+        return 0
+    with open(f"{path}.head", encoding="utf-8") as f:
+        return int(f.read())
+
+
+def test_pop_ack_and_resume(tmp_path):
+    path = str(tmp_path / "queue.txt")
+    queue = WorkQueue(path)
+    assert queue.pop_batch(10) == []
+    assert queue.push_many(f"1.2.3.4:{port}" for port in range(1, 11)) == 10
+
+    first = queue.pop_batch(4)
+    assert [item.value for item in first] == [f"1.2.3.4:{p}" for p in range(1, 5)]
+    # out of order: the head only moves past a contiguous acknowledged prefix
+    queue.ack(first[1:])
+    assert read_head(path) == 0
+    queue.ack(first[0])
+    assert read_head(path) == first[-1].end
+    unacked = queue.pop_batch(2)
+    queue.close()
+
+    # a new queue on the same file re-delivers what was not acknowledged
+    resumed = WorkQueue(path)
+    values = [item.value for item in resumed.pop_batch(100)]
+    assert values == [item.value for item in unacked] + [
+        f"1.2.3.4:{p}" for p in range(7, 11)
+    ]
+    assert not resumed.pending()
+
+    # or the same queue, once its workers are gone
+    resumed.requeue()
+    assert [item.value for item in resumed.pop_batch(100)] == values
+
+
+def test_reads_plain_text_files(tmp_path):
+    path = tmp_path / "legacy.txt"
+    path.write_text("a\n\nb\r\nc", encoding="utf-8")
+    queue = WorkQueue(str(path))
+    items = queue.pop_batch(10)
+    assert [item.value for item in items] == ["a", "b", "c"]
+    queue.push("d")
+    assert [item.value for item in queue.pop_batch(10)] == ["d"]
+    queue.ack(items)
+    assert read_head(str(path)) == len("a\n\nb\r\nc\n")
+
+
+def test_compaction(tmp_path):
+    path = str(tmp_path / "queue.txt")
+    queue = WorkQueue(path, compact_bytes=100)
+    queue.push_many(f"10.0.0.{i}:8080" for i in range(100))
+    queue.ack(queue.pop_batch(60))
+    size = os.path.getsize(path)
+    assert size == 40 * len("10.0.0.60:8080\n")
+    assert read_head(path) == 0
+    queue.push("10.0.0.200:8080")
+    rest = [item.value for item in queue.pop_batch(100)]
+    assert rest == [f"10.0.0.{i}:8080" for i in range(60, 100)] + ["10.0.0.200:8080"]
+
+    queue.clear()
+    assert not os.path.exists(path) and not os.path.exists(f"{path}.head")
+
+
+def test_ack_is_constant_io(tmp_path):
+    path = str(tmp_path / "ports.txt")
+    queue = WorkQueue(path, compact_bytes=1 << 30)
+    queue.push_many(f"1.2.3.4:{port}" for port in range(1, 65536))
+    before = os.stat(path)
+    for item in queue.pop_batch(1000):
+        queue.ack(item)
+    after = os.stat(path)
+    # the queue file itself is never rewritten while consuming
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+
+def test_file_move_lines(tmp_path):
+    source = tmp_path / "source.txt"
+    destination = tmp_path / "destination.txt"
+    source.write_text("".join(f"{i}\n" for i in range(10)), encoding="utf-8")
+    file_move_lines(str(source), str(destination), 3)
+    assert destination.read_text(encoding="utf-8") == "0\n1\n2\n"
+    assert source.read_text(encoding="utf-8") == "".join(f"{i}\n" for i in range(3, 10))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__]))
@@ -1,5 +1,4 @@
 from src.utils.parse_args import parse_args
-import concurrent.futures
 import os
 import random
 import threading
@@ -13,31 +12,41 @@ from joblib import Parallel, delayed
 from proxyWorking import ProxyWorkingManager
 from proxy_checker import ProxyChecker
 from proxy_hunter import (
+    CheckPipeline,
+    SessionPool,
     build_request,
-    check_raw_headers_keywords,
     decompress_requests_response,
     delete_path,
-    extract_proxies,
     file_append_str,
-    read_all_text_files,
-    read_file,
+    get_judge_url,
+    get_session_pool,
+    iter_proxies_from_files,
+    list_text_files,
     sanitize_filename,
     truncate_file_content,
 )
-from proxy_hunter import check_proxy
+from proxy_hunter.curl.judge import JUDGE_TITLE
 from src.ProxyDB import ProxyDB
 from src.func import get_relative_path
 from src.func_console import green, log_proxy, red
-from src.func_date import is_date_rfc3339_hour_more_than
 
 
 class ProxyCheckerReal:
-    def __init__(self, log_mode: str = "text"):
+    def __init__(
+        self,
+        log_mode: str = "text",
+        session_pool: Optional[SessionPool] = None,
+        pipeline: Optional[CheckPipeline] = None,
+    ):
         """
         Initializes the ProxyCheckerReal instance.
 
         Args:
             log_mode (str): The logging mode, either 'html' or 'text'.
+            session_pool (Optional[SessionPool]): Pool reusing connections across
+                the checks of a proxy. Defaults to the process-wide pool.
+            pipeline (Optional[CheckPipeline]): Staged checker of `real_check`,
+                caching the connect and sniff stages of each proxy across URLs.
         """
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -45,6 +54,8 @@ class ProxyCheckerReal:
             "Accept-Language": "en-US,en;q=0.9",
         }
         self.log_mode = log_mode
+        self.session_pool = session_pool or get_session_pool()
+        self.pipeline = pipeline or CheckPipeline(headers=self.headers)
 
     def log(self, *args, **kwargs):
         """
@@ -85,60 +96,34 @@ class ProxyCheckerReal:
             truncate_file_content(output_file)
         response_title = ""
 
-        def check_proxy_with_cancellation(proxy_type: str):
-            if cancel_event and cancel_event.is_set():
-                return None  # Early exit if cancellation is requested
-            return check_proxy(
-                proxy, proxy_type, url, self.headers, cancel_event=cancel_event
-            )
-
-        executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
-        future_to_proxy_type = {
-            executor.submit(check_proxy_with_cancellation, proxy_type): proxy_type
-            for proxy_type in ["socks4", "http", "socks5"]
-        }
-
-        for future in concurrent.futures.as_completed(future_to_proxy_type):
-            proxy_type = future_to_proxy_type[future]
-            # if cancel_event and cancel_event.is_set():
-            #     self.log(
-            #         f"Cancellation requested, stopping check for {proxy_type}://{proxy}."
-            #     )
-            #     break
-            try:
-                check = future.result()
-                if check is None:
-                    continue  # Skip if the result is None due to cancellation
-                log = f"{check.type}://{check.proxy}\n"
-                log += f"RESULT: {'true' if check.result else 'false'}\n"
-                if not check.result and check.error:
-                    log += f"ERROR: {check.error.strip()}\n"
-                if check.response and check.response.ok:
-                    log += "RESPONSE HEADERS:\n"
-                    for key, value in check.response.headers.items():
-                        log += f"  {key}: {value}\n"
-                    response_text = decompress_requests_response(check.response)
-                    if response_text:
-                        soup = BeautifulSoup(response_text, "html.parser")
-                        response_title = (
-                            soup.title.string.strip()
-                            if soup.title and soup.title.string
-                            else ""
-                        )
-                        if (
-                            not check_raw_headers_keywords(response_text)
-                            and response_title.lower() != "AZ Environment".lower()
-                        ):
-                            log += f"TITLE: {response_title}\n"
-                            if title_should_be.lower() in response_title.lower():
-                                if check.type is not None:
-                                    protocols.append(check.type.lower())
-                file_append_str(output_file, log)
-            except Exception as e:
-                self.log(
-                    f"real_check({proxy_type}://{proxy}) check generated an exception: {e}"
+        fetches = {}
+        if not (cancel_event and cancel_event.is_set()):
+            # cheap stages first: only the protocols the proxy speaks are fetched
+            check = self.pipeline.check_sync(proxy, url, title_should_be)
+            fetches = check.fetches
+            if not fetches:
+                failed = check.stages[-1]
+                file_append_str(
+                    output_file, f"{proxy}\nRESULT: false\nERROR: {failed.error}\n"
                 )
 
+        for proxy_type, fetch in fetches.items():
+            log = f"{proxy_type}://{proxy}\n"
+            log += f"RESULT: {'true' if fetch.ok else 'false'}\n"
+            if not fetch.ok and fetch.error:
+                log += f"ERROR: {fetch.error.strip()}\n"
+            if fetch.value is not None and fetch.value.ok:
+                log += f"STATUS: {fetch.value.status_code}\n"
+                response_title = fetch.value.title
+                if (
+                    not fetch.value.echoes_request
+                    and response_title.lower() != "AZ Environment".lower()
+                ):
+                    log += f"TITLE: {response_title}\n"
+                    if fetch.ok:
+                        protocols.append(proxy_type)
+            file_append_str(output_file, log)
+
         # if os.path.exists(output_file):
         #     self.log(f"Logs written {output_file}")
 
@@ -178,20 +163,42 @@ class ProxyCheckerReal:
         """
         checker = ProxyChecker(60000, False)
         result = None
-        for url in checker.anonymity_helper.proxy_judges:
+        judges = list(checker.anonymity_helper.proxy_judges)
+        if get_judge_url():
+            # the self-hosted judge serves the same page as data/azenv.php
+            judges.insert(0, get_judge_url("/azenv"))
+        for url in judges:
             response = None
             try:
-                response = build_request(proxy, "http", endpoint=url)
+                response = build_request(
+                    proxy,
+                    "http",
+                    endpoint=url,
+                    cookie_file=None,
+                    session_pool=self.session_pool,
+                )
             except Exception:
                 pass
             if response and not response.ok:
                 try:
-                    response = build_request(proxy, "socks4", endpoint=url)
+                    response = build_request(
+                        proxy,
+                        "socks4",
+                        endpoint=url,
+                        cookie_file=None,
+                        session_pool=self.session_pool,
+                    )
                 except Exception:
                     pass
             if response and not response.ok:
                 try:
-                    response = build_request(proxy, "socks5", endpoint=url)
+                    response = build_request(
+                        proxy,
+                        "socks5",
+                        endpoint=url,
+                        cookie_file=None,
+                        session_pool=self.session_pool,
+                    )
                 except Exception:
                     pass
             if response and response.ok:
@@ -231,6 +238,8 @@ class ProxyCheckerReal:
             ["http://www.example.net/", "example"],
             ["http://www.example.com/", "example"],
         ]
+        if get_judge_url():
+            configs.insert(0, [get_judge_url("/"), JUDGE_TITLE])
         for config in configs:
             url, title_should_be = tuple(config)
             response = None
@@ -240,7 +249,12 @@ class ProxyCheckerReal:
             try:
                 start_time = time.time()
                 response = build_request(
-                    proxy, "http", endpoint=url, allow_redirects=True
+                    proxy,
+                    "http",
+                    endpoint=url,
+                    allow_redirects=True,
+                    cookie_file=None,
+                    session_pool=self.session_pool,
                 )
                 end_time = time.time()
             except Exception:
@@ -250,7 +264,12 @@ class ProxyCheckerReal:
                 try:
                     start_time = time.time()
                     response = build_request(
-                        proxy, "socks4", endpoint=url, allow_redirects=True
+                        proxy,
+                        "socks4",
+                        endpoint=url,
+                        allow_redirects=True,
+                        cookie_file=None,
+                        session_pool=self.session_pool,
                     )
                     end_time = time.time()
                 except Exception:
@@ -260,7 +279,12 @@ class ProxyCheckerReal:
                 try:
                     start_time = time.time()
                     response = build_request(
-                        proxy, "socks5", endpoint=url, allow_redirects=True
+                        proxy,
+                        "socks5",
+                        endpoint=url,
+                        allow_redirects=True,
+                        cookie_file=None,
+                        session_pool=self.session_pool,
                     )
                     end_time = time.time()
                 except Exception:
@@ -328,26 +352,35 @@ def worker(item: Dict[str, Any]):
     try:
         db = ProxyDB(get_relative_path("src/database.sqlite"))
         test = {}
-        if not test.get("result"):
-            test = real_check(
-                item["proxy"], "https://www.axis.co.id/bantuan", "pusat layanan"
-            )
-        if not test.get("result"):
-            test = real_check(
-                item["proxy"], "https://www.ssl.org/", "SSL Certificate Checker"
-            )
+        judge_only = False
+        if get_judge_url():
+            test = real_check(item["proxy"], get_judge_url("/"), JUDGE_TITLE)
+            judge_only = bool(test.get("result"))
+        # a plain http judge says nothing about https, so the https pages
+        # still run after it
+        for url, title in (
+            ("https://www.axis.co.id/bantuan", "pusat layanan"),
+            ("https://www.ssl.org/", "SSL Certificate Checker"),
+        ):
+            if test.get("https"):
+                break
+            https_test = real_check(item["proxy"], url, title)
+            if https_test.get("result"):
+                test = https_test
+                judge_only = False
         if not test.get("result"):
             test = real_check(item["proxy"], "http://httpforever.com/", "HTTP Forever")
 
         if test.get("result"):
-            db.update_data(
-                item["proxy"],
-                {
-                    "status": "active",
-                    "https": "true" if test["https"] else "false",
-                    "type": ("-".join(test["type"]).lower() if "type" in test else ""),
-                },
-            )
+            data = {
+                "status": "active",
+                "type": ("-".join(test["type"]).lower() if "type" in test else ""),
+            }
+            # https failed on two sites after the judge: maybe the sites are
+            # down, so the flag is left as it was
+            if not judge_only or test["https"]:
+                data["https"] = "true" if test["https"] else "false"
+            db.update_data(item["proxy"], data)
             # write working.json
             wmg = ProxyWorkingManager()
             wmg._load_db()
@@ -380,7 +413,11 @@ def using_pool(proxies: List[Dict[str, Any]], pool_size: int = 5):
 
 
 def using_joblib(proxies: List[dict], pool_size: int = 5):
-    return Parallel(n_jobs=pool_size)(delayed(worker)(item) for item in proxies)
+    # threads, not processes: the checks are I/O bound and the workers have to
+    # share the latency tracker (and session pool) of this process
+    return Parallel(n_jobs=pool_size, prefer="threads")(
+        delayed(worker)(item) for item in proxies
+    )
 
 
 def test():
@@ -394,27 +431,25 @@ def test():
         log_proxy(f"{proxy} fail get latency")
 
 
-def main_real_proxy_checker(limit: int = 100):
+def main_real_proxy_checker(limit: int = 100, workers: int = 0):
     db = ProxyDB(get_relative_path("src/database.sqlite"), True)
-    files_content = read_all_text_files(get_relative_path("assets/proxies"))
+    file_paths = list_text_files(get_relative_path("assets/proxies"))
     if os.path.exists(get_relative_path("proxies.txt")):
-        files_content[get_relative_path("proxies.txt")] = str(
-            read_file(get_relative_path("proxies.txt"))
+        file_paths.append(get_relative_path("proxies.txt"))
+    seen = set()
+    for file_path in file_paths:
+        # Stream the file into the database without reading it whole; only the
+        # command line passes `workers` for a process pool
+        counts = db.ingest(
+            iter_proxies_from_files([file_path], workers=workers, seen=seen)
         )
-    for file_path, content in files_content.items():
-        extract = extract_proxies(content)
-        print(f"Total proxies extracted from {file_path} is {len(extract)}")
-        db.extract_proxies(content, True)
+        total = counts["added"] + counts["skipped"]
+        print(f"Total proxies extracted from {file_path} is {total}")
         delete_path(file_path)
 
-    proxies = db.get_working_proxies(False)
     hours_ago = 4
-    proxies = [
-        item
-        for item in proxies
-        if is_date_rfc3339_hour_more_than(item.get("last_check"), hours_ago)
-        # filter only working proxies checked more than [hours_ago] hours
-    ]
+    # filter only working proxies checked more than [hours_ago] hours
+    proxies = db.get_working_proxies(False, stale_hours=hours_ago)
     print(f"Re-test working proxies >{hours_ago} hours ago {len(proxies)}")
     if not proxies or len(proxies) < 100:
         proxies.extend(db.get_untested_proxies(limit))
@@ -422,10 +457,17 @@ def main_real_proxy_checker(limit: int = 100):
     if not proxies:
         proxies.extend(db.get_all_proxies(True)[:limit])
     random.shuffle(proxies)
+    # historically fast and recently alive proxies first; the checks derive
+    # their timeouts from the same history
+    tracker = db.load_latency_history()
+    proxies = tracker.order(proxies, key=lambda item: str(item.get("proxy") or ""))
 
     # using_pool(proxies[limit:], 5)
     using_joblib(proxies[:limit], 5)
+    # the cached stage results only matter within this run
+    instance_checker.pipeline.clear()
 
+    db.save_latency_history(tracker)
     db.close()
 
 
@@ -439,4 +481,4 @@ if __name__ == "__main__":
     # print(sc)
 
     # test()
-    main_real_proxy_checker(limit)
+    main_real_proxy_checker(limit, workers=os.cpu_count() or 1)
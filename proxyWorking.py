@@ -21,13 +21,14 @@ class ProxyWorkingManager:
 
     def _load_db(self):
         """Import and merge from database into working.json"""
-        db_data: List[Dict[str, Any]] = self.db.db.select("proxies", "*", "status = ?", ["active"])  # type: ignore
         file_data = self._load_data()
 
         # Create a dictionary for fast lookup
         existing_proxies = {entry.get("proxy"): entry for entry in file_data}
-        new_entries_dict = {
-            entry.get("proxy"): entry for entry in db_data if entry.get("proxy")
+        # columnar load: no row dict per proxy while the table is read
+        active = self.db.load_batch(where="status = ?", params=["active"])
+        new_entries_dict: Dict[Any, Dict[str, Any]] = {
+            proxy.proxy: proxy.to_dict() for proxy in active if proxy.proxy
         }
 
         # Merge new entries, retaining the most recent data for each proxy
@@ -9,10 +9,9 @@ if _REPO_ROOT not in sys.path:
     sys.path.insert(0, _REPO_ROOT)
 
 import threading
-from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
-from proxy_hunter import extract_ips, is_port_open
+from proxy_hunter import extract_ips, scan_ports
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QBrush, QColor, QIcon
 from PySide6.QtWidgets import (
@@ -293,8 +292,6 @@ class PortFinder(QWidget):
         self._open_count = 0
         self._start_time = None
         self._cancel_event = None
-        self._futures = None
-        self._executor = None
 
     def _autosave_manual_text(self):
         try:
@@ -444,72 +441,41 @@ class PortFinder(QWidget):
             pass
 
     def _scan_background(self, ips, ports_list, port_from, port_to):
-        # Cooperative cancellation: create an event and track futures/executor
+        # Cooperative cancellation: the scan stops once the event is set
         try:
             self._cancel_event = threading.Event()
-            created = 0
-            self._futures = []
-            self._executor = ThreadPoolExecutor(max_workers=50)
 
-            def _task_done_callback(fut, ip, port):
+            def _on_result(result):
                 # If aborted, skip processing results
-                try:
-                    if self._cancel_event is not None and self._cancel_event.is_set():
-                        return
-                    if fut.cancelled():
-                        return
-                    ok = fut.result()
-                except Exception:
-                    ok = False
+                if self._cancel_event is not None and self._cancel_event.is_set():
+                    return
                 # Emit result to UI via signal
                 try:
-                    self.result_signal.emit({"ip": ip, "port": port, "open": bool(ok)})
+                    self.result_signal.emit(
+                        {"ip": result.host, "port": result.port, "open": result.open}
+                    )
                 except Exception:
                     pass
 
-            # Submit tasks and report creation progress periodically
-            for ip in ips:
-                if self._cancel_event.is_set():
-                    break
-                for port in ports_list:
-                    if self._cancel_event.is_set():
-                        break
-                    addr = f"{ip}:{port}"
-                    fut = self._executor.submit(is_port_open, addr)
-                    self._futures.append(fut)
-                    # attach callback with captured ip/port
-                    fut.add_done_callback(
-                        lambda fut, ip=ip, port=port: _task_done_callback(fut, ip, port)
-                    )
-                    created += 1
-                    if created % 500 == 0 or created == self._total_tasks:
-                        try:
-                            self.status_signal.emit(
-                                f"Generating tasks: {created} / {self._total_tasks}"
-                            )
-                        except Exception:
-                            pass
-
-            # All tasks submitted (or aborted)
             try:
-                if not (self._cancel_event and self._cancel_event.is_set()):
-                    self.status_signal.emit("All tasks created, starting scan...")
-                else:
-                    self.status_signal.emit("Task generation aborted")
+                self.status_signal.emit("Scanning...")
             except Exception:
                 pass
 
-            # Wait for running tasks to finish unless aborted
+            # Targets are generated lazily while up to 1000 connects are in flight
+            targets = ((ip, port) for ip in ips for port in ports_list)
             try:
-                if self._executor:
-                    self._executor.shutdown(wait=True)
-            except Exception:
-                pass
+                scan_ports(
+                    targets,
+                    _on_result,
+                    self._cancel_event,
+                    concurrency=1000,
+                    timeout=5.0,
+                )
+            except Exception as e:
+                print(f"Port scan failed: {e}")
         finally:
-            # Clear executor/futures and reset cancel event
             try:
-                self._executor = None
-                self._futures = None
                 if self._cancel_event is not None and self._cancel_event.is_set():
                     self.status_signal.emit("Scan aborted")
             except Exception:
@@ -614,18 +580,11 @@ class PortFinder(QWidget):
             pass
 
     def _on_abort(self):
-        # Signal cancellation and attempt to cancel pending futures
+        # Signal cancellation; the scan drops the connects in flight
         try:
             if self._cancel_event is None:
                 return
             self._cancel_event.set()
-            # attempt to cancel futures that haven't started
-            if self._futures:
-                for fut in list(self._futures):
-                    try:
-                        fut.cancel()
-                    except Exception:
-                        pass
             try:
                 self.status_signal.emit("Abort requested — cancelling pending tasks...")
             except Exception:
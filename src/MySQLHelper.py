@@ -1,9 +1,33 @@
 import mysql.connector
 from mysql.connector import Error
-from typing import Any, List, Optional, Union, Dict, Sequence, cast
+from mysql.connector.errors import PoolError
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    Dict,
+    Sequence,
+    Set,
+    cast,
+)
+import functools
 import hashlib
+import random
+import threading
+import time
 
 DISCONNECT_ERRNOS = {2006, 2013, 2055, 4031}
+# `sample()` probes random keys in chunks of this size
+SAMPLE_PROBE_CHUNK = 500
+# Above this many random key probes `sample()` falls back to a reservoir over the keys
+SAMPLE_MAX_PROBES = 20000
 
 
 class MySQLConnection(mysql.connector.connection.MySQLConnection):
@@ -14,10 +38,206 @@ class MySQLConnection(mysql.connector.connection.MySQLConnection):
         print("This is a custom MySQL connection method.")
 
 
+class PooledConnection:
+    """A pooled connection plus its bookkeeping and prepared-statement cache."""
+
+    def __init__(self, conn: Any):
+        self.conn = conn
+        self.created = time.monotonic()
+        self.last_used = self.created
+        # SQL text -> (cached SQL object, prepared cursor); statements live per connection
+        self.prepared: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+
+    def close(self) -> None:
+        for _, cursor in self.prepared.values():
+            try:
+                cursor.close()
+            except Exception:
+                pass
+        self.prepared.clear()
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+class MySQLConnectionPool:
+    """
+    Thread-safe pool of MySQL connections.
+
+    Connections are opened lazily up to `size`, handed out LIFO, pinged when
+    they sat idle longer than `health_check_interval` seconds and replaced once
+    older than `max_lifetime` seconds. `acquire()` blocks up to `timeout`
+    seconds when every connection is checked out.
+
+    `MySQLConnectionPool.shared()` returns one pool per server/user/database so
+    every `MySQLHelper` of a process reuses the same connections instead of
+    paying a TCP and auth handshake each.
+    """
+
+    _shared: Dict[Tuple[Any, ...], "MySQLConnectionPool"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        size: int = 5,
+        max_lifetime: Optional[float] = 3600.0,
+        health_check_interval: Optional[float] = 30.0,
+        timeout: Optional[float] = 30.0,
+        connection_factory: Optional[Callable[[], Any]] = None,
+        **connect_kwargs: Any,
+    ):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.connection_factory = connection_factory or (
+            lambda: MySQLConnection(**connect_kwargs)
+        )
+        self._idle: List[PooledConnection] = []
+        self._opened = 0
+        self._cond = threading.Condition()
+
+    @classmethod
+    def shared(cls, size: int = 5, **connect_kwargs: Any) -> "MySQLConnectionPool":
+        """Return the process-wide pool for these connection arguments."""
+        key = tuple(sorted(connect_kwargs.items()))
+        with cls._shared_lock:
+            pool = cls._shared.get(key)
+            if pool is None:
+                pool = cls(size=size, **connect_kwargs)
+                cls._shared[key] = pool
+            return pool
+
+    def _expired(self, pooled: PooledConnection) -> bool:
+        return (
+            self.max_lifetime is not None
+            and time.monotonic() - pooled.created >= self.max_lifetime
+        )
+
+    def _healthy(self, pooled: PooledConnection) -> bool:
+        if self._expired(pooled):
+            return False
+        if (
+            self.health_check_interval is None
+            or time.monotonic() - pooled.last_used < self.health_check_interval
+        ):
+            return True
+        try:
+            pooled.conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, pooled: PooledConnection) -> None:
+        pooled.close()
+        with self._cond:
+            self._opened -= 1
+            self._cond.notify()
+
+    def acquire(self) -> PooledConnection:
+        """Check out a healthy connection, opening one while below `size`."""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._opened >= self.size:
+                    remaining = (
+                        None if deadline is None else deadline - time.monotonic()
+                    )
+                    if remaining is not None and remaining <= 0:
+                        raise PoolError(
+                            f"no MySQL connection available (pool size {self.size})"
+                        )
+                    self._cond.wait(remaining)
+                pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    self._opened += 1
+            if pooled is None:
+                try:
+                    return PooledConnection(self.connection_factory())
+                except BaseException:
+                    with self._cond:
+                        self._opened -= 1
+                        self._cond.notify()
+                    raise
+            if self._healthy(pooled):
+                return pooled
+            self._discard(pooled)
+
+    def release(self, pooled: PooledConnection, discard: bool = False) -> None:
+        """Return a connection; broken or expired ones are closed instead."""
+        if discard or self._expired(pooled):
+            self._discard(pooled)
+            return
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Close the idle connections; checked-out ones close on release."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+        for pooled in idle:
+            pooled.close()
+
+
+class _ThreadLocalState:
+    """Per-thread attribute stored on the owner's `_local`, with a default."""
+
+    def __init__(self, default: Any):
+        self.default = default
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        return getattr(obj._local, self.name, self.default)
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        setattr(obj._local, self.name, value)
+
+
+class _Session:
+    """The pooled connection a thread is using, and its plain/dict cursor."""
+
+    def __init__(self, pooled: PooledConnection):
+        self.pooled = pooled
+        self.cursor: Any = None
+        # nesting depth of `_checkout()` blocks on this thread
+        self.depth = 0
+        # kept until `release_connection()` once `conn`/`cursor` leaked to callers
+        self.pinned = False
+        self.released = False
+
+
+def _pooled(method: Callable) -> Callable:
+    """Run the method on the calling thread's pooled connection."""
+
+    @functools.wraps(method)
+    def wrapper(self: "MySQLHelper", *args: Any, **kwargs: Any) -> Any:
+        with self._checkout():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class MySQLHelper:
     """
     A helper class for interacting with MySQL databases.
 
+    Connections come from a `MySQLConnectionPool` (by default the process-wide
+    pool for the same server/user/database). Each thread checks out its own
+    connection for the duration of a call, `transaction()` or `batch()`, so
+    concurrent workers sharing one helper run their statements in parallel.
+    Parameterized statements issued by the CRUD methods run as server-side
+    prepared statements cached per connection.
+
     Example:
         >>> db = MySQLHelper(host="localhost", user="root", password="1234", database="testdb")
         >>> db.create_table("users", ["id INT AUTO_INCREMENT PRIMARY KEY", "name VARCHAR(255)"])
@@ -25,6 +245,16 @@ class MySQLHelper:
         >>> db.select("users", where="name=%s", params=("Alice",))
     """
 
+    # Per-thread `transaction()` / `batch()` state: each thread has its own connection
+    # True while a `transaction()` block is open; writes defer their commit
+    _in_transaction = _ThreadLocalState(False)
+    # `batch()` state: nesting depth, thresholds and writes since last flush
+    _batch_depth = _ThreadLocalState(0)
+    _batch_max_rows = _ThreadLocalState(None)
+    _batch_max_seconds = _ThreadLocalState(None)
+    _batch_pending = _ThreadLocalState(0)
+    _batch_started = _ThreadLocalState(0.0)
+
     def __init__(
         self,
         host: str = "localhost",
@@ -33,37 +263,147 @@ class MySQLHelper:
         database: Optional[str] = None,
         port: int = 3306,
         autocommit: bool = True,
+        pool_size: int = 5,
+        pool: Optional[MySQLConnectionPool] = None,
+        prepared_cache_size: int = 64,
     ):
-        self.conn = MySQLConnection(
+        self.mysql_username = user
+        self.mysql_password = password
+        self.mysql_host = host
+        self.mysql_port = port
+        self.mysql_database = database
+        self.autocommit = autocommit
+        # Prepared statements kept per connection (0 disables them)
+        self.prepared_cache_size = prepared_cache_size
+        self.pool = pool or MySQLConnectionPool.shared(
+            size=pool_size,
             host=host,
             user=user,
             password=password,
             database=database,
             port=port,
         )
-        self.conn.autocommit = autocommit
-        self.cursor = self.conn.cursor(dictionary=True)
-        # Prefer the `server_info` property if available (newer mysql-connector-python),
-        # otherwise fall back to the deprecated `get_server_info()` method.
+        self._local = threading.local()
+        # Sessions checked out by any thread, so `close()` can return them
+        self._sessions: Dict[int, _Session] = {}
+        self._sessions_lock = threading.Lock()
+        # Check out a connection right away so connection errors surface here
+        with self._checkout():
+            # Prefer the `server_info` property if available (newer mysql-connector-python),
+            # otherwise fall back to the deprecated `get_server_info()` method.
+            try:
+                self.mysql_version = getattr(self.conn, "server_info", None)
+                if not self.mysql_version and hasattr(self.conn, "get_server_info"):
+                    self.mysql_version = self.conn.get_server_info()
+            except Exception:
+                self.mysql_version = None
+
+    # ---------- Connection pool ----------
+
+    def _session(self) -> Optional[_Session]:
+        session = getattr(self._local, "session", None)
+        return None if session is None or session.released else session
+
+    def _acquire_session(self) -> _Session:
+        session = self._session()
+        if session is None:
+            session = _Session(self.pool.acquire())
+            if session.pooled.conn.autocommit != self.autocommit:
+                session.pooled.conn.autocommit = self.autocommit
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions[threading.get_ident()] = session
+        return session
+
+    def _release_session(self, session: _Session, discard: bool = False) -> None:
+        if session.released:
+            return
+        session.released = True
+        with self._sessions_lock:
+            for ident, held in list(self._sessions.items()):
+                if held is session:
+                    del self._sessions[ident]
+        if getattr(self._local, "session", None) is session:
+            self._local.session = None
         try:
-            self.mysql_version = getattr(self.conn, "server_info", None)
-            if not self.mysql_version and hasattr(self.conn, "get_server_info"):
-                self.mysql_version = self.conn.get_server_info()
+            if session.cursor is not None:
+                session.cursor.close()
         except Exception:
-            self.mysql_version = None
-        self.mysql_username = user
-        self.mysql_password = password
-        self.mysql_host = host
-        self.mysql_port = port
-        self.mysql_database = database
+            discard = True
+        if not discard:
+            try:
+                # never hand out a connection with an open transaction/snapshot
+                if session.pooled.conn.in_transaction:
+                    session.pooled.conn.rollback()
+            except Exception:
+                discard = True
+        self.pool.release(session.pooled, discard=discard)
+
+    @contextmanager
+    def _checkout(self) -> Iterator[_Session]:
+        """Hold the calling thread's connection for the duration of the block.
+
+        The outermost block returns the connection to the pool unless a
+        `transaction()`/`batch()` is still open or `conn`/`cursor` were pinned.
+        """
+        session = self._acquire_session()
+        session.depth += 1
+        try:
+            yield session
+        finally:
+            session.depth -= 1
+            if (
+                session.depth == 0
+                and not session.pinned
+                and not self._in_transaction
+                and not self._batch_depth
+            ):
+                self._release_session(session)
+
+    @property
+    def conn(self) -> Any:
+        """The calling thread's connection.
+
+        Outside of helper calls this pins a pooled connection to the thread
+        until `release_connection()` or `close()`.
+        """
+        session = self._session()
+        if session is None:
+            session = self._acquire_session()
+            session.pinned = True
+        return session.pooled.conn
+
+    @property
+    def cursor(self) -> Any:
+        """The calling thread's dictionary cursor (see `conn`)."""
+        conn = self.conn
+        session = cast(_Session, self._session())
+        if session.cursor is None:
+            session.cursor = conn.cursor(dictionary=True)
+        return session.cursor
+
+    def release_connection(self) -> None:
+        """Return the calling thread's pinned connection to the pool."""
+        session = self._session()
+        if session is not None:
+            session.pinned = False
+            if (
+                session.depth == 0
+                and not self._in_transaction
+                and not self._batch_depth
+            ):
+                self._release_session(session)
 
     def _reset_cursor(self) -> None:
+        session = self._session()
+        if session is None:
+            return
         try:
-            if getattr(self, "cursor", None):
-                self.cursor.close()
+            if session.cursor is not None:
+                session.cursor.close()
         except Exception:
             pass
-        self.cursor = self.conn.cursor(dictionary=True)
+        session.cursor = None
 
     def _is_disconnect_error(self, err: Exception) -> bool:
         if not isinstance(err, Error):
@@ -80,24 +420,43 @@ class MySQLHelper:
         )
 
     def _reconnect(self) -> None:
+        """Replace the calling thread's broken connection with a fresh pooled one."""
+        session = self._session()
+        if session is None:
+            return
         try:
-            self.conn.reconnect(attempts=3, delay=1)
-        except Exception:
-            # Recreate connection as a fallback when reconnect is unavailable/failed.
-            self.conn = MySQLConnection(
-                host=self.mysql_host,
-                user=self.mysql_username,
-                password=self.mysql_password,
-                database=self.mysql_database,
-                port=self.mysql_port,
-            )
-            self.conn.autocommit = True
-        self._reset_cursor()
-        # Ensure the connection is actually usable
-        try:
-            self.conn.ping(reconnect=True, attempts=3, delay=1)
+            if session.cursor is not None:
+                session.cursor.close()
         except Exception:
             pass
+        session.cursor = None
+        self.pool.release(session.pooled, discard=True)
+        session.pooled = self.pool.acquire()
+        if session.pooled.conn.autocommit != self.autocommit:
+            session.pooled.conn.autocommit = self.autocommit
+
+    def _prepared_cursor(self, sql: str) -> Tuple[Any, str]:
+        """Return the cached prepared cursor for `sql` on this thread's connection.
+
+        mysql-connector re-prepares unless the very same SQL string object is
+        executed again, so the cached string is returned along with the cursor.
+        """
+        cache = cast(_Session, self._session()).pooled.prepared
+        if sql in cache:
+            cache.move_to_end(sql)
+            cached_sql, cursor = cache[sql]
+            return cursor, cached_sql
+        cursor = cast(_Session, self._session()).pooled.conn.cursor(
+            prepared=True, dictionary=True
+        )
+        cache[sql] = (sql, cursor)
+        while len(cache) > self.prepared_cache_size:
+            _, (_, evicted) = cache.popitem(last=False)
+            try:
+                evicted.close()  # deallocates the server-side statement
+            except Exception:
+                pass
+        return cursor, sql
 
     def _execute_with_retry(
         self,
@@ -106,29 +465,50 @@ class MySQLHelper:
         *,
         use_main_cursor: bool = True,
         dictionary_cursor: bool = True,
+        prepared: bool = False,
     ):
+        # Only parameterized statements are worth preparing: they are the
+        # fixed templates that get executed again with other values
+        prepared = prepared and bool(params) and self.prepared_cache_size > 0
         attempt = 0
         while True:
-            cursor = (
-                self.cursor
-                if use_main_cursor
-                else self.conn.cursor(dictionary=dictionary_cursor)
-            )
+            operation = sql
+            if prepared:
+                cursor, operation = self._prepared_cursor(sql)
+            elif use_main_cursor:
+                cursor = self.cursor
+            else:
+                cursor = self.conn.cursor(dictionary=dictionary_cursor)
             try:
-                cursor.execute(sql, params or ())
+                cursor.execute(operation, tuple(params) if params else ())
                 return cursor
             except Exception as err:
-                if self._is_disconnect_error(err) and attempt < 1:
+                if prepared:
+                    # drop the statement; it is prepared again on retry
+                    pooled = cast(_Session, self._session()).pooled
+                    pooled.prepared.pop(sql, None)
+                    try:
+                        cursor.close()
+                    except Exception:
+                        pass
+                # Never reconnect inside transaction()/batch(): the writes of the
+                # open transaction are lost with the old connection.
+                if (
+                    self._is_disconnect_error(err)
+                    and attempt < 1
+                    and not self._in_transaction
+                    and not self._batch_depth
+                ):
                     attempt += 1
                     try:
-                        if not use_main_cursor:
+                        if not use_main_cursor and not prepared:
                             cursor.close()
                     except Exception:
                         pass
                     self._reconnect()
                     continue
                 try:
-                    if not use_main_cursor:
+                    if not use_main_cursor and not prepared:
                         cursor.close()
                 except Exception:
                     pass
@@ -136,32 +516,37 @@ class MySQLHelper:
 
     # ---------- Core CRUD ----------
 
+    @_pooled
     def create_table(self, table_name: str, columns: List[str]) -> None:
         columns_str = ", ".join(columns)
         sql = f"CREATE TABLE IF NOT EXISTS {table_name} ({columns_str})"
         self._execute_with_retry(sql)
 
+    @_pooled
     def insert(self, table_name: str, data: Dict[str, Any]) -> None:
         columns = ", ".join(data.keys())
         placeholders = ", ".join(["%s"] * len(data))
         sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-        self._execute_with_retry(sql, tuple(data.values()))
-        self.conn.commit()
+        self._execute_with_retry(sql, tuple(data.values()), prepared=True)
+        self._commit()
 
+    @_pooled
     def insert_ignore(self, table_name: str, data: Dict[str, Any]) -> None:
         columns = ", ".join(data.keys())
         placeholders = ", ".join(["%s"] * len(data))
         sql = f"INSERT IGNORE INTO {table_name} ({columns}) VALUES ({placeholders})"
-        self._execute_with_retry(sql, tuple(data.values()))
-        self.conn.commit()
+        self._execute_with_retry(sql, tuple(data.values()), prepared=True)
+        self._commit()
 
+    @_pooled
     def insert_replace(self, table_name: str, data: Dict[str, Any]) -> None:
         columns = ", ".join(data.keys())
         placeholders = ", ".join(["%s"] * len(data))
         sql = f"REPLACE INTO {table_name} ({columns}) VALUES ({placeholders})"
-        self._execute_with_retry(sql, tuple(data.values()))
-        self.conn.commit()
+        self._execute_with_retry(sql, tuple(data.values()), prepared=True)
+        self._commit()
 
+    @_pooled
     def select(
         self,
         table_name: str,
@@ -185,10 +570,41 @@ class MySQLHelper:
             exec_params_list.append(limit)
 
         exec_params = tuple(exec_params_list)
-        self._execute_with_retry(sql, exec_params)
-        rows = self.cursor.fetchall()
+        cursor = self._execute_with_retry(sql, exec_params, prepared=True)
+        rows = cursor.fetchall()
         return cast(Sequence[Dict[str, Any]], rows)
 
+    @_pooled
+    def select_rows(
+        self,
+        table_name: str,
+        columns: str = "*",
+        where: Optional[str] = None,
+        params: Optional[Union[tuple, list]] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[str], List[tuple]]:
+        """
+        Like `select()`, but returns the column names and plain row tuples
+        instead of one dict per row, for bulk loads (see `ProxyBatch`).
+        """
+        sql = f"SELECT {columns} FROM {table_name}"
+        if where:
+            sql += f" WHERE {where}"
+        exec_params = list(params) if params is not None else []
+        if limit is not None:
+            sql += " LIMIT %s"
+            exec_params.append(limit)
+
+        cursor = self._execute_with_retry(
+            sql, exec_params, use_main_cursor=False, dictionary_cursor=False
+        )
+        try:
+            names = [d[0] for d in cursor.description]
+            return names, [tuple(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    @_pooled
     def count(
         self,
         table_name: str,
@@ -198,8 +614,10 @@ class MySQLHelper:
         sql = f"SELECT COUNT(*) AS count FROM {table_name}"
         if where:
             sql += f" WHERE {where}"
-        self._execute_with_retry(sql, params)
-        result = self.cursor.fetchone()
+        cursor = self._execute_with_retry(sql, params, prepared=True)
+        # fetchall() drains the (unbuffered) prepared cursor
+        fetched = cursor.fetchall()
+        result = fetched[0] if fetched else None
         if not result:
             return 0
         # `fetchone()` may return a dict (with `dictionary=True`) or a sequence/tuple.
@@ -216,6 +634,126 @@ class MySQLHelper:
         except Exception:
             return 0
 
+    @_pooled
+    def sample(
+        self,
+        table_name: str,
+        n: int,
+        columns: str = "*",
+        where: Optional[str] = None,
+        params: Optional[Union[tuple, list]] = None,
+        key: str = "id",
+    ) -> List[Dict[str, Any]]:
+        """
+        Select up to `n` random rows without sorting the table like `ORDER BY RAND()`.
+
+        Random values of the integer `key` are probed against its index and kept
+        when the row matches `where`; sparse filters fall back to a reservoir over
+        the matching keys. See `SQLiteHelper.sample` for details.
+        """
+        if n <= 0:
+            return []
+        where_sql = f"({where})" if where else "1=1"
+        where_params = list(params) if params is not None else []
+
+        self._execute_with_retry(
+            f"SELECT MIN({key}) AS lo, MAX({key}) AS hi FROM {table_name}"
+        )
+        bounds = self.cursor.fetchone()
+        if not bounds or bounds["lo"] is None or bounds["hi"] is None:
+            return []
+        lo, hi = int(bounds["lo"]), int(bounds["hi"])
+
+        chosen: List[int] = []
+        probed: Set[int] = set()
+        probes = hits = 0
+        while len(chosen) < n and len(probed) <= hi - lo:
+            need = n - len(chosen)
+            # Size the next round from the hit rate seen so far
+            rate = hits / probes if probes else 1.0
+            if rate == 0:
+                break
+            want = int(need / rate * 1.25) + 16
+            if probes + want > SAMPLE_MAX_PROBES:
+                break
+            keys = self._draw_sample_keys(lo, hi, probed, want)
+            found: List[int] = []
+            for i in range(0, len(keys), SAMPLE_PROBE_CHUNK):
+                chunk = keys[i : i + SAMPLE_PROBE_CHUNK]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                self._execute_with_retry(
+                    f"SELECT {key} AS k FROM {table_name} WHERE {where_sql} AND {key} IN ({placeholders})",
+                    tuple(where_params + chunk),
+                )
+                found.extend(int(row["k"]) for row in self.cursor.fetchall())
+            probes += len(keys)
+            hits += len(found)
+            # The probed keys are a uniform draw, so any subset of the hits is too
+            chosen.extend(random.sample(found, min(need, len(found))))
+
+        if len(chosen) < n:
+            # Reservoir over the matching keys not picked by the probes
+            taken = set(chosen)
+            reservoir: List[int] = []
+            seen = 0
+            k = n - len(chosen)
+            cursor = self._execute_with_retry(
+                f"SELECT {key} FROM {table_name} WHERE {where_sql}",
+                tuple(where_params),
+                use_main_cursor=False,
+                dictionary_cursor=False,
+            )
+            try:
+                while True:
+                    batch_rows = cursor.fetchmany(1000)
+                    if not batch_rows:
+                        break
+                    for (value,) in batch_rows:
+                        value = int(value)
+                        if value in taken:
+                            continue
+                        seen += 1
+                        if len(reservoir) < k:
+                            reservoir.append(value)
+                        else:
+                            j = random.randrange(seen)
+                            if j < k:
+                                reservoir[j] = value
+            finally:
+                cursor.close()
+            chosen.extend(reservoir)
+
+        rows: List[Dict[str, Any]] = []
+        for i in range(0, len(chosen), SAMPLE_PROBE_CHUNK):
+            chunk = chosen[i : i + SAMPLE_PROBE_CHUNK]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            self._execute_with_retry(
+                f"SELECT {columns} FROM {table_name} WHERE {key} IN ({placeholders})",
+                tuple(chunk),
+            )
+            rows.extend(cast(Sequence[Dict[str, Any]], self.cursor.fetchall()))
+        random.shuffle(rows)
+        return rows
+
+    @staticmethod
+    def _draw_sample_keys(lo: int, hi: int, probed: Set[int], want: int) -> List[int]:
+        """Draw up to `want` distinct keys in [lo, hi] that were not probed yet."""
+        remaining = hi - lo + 1 - len(probed)
+        if want * 2 >= remaining:
+            # Most of the range is wanted: enumerate it instead of retrying draws
+            keys = [k for k in range(lo, hi + 1) if k not in probed]
+            keys = random.sample(keys, min(want, len(keys)))
+        else:
+            picked: Set[int] = set()
+            while len(picked) < want:
+                k = random.randint(lo, hi)
+                if k not in probed:
+                    picked.add(k)
+            keys = list(picked)
+        probed.update(keys)
+        return keys
+
+    @_pooled
     def update(
         self,
         table_name: str,
@@ -226,9 +764,10 @@ class MySQLHelper:
         set_values = ", ".join(f"{key}=%s" for key in data)
         sql = f"UPDATE {table_name} SET {set_values} WHERE {where}"
         values = list(data.values()) + list(params or [])
-        self._execute_with_retry(sql, values)
-        self.conn.commit()
+        self._execute_with_retry(sql, values, prepared=True)
+        self._commit()
 
+    @_pooled
     def delete(
         self,
         table_name: str,
@@ -236,17 +775,183 @@ class MySQLHelper:
         params: Optional[Union[tuple, list]] = None,
     ) -> None:
         sql = f"DELETE FROM {table_name} WHERE {where}"
-        self._execute_with_retry(sql, params)
-        self.conn.commit()
+        self._execute_with_retry(sql, params, prepared=True)
+        self._commit()
 
     # ---------- Utility Methods ----------
 
+    @_pooled
     def execute_query(
         self, sql: str, params: Optional[Union[tuple, list]] = None
     ) -> None:
         self._execute_with_retry(sql, params)
+        self._commit()
+
+    @_pooled
+    def executemany(self, sql: str, seq_of_params: Iterable[Union[tuple, list]]) -> int:
+        """
+        Executes a parameterized SQL statement once for every parameter set.
+
+        mysql-connector rewrites batched INSERTs into a single multi-row
+        statement. The batch is committed once (or deferred by
+        `transaction()` / `batch()`).
+
+        Returns the total number of rows affected.
+        """
+        rows = [tuple(params) for params in seq_of_params]
+        if not rows:
+            return 0
+        attempt = 0
+        while True:
+            cur = self.conn.cursor()
+            try:
+                cur.executemany(sql, rows)
+                affected = cur.rowcount
+                break
+            except Exception as err:
+                if (
+                    self._is_disconnect_error(err)
+                    and attempt < 1
+                    and not self._in_transaction
+                    and not self._batch_depth
+                ):
+                    attempt += 1
+                    self._reconnect()
+                    continue
+                raise
+            finally:
+                try:
+                    cur.close()
+                except Exception:
+                    pass
+        self._commit(len(rows))
+        return affected if affected is not None and affected > 0 else 0
+
+    def _commit(self, rows: int = 1) -> None:
+        """
+        Commits a finished write unless `transaction()` or `batch()` defers it.
+
+        Inside a batch the write is only counted, and the batch is flushed once
+        one of its thresholds is reached.
+        """
+        if self._batch_depth:
+            self._batch_pending += rows
+            if not self._in_transaction and self._batch_due():
+                self._flush_batch()
+            return
+        if self._in_transaction:
+            return
         self.conn.commit()
 
+    def _batch_due(self) -> bool:
+        if (
+            self._batch_max_rows is not None
+            and self._batch_pending >= self._batch_max_rows
+        ):
+            return True
+        return (
+            self._batch_max_seconds is not None
+            and time.monotonic() - self._batch_started >= self._batch_max_seconds
+        )
+
+    def _flush_batch(self, reopen: bool = True) -> None:
+        self.conn.commit()
+        self._batch_pending = 0
+        self._batch_started = time.monotonic()
+        # With autocommit enabled every statement outside an explicit
+        # transaction is committed by the server, so start the next one.
+        if reopen and not self.conn.in_transaction:
+            self.conn.start_transaction()
+
+    @contextmanager
+    def transaction(self) -> Iterator["MySQLHelper"]:
+        """
+        Runs the enclosed statements inside one transaction.
+
+        Commits when the block exits normally and rolls back when it raises.
+        Nested calls join the outermost transaction. Inside `batch()` the block
+        becomes a savepoint of the batch transaction, so a failure only undoes
+        the statements of this block.
+        """
+        # Keep this thread's connection for the whole block
+        with self._checkout():
+            if self._in_transaction:
+                yield self
+                return
+            self._in_transaction = True
+            savepoint = self._batch_depth > 0
+            try:
+                if not self.conn.in_transaction:
+                    self.conn.start_transaction()
+                if savepoint:
+                    self._execute_with_retry("SAVEPOINT helper_transaction")
+                yield self
+                if savepoint:
+                    self._execute_with_retry("RELEASE SAVEPOINT helper_transaction")
+                else:
+                    self.conn.commit()
+            except BaseException:
+                try:
+                    if savepoint:
+                        self._execute_with_retry(
+                            "ROLLBACK TO SAVEPOINT helper_transaction"
+                        )
+                        self._execute_with_retry("RELEASE SAVEPOINT helper_transaction")
+                    else:
+                        self.conn.rollback()
+                except Exception:
+                    pass
+                raise
+            finally:
+                self._in_transaction = False
+            if savepoint and self._batch_due():
+                self._flush_batch()
+
+    @contextmanager
+    def batch(
+        self, max_rows: Optional[int] = 1000, max_seconds: Optional[float] = 5.0
+    ) -> Iterator["MySQLHelper"]:
+        """
+        Coalesces writes into as few commits as possible.
+
+        All helper methods keep working inside the block. Writes run in an
+        explicit transaction that is committed once `max_rows` rows were
+        written or the last flush is older than `max_seconds` (both checked on
+        each write), and when the block exits. If the block raises, writes
+        that were not flushed yet are rolled back; earlier flushes stay
+        committed. Nested calls join the outermost batch.
+
+        Example:
+            >>> with db.batch(max_rows=500):
+            ...     for name in names:
+            ...         db.insert("users", {"name": name})
+        """
+        # Keep this thread's connection for the whole block
+        with self._checkout():
+            if self._batch_depth == 0:
+                self._batch_max_rows = max_rows
+                self._batch_max_seconds = max_seconds
+                self._batch_pending = 0
+                self._batch_started = time.monotonic()
+                if not self.conn.in_transaction:
+                    self.conn.start_transaction()
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    try:
+                        self.conn.rollback()
+                    except Exception:
+                        pass
+                    self._batch_pending = 0
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush_batch(reopen=False)
+
+    @_pooled
     def execute_query_fetch(
         self, sql: str, params: Optional[Union[tuple, list]] = None
     ) -> Union[List[Dict[str, Any]], int]:
@@ -272,14 +977,21 @@ class MySQLHelper:
                 return cast(List[Dict[str, Any]], rows)
 
             # No resultset: commit and return affected rowcount
-            self.conn.commit()
+            self._commit()
             return cur.rowcount
         finally:
             if cur is not None:
                 cur.close()
 
-    def checksum(self, table: str, columns: Optional[List[str]] = None) -> str:
-        """Calculate a MD5 checksum for a table using GROUP_CONCAT over the given columns.
+    @_pooled
+    def checksum(
+        self, table: str, columns: Optional[List[str]] = None, chunk_size: int = 1000
+    ) -> str:
+        """Calculate a MD5 checksum for a table by streaming ordered rows.
+
+        Rows are read in chunks of `chunk_size` and fed to an incremental MD5
+        (values joined with '|', rows with '||'), so neither the client nor the
+        server (GROUP_CONCAT) builds the whole table as one string.
 
         Returns hex string or empty string on failure.
         """
@@ -301,25 +1013,114 @@ class MySQLHelper:
         # choose ordering column: prefer 'id' if present
         order_col = "id" if "id" in cols else cols[0]
 
-        # build CONCAT_WS and COALESCE parts
-        coalesced = ", ".join(f"COALESCE({c}, '')" for c in cols)
-        concat_ws = f"CONCAT_WS('|', {coalesced})"
+        h = hashlib.md5()
+        try:
+            cursor = self._execute_with_retry(
+                f"SELECT {', '.join(cols)} FROM {table} ORDER BY {order_col}",
+                use_main_cursor=False,
+                dictionary_cursor=False,
+            )
+            try:
+                first_row = True
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for r in rows:
+                        row = "|".join("" if v is None else str(v) for v in r)
+                        h.update((row if first_row else "||" + row).encode("utf-8"))
+                        first_row = False
+            finally:
+                cursor.close()
+        except Exception:
+            return ""
+        return h.hexdigest()
 
-        sql = (
-            f"SELECT MD5(GROUP_CONCAT({concat_ws} ORDER BY {order_col} SEPARATOR '||')) AS checksum "
-            f"FROM {table}"
+    @staticmethod
+    def _tracking_name(table: str, columns: Optional[List[str]] = None) -> str:
+        """Suffix of the `meta` keys used by `track_changes()`/`cached_checksum()`."""
+        return table + (f":{'+'.join(columns)}" if columns else "")
+
+    @_pooled
+    def track_changes(self, table: str, columns: Optional[List[str]] = None) -> None:
+        """Install triggers bumping a `meta` counter on every write to `table`.
+
+        When `columns` is given only inserts, deletes and updates of those
+        columns count. Creating triggers may need the TRIGGER privilege.
+        """
+        key = f"table_version:{self._tracking_name(table, columns)}"
+        suffix = f"_{'_'.join(columns)}" if columns else ""
+        bump = (
+            f"INSERT INTO meta (`key`, value) VALUES ('{key}', 1) "
+            "ON DUPLICATE KEY UPDATE value = CAST(value AS UNSIGNED) + 1"
+        )
+        self.execute_query(
+            "CREATE TABLE IF NOT EXISTS meta (`key` VARCHAR(255) PRIMARY KEY, value TEXT)"
+        )
+        for op, event in (
+            ("insert", "INSERT"),
+            ("update", "UPDATE"),
+            ("delete", "DELETE"),
+        ):
+            body = bump
+            if op == "update" and columns:
+                # MySQL has no UPDATE OF: compare the tracked columns instead
+                changed = " OR ".join(f"NOT (OLD.{c} <=> NEW.{c})" for c in columns)
+                body = f"IF {changed} THEN {bump}; END IF"
+            self.execute_query(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{op}{suffix} "
+                f"AFTER {event} ON {table} FOR EACH ROW BEGIN {body}; END"
+            )
+        # Mark the table as tracked only once every trigger exists
+        self.execute_query(
+            "INSERT IGNORE INTO meta (`key`, value) VALUES (%s, %s)", (key, "0")
         )
 
+    @_pooled
+    def table_version(
+        self, table: str, columns: Optional[List[str]] = None
+    ) -> Optional[int]:
+        """Return the `track_changes()` write counter, or None when not tracked."""
         try:
-            res = self.execute_query_fetch(sql)
-            if isinstance(res, list) and res:
-                row = res[0]
-                if isinstance(row, dict):
-                    return str(row.get("checksum") or "")
-            return ""
-        except Exception:
-            return ""
+            rows = self.select(
+                "meta",
+                "value",
+                "`key` = %s",
+                (f"table_version:{self._tracking_name(table, columns)}",),
+            )
+        except Error:
+            return None
+        return int(rows[0]["value"]) if rows else None
+
+    @_pooled
+    def cached_checksum(self, table: str, columns: Optional[List[str]] = None) -> str:
+        """Return `checksum()`, reusing the stored digest while the table is unchanged.
+
+        Needs `track_changes()` for the same table/columns; untracked tables
+        are always hashed.
+        """
+        version = self.table_version(table, columns)
+        if version is None:
+            return self.checksum(table, columns)
+        cache_key = f"checksum:{self._tracking_name(table, columns)}"
+        rows = self.select("meta", "value", "`key` = %s", (cache_key,))
+        if rows:
+            cached_version, _, digest = str(rows[0]["value"]).partition(":")
+            if cached_version == str(version) and digest:
+                return digest
+        digest = self.checksum(table, columns)
+        if digest:
+            try:
+                self.execute_query(
+                    "REPLACE INTO meta (`key`, value) VALUES (%s, %s)",
+                    (cache_key, f"{version}:{digest}"),
+                )
+            except Error:
+                # read-only users still get the checksum
+                pass
+        return digest
 
+    @_pooled
     def column_exists(self, table_name: str, column_name: str) -> bool:
         """
         Check whether a column exists in a given table for MySQL.
@@ -344,11 +1145,37 @@ class MySQLHelper:
         except Exception:
             return False
 
+    @_pooled
+    def index_exists(self, table_name: str, index_name: str) -> bool:
+        """
+        Check whether an index exists on a given table for MySQL.
+
+        Uses information_schema.statistics to determine existence.
+        """
+        db_name = self.mysql_database or getattr(self.conn, "database", None)
+        if not db_name:
+            return False
+        sql = (
+            "SELECT COUNT(*) AS cnt FROM information_schema.statistics "
+            "WHERE table_schema = %s AND table_name = %s AND index_name = %s"
+        )
+        self._execute_with_retry(sql, (db_name, table_name, index_name))
+        res = self.cursor.fetchone()
+        if not res:
+            return False
+        try:
+            cnt = res.get("cnt") if isinstance(res, dict) else res[0]
+            return int(cast(Any, cnt)) > 0
+        except Exception:
+            return False
+
+    @_pooled
     def truncate_table(self, table_name: str) -> None:
         sql = f"TRUNCATE TABLE {table_name}"
         self._execute_with_retry(sql)
-        self.conn.commit()
+        self._commit()
 
+    @_pooled
     def dump_database(self, dump_path: str) -> None:
         """
         Exports the current database schema and data to an SQL dump file.
@@ -378,13 +1205,15 @@ class MySQLHelper:
         self.close()
 
     def close(self):
-        try:
-            if self.cursor:
-                self.cursor.close()
-        except Exception:
-            pass
-        try:
-            if self.conn:
-                self.conn.close()
-        except Exception:
-            pass
+        """Return every connection checked out by this helper to the pool.
+
+        Open transactions are rolled back. The pool itself stays open for other
+        helpers; call `pool.close()` to close its idle connections.
+        """
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            try:
+                self._release_session(session)
+            except Exception:
+                pass
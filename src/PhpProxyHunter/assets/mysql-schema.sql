@@ -21,7 +21,13 @@ CREATE TABLE IF NOT EXISTS `proxies` (
   `webgl_renderer` VARCHAR(255),
   `browser_vendor` VARCHAR(255),
   `username` VARCHAR(255),
-  `password` VARCHAR(255)
+  `password` VARCHAR(255),
+  `ip` VARCHAR(255) GENERATED ALWAYS AS (SUBSTRING_INDEX(`proxy`, ':', 1)) STORED,
+  `port` INT UNSIGNED GENERATED ALWAYS AS (IF(`proxy` REGEXP ':[0-9]{1,5}$', CAST(SUBSTRING_INDEX(`proxy`, ':', -1) AS UNSIGNED), NULL)) STORED,
+  `last_check_ts` BIGINT,
+  KEY `idx_proxies_status_last_check` (`status`, `last_check`),
+  KEY `idx_proxies_status_last_check_ts` (`status`, `last_check_ts`),
+  KEY `idx_proxies_ip` (`ip`)
 );
 
 CREATE TABLE IF NOT EXISTS `processed_proxies` (
@@ -36,6 +42,16 @@ CREATE TABLE IF NOT EXISTS `added_proxies` (
 
 CREATE TABLE IF NOT EXISTS `meta` (`key` VARCHAR(255) PRIMARY KEY, `value` TEXT);
 
+CREATE TABLE IF NOT EXISTS `proxy_latency` (
+  `key` VARCHAR(255) PRIMARY KEY,
+  `srtt` DOUBLE,
+  `rttvar` DOUBLE,
+  `alive` DOUBLE,
+  `samples` INT,
+  `last_ok` DOUBLE,
+  `updated` DOUBLE
+);
+
 CREATE TABLE IF NOT EXISTS `auth_user` (
   `id` INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
   `password` VARCHAR(128) NOT NULL,
@@ -1,27 +1,82 @@
+import hashlib
+import itertools
 import json
 import os
+import random
 import re
 import sys
 import time
-from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Union, cast
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 from proxy_hunter import (
+    LatencyTracker,
     Proxy,
+    ProxyBatch,
     extract_proxies,
     file_append_str,
+    get_latency_tracker,
     random_windows_ua,
     read_file,
 )
 
 from data.webgl import random_webgl_data
 from src.func import get_nuitka_file, get_relative_path
-from src.func_date import get_current_rfc3339_time
+from src.func_date import get_current_rfc3339_time, hours_ago_epoch, rfc3339_to_epoch
 from src.geoPlugin import get_geo_ip
 from src.SQLiteHelper import SQLiteHelper
 from src.MySQLHelper import MySQLHelper
 from src.func_console import blue, cyan, green, magenta, red, white, yellow, orange
+from src.migrations.migrate import load_migrations, run_migrations
+
+# Columns computed by the database from `proxy`; they must never be written
+GENERATED_COLUMNS = ("ip", "port")
+
+# `meta` key holding the hash of the schema set up by `ProxyDB.ensure_schema()`
+SCHEMA_HASH_KEY = "schema_hash"
+# Bump when `ensure_schema()` sets up something the schema file does not cover
+SCHEMA_SETUP_VERSION = 1
+
+_schema_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+def _schema_hash(schema_file: Optional[str]) -> str:
+    """
+    Hash the schema file together with the known migrations.
+
+    Cached per process while the file's mtime and size stay the same.
+    """
+    cache_key: Tuple[str, int, int] = ("", 0, 0)
+    if schema_file:
+        try:
+            st = os.stat(schema_file)
+            cache_key = (schema_file, st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+    digest = _schema_hashes.get(cache_key)
+    if digest is None:
+        h = hashlib.sha256(f"setup:{SCHEMA_SETUP_VERSION}\n".encode("utf-8"))
+        numbers = [str(module.MIGRATION_NUMBER) for module, _ in load_migrations()]
+        h.update(f"migrations:{','.join(numbers)}\n".encode("utf-8"))
+        if cache_key[0]:
+            with open(cache_key[0], "rb") as f:
+                h.update(f.read())
+        digest = h.hexdigest()
+        _schema_hashes[cache_key] = digest
+    return digest
 
 
 class ProxyDB:
@@ -39,6 +94,8 @@ class ProxyDB:
     description: str = (
         "Current database connection description (e.g., type, location) for debugging purposes."
     )
+    # `mysql-schema.sql` location, looked up once per process ("" when missing)
+    _mysql_schema_file: Optional[str] = None
 
     # noinspection PyMethodMayBeStatic
     def _find_mysql_schema_file(self) -> Optional[str]:
@@ -78,6 +135,7 @@ class ProxyDB:
         mysql_dbname: str = "php_proxy_hunter",
         mysql_user: str = "root",
         mysql_password: str = "",
+        mysql_pool_size: int = 5,
     ):
         """
         Initialize ProxyDB instance.
@@ -85,6 +143,8 @@ class ProxyDB:
         Args:
             db_location (Optional[str]): The location of the SQLite database file. If None, uses default path.
             start (bool): If True, automatically starts the database connection.
+            mysql_pool_size (int): Connections kept in the shared MySQL pool, roughly the
+                number of threads querying at once.
         """
         self.check_same_thread = check_same_thread
         self.db_location = db_location
@@ -96,6 +156,7 @@ class ProxyDB:
         self.mysql_dbname = mysql_dbname
         self.mysql_user = mysql_user
         self.mysql_password = mysql_password
+        self.mysql_pool_size = mysql_pool_size
         if isinstance(db_location, (SQLiteHelper, MySQLHelper)):
             # accept helper instance directly
             self.db = db_location
@@ -112,6 +173,9 @@ class ProxyDB:
     def start_connection(self, debug: bool = False) -> bool:
         """Establishes a connection to the SQLite database and sets up initial configurations.
 
+        The schema setup is skipped for databases already set up with the
+        current schema (see `ensure_schema()`); VACUUM is left to `vacuum()`.
+
         Returns:
             bool: True when the connection and initialization succeed, False on error.
         """
@@ -134,21 +198,8 @@ class ProxyDB:
                     user=self.mysql_user,
                     password=self.mysql_password,
                     database=dbname,
+                    pool_size=self.mysql_pool_size,
                 )
-                # load mysql schema if available
-                try:
-                    sql_file = self._find_mysql_schema_file()
-                    if sql_file and os.path.exists(sql_file):
-                        contents = str(read_file(sql_file))
-                        if contents:
-                            # MySQLHelper exposes execute_query but uses %s params; execute as raw
-                            for stmt in contents.split(";"):
-                                stmt = stmt.strip()
-                                if stmt:
-                                    self.db.execute_query(stmt)
-                except Exception:
-                    # ignore missing schema file
-                    pass
             else:
                 if not self.db_location:
                     self.db_location = get_relative_path("src/database.sqlite")
@@ -157,39 +208,7 @@ class ProxyDB:
                     cast(str, self.db_location),
                     check_same_thread=self.check_same_thread,
                 )
-                # create table proxies when not exist
-                db_create_file = get_nuitka_file("assets/database/create.sql")
-                contents = str(read_file(db_create_file))
-                commands = contents.split(";")
-                if contents:
-                    # Loop through each command
-                    for command in commands:
-                        # Strip any leading/trailing whitespace
-                        command = command.strip()
-                        # Ignore empty commands
-                        if command:
-                            self.db.execute_query(command)
-
-            # SQLite-specific pragmas
-            if self.driver != "mysql":
-                wal_enabled = self.get_meta_value("wal_enabled")
-                if not wal_enabled:
-                    try:
-                        self.db.execute_query("PRAGMA journal_mode = WAL")
-                        self.db.execute_query("PRAGMA wal_autocheckpoint = 100")
-                        self.set_meta_value("wal_enabled", "1")
-                    except Exception:
-                        pass
-
-                auto_vacuum_enabled = self.get_meta_value("auto_vacuum_enabled")
-                if not auto_vacuum_enabled:
-                    try:
-                        self.db.execute_query("PRAGMA auto_vacuum = FULL")
-                        self.set_meta_value("auto_vacuum_enabled", "1")
-                    except Exception:
-                        pass
-
-                self.run_daily_vacuum()
+            self.ensure_schema(debug=debug)
             return True
         except Exception as e:
             file_append_str(get_nuitka_file("error.txt"), str(e))
@@ -197,6 +216,86 @@ class ProxyDB:
                 print(e)
             return False
 
+    def _schema_file(self) -> Optional[str]:
+        if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
+            if ProxyDB._mysql_schema_file is None:
+                ProxyDB._mysql_schema_file = self._find_mysql_schema_file() or ""
+            return ProxyDB._mysql_schema_file or None
+        return get_nuitka_file("assets/database/create.sql")
+
+    def ensure_schema(self, force: bool = False, debug: bool = False) -> bool:
+        """
+        Create the tables, apply pending migrations and set the SQLite pragmas.
+
+        The work is skipped when the `schema_hash` stored in `meta` matches the
+        current schema file and migrations, so opening an up-to-date database
+        costs a single meta lookup.
+
+        Args:
+            force (bool): Run the setup even when the stored hash matches.
+
+        Returns:
+            bool: True when the setup ran, False when it was skipped.
+        """
+        db = self.get_db()
+        schema_file = self._schema_file()
+        expected = _schema_hash(schema_file)
+        if not force:
+            try:
+                if self.get_meta_value(SCHEMA_HASH_KEY) == expected:
+                    return False
+            except Exception:
+                # no meta table yet
+                pass
+
+        contents = str(read_file(schema_file)) if schema_file else ""
+        for command in contents.split(";"):
+            # Strip any leading/trailing whitespace
+            command = command.strip()
+            # Ignore empty commands
+            if not command:
+                continue
+            if isinstance(db, MySQLHelper):
+                # keep going when one statement of the shared schema fails
+                try:
+                    db.execute_query(command)
+                except Exception:
+                    pass
+            else:
+                db.execute_query(command)
+
+        # Apply pending schema migrations (columns/indexes for older databases)
+        migrated = True
+        try:
+            run_migrations(db)
+        except Exception as e:
+            migrated = False
+            file_append_str(get_nuitka_file("error.txt"), f"migration failed: {e}")
+            if debug:
+                print(f"migration failed: {e}")
+
+        # SQLite-specific pragmas; both are persistent in the database file
+        if isinstance(db, SQLiteHelper):
+            if not self.get_meta_value("wal_enabled"):
+                try:
+                    db.execute_query("PRAGMA journal_mode = WAL")
+                    db.execute_query("PRAGMA wal_autocheckpoint = 100")
+                    self.set_meta_value("wal_enabled", "1")
+                except Exception:
+                    pass
+            if not self.get_meta_value("auto_vacuum_enabled"):
+                try:
+                    # applies to an existing database after the next `vacuum()`
+                    db.execute_query("PRAGMA auto_vacuum = FULL")
+                    self.set_meta_value("auto_vacuum_enabled", "1")
+                except Exception:
+                    pass
+
+        # A failed migration is retried on the next open
+        if migrated:
+            self.set_meta_value(SCHEMA_HASH_KEY, expected)
+        return True
+
     def close(self, debug: bool = False):
         """Closes the database connection if open."""
         if self.db:
@@ -235,9 +334,9 @@ class ProxyDB:
             Optional[str]: The meta value associated with the key, or None if not found.
         """
         if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
-            result = self.get_db().select("meta", "value", "key = %s", (key,))
+            result = self.get_db().select("meta", "value", "`key` = %s", (key,))
         else:
-            result = self.get_db().select("meta", "value", "key = ?", (key,))
+            result = self.get_db().select("meta", "value", "`key` = ?", (key,))
         return result[0]["value"] if result else None
 
     def set_meta_value(self, key: str, value: str) -> None:
@@ -250,12 +349,49 @@ class ProxyDB:
         """
 
         if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
-            sql = "REPLACE INTO meta (key, value) VALUES (%s, %s)"
+            sql = "REPLACE INTO meta (`key`, value) VALUES (%s, %s)"
         else:
-            sql = "REPLACE INTO meta (key, value) VALUES (?, ?)"
+            sql = "REPLACE INTO meta (`key`, value) VALUES (?, ?)"
         self.get_db().execute_query(sql, (key, value))
 
-    def run_daily_vacuum(self):
+    def batch(
+        self, max_rows: Optional[int] = 1000, max_seconds: Optional[float] = 5.0
+    ) -> ContextManager[Union[SQLiteHelper, MySQLHelper]]:
+        """
+        Defer commits of all ProxyDB writes made inside the block.
+
+        Writes are coalesced into one transaction that is flushed every
+        `max_rows` rows or `max_seconds` seconds and when the block exits;
+        unflushed writes are rolled back when the block raises.
+        See `SQLiteHelper.batch()` / `MySQLHelper.batch()`.
+
+        Example:
+            >>> with proxy_db.batch(max_rows=500):
+            ...     for proxy in proxies:
+            ...         proxy_db.update_status(proxy, "dead")
+        """
+        return self.get_db().batch(max_rows=max_rows, max_seconds=max_seconds)
+
+    def vacuum(self) -> None:
+        """
+        Prune the latency history, then rebuild the SQLite database file and
+        truncate its WAL.
+
+        This is maintenance work that locks the whole database, so it is never
+        done when opening a connection; run it from `src/db_maintenance.py` or
+        a scheduled job. MySQL databases are only pruned.
+        """
+        self.prune_latency_stats()
+        db = self.get_db()
+        if not isinstance(db, SQLiteHelper):
+            return
+        db.execute_query("VACUUM")
+        # https://stackoverflow.com/a/37865221/6404439
+        db.execute_query("PRAGMA wal_checkpoint(SQLITE_CHECKPOINT_TRUNCATE);")
+        self.set_meta_value("last_vacuum_time", str(int(time.time())))
+
+    def run_daily_vacuum(self) -> bool:
+        """Run `vacuum()` when the last one is older than a day; returns True when it ran."""
         last_vacuum_time: Optional[str] = self.get_meta_value("last_vacuum_time")
         current_time: int = int(time.time())
         one_day_in_seconds: int = 86400
@@ -263,12 +399,9 @@ class ProxyDB:
         if not last_vacuum_time or (
             current_time - int(last_vacuum_time) > one_day_in_seconds
         ):
-            self.get_db().execute_query("VACUUM")
-            # https://stackoverflow.com/a/37865221/6404439
-            self.get_db().execute_query(
-                "PRAGMA wal_checkpoint(SQLITE_CHECKPOINT_TRUNCATE);"
-            )
-            self.set_meta_value("last_vacuum_time", str(current_time))
+            self.vacuum()
+            return True
+        return False
 
     def select(self, proxy: Optional[str]):
         if not proxy:
@@ -339,6 +472,40 @@ class ProxyDB:
         """Return SQL RANDOM function name depending on backend."""
         return "RAND()" if isinstance(self.db, MySQLHelper) else "RANDOM()"
 
+    def _random_proxies(
+        self, where: str, params: List[Union[str, int]], limit: Optional[int]
+    ) -> List[Dict[str, Union[str, None]]]:
+        """Return up to `limit` random proxies matching `where` without `ORDER BY RANDOM()`.
+
+        Limited requests use the helper `sample()`; unlimited ones fetch the matches
+        and shuffle them in Python, which is cheaper than sorting them in SQL.
+        """
+        if limit is None or limit >= sys.maxsize:
+            rows = list(self.get_db().select("proxies", "*", where, params))
+            random.shuffle(rows)
+        else:
+            rows = self.get_db().sample("proxies", int(limit), "*", where, params)
+        return cast(List[Dict[str, Union[str, None]]], rows)
+
+    def _last_check_filter(
+        self,
+        placeholder: str,
+        last_checked: Optional[str] = None,
+        stale_hours: Optional[float] = None,
+    ) -> Tuple[str, List[Union[str, int]]]:
+        """Build `AND ...` conditions on the indexed `last_check_ts` epoch column."""
+        where = ""
+        params: List[Union[str, int]] = []
+        if last_checked:
+            cutoff = rfc3339_to_epoch(last_checked)
+            if cutoff is not None:
+                where += f" AND last_check_ts <= {placeholder}"
+                params.append(cutoff)
+        if stale_hours is not None:
+            where += f" AND last_check_ts < {placeholder}"
+            params.append(hours_ago_epoch(stale_hours))
+        return where, params
+
     def normalize_proxy(self, proxy: Optional[str]) -> str:
         """Normalize and validate a proxy string using extract_proxies()."""
         proxies = extract_proxies(proxy)
@@ -352,6 +519,7 @@ class ProxyDB:
         per_page: Optional[int] = None,
         status: Optional[str] = None,
         last_checked: Optional[str] = None,
+        stale_hours: Optional[float] = None,
     ) -> List[Dict[str, Union[str, None]]]:
         """Get all proxies with optional pagination, randomization, and filtering.
 
@@ -366,12 +534,15 @@ class ProxyDB:
             last_checked (Optional[str]): Filter by last_check column (RFC3339 date string).
                 When provided, only returns proxies that were checked on or before this date
                 (i.e., last_check <= last_checked).
+            stale_hours (Optional[float]): Only return proxies last checked more than this
+                many hours ago. Never-checked proxies are excluded.
 
         Returns:
             List[Dict[str, Union[str, None]]]: List of proxy rows as dictionaries.
 
         Backwards-compatible: when only `limit` is provided it behaves like before
         (providing a positive limit implies randomization unless `randomize` is set).
+        Use `iter_proxies()` to walk the whole table.
         """
         # Pagination (page/perPage) takes precedence over legacy limit
         offset = None
@@ -396,20 +567,26 @@ class ProxyDB:
             where_clause += f" AND status = {placeholder}"
             params.append(status)
 
-        # Last checked filtering (last_check <= last_checked)
-        if last_checked:
-            where_clause += f" AND last_check <= {placeholder}"
-            params.append(last_checked)
+        # Last checked filtering on the epoch column (last_check <= last_checked)
+        last_check_where, last_check_params = self._last_check_filter(
+            placeholder, last_checked, stale_hours
+        )
+        where_clause += last_check_where
+        params.extend(last_check_params)
 
         # Determine ordering (after building base where_clause, considering final_limit)
-        order_clause = ""
         if randomize is None:
             # Backwards-compatible: randomize if limit is provided
-            if final_limit is not None and final_limit > 0:
-                order_clause = f" ORDER BY {self.get_random_function()}"
-        else:
-            if randomize:
-                order_clause = f" ORDER BY {self.get_random_function()}"
+            randomize = final_limit is not None and final_limit > 0
+        order_clause = ""
+        if randomize:
+            if offset is None:
+                try:
+                    return self._random_proxies(where_clause, params, final_limit)
+                except Exception:
+                    pass
+            # Random pages keep the SQL ordering
+            order_clause = f" ORDER BY {self.get_random_function()}"
 
         # Build full SQL query with WHERE, ORDER BY, LIMIT, OFFSET
         sql_where = where_clause + order_clause
@@ -429,6 +606,133 @@ class ProxyDB:
             except Exception:
                 return []
 
+    def iter_proxies(
+        self,
+        after_id: int = 0,
+        batch_size: int = 1000,
+        where: Optional[str] = None,
+        params: Optional[Union[tuple, list]] = None,
+        columns: str = "*",
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Walk the proxies table in `id` order, one batch of rows at a time.
+
+        Each batch is read with `id > <last id seen>` on the primary key, so a
+        batch costs the same wherever it is in the table and deleting or
+        rewriting rows while iterating neither skips nor repeats rows (unlike
+        `get_all_proxies(page=..., per_page=...)`, whose OFFSET shifts). Rows
+        inserted after the iteration started are not visited, so rows renamed
+        by the caller (delete + insert) are not picked up again.
+
+        Args:
+            after_id (int): Resume after this `id` (the last id of a previous run).
+            batch_size (int): Rows per yielded batch.
+            where (Optional[str]): Extra condition, using the backend's placeholder.
+            params (Optional[Union[tuple, list]]): Parameters for `where`.
+            columns (str): Columns to select; `id` is always included.
+
+        Yields:
+            List[Dict[str, Any]]: Up to `batch_size` rows ordered by `id`.
+        """
+        columns = self._with_id_column(columns)
+        db = self.get_db()
+        for rows in self._keyset_pages(
+            lambda condition, values: db.select(
+                "proxies", columns, condition, values, limit=batch_size
+            ),
+            lambda row: row["id"],
+            after_id,
+            batch_size,
+            where,
+            params,
+        ):
+            yield cast(List[Dict[str, Any]], list(rows))
+
+    def load_batch(
+        self,
+        where: Optional[str] = None,
+        params: Optional[Union[tuple, list]] = None,
+        columns: str = "*",
+        batch_size: int = 10000,
+    ) -> ProxyBatch:
+        """Load proxies into a columnar `ProxyBatch`.
+
+        Rows are read from the cursor as plain tuples, `batch_size` at a time in
+        `id` order (like `iter_proxies()`), and appended to the batch without a
+        dict or `Proxy` per row. Use this instead of `get_all_proxies()` when
+        loading hundreds of thousands of rows.
+
+        Args:
+            where (Optional[str]): Extra condition, using the backend's placeholder.
+            params (Optional[Union[tuple, list]]): Parameters for `where`.
+            columns (str): Columns to select; `id` is always included.
+            batch_size (int): Rows fetched per query.
+
+        Returns:
+            ProxyBatch: The matching proxies.
+        """
+        columns = self._with_id_column(columns)
+        db = self.get_db()
+        batch: Optional[ProxyBatch] = None
+        id_index = 0
+
+        def fetch(condition: str, values: list) -> List[tuple]:
+            nonlocal batch, id_index
+            names, rows = db.select_rows(
+                "proxies", columns, condition, values, limit=batch_size
+            )
+            if batch is None:
+                batch = ProxyBatch(names)
+                id_index = names.index("id")
+            batch.extend_rows(names, rows)
+            return rows
+
+        for _ in self._keyset_pages(
+            fetch, lambda row: row[id_index], 0, batch_size, where, params
+        ):
+            pass
+        return batch if batch is not None else ProxyBatch()
+
+    @staticmethod
+    def _with_id_column(columns: str) -> str:
+        if columns.strip() != "*" and "id" not in [
+            c.strip() for c in columns.split(",")
+        ]:
+            columns = f"id, {columns}"
+        return columns
+
+    def _keyset_pages(
+        self,
+        fetch: Callable[[str, list], Any],
+        row_id: Callable[[Any], Any],
+        after_id: int,
+        batch_size: int,
+        where: Optional[str],
+        params: Optional[Union[tuple, list]],
+    ) -> Iterator[Any]:
+        """Call `fetch(condition, values)` for consecutive `id` ranges of the
+        proxies table, up to the MAX(id) seen when starting, and yield its rows."""
+        if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
+            placeholder = "%s"
+        else:
+            placeholder = "?"
+        top = self.get_db().select("proxies", "MAX(id) AS max_id")
+        max_id = top[0]["max_id"] if top else None
+        if max_id is None:
+            return
+        condition = f" AND ({where})" if where else ""
+        last_id = int(after_id or 0)
+        while last_id < int(max_id):
+            rows = fetch(
+                f"id > {placeholder} AND id <= {placeholder}{condition} ORDER BY id",
+                [last_id, max_id, *(params or [])],
+            )
+            if not rows:
+                break
+            last_id = int(row_id(rows[-1]))
+            yield rows
+            if len(rows) < batch_size:
+                break
+
     def remove(
         self,
         proxy: Optional[str],
@@ -500,6 +804,160 @@ class ProxyDB:
             pass
         return self.select(proxy)
 
+    def add_many(
+        self,
+        proxies: Iterable[Union[str, Proxy]],
+        chunk_size: int = 500,
+        update_credentials: bool = False,
+        debug: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Bulk version of `add()` for large proxy lists.
+
+        Proxies are normalized and de-duplicated up front, then processed in
+        chunks: one `IN (...)` lookup against `proxies` and one against
+        `added_proxies`, followed by `executemany` inserts, all inside a single
+        transaction per chunk.
+
+        Args:
+            proxies (Iterable[Union[str, Proxy]]): Raw proxy strings (any format
+                accepted by `extract_proxies`) or already parsed `Proxy` objects.
+            chunk_size (int): Number of proxies per lookup/transaction.
+            update_credentials (bool): When True, store username/password of
+                credentialed proxies on their rows (see `upsert_many`).
+            debug (bool): Print per-chunk progress.
+
+        Returns:
+            Dict[str, int]: Counts with keys ``added`` (new rows inserted),
+            ``skipped`` (already present in `proxies` or `added_proxies`) and
+            ``credentials`` (rows whose username/password were updated).
+        """
+        # Normalize and de-duplicate, keeping the last credentials seen per proxy
+        normalized: Dict[str, Optional[Proxy]] = {}
+        for item in proxies:
+            if isinstance(item, Proxy):
+                parsed = item
+            else:
+                extracted = extract_proxies(item)
+                if not extracted:
+                    continue
+                parsed = extracted[0]
+            if not parsed.proxy:
+                continue
+            key = parsed.proxy.strip()
+            if parsed.has_credentials() or key not in normalized:
+                normalized[key] = parsed if parsed.has_credentials() else None
+
+        counts = {"added": 0, "skipped": 0, "credentials": 0}
+        if not normalized:
+            return counts
+
+        db = self.get_db()
+        if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
+            placeholder = "%s"
+            insert_ignore = "INSERT IGNORE INTO"
+        else:
+            placeholder = "?"
+            insert_ignore = "INSERT OR IGNORE INTO"
+
+        keys = list(normalized.keys())
+        chunk_size = max(1, int(chunk_size))
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start : start + chunk_size]
+            in_clause = ", ".join([placeholder] * len(chunk))
+            with db.transaction():
+                existing: Set[str] = {
+                    row["proxy"]
+                    for row in db.select(
+                        "proxies", "proxy", f"proxy IN ({in_clause})", chunk
+                    )
+                }
+                already_added: Set[str] = {
+                    row["proxy"]
+                    for row in db.select(
+                        "added_proxies", "proxy", f"proxy IN ({in_clause})", chunk
+                    )
+                }
+                to_insert = [
+                    p for p in chunk if p not in existing and p not in already_added
+                ]
+                if to_insert:
+                    db.executemany(
+                        f"{insert_ignore} proxies (proxy, status) VALUES ({placeholder}, {placeholder})",
+                        [(p, "untested") for p in to_insert],
+                    )
+                    db.executemany(
+                        f"{insert_ignore} added_proxies (proxy) VALUES ({placeholder})",
+                        [(p,) for p in to_insert],
+                    )
+
+                credential_rows = []
+                if update_credentials:
+                    present = existing.union(to_insert)
+                    for p in chunk:
+                        item = normalized[p]
+                        if item is not None and p in present:
+                            credential_rows.append((item.username, item.password, p))
+                    if credential_rows:
+                        db.executemany(
+                            f"UPDATE proxies SET username = {placeholder}, password = {placeholder} WHERE proxy = {placeholder}",
+                            credential_rows,
+                        )
+
+            counts["added"] += len(to_insert)
+            counts["skipped"] += len(chunk) - len(to_insert)
+            counts["credentials"] += len(credential_rows)
+            if debug:
+                print(
+                    f"[add_many] chunk {start // chunk_size + 1}: "
+                    f"{len(to_insert)} added, {len(chunk) - len(to_insert)} skipped, "
+                    f"{len(credential_rows)} credentials updated"
+                )
+
+        return counts
+
+    def upsert_many(
+        self,
+        proxies: Iterable[Union[str, Proxy]],
+        chunk_size: int = 500,
+        debug: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Bulk-add proxies and store the credentials of authenticated ones.
+
+        Same as `add_many(..., update_credentials=True)`.
+        """
+        return self.add_many(
+            proxies, chunk_size=chunk_size, update_credentials=True, debug=debug
+        )
+
+    def ingest(
+        self,
+        proxies: Iterable[Union[str, Proxy]],
+        batch_size: int = 10000,
+        update_credentials: bool = True,
+        debug: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Feed an unbounded proxy stream (e.g. `iter_proxies_from_files`) to
+        `add_many` in batches of `batch_size`, so it never holds more than one
+        batch in memory.
+
+        Returns:
+            Dict[str, int]: Summed `add_many` counts.
+        """
+        counts = {"added": 0, "skipped": 0, "credentials": 0}
+        iterator = iter(proxies)
+        while True:
+            batch = list(itertools.islice(iterator, max(1, int(batch_size))))
+            if not batch:
+                return counts
+            batch_counts = self.add_many(
+                batch, update_credentials=update_credentials, debug=debug
+            )
+            for key in counts:
+                counts[key] += batch_counts[key]
+
     def update(
         self,
         proxy,
@@ -536,7 +994,7 @@ class ProxyDB:
             data["timezone"] = timezone
         if status and status != "untested":
             data["status"] = status
-            data["last_check"] = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+            data["last_check"] = get_current_rfc3339_time()
         if data:
             self.update_data(proxy, data)
 
@@ -582,9 +1040,15 @@ class ProxyDB:
                 )
             data["last_check"] = get_current_rfc3339_time()
 
+        if "last_check" in data:
+            # Keep the indexed epoch column in sync with the text timestamp
+            data["last_check_ts"] = rfc3339_to_epoch(data.get("last_check"))
+
         if data:
             data = self.clean_type(data)
             data = self.fix_no_such_column(data)
+            for column in GENERATED_COLUMNS:
+                data.pop(column, None)
             # sanitize values for SQL drivers (MySQL in particular)
             if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
                 for k, v in list(data.items()):
@@ -634,6 +1098,105 @@ class ProxyDB:
     def update_latency(self, proxy, latency):
         self.update(proxy.strip(), latency=latency)
 
+    def get_latency_stats(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Rows of the `proxy_latency` table, to restore a `LatencyTracker` with `load_rows`.
+
+        Args:
+            limit (Optional[int]): Keep only the most recently updated rows.
+
+        Returns:
+            List[Dict[str, Any]]: The rows, least recently updated first.
+        """
+        rows = self.get_db().select(
+            "proxy_latency", "*", "1 = 1 ORDER BY updated DESC", limit=limit
+        )
+        return rows[::-1]
+
+    def save_latency_stats(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Store `LatencyTracker.to_rows()` in the `proxy_latency` table, replacing older rows of the same key.
+
+        Returns:
+            int: The number of rows written.
+        """
+        columns = ("key", "srtt", "rttvar", "alive", "samples", "last_ok", "updated")
+        placeholder = (
+            "%s" if isinstance(self.db, MySQLHelper) or self.driver == "mysql" else "?"
+        )
+        sql = (
+            f"REPLACE INTO proxy_latency (`key`, {', '.join(columns[1:])}) "
+            f"VALUES ({', '.join([placeholder] * len(columns))})"
+        )
+        values = [tuple(row.get(column) for column in columns) for row in rows]
+        if not values:
+            return 0
+        with self.get_db().transaction():
+            self.get_db().executemany(sql, values)
+        return len(values)
+
+    def prune_latency_stats(self, keep: Optional[int] = None) -> None:
+        """
+        Delete the `proxy_latency` rows that `load_latency_history` no longer reads.
+
+        Args:
+            keep (Optional[int]): Most recently updated rows to keep. Defaults
+                to `max_entries` of the shared tracker.
+        """
+        if keep is None:
+            keep = get_latency_tracker().max_entries
+        db = self.get_db()
+        rows = db.execute_query_fetch(
+            "SELECT updated FROM proxy_latency ORDER BY updated DESC "
+            f"LIMIT 1 OFFSET {max(int(keep) - 1, 0)}"
+        )
+        if not isinstance(rows, list) or not rows:
+            return
+        placeholder = (
+            "%s" if isinstance(self.db, MySQLHelper) or self.driver == "mysql" else "?"
+        )
+        db.delete("proxy_latency", f"updated < {placeholder}", [rows[0]["updated"]])
+
+    def load_latency_history(
+        self, tracker: Optional[LatencyTracker] = None
+    ) -> LatencyTracker:
+        """
+        Restore the latency history of the checkers from the `proxy_latency` table.
+
+        Args:
+            tracker (Optional[LatencyTracker]): Defaults to `get_latency_tracker()`.
+
+        Returns:
+            LatencyTracker: The tracker; entries it updated since the last save
+                are kept, and it is left as is when the table cannot be read.
+        """
+        if tracker is None:
+            tracker = get_latency_tracker()
+        try:
+            tracker.load_rows(self.get_latency_stats(limit=tracker.max_entries))
+        except Exception as e:
+            print(f"[WARN] Failed loading latency history: {e}")
+        return tracker
+
+    def save_latency_history(self, tracker: Optional[LatencyTracker] = None) -> int:
+        """
+        Store the latency history of the checkers, see `load_latency_history`.
+        Only the entries recorded since the previous save are written.
+
+        Returns:
+            int: The number of rows written, 0 when saving failed.
+        """
+        if tracker is None:
+            tracker = get_latency_tracker()
+        try:
+            rows = tracker.to_rows(dirty_only=True)
+            written = self.save_latency_stats(rows)
+            tracker.mark_saved(rows)
+            return written
+        except Exception as e:
+            print(f"[WARN] Failed saving latency history: {e}")
+            return 0
+
     def get_working_proxies(
         self,
         auto_fix: bool = False,
@@ -647,6 +1210,7 @@ class ProxyDB:
         last_checked: Optional[str] = None,
         output_file: Optional[Union[str, Path]] = None,
         debug: bool = False,
+        stale_hours: Optional[float] = None,
     ) -> List[Dict[str, Union[str, None]]]:
         """
         Retrieve working (active) proxies with optional limit, ordering and filters.
@@ -654,7 +1218,7 @@ class ProxyDB:
         Parameters
         - auto_fix (bool): If True, run `fix_empty_data()` on the results before returning to populate missing geo/webgl/useragent data.
         - limit (Optional[int]): Legacy single-argument limit (kept for compatibility).
-        - randomize (bool): When True results are ordered randomly. When False results prefer most-recent rows (`ORDER BY rowid DESC` for SQLite, `ORDER BY id DESC` for MySQL) so recently added/updated proxies appear in limited result sets.
+        - randomize (bool): When True results are ordered randomly. When False results prefer the most recently checked rows on SQLite (`ORDER BY last_check_ts DESC`, then newest rows first, read in the order of the `(status, last_check_ts)` index) and the newest rows on MySQL (`ORDER BY id DESC`), where writers outside ProxyDB may leave `last_check_ts` unset.
         - ssl (Optional[bool]): Filter by the `https` column:
             - `True`  => return only proxies where `https` represents SSL
                 (accepted values: "true", "1" — case-insensitive).
@@ -670,6 +1234,7 @@ class ProxyDB:
         - page (Optional[int]): 1-based page number for pagination. If provided together with `per_page`, it overrides legacy `limit`.
         - per_page (Optional[int]): Number of items per page for pagination.
         - last_checked (Optional[str]): Filter by `last_check` column (RFC3339 date string). When provided, only returns proxies with `last_check <= last_checked`.
+        - stale_hours (Optional[float]): Only return proxies last checked more than this many hours ago (never-checked proxies are excluded). Answered from the indexed `last_check_ts` column.
         - output_file (Optional[Union[str, Path]]): If provided, saves the results as JSON to the specified file path.
 
         Returns
@@ -687,7 +1252,8 @@ class ProxyDB:
         params: List[Union[str, int]] = ["active"]
         if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
             placeholder = "%s"
-            # For MySQL: when randomize use RAND(), otherwise prefer most-recent rows
+            # For MySQL: when randomize use RAND(), otherwise newest rows first;
+            # writers that bypass ProxyDB may leave last_check_ts unset there
             order_clause = " ORDER BY RAND()" if randomize else " ORDER BY id DESC"
         else:
             placeholder = "?"
@@ -719,10 +1285,12 @@ class ProxyDB:
             where_clause += f" AND LOWER(type) LIKE {placeholder}"
             params.append(f"%{proxy_type.strip().lower()}%")
 
-        # Last checked filtering (last_check <= last_checked)
-        if last_checked:
-            where_clause += f" AND last_check <= {placeholder}"
-            params.append(last_checked)
+        # Last checked filtering on the epoch column (last_check <= last_checked)
+        last_check_where, last_check_params = self._last_check_filter(
+            placeholder, last_checked, stale_hours
+        )
+        where_clause += last_check_where
+        params.extend(last_check_params)
 
         # For SQLiteHelper we can pass rand and limit separately to avoid
         # embedding LIMIT into the where string. For MySQL keep previous behavior.
@@ -736,16 +1304,21 @@ class ProxyDB:
             final_limit = per_page
 
         try:
-            if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
+            if randomize and offset is None:
+                result = self._random_proxies(where_clause, params, final_limit)
+            elif isinstance(self.db, MySQLHelper) or self.driver == "mysql":
                 sql_where = f"{where_clause}{order_clause} LIMIT {int(final_limit)}"
                 if offset is not None:
                     sql_where += f" OFFSET {int(offset)}"
                 result = self.get_db().select("proxies", "*", sql_where, params)
             else:
                 # sqlite: when not randomizing, prefer most-recent rows so newly
-                # added/updated proxies appear in the limited result set.
+                # checked proxies appear in the limited result set. This is the
+                # order of the (status, last_check_ts) index, so nothing is sorted.
                 if not randomize:
-                    where_clause = f"{where_clause} ORDER BY rowid DESC"
+                    where_clause = (
+                        f"{where_clause} ORDER BY last_check_ts DESC, rowid DESC"
+                    )
                 # Build SQL with LIMIT/OFFSET for SQLite
                 limit_offset_sql = f"LIMIT {int(final_limit)}"
                 if offset is not None:
@@ -814,17 +1387,26 @@ class ProxyDB:
 
         # Desired semantics: include rows where status is NULL or empty string,
         # and also any row whose status is NOT one of ('active','port-closed','dead').
-        params: List[Union[str, int]]
-        if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
-            order_clause = " ORDER BY RAND()" if randomize else ""
-            sql_where = f"status IS NULL OR status = %s OR status NOT IN (%s, %s, %s){order_clause} LIMIT {limit}"
-            params = ["", "active", "port-closed", "dead"]
-            result = self.get_db().select("proxies", "*", sql_where, params)
+        # `NOT IN` cannot use an index, so the statuses around the excluded ones
+        # are matched as index ranges instead: one index search per arm.
+        placeholder = (
+            "%s" if isinstance(self.db, MySQLHelper) or self.driver == "mysql" else "?"
+        )
+        excluded = sorted(["active", "port-closed", "dead"])
+        arms = ["status IS NULL", f"status < {placeholder}"]
+        params: List[Union[str, int]] = [excluded[0]]
+        for low, high in zip(excluded, excluded[1:]):
+            arms.append(f"status > {placeholder} AND status < {placeholder}")
+            params.extend([low, high])
+        arms.append(f"status > {placeholder}")
+        params.append(excluded[-1])
+        sql_where = " OR ".join(f"({arm})" for arm in arms)
+        if randomize:
+            result = self._random_proxies(sql_where, params, limit)
         else:
-            order_clause = " ORDER BY RANDOM()" if randomize else ""
-            sql_where = f"status IS NULL OR status = ? OR status NOT IN (?,?,?){order_clause} LIMIT {limit}"
-            params = ["", "active", "port-closed", "dead"]
-            result = self.get_db().select("proxies", "*", sql_where, params)
+            result = self.get_db().select(
+                "proxies", "*", f"{sql_where} LIMIT {limit}", params
+            )
 
         if not result:
             return []
@@ -846,28 +1428,21 @@ class ProxyDB:
 
         Args:
             limit: maximum number of results to return.
-            randomize: when True include a random ordering clause in the SQL.
+            randomize: when True return a random sample of the matching rows.
         """
         if not limit:
             limit = sys.maxsize
 
+        params: List[Union[str, int]] = ["dead", "port-closed"]
         if isinstance(self.db, MySQLHelper) or self.driver == "mysql":
-            order_clause = " ORDER BY RAND()" if randomize else ""
-            sql = f"status = %s or status = %s{order_clause} LIMIT {limit}"
-            result = self.get_db().select(
-                "proxies",
-                "*",
-                sql,
-                ["dead", "port-closed"],
-            )
+            sql = "status IN (%s, %s)"
+        else:
+            sql = "status IN (?, ?)"
+        if randomize:
+            result = self._random_proxies(sql, params, limit)
         else:
-            order_clause = " ORDER BY RANDOM()" if randomize else ""
-            sql = f"status = ? or status = ?{order_clause} LIMIT {limit}"
             result = self.get_db().select(
-                "proxies",
-                "*",
-                sql,
-                ["dead", "port-closed"],
+                "proxies", "*", f"{sql} LIMIT {limit}", params
             )
         if not isinstance(result, list):
             result = []
@@ -1020,23 +1595,18 @@ class ProxyDB:
             return []
 
         result = extract_proxies(line)
-        if update_db:
-            for item in result:
-                if not self.select(item.proxy):
-                    if debug:
-                        print(f"[extract_proxies] Adding proxy: {item.proxy}")
-                    self.add(item.proxy)
-                if item.username and item.password:
-                    if debug:
-                        print(
-                            f"[extract_proxies] Updating credentials for proxy: {item.proxy}"
-                        )
-                    self.update_data(
-                        item.proxy,
-                        {"username": item.username, "password": item.password},
-                    )
+        if update_db and result:
+            counts = self.upsert_many(result)
+            if debug:
+                print(
+                    f"[extract_proxies] {counts['added']} added, {counts['skipped']} skipped, "
+                    f"{counts['credentials']} credentials updated"
+                )
 
         return result
 
     def checksum(self, table: str, columns: List[str]) -> str:
         return self.get_db().checksum(table, columns)
+
+    def cached_checksum(self, table: str, columns: List[str]) -> str:
+        return self.get_db().cached_checksum(table, columns)
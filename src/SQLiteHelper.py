@@ -1,8 +1,21 @@
 import os
+import random
 import sqlite3
 import sys
 import threading
-from typing import List, Optional, Union, Dict, Any
+import time
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 from proxy_hunter import copy_file, delete_path
 
@@ -11,6 +24,11 @@ from src.func import get_relative_path
 from src.func_console import get_message_exception
 import hashlib
 
+# `sample()` probes random keys in chunks of this size (below SQLite's variable limit)
+SAMPLE_PROBE_CHUNK = 500
+# Above this many random key probes `sample()` falls back to a reservoir over the keys
+SAMPLE_MAX_PROBES = 20000
+
 
 class MyDatabaseConnection(sqlite3.Connection):
     def __init__(self, database: str, *args, **kwargs):
@@ -106,12 +124,18 @@ class SQLiteHelper:
             db_path (str): The file path to the SQLite database.
         """
         self.db_path = db_path
-        # Connect database (create a connection object)
-        sqlite3.connect(db_path, check_same_thread=check_same_thread)
-        # Wrap custom class
+        # Connect database through the custom connection class
         self.conn = MyDatabaseConnection(db_path, check_same_thread=check_same_thread)
         # Lock to serialize access from multiple threads
         self._lock = threading.RLock()
+        # True while a `transaction()` block is open; writes defer their commit
+        self._in_transaction = False
+        # `batch()` state: nesting depth, thresholds and writes since last flush
+        self._batch_depth = 0
+        self._batch_max_rows: Optional[int] = None
+        self._batch_max_seconds: Optional[float] = None
+        self._batch_pending = 0
+        self._batch_started = 0.0
         self.conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key support
         self.conn.row_factory = sqlite3.Row  # Access rows by column names
 
@@ -136,13 +160,7 @@ class SQLiteHelper:
             cur = self.conn.cursor()
             try:
                 cur.execute(sql)
-                try:
-                    self.conn.commit()
-                except sqlite3.OperationalError as e:
-                    if "no transaction is active" in str(e).lower():
-                        pass
-                    else:
-                        raise
+                self._commit()
             finally:
                 cur.close()
 
@@ -177,13 +195,7 @@ class SQLiteHelper:
                         cur.execute(sql, params)
                     else:
                         raise
-                try:
-                    self.conn.commit()
-                except sqlite3.OperationalError as e:
-                    if "no transaction is active" in str(e).lower():
-                        pass
-                    else:
-                        raise
+                self._commit()
             finally:
                 cur.close()
 
@@ -207,13 +219,7 @@ class SQLiteHelper:
                         cur.execute(sql, params)
                     else:
                         raise
-                try:
-                    self.conn.commit()
-                except sqlite3.OperationalError as e:
-                    if "no transaction is active" in str(e).lower():
-                        pass
-                    else:
-                        raise
+                self._commit()
             finally:
                 cur.close()
 
@@ -237,13 +243,7 @@ class SQLiteHelper:
                         cur.execute(sql, params)
                     else:
                         raise
-                try:
-                    self.conn.commit()
-                except sqlite3.OperationalError as e:
-                    if "no transaction is active" in str(e).lower():
-                        pass
-                    else:
-                        raise
+                self._commit()
             finally:
                 cur.close()
 
@@ -328,6 +328,40 @@ class SQLiteHelper:
             finally:
                 cur.close()
 
+    def select_rows(
+        self,
+        table_name: str,
+        columns: str = "*",
+        where: Optional[str] = None,
+        params: Optional[Union[tuple, list]] = None,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[str], List[tuple]]:
+        """
+        Like `select()`, but returns the column names and plain row tuples
+        instead of one dict per row, for bulk loads (see `ProxyBatch`).
+
+        Returns:
+            Tuple[List[str], List[tuple]]: Column names and rows in that order.
+        """
+        sql = f"SELECT {columns} FROM {table_name}"
+        if where:
+            sql += f" WHERE {where}"
+        exec_params = list(params) if params is not None else []
+        if limit is not None:
+            sql += " LIMIT ?"
+            exec_params.append(limit)
+
+        with self._lock:
+            cur = self.conn.cursor()
+            # tuples instead of the connection's sqlite3.Row
+            cur.row_factory = None
+            try:
+                cur.execute(sql, tuple(exec_params))
+                names = [d[0] for d in cur.description]
+                return names, cur.fetchall()
+            finally:
+                cur.close()
+
     def count(
         self,
         table_name: str,
@@ -362,6 +396,132 @@ class SQLiteHelper:
             finally:
                 cur.close()
 
+    def sample(
+        self,
+        table_name: str,
+        n: int,
+        columns: str = "*",
+        where: Optional[str] = None,
+        params: Optional[Union[tuple, list]] = None,
+        key: str = "rowid",
+    ) -> List[dict]:
+        """
+        Selects up to `n` random rows without sorting the table like `ORDER BY RANDOM()`.
+
+        Random values of the integer `key` are probed against its index and kept
+        when the row matches `where` (rejection sampling). When the filter is too
+        sparse for probing to pay off, the remaining rows are drawn with a reservoir
+        over the matching keys, which walks the filter's index once instead.
+        Every matching row is equally likely to be picked.
+
+        Args:
+            table_name (str): The name of the table.
+            n (int): The maximum number of rows to return.
+            columns (str): The columns to select (default is '*').
+            where (Optional[str]): A plain filter without 'WHERE', ORDER BY or LIMIT (default is None).
+            params (Optional[Union[tuple, list]]): Parameters to substitute in `where` (default is None).
+            key (str): Integer key column to probe (default is 'rowid').
+
+        Returns:
+            List[dict]: Up to `n` rows in random order.
+        """
+        if n <= 0:
+            return []
+        where_sql = f"({where})" if where else "1=1"
+        where_params = list(params) if params is not None else []
+
+        with self._lock:
+            cur = self.conn.cursor()
+            try:
+                # Separate queries: SQLite only answers a lone MIN()/MAX() from the index
+                cur.execute(f"SELECT MIN({key}) FROM {table_name}")
+                lo = cur.fetchone()[0]
+                cur.execute(f"SELECT MAX({key}) FROM {table_name}")
+                hi = cur.fetchone()[0]
+                if lo is None or hi is None:
+                    return []
+
+                chosen: List[int] = []
+                probed: Set[int] = set()
+                probes = hits = 0
+                while len(chosen) < n and len(probed) <= hi - lo:
+                    need = n - len(chosen)
+                    # Size the next round from the hit rate seen so far
+                    rate = hits / probes if probes else 1.0
+                    if rate == 0:
+                        break
+                    want = int(need / rate * 1.25) + 16
+                    if probes + want > SAMPLE_MAX_PROBES:
+                        break
+                    keys = self._draw_sample_keys(lo, hi, probed, want)
+                    found: List[int] = []
+                    for i in range(0, len(keys), SAMPLE_PROBE_CHUNK):
+                        chunk = keys[i : i + SAMPLE_PROBE_CHUNK]
+                        placeholders = ", ".join("?" for _ in chunk)
+                        cur.execute(
+                            f"SELECT {key} FROM {table_name} WHERE {where_sql} AND {key} IN ({placeholders})",
+                            tuple(where_params + chunk),
+                        )
+                        found.extend(row[0] for row in cur.fetchall())
+                    probes += len(keys)
+                    hits += len(found)
+                    # The probed keys are a uniform draw, so any subset of the hits is too
+                    chosen.extend(random.sample(found, min(need, len(found))))
+
+                if len(chosen) < n:
+                    # Reservoir over the matching keys not picked by the probes
+                    taken = set(chosen)
+                    reservoir: List[int] = []
+                    seen = 0
+                    cur.execute(
+                        f"SELECT {key} FROM {table_name} WHERE {where_sql}",
+                        tuple(where_params),
+                    )
+                    k = n - len(chosen)
+                    for (value,) in cur:
+                        if value in taken:
+                            continue
+                        seen += 1
+                        if len(reservoir) < k:
+                            reservoir.append(value)
+                        else:
+                            j = random.randrange(seen)
+                            if j < k:
+                                reservoir[j] = value
+                    chosen.extend(reservoir)
+
+                rows: List[dict] = []
+                for i in range(0, len(chosen), SAMPLE_PROBE_CHUNK):
+                    chunk = chosen[i : i + SAMPLE_PROBE_CHUNK]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    cur.execute(
+                        f"SELECT {columns} FROM {table_name} WHERE {key} IN ({placeholders})",
+                        tuple(chunk),
+                    )
+                    rows.extend(dict(row) for row in cur.fetchall())
+                random.shuffle(rows)
+                return rows
+            finally:
+                cur.close()
+
+    @staticmethod
+    def _draw_sample_keys(lo: int, hi: int, probed: Set[int], want: int) -> List[int]:
+        """Draw up to `want` distinct keys in [lo, hi] that were not probed yet."""
+        remaining = hi - lo + 1 - len(probed)
+        if want * 2 >= remaining:
+            # Most of the range is wanted: enumerate it instead of retrying draws
+            keys = [k for k in range(lo, hi + 1) if k not in probed]
+            keys = random.sample(keys, min(want, len(keys)))
+        else:
+            picked: Set[int] = set()
+            while len(picked) < want:
+                k = random.randint(lo, hi)
+                if k not in probed:
+                    picked.add(k)
+            keys = list(picked)
+        probed.update(keys)
+        return keys
+
     def update(
         self,
         table_name: str,
@@ -389,13 +549,7 @@ class SQLiteHelper:
                         cur.execute(sql, tuple(combined))
                     else:
                         raise
-                try:
-                    self.conn.commit()
-                except sqlite3.OperationalError as e:
-                    if "no transaction is active" in str(e).lower():
-                        pass
-                    else:
-                        raise
+                self._commit()
             finally:
                 cur.close()
 
@@ -419,13 +573,7 @@ class SQLiteHelper:
                         cur.execute(sql, exec_params)
                     else:
                         raise
-                try:
-                    self.conn.commit()
-                except sqlite3.OperationalError as e:
-                    if "no transaction is active" in str(e).lower():
-                        pass
-                    else:
-                        raise
+                self._commit()
             finally:
                 cur.close()
 
@@ -474,15 +622,171 @@ class SQLiteHelper:
                             cur.execute(sql)
                         else:
                             raise
-                try:
+                self._commit()
+            finally:
+                cur.close()
+
+    def executemany(self, sql: str, seq_of_params: Iterable[Union[tuple, list]]) -> int:
+        """
+        Executes a parameterized SQL statement once for every parameter set.
+
+        All rows are written with a single `cursor.executemany()` call and
+        committed once (or deferred by `transaction()` / `batch()`).
+
+        Args:
+            sql (str): The SQL statement to execute.
+            seq_of_params (Iterable[Union[tuple, list]]): Parameter sets, one per row.
+
+        Returns:
+            int: The total number of rows affected.
+        """
+        rows = [tuple(params) for params in seq_of_params]
+        if not rows:
+            return 0
+        with self._lock:
+            cur = self.conn.cursor()
+            try:
+                cur.executemany(sql, rows)
+                affected = cur.rowcount
+                self._commit(len(rows))
+                return affected if affected is not None and affected > 0 else 0
+            finally:
+                cur.close()
+
+    def _commit(self, rows: int = 1) -> None:
+        """
+        Commits a finished write unless `transaction()` or `batch()` defers it.
+
+        Inside a batch the write is only counted, and the batch is flushed once
+        one of its thresholds is reached.
+        """
+        if self._batch_depth:
+            self._batch_pending += rows
+            if not self._in_transaction and self._batch_due():
+                self._flush_batch()
+            return
+        if self._in_transaction:
+            return
+        try:
+            self.conn.commit()
+        except sqlite3.OperationalError as e:
+            if "no transaction is active" in str(e).lower():
+                pass
+            else:
+                raise
+
+    def _batch_due(self) -> bool:
+        if (
+            self._batch_max_rows is not None
+            and self._batch_pending >= self._batch_max_rows
+        ):
+            return True
+        return (
+            self._batch_max_seconds is not None
+            and time.monotonic() - self._batch_started >= self._batch_max_seconds
+        )
+
+    def _flush_batch(self) -> None:
+        with self._lock:
+            if self.conn.in_transaction:
+                self.conn.commit()
+            self._batch_pending = 0
+            self._batch_started = time.monotonic()
+
+    @contextmanager
+    def transaction(self) -> Iterator["SQLiteHelper"]:
+        """
+        Runs the enclosed statements inside one transaction.
+
+        Commits when the block exits normally and rolls back when it raises.
+        Nested calls join the outermost transaction. Inside `batch()` the block
+        becomes a savepoint of the batch transaction, so a failure only undoes
+        the statements of this block.
+
+        Usage:
+            >>> with db_helper.transaction():
+            ...     db_helper.executemany("INSERT INTO users (name) VALUES (?)", [("a",), ("b",)])
+        """
+        with self._lock:
+            if self._in_transaction:
+                yield self
+                return
+            self._in_transaction = True
+            savepoint = self._batch_depth > 0
+            try:
+                if not self.conn.in_transaction:
+                    self.conn.execute("BEGIN")
+                if savepoint:
+                    self.conn.execute("SAVEPOINT helper_transaction")
+                yield self
+                if savepoint:
+                    self.conn.execute("RELEASE SAVEPOINT helper_transaction")
+                else:
                     self.conn.commit()
-                except sqlite3.OperationalError as e:
-                    if "no transaction is active" in str(e).lower():
-                        pass
+            except BaseException:
+                try:
+                    if savepoint:
+                        self.conn.execute("ROLLBACK TO SAVEPOINT helper_transaction")
+                        self.conn.execute("RELEASE SAVEPOINT helper_transaction")
                     else:
-                        raise
+                        self.conn.rollback()
+                except Exception:
+                    pass
+                raise
             finally:
-                cur.close()
+                self._in_transaction = False
+            if savepoint and self._batch_due():
+                self._flush_batch()
+
+    @contextmanager
+    def batch(
+        self, max_rows: Optional[int] = 1000, max_seconds: Optional[float] = 5.0
+    ) -> Iterator["SQLiteHelper"]:
+        """
+        Coalesces writes into as few commits as possible.
+
+        All helper methods keep working inside the block, but instead of
+        committing every statement the pending writes are committed together
+        once `max_rows` rows were written or the last flush is older than
+        `max_seconds` (both checked on each write), and when the block exits.
+        If the block raises, writes that were not flushed yet are rolled back;
+        earlier flushes stay committed. Nested calls join the outermost batch.
+
+        The batch applies to the helper as a whole, so writes made by other
+        threads sharing this connection are coalesced into it as well.
+
+        Args:
+            max_rows (Optional[int]): Flush after this many written rows. None disables the limit.
+            max_seconds (Optional[float]): Flush when the last flush is older than this. None disables the limit.
+
+        Usage:
+            >>> with db_helper.batch(max_rows=500):
+            ...     for name in names:
+            ...         db_helper.insert("users", {"name": name})
+        """
+        with self._lock:
+            if self._batch_depth == 0:
+                self._batch_max_rows = max_rows
+                self._batch_max_seconds = max_seconds
+                self._batch_pending = 0
+                self._batch_started = time.monotonic()
+            self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    try:
+                        self.conn.rollback()
+                    except Exception:
+                        pass
+                    self._batch_pending = 0
+            raise
+        with self._lock:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush_batch()
 
     def execute_query_fetch(
         self, sql: str, params: Optional[Union[tuple, list]] = None
@@ -550,92 +854,141 @@ class SQLiteHelper:
                     return result
 
                 # No description -> no rows (e.g., INSERT/UPDATE/DELETE)
-                try:
-                    self.conn.commit()
-                except sqlite3.OperationalError as e:
-                    if "no transaction is active" in str(e).lower():
-                        pass
-                    else:
-                        raise
+                self._commit()
                 return cur.rowcount
             finally:
                 cur.close()
 
-    def checksum(self, table: str, columns: Optional[List[str]] = None) -> str:
-        """Calculate a checksum for a table by concatenating ordered row values and hashing.
+    def checksum(
+        self, table: str, columns: Optional[List[str]] = None, chunk_size: int = 1000
+    ) -> str:
+        """Calculate a checksum for a table by hashing ordered row values.
 
-        This implementation fetches rows ordered by `id` (if present) and computes an MD5
-        over the concatenated values. If `columns` is None or empty, all columns are used
-        in the cursor order.
+        Rows are ordered by `id` (if present) and streamed from the cursor in
+        chunks of `chunk_size` into an incremental MD5, so memory stays constant
+        regardless of the table size. Values are joined with '|' and rows with
+        '||'. If `columns` is None or empty, all columns are used in the cursor order.
         Returns the hex digest string or empty string on failure.
         """
-        # Determine ordering and column list
         cols: List[str] = columns[:] if columns else []
 
-        # Fetch a single row to determine columns if none provided
-        try:
-            cur = self.conn.cursor()
+        # Determine columns from the cursor description when none provided
+        if not cols:
             try:
-                cur.execute(f"SELECT * FROM {table} LIMIT 1")
-                first = cur.fetchone()
-                if first is not None and not cols:
-                    # sqlite3.Row supports keys
-                    if isinstance(first, sqlite3.Row):
-                        cols = list(first.keys())
-                    elif isinstance(first, (list, tuple)):
-                        # fallback: use cursor description
+                cur = self.conn.cursor()
+                try:
+                    cur.execute(f"SELECT * FROM {table} LIMIT 1")
+                    if cur.fetchone() is not None:
                         cols = [d[0] for d in cur.description]
-            finally:
-                cur.close()
-        except Exception:
-            return ""
+                finally:
+                    cur.close()
+            except Exception:
+                return ""
 
         if not cols:
             return ""
 
         order_col = "id" if "id" in cols else cols[0]
 
-        # Fetch all rows ordered by order_col and build concatenated string
+        h = hashlib.md5()
         try:
-            cur = self.conn.cursor()
-            try:
-                cols_sql = ", ".join(cols)
-                cur.execute(f"SELECT {cols_sql} FROM {table} ORDER BY {order_col}")
-                rows = cur.fetchall()
-            finally:
-                cur.close()
+            with self._lock:
+                cur = self.conn.cursor()
+                try:
+                    cols_sql = ", ".join(cols)
+                    cur.execute(f"SELECT {cols_sql} FROM {table} ORDER BY {order_col}")
+                    first = True
+                    while True:
+                        rows = cur.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        for r in rows:
+                            row = "|".join("" if v is None else str(v) for v in r)
+                            h.update((row if first else "||" + row).encode("utf-8"))
+                            first = False
+                finally:
+                    cur.close()
         except Exception:
             return ""
+        return h.hexdigest()
 
-        parts: List[str] = []
-        for r in rows:
-            # r can be sqlite3.Row or tuple
-            values: List[str] = []
-            if isinstance(r, sqlite3.Row):
-                for c in cols:
-                    try:
-                        v = r[c]
-                    except Exception:
-                        v = None
-                    values.append(str(v) if v is not None else "")
-            elif isinstance(r, (list, tuple)):
-                for i in range(len(cols)):
-                    try:
-                        v = r[i]
-                    except Exception:
-                        v = None
-                    values.append(str(v) if v is not None else "")
-            else:
-                # unexpected row type
-                continue
-            parts.append("|".join(values))
+    @staticmethod
+    def _tracking_name(table: str, columns: Optional[List[str]] = None) -> str:
+        """Suffix of the `meta` keys used by `track_changes()`/`cached_checksum()`."""
+        return table + (f":{'+'.join(columns)}" if columns else "")
+
+    def track_changes(self, table: str, columns: Optional[List[str]] = None) -> None:
+        """Install triggers bumping a `meta` counter on every write to `table`.
 
-        joined = "||".join(parts)
+        When `columns` is given only inserts, deletes and updates of those
+        columns count. `cached_checksum()` uses the counter to skip rehashing
+        unchanged tables.
+        """
+        key = f"table_version:{self._tracking_name(table, columns)}"
+        suffix = f"_{'_'.join(columns)}" if columns else ""
+        bump = (
+            f"INSERT INTO meta (key, value) VALUES ('{key}', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+        update_of = f" OF {', '.join(columns)}" if columns else ""
+        self.execute_query(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        for op, event in (
+            ("insert", "INSERT"),
+            ("update", f"UPDATE{update_of}"),
+            ("delete", "DELETE"),
+        ):
+            self.execute_query(
+                f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{op}{suffix} "
+                f"AFTER {event} ON {table} BEGIN {bump}; END"
+            )
+        # Mark the table as tracked only once every trigger exists
+        self.execute_query(
+            "INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)", (key, "0")
+        )
+
+    def table_version(
+        self, table: str, columns: Optional[List[str]] = None
+    ) -> Optional[int]:
+        """Return the `track_changes()` write counter, or None when not tracked."""
         try:
-            h = hashlib.md5(joined.encode("utf-8")).hexdigest()
-            return h
-        except Exception:
-            return ""
+            rows = self.select(
+                "meta",
+                "value",
+                "key = ?",
+                (f"table_version:{self._tracking_name(table, columns)}",),
+            )
+        except sqlite3.OperationalError:
+            return None
+        return int(rows[0]["value"]) if rows else None
+
+    def cached_checksum(self, table: str, columns: Optional[List[str]] = None) -> str:
+        """Return `checksum()`, reusing the stored digest while the table is unchanged.
+
+        Needs `track_changes()` for the same table/columns; untracked tables
+        are always hashed.
+        """
+        version = self.table_version(table, columns)
+        if version is None:
+            return self.checksum(table, columns)
+        cache_key = f"checksum:{self._tracking_name(table, columns)}"
+        rows = self.select("meta", "value", "key = ?", (cache_key,))
+        if rows:
+            cached_version, _, digest = str(rows[0]["value"]).partition(":")
+            if cached_version == str(version) and digest:
+                return digest
+        digest = self.checksum(table, columns)
+        if digest:
+            try:
+                self.execute_query(
+                    "REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    (cache_key, f"{version}:{digest}"),
+                )
+            except sqlite3.Error:
+                # read-only databases still get the checksum
+                pass
+        return digest
 
     def column_exists(self, table_name: str, column_name: str) -> bool:
         """
@@ -647,7 +1000,8 @@ class SQLiteHelper:
             cur = self.conn.cursor()
             try:
                 try:
-                    cur.execute(f"PRAGMA table_info({table_name})")
+                    # table_xinfo also lists generated columns (table_info hides them)
+                    cur.execute(f"PRAGMA table_xinfo({table_name})")
                 except Exception:
                     # If table does not exist or invalid name, treat as not existing
                     return False
@@ -664,19 +1018,27 @@ class SQLiteHelper:
             finally:
                 cur.close()
 
+    def index_exists(self, table_name: str, index_name: str) -> bool:
+        """
+        Check whether an index exists on a given table for SQLite.
+
+        Returns True if the index exists, False otherwise.
+        """
+        rows = self.select(
+            "sqlite_master",
+            "name",
+            "type = 'index' AND tbl_name = ? AND name = ?",
+            (table_name, index_name),
+        )
+        return len(rows) > 0
+
     def truncate_table(self, table_name: str) -> None:
         sql = f"DELETE FROM {table_name}"
         with self._lock:
             cur = self.conn.cursor()
             try:
                 cur.execute(sql)
-                try:
-                    self.conn.commit()
-                except sqlite3.OperationalError as e:
-                    if "no transaction is active" in str(e).lower():
-                        pass
-                    else:
-                        raise
+                self._commit()
             finally:
                 cur.close()
 
@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+
+# Ensure project root on sys.path when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.ProxyDB import ProxyDB
+from src.shared import init_db
+
+
+def main() -> int:
+    """Database maintenance that is too expensive to run on every connection open."""
+    parser = argparse.ArgumentParser(description="ProxyDB maintenance")
+    parser.add_argument(
+        "--schema",
+        action="store_true",
+        help="re-apply the schema file and pending migrations even when up to date",
+    )
+    parser.add_argument(
+        "--vacuum",
+        action="store_true",
+        help="prune old latency history, VACUUM the SQLite database and truncate its WAL",
+    )
+    parser.add_argument(
+        "--daily",
+        action="store_true",
+        help="only VACUUM when the last one is older than a day",
+    )
+    parser.add_argument(
+        "--db",
+        help="path of a SQLite database to maintain instead of the configured one",
+    )
+    args = parser.parse_args()
+
+    db = ProxyDB(args.db, start=True) if args.db else init_db()
+    if not db or not db.db:
+        print("Failed to initialize database connection.")
+        return 1
+    try:
+        if args.schema:
+            db.ensure_schema(force=True, debug=True)
+            print("Schema applied.")
+        if args.vacuum:
+            db.vacuum()
+            print("Database vacuumed.")
+        elif args.daily:
+            ran = db.run_daily_vacuum()
+            print("Database vacuumed." if ran else "Vacuum not due yet.")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -318,6 +318,32 @@ def parse_interval_to_seconds(interval: str) -> int:
     return amount * unit_seconds[unit]
 
 
+def rfc3339_to_epoch(date_str: Optional[str]) -> Optional[int]:
+    """
+    Convert an RFC3339 timestamp to integer Unix epoch seconds.
+
+    Naive timestamps are treated as UTC, like `is_date_rfc3339_older_than` and
+    SQLite's `strftime('%s', ...)`, so both sides agree on `last_check_ts`.
+
+    Returns:
+        Optional[int]: Epoch seconds, or None for empty/invalid input.
+    """
+    if not date_str or not isinstance(date_str, str):
+        return None
+    try:
+        parsed = parser.isoparse(date_str.strip())
+    except (ValueError, OverflowError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def hours_ago_epoch(hours: float) -> int:
+    """Return the Unix epoch seconds of `hours` hours ago."""
+    return int(datetime.now(timezone.utc).timestamp() - hours * 3600)
+
+
 if __name__ == "__main__":
     date_str = "2024-07-29T10:36:02+07:00"
     hours_to_check = 1
@@ -19,8 +19,9 @@ from proxy_hunter import (
     get_pc_useragent,
     get_unique_dicts_by_key_in_list,
     is_port_open,
+    iter_proxies_from_files,
+    list_text_files,
     move_string_between,
-    read_all_text_files,
     read_file,
 )
 
@@ -194,15 +195,19 @@ def get_proxies(
         # =====================================================
 
         if not working_only and not untested_only:
-            files_content = read_all_text_files(get_relative_path("assets/proxies"))
+            file_paths = list_text_files(get_relative_path("assets/proxies"))
 
             proxy_file_path = get_relative_path("proxies.txt")
 
             if os.path.exists(proxy_file_path):
-                files_content[proxy_file_path] = str(read_file(proxy_file_path))
+                file_paths.append(proxy_file_path)
 
-            for file_path, content in files_content.items():
-                extracted = db.extract_proxies(content, True)
+            for file_path in file_paths:
+                # Stream each file instead of reading it into memory
+                extracted = list(iter_proxies_from_files([file_path]))
+
+                if extracted:
+                    db.upsert_many(extracted)
 
                 total = len(extracted)
 
@@ -226,18 +231,12 @@ def get_proxies(
             # =================================================
 
             if len(proxies) < 100:
-                append(
-                    item
-                    for item in select("proxies", "*", rand=True)
-                    if item.get("proxy")
-                    and (
-                        skip_last_check_filter
-                        or is_date_rfc3339_hour_more_than(
-                            item.get("last_check"),
-                            1,
-                        )
-                    )
-                )
+                if skip_last_check_filter:
+                    stale = select("proxies", "*", rand=True)
+                else:
+                    # Checked more than an hour ago, filtered on the indexed epoch column
+                    stale = db.get_all_proxies(randomize=True, stale_hours=1)
+                append(item for item in stale if item.get("proxy"))
 
         # =====================================================
         # Deduplicate + filtering
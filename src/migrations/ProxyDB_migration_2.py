@@ -0,0 +1,60 @@
+import os
+import sys
+from typing import Union
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.MySQLHelper import MySQLHelper
+from src.SQLiteHelper import SQLiteHelper
+
+MIGRATION_NUMBER = 2
+
+# `ip` and `port` are derived from the normalized "ip:port" value in `proxy`
+SQLITE_IP_EXPR = (
+    "CASE WHEN INSTR(proxy, ':') > 0 "
+    "THEN SUBSTR(proxy, 1, INSTR(proxy, ':') - 1) ELSE proxy END"
+)
+SQLITE_PORT_EXPR = (
+    "CASE WHEN INSTR(proxy, ':') > 0 "
+    "THEN CAST(SUBSTR(proxy, INSTR(proxy, ':') + 1) AS INTEGER) END"
+)
+MYSQL_IP_EXPR = "SUBSTRING_INDEX(proxy, ':', 1)"
+MYSQL_PORT_EXPR = (
+    "IF(proxy REGEXP ':[0-9]{1,5}$', "
+    "CAST(SUBSTRING_INDEX(proxy, ':', -1) AS UNSIGNED), NULL)"
+)
+
+# Secondary indexes for the hot `proxies` filters (status/last_check and per-IP lookups)
+PROXIES_INDEXES = {
+    "idx_proxies_status_last_check": "status, last_check",
+    "idx_proxies_ip": "ip",
+}
+
+
+def migrate(db: Union[SQLiteHelper, MySQLHelper]):
+    # Add generated column 'ip' to 'proxies' table when not exists
+    if not db.column_exists("proxies", "ip"):
+        if isinstance(db, SQLiteHelper):
+            # ALTER TABLE can only add VIRTUAL generated columns; they are still indexable
+            db.execute_query(
+                f"ALTER TABLE proxies ADD COLUMN ip TEXT GENERATED ALWAYS AS ({SQLITE_IP_EXPR}) VIRTUAL"
+            )
+        elif isinstance(db, MySQLHelper):
+            db.execute_query(
+                f"ALTER TABLE proxies ADD COLUMN ip VARCHAR(255) GENERATED ALWAYS AS ({MYSQL_IP_EXPR}) STORED"
+            )
+
+    # Add generated column 'port' to 'proxies' table when not exists
+    if not db.column_exists("proxies", "port"):
+        if isinstance(db, SQLiteHelper):
+            db.execute_query(
+                f"ALTER TABLE proxies ADD COLUMN port INTEGER GENERATED ALWAYS AS ({SQLITE_PORT_EXPR}) VIRTUAL"
+            )
+        elif isinstance(db, MySQLHelper):
+            db.execute_query(
+                f"ALTER TABLE proxies ADD COLUMN port INT UNSIGNED GENERATED ALWAYS AS ({MYSQL_PORT_EXPR}) STORED"
+            )
+
+    for index_name, columns in PROXIES_INDEXES.items():
+        if not db.index_exists("proxies", index_name):
+            db.execute_query(f"CREATE INDEX {index_name} ON proxies ({columns})")
@@ -0,0 +1,83 @@
+import os
+import sys
+from typing import Union
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.func_date import rfc3339_to_epoch
+from src.MySQLHelper import MySQLHelper
+from src.SQLiteHelper import SQLiteHelper
+
+MIGRATION_NUMBER = 3
+
+# Rows converted per backfill round
+BACKFILL_CHUNK = 1000
+
+# SQLite keeps `last_check_ts` in sync for writers that bypass ProxyDB (raw SQL,
+# Django ORM). Values already set by the writer in the same statement are kept.
+# Migration 5 adds the MySQL equivalent.
+SQLITE_TRIGGERS = {
+    "trg_proxies_last_check_ts_insert": """
+        CREATE TRIGGER IF NOT EXISTS trg_proxies_last_check_ts_insert
+        AFTER INSERT ON proxies
+        WHEN NEW.last_check IS NOT NULL AND NEW.last_check_ts IS NULL
+        BEGIN
+            UPDATE proxies SET last_check_ts = CAST(strftime('%s', NEW.last_check) AS INTEGER)
+            WHERE rowid = NEW.rowid;
+        END
+    """,
+    "trg_proxies_last_check_ts_update": """
+        CREATE TRIGGER IF NOT EXISTS trg_proxies_last_check_ts_update
+        AFTER UPDATE OF last_check ON proxies
+        WHEN NEW.last_check_ts IS OLD.last_check_ts
+        BEGIN
+            UPDATE proxies SET last_check_ts = CAST(strftime('%s', NEW.last_check) AS INTEGER)
+            WHERE rowid = NEW.rowid;
+        END
+    """,
+}
+
+
+def migrate(db: Union[SQLiteHelper, MySQLHelper]):
+    # Add column 'last_check_ts' (Unix epoch of 'last_check') when not exists
+    if not db.column_exists("proxies", "last_check_ts"):
+        if isinstance(db, SQLiteHelper):
+            db.execute_query("ALTER TABLE proxies ADD COLUMN last_check_ts INTEGER")
+        elif isinstance(db, MySQLHelper):
+            db.execute_query("ALTER TABLE proxies ADD COLUMN last_check_ts BIGINT")
+
+    # Backfill from the mixed-format text column; unparseable values stay NULL
+    placeholder = "%s" if isinstance(db, MySQLHelper) else "?"
+    last_id = 0
+    while True:
+        rows = db.select(
+            "proxies",
+            "id, last_check",
+            f"id > {placeholder} AND last_check_ts IS NULL AND last_check IS NOT NULL "
+            f"AND last_check != '' ORDER BY id",
+            [last_id],
+            limit=BACKFILL_CHUNK,
+        )
+        if not rows:
+            break
+        last_id = int(rows[-1]["id"])
+        updates = [
+            (epoch, row["id"])
+            for row in rows
+            if (epoch := rfc3339_to_epoch(row["last_check"])) is not None
+        ]
+        if updates:
+            with db.transaction():
+                db.executemany(
+                    f"UPDATE proxies SET last_check_ts = {placeholder} WHERE id = {placeholder}",
+                    updates,
+                )
+
+    if not db.index_exists("proxies", "idx_proxies_status_last_check_ts"):
+        db.execute_query(
+            "CREATE INDEX idx_proxies_status_last_check_ts ON proxies (status, last_check_ts)"
+        )
+
+    if isinstance(db, SQLiteHelper):
+        for sql in SQLITE_TRIGGERS.values():
+            db.execute_query(sql)
@@ -0,0 +1,23 @@
+import os
+import sys
+from typing import Union
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.MySQLHelper import MySQLHelper
+from src.SQLiteHelper import SQLiteHelper
+
+MIGRATION_NUMBER = 4
+
+# Columns whose changes invalidate `cached_checksum("proxies", ...)` cache keys
+TRACKED_PROXIES_COLUMNS = ["proxy"]
+
+
+def migrate(db: Union[SQLiteHelper, MySQLHelper]):
+    # Count writes to `proxies.proxy` in `meta` so checksum cache keys are O(1)
+    try:
+        db.track_changes("proxies", TRACKED_PROXIES_COLUMNS)
+    except Exception:
+        if isinstance(db, SQLiteHelper):
+            raise
+        # MySQL users without the TRIGGER privilege keep hashing on demand
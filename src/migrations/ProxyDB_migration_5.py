@@ -0,0 +1,102 @@
+import os
+import sys
+from typing import Union
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.func_date import rfc3339_to_epoch
+from src.MySQLHelper import MySQLHelper
+from src.SQLiteHelper import SQLiteHelper
+
+MIGRATION_NUMBER = 5
+
+# Rows compared per backfill round
+BACKFILL_CHUNK = 1000
+
+_RFC3339_PREFIX = "^[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}"
+_UTC_OFFSET = "[+-][0-9]{2}:?[0-9]{2}$"
+
+
+def mysql_epoch_sql(value: str) -> str:
+    """
+    MySQL expression of `rfc3339_to_epoch(value)`: Unix epoch seconds of an
+    RFC3339 string, naive timestamps taken as UTC, NULL for anything else.
+
+    Args:
+        value (str): SQL expression of the text, e.g. 'NEW.last_check'.
+    """
+    offset = f"REGEXP_SUBSTR({value}, '{_UTC_OFFSET}')"
+    offset_seconds = (
+        f"IF(LEFT({offset}, 1) = '-', -1, 1)"
+        f" * (CAST(SUBSTRING({offset}, 2, 2) AS SIGNED) * 3600"
+        f" + CAST(RIGHT({offset}, 2) AS SIGNED) * 60)"
+    )
+    return (
+        f"IF({value} REGEXP '{_RFC3339_PREFIX}', "
+        "TIMESTAMPDIFF(SECOND, '1970-01-01 00:00:00', "
+        f"STR_TO_DATE(LEFT({value}, 19), '%Y-%m-%dT%H:%i:%s'))"
+        f" - IFNULL({offset_seconds}, 0), NULL)"
+    )
+
+
+# The MySQL side of the SQLite triggers of migration 3: PHP and raw Django SQL
+# write `last_check` without `last_check_ts`. Values set by the writer in the
+# same statement are kept.
+MYSQL_TRIGGERS = {
+    "trg_proxies_last_check_ts_insert": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_proxies_last_check_ts_insert
+        BEFORE INSERT ON proxies FOR EACH ROW
+        BEGIN
+            IF NEW.last_check_ts IS NULL THEN
+                SET NEW.last_check_ts = {mysql_epoch_sql("NEW.last_check")};
+            END IF;
+        END
+    """,
+    "trg_proxies_last_check_ts_update": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_proxies_last_check_ts_update
+        BEFORE UPDATE ON proxies FOR EACH ROW
+        BEGIN
+            IF NOT (NEW.last_check <=> OLD.last_check)
+                AND NEW.last_check_ts <=> OLD.last_check_ts THEN
+                SET NEW.last_check_ts = {mysql_epoch_sql("NEW.last_check")};
+            END IF;
+        END
+    """,
+}
+
+
+def migrate(db: Union[SQLiteHelper, MySQLHelper]):
+    # SQLite has kept the column in sync since migration 3
+    if not isinstance(db, MySQLHelper):
+        return
+
+    try:
+        for sql in MYSQL_TRIGGERS.values():
+            db.execute_query(sql)
+    except Exception:
+        # users without the TRIGGER privilege rely on ProxyDB.update_data alone
+        pass
+
+    # Re-derive the values the other writers left NULL or stale
+    last_id = 0
+    while True:
+        rows = db.select(
+            "proxies",
+            "id, last_check, last_check_ts",
+            "id > %s ORDER BY id",
+            [last_id],
+            limit=BACKFILL_CHUNK,
+        )
+        if not rows:
+            break
+        last_id = int(rows[-1]["id"])
+        updates = [
+            (epoch, row["id"])
+            for row in rows
+            if (epoch := rfc3339_to_epoch(row["last_check"])) != row["last_check_ts"]
+        ]
+        if updates:
+            with db.transaction():
+                db.executemany(
+                    "UPDATE proxies SET last_check_ts = %s WHERE id = %s", updates
+                )
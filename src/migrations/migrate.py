@@ -2,6 +2,7 @@ import glob
 import importlib.util
 import os
 import sys
+from functools import lru_cache
 from types import ModuleType
 from typing import Concatenate, List, ParamSpec, Tuple, Callable, TypeVar, Union, cast
 
@@ -12,7 +13,6 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 
 from src.MySQLHelper import MySQLHelper
 from src.SQLiteHelper import SQLiteHelper
-from src.shared import init_db
 from src.func_platform import is_debug
 
 P = ParamSpec("P")
@@ -21,14 +21,21 @@ DB = Union[SQLiteHelper, MySQLHelper]
 
 Handler = Callable[Concatenate[DB, P], R]
 
+# `meta` key holding the highest MIGRATION_NUMBER applied to a database
+MIGRATION_VERSION_KEY = "migration_version"
+
 
 @dataclass
 class MigrationScript(ModuleType):
     migrate: Handler
 
 
+@lru_cache(maxsize=1)
 def load_migrations():
-    """Dynamically load migration scripts from the migrations directory."""
+    """Dynamically load migration scripts from the migrations directory.
+
+    The scripts are only loaded once per process.
+    """
     migration_scripts: List[Tuple[MigrationScript, str]] = []
     # name of this file so we avoid loading it as a migration
     current_filename = os.path.splitext(os.path.basename(__file__))[0]
@@ -48,13 +55,53 @@ def load_migrations():
     return sorted(migration_scripts, key=lambda x: x[0].MIGRATION_NUMBER)
 
 
+def get_migration_version(db: DB) -> int:
+    """Return the migration version recorded in `meta`, or 0 when none was applied."""
+    placeholder = "%s" if isinstance(db, MySQLHelper) else "?"
+    try:
+        rows = db.select(
+            "meta", "value", f"`key` = {placeholder}", (MIGRATION_VERSION_KEY,)
+        )
+        return int(rows[0]["value"]) if rows else 0
+    except Exception:
+        return 0
+
+
+def set_migration_version(db: DB, version: int) -> None:
+    placeholder = "%s" if isinstance(db, MySQLHelper) else "?"
+    db.execute_query(
+        f"REPLACE INTO meta (`key`, value) VALUES ({placeholder}, {placeholder})",
+        (MIGRATION_VERSION_KEY, str(version)),
+    )
+
+
+def run_migrations(db: DB, debug: bool = False) -> int:
+    """Apply every migration newer than the version recorded in `meta`.
+
+    Each applied migration bumps the recorded version, so an interrupted run
+    resumes where it stopped. Returns the resulting migration version.
+    """
+    version = get_migration_version(db)
+    for module, path in load_migrations():
+        number = int(module.MIGRATION_NUMBER)
+        if number <= version:
+            continue
+        if debug:
+            print(f"Applying migration: {number} ({path})")
+        module.migrate(db)
+        set_migration_version(db, number)
+        version = number
+    return version
+
+
 if __name__ == "__main__":
-    migrations = load_migrations()
+    from src.shared import init_db
+
     db = init_db()
     if not db.db:
         print("Failed to initialize database connection.")
         sys.exit(1)
-    for module, path in migrations:
-        print(f"Applying migration: {module.MIGRATION_NUMBER} ({path})")
-        module.migrate(db.db)
-    print("All migrations applied.")
+    if is_debug():
+        print(f"Current migration version: {get_migration_version(db.db)}")
+    version = run_migrations(db.db, debug=True)
+    print(f"All migrations applied (version {version}).")
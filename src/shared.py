@@ -72,6 +72,7 @@ def init_mysql_db(custom_db_name: Optional[str] = None):
     - MYSQL_HOST_PRODUCTION: Production host
     - MYSQL_USER_PRODUCTION: Production user
     - MYSQL_PASS_PRODUCTION: Production password
+    - MYSQL_POOL_SIZE: Connections in the shared pool (default: 5)
 
     Returns:
         ProxyDB: Initialized MySQL database instance
@@ -105,6 +106,7 @@ def init_mysql_db(custom_db_name: Optional[str] = None):
         mysql_dbname=db_name,
         mysql_user=db_user,
         mysql_password=db_pass,
+        mysql_pool_size=int(os.getenv("MYSQL_POOL_SIZE", "5")),
     )
     db.description = f"MySQL database '{db_name}' at {db_host} (user: {db_user})"
     if db.start_connection():
@@ -1,6 +1,8 @@
 from pathlib import Path
 from typing import List, Union, Set
 
+from proxy_hunter import remove_strings_from_file
+
 
 def remove_string_from_file(
     file_path: Union[str, Path],
@@ -10,6 +12,9 @@ def remove_string_from_file(
     """
     Remove all occurrences of a specific string from a file.
 
+    The file is streamed line by line and each line is checked against a set,
+    so removing thousands of processed proxies costs a single pass.
+
     Args:
         file_path: Path to the file from which to remove the string.
         data: The string or list of strings to be removed from the file.
@@ -23,35 +28,14 @@ def remove_string_from_file(
             print(f"File {file_path} does not exist.")
             return False
 
-        with file_path.open("r", encoding="utf-8") as f:
-            content = f.read()
-
         # Support removing a single string or multiple strings (list/tuple/set)
-        new_content = content
-        if isinstance(data, (list, tuple, set)):
-            for item in data:
-                if not item:
-                    continue
-                new_content = new_content.replace(str(item), "")
-        else:
-            if data:
-                new_content = new_content.replace(str(data), "")
-
-        # Optionally remove trailing empty lines at end of file
-        if clear_trailing_empty_lines:
-            # splitlines() drops final empty trailing line markers, so we'll
-            # operate on logical lines and then rejoin with a single '\n'
-            lines = new_content.splitlines()
-            while lines and lines[-1].strip() == "":
-                lines.pop()
-            new_content = "\n".join(lines)
-            # If there is remaining content, ensure it ends with a single newline
-            if new_content and not new_content.endswith("\n"):
-                new_content += "\n"
-
-        with file_path.open("w", encoding="utf-8") as f:
-            f.write(new_content)
-
+        if not isinstance(data, (list, tuple, set)):
+            data = [data]
+        remove_strings_from_file(
+            file_path,
+            {str(item) for item in data if item},
+            clear_trailing_empty_lines=clear_trailing_empty_lines,
+        )
         return True
     except Exception as e:
         print(f"Error removing string from file: {e}")
@@ -1,4 +1,5 @@
 import os
+import sqlite3
 import sys
 import pytest
 from pathlib import Path
@@ -111,5 +112,107 @@ def test_execute_query_and_fetch(db_helper: SQLiteHelper):
     assert any(r.get("v") == "99" for r in rows2)
 
 
+def _committed_count(where: str = "1=1") -> int:
+    # Separate connection only sees committed rows
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(
+            f"SELECT COUNT(*) FROM {TABLE_NAME} WHERE {where}"
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_batch_defers_and_flushes_commits(db_helper: SQLiteHelper):
+    db_helper.truncate_table(TABLE_NAME)
+    with db_helper.batch(max_rows=3, max_seconds=None):
+        db_helper.insert(TABLE_NAME, {"k": "b1", "v": "1"})
+        db_helper.insert(TABLE_NAME, {"k": "b2", "v": "2"})
+        db_helper.update(TABLE_NAME, {"v": "22"}, "k = ?", ["b2"])
+        # third write reached max_rows -> flushed
+        assert _committed_count() == 2
+        db_helper.insert(TABLE_NAME, {"k": "b3", "v": "3"})
+        assert _committed_count() == 2
+        # reads on the batching connection see pending writes
+        assert db_helper.count(TABLE_NAME) == 3
+    assert _committed_count() == 3
+
+
+def test_batch_rolls_back_unflushed_writes(db_helper: SQLiteHelper):
+    db_helper.truncate_table(TABLE_NAME)
+    with pytest.raises(RuntimeError):
+        with db_helper.batch(max_rows=2, max_seconds=None):
+            db_helper.insert(TABLE_NAME, {"k": "r1", "v": "1"})
+            db_helper.insert(TABLE_NAME, {"k": "r2", "v": "2"})
+            db_helper.insert(TABLE_NAME, {"k": "r3", "v": "3"})
+            raise RuntimeError("boom")
+    assert _committed_count() == 2
+    assert db_helper.count(TABLE_NAME, "k = ?", ["r3"]) == 0
+    # helper commits normally again after the batch
+    db_helper.insert(TABLE_NAME, {"k": "r4", "v": "4"})
+    assert _committed_count("k = 'r4'") == 1
+
+
+def test_transaction_inside_batch_is_a_savepoint(db_helper: SQLiteHelper):
+    db_helper.truncate_table(TABLE_NAME)
+    with db_helper.batch(max_rows=None, max_seconds=None):
+        db_helper.insert(TABLE_NAME, {"k": "s1", "v": "1"})
+        with pytest.raises(RuntimeError):
+            with db_helper.transaction():
+                db_helper.executemany(
+                    f"INSERT INTO {TABLE_NAME} (k, v) VALUES (?, ?)",
+                    [("s2", "2"), ("s3", "3")],
+                )
+                raise RuntimeError("boom")
+        with db_helper.transaction():
+            db_helper.executemany(
+                f"INSERT INTO {TABLE_NAME} (k, v) VALUES (?, ?)", [("s4", "4")]
+            )
+        assert _committed_count() == 0
+    assert sorted(r["k"] for r in db_helper.select(TABLE_NAME, "k")) == ["s1", "s4"]
+    assert _committed_count() == 2
+
+
+def test_checksum_streams_in_chunks(db_helper: SQLiteHelper):
+    import hashlib
+
+    db_helper.truncate_table(TABLE_NAME)
+    rows = [(f"c{i:03d}", str(i) if i % 7 else None) for i in range(250)]
+    db_helper.executemany(f"INSERT INTO {TABLE_NAME} (k, v) VALUES (?, ?)", rows)
+    # same digest as hashing the whole table joined into one string
+    expected = hashlib.md5(
+        "||".join(f"{k}|{v or ''}" for k, v in sorted(rows)).encode("utf-8")
+    ).hexdigest()
+    assert db_helper.checksum(TABLE_NAME, ["k", "v"], chunk_size=16) == expected
+    assert db_helper.checksum(TABLE_NAME, ["k", "v"]) == expected
+
+
+def test_cached_checksum_tracks_changes(db_helper: SQLiteHelper, monkeypatch):
+    db_helper.truncate_table(TABLE_NAME)
+    db_helper.insert(TABLE_NAME, {"k": "t1", "v": "1"})
+    assert db_helper.table_version(TABLE_NAME, ["k"]) is None
+    db_helper.track_changes(TABLE_NAME, ["k"])
+    first = db_helper.cached_checksum(TABLE_NAME, ["k"])
+    assert first == db_helper.checksum(TABLE_NAME, ["k"])
+
+    # unchanged table (or untracked column updates): no rehash
+    calls = []
+    original = db_helper.checksum
+    monkeypatch.setattr(
+        db_helper, "checksum", lambda *a, **kw: calls.append(a) or original(*a, **kw)
+    )
+    db_helper.update(TABLE_NAME, {"v": "11"}, "k = ?", ["t1"])
+    assert db_helper.cached_checksum(TABLE_NAME, ["k"]) == first
+    assert calls == []
+
+    version = db_helper.table_version(TABLE_NAME, ["k"])
+    db_helper.insert(TABLE_NAME, {"k": "t2", "v": "2"})
+    db_helper.update(TABLE_NAME, {"k": "t3"}, "k = ?", ["t2"])
+    db_helper.delete(TABLE_NAME, "k = ?", ["t3"])
+    assert db_helper.table_version(TABLE_NAME, ["k"]) == version + 3
+    assert db_helper.cached_checksum(TABLE_NAME, ["k"]) == first
+    assert len(calls) == 1
+
+
 if __name__ == "__main__":
     pytest.main(["-q", __file__])
@@ -0,0 +1,148 @@
+import os
+import random
+import sys
+from collections import Counter
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.ProxyDB import ProxyDB
+from src.SQLiteHelper import SQLiteHelper
+
+
+@pytest.fixture()
+def helper(tmp_path):
+    db = SQLiteHelper(str(tmp_path / "sample.sqlite"))
+    yield db
+    db.close()
+
+
+def fill_items(db: SQLiteHelper, rows: int) -> None:
+    """Create `items` with `rows` rows; every 10th is 'active', every 10000th 'private'."""
+    db.conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, status TEXT)")
+    db.conn.execute(f"""
+        WITH RECURSIVE seq(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM seq WHERE x < {rows})
+        INSERT INTO items (id, status)
+        SELECT x, CASE
+            WHEN x % 10000 = 0 THEN 'private'
+            WHEN x % 10 = 0 THEN 'active'
+            ELSE 'dead' END
+        FROM seq
+        """)
+    db.conn.execute("CREATE INDEX idx_items_status ON items (status)")
+    db.conn.commit()
+
+
+def vm_steps(db: SQLiteHelper, fn) -> int:
+    """Count SQLite virtual machine steps (in units of 100) spent running `fn`."""
+    steps = [0]
+
+    def handler():
+        steps[0] += 1
+        return 0
+
+    db.conn.set_progress_handler(handler, 100)
+    try:
+        fn()
+    finally:
+        db.conn.set_progress_handler(None, 100)
+    return steps[0]
+
+
+@pytest.mark.parametrize(
+    "key_range",
+    [
+        150,  # dense: served by key probes
+        1000,  # 10% of the keys match
+        100000,  # sparse: served by the reservoir
+    ],
+)
+def test_sample_is_uniform(helper: SQLiteHelper, key_range: int):
+    # 100 matching rows scattered over the key range, the other keys are misses or gaps
+    rng = random.Random(key_range)
+    population = set(rng.sample(range(1, key_range + 1), 100))
+    helper.conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, status TEXT)")
+    helper.conn.execute("CREATE INDEX idx_items_status ON items (status)")
+    helper.conn.executemany(
+        "INSERT INTO items (id, status) VALUES (?, ?)",
+        [
+            (i, "hit" if i in population else "miss")
+            for i in range(1, key_range + 1)
+            if i in population or i % 3
+        ],
+    )
+    helper.conn.commit()
+
+    random.seed(1234)
+    n, rounds = 5, 2000
+    counts: Counter = Counter()
+    for _ in range(rounds):
+        rows = helper.sample("items", n, "id, status", "status = ?", ("hit",))
+        ids = [row["id"] for row in rows]
+        assert len(ids) == n == len(set(ids))
+        assert all(row["status"] == "hit" for row in rows)
+        counts.update(ids)
+
+    assert set(counts) == population
+    mean = rounds * n / len(population)
+    chi2 = sum((counts[i] - mean) ** 2 / mean for i in population)
+    dof = len(population) - 1
+    # chi-square far beyond its expectation means some rows are favoured
+    assert chi2 < dof + 5 * (2 * dof) ** 0.5
+
+
+def test_sample_returns_everything_when_short(helper: SQLiteHelper):
+    fill_items(helper, 30000)
+    rows = helper.sample("items", 10, where="status = ?", params=("private",))
+    assert sorted(row["id"] for row in rows) == [10000, 20000, 30000]
+    assert helper.sample("items", 10, where="status = ?", params=("none",)) == []
+
+
+def test_sample_cost_on_1m_rows(helper: SQLiteHelper):
+    fill_items(helper, 1000000)
+
+    for where, params in [(None, None), ("status = ?", ("active",))]:
+        sample_steps = vm_steps(
+            helper, lambda: helper.sample("items", 100, "*", where, params)
+        )
+        order_steps = vm_steps(
+            helper,
+            lambda: helper.select("items", "*", where, params, rand=True, limit=100),
+        )
+        # ORDER BY RANDOM() walks and sorts every matching row
+        assert sample_steps * 20 < order_steps, (where, sample_steps, order_steps)
+
+
+def test_proxydb_random_getters_use_sample(tmp_path, monkeypatch):
+    proxy_db = ProxyDB(db_location=str(tmp_path / "proxies.sqlite"), start=True)
+    try:
+        for i in range(1, 21):
+            proxy = f"10.254.251.{i}:8080"
+            proxy_db.add(proxy)
+            proxy_db.update(proxy, status="active" if i % 2 else "dead")
+
+        calls = []
+        original = proxy_db.get_db().sample
+        monkeypatch.setattr(
+            proxy_db.get_db(),
+            "sample",
+            lambda *args, **kwargs: calls.append(args) or original(*args, **kwargs),
+        )
+
+        working = proxy_db.get_working_proxies(limit=3)
+        assert len(working) == 3
+        assert all(row["status"] == "active" for row in working)
+        dead = proxy_db.get_dead_proxies(limit=4)
+        assert len(dead) == 4
+        assert all(row["status"] == "dead" for row in dead)
+        assert len(proxy_db.get_all_proxies(limit=5)) == 5
+        assert len(calls) == 3
+
+        # Without a limit every match is returned, shuffled
+        assert len(proxy_db.get_working_proxies()) == 10
+    finally:
+        proxy_db.close()
+
+
+if __name__ == "__main__":
+    pytest.main(["-vvv", "-s", __file__])
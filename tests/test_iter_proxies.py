@@ -0,0 +1,100 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.ProxyDB import ProxyDB
+
+
+@pytest.fixture()
+def proxy_db(tmp_path):
+    db = ProxyDB(db_location=str(tmp_path / "iter.sqlite"), start=True)
+    db.get_db().executemany(
+        "INSERT INTO proxies (proxy, status) VALUES (?, ?)",
+        [
+            (f"10.253.{i // 250}.{i % 250}:8080", "active" if i % 3 else "dead")
+            for i in range(2500)
+        ],
+    )
+    yield db
+    db.close()
+
+
+def test_iter_proxies_visits_every_row_once(proxy_db: ProxyDB):
+    batches = list(proxy_db.iter_proxies(batch_size=1000))
+    assert [len(batch) for batch in batches] == [1000, 1000, 500]
+    ids = [row["id"] for batch in batches for row in batch]
+    assert ids == sorted(ids) and len(set(ids)) == 2500
+
+    active = [
+        row
+        for batch in proxy_db.iter_proxies(
+            batch_size=300, where="status = ?", params=["active"], columns="proxy"
+        )
+        for row in batch
+    ]
+    assert len(active) == 1666
+    assert all(set(row) == {"id", "proxy"} for row in active)
+
+    # resume after a given id
+    rest = [
+        row["id"] for batch in proxy_db.iter_proxies(after_id=2400) for row in batch
+    ]
+    assert rest == list(range(2401, 2501))
+
+
+def test_iter_proxies_is_stable_under_deletes(proxy_db: ProxyDB):
+    seen = []
+    for batch in proxy_db.iter_proxies(batch_size=100):
+        for row in batch:
+            seen.append(row["id"])
+            # delete the visited row and rename it, like clean_invalid_proxies
+            proxy_db.remove(row["proxy"])
+            proxy_db.add(row["proxy"].replace("10.253.", "10.252."))
+    # every original row visited exactly once, renamed rows are not revisited
+    assert seen == list(range(1, 2501))
+
+    # OFFSET paging under the same workload skips rows
+    paged = []
+    page = 1
+    while True:
+        rows = proxy_db.get_all_proxies(page=page, per_page=100, randomize=False)
+        if not rows:
+            break
+        for row in rows:
+            paged.append(row["id"])
+            proxy_db.remove(row["proxy"])
+        page += 1
+    assert len(paged) < 2500
+
+
+def test_load_batch_matches_rows(proxy_db: ProxyDB):
+    batch = proxy_db.load_batch(
+        where="status = ?", params=["active"], columns="proxy, status", batch_size=700
+    )
+    rows = [
+        row
+        for page in proxy_db.iter_proxies(
+            where="status = ?", params=["active"], columns="proxy, status"
+        )
+        for row in page
+    ]
+    assert len(batch) == len(rows) == 1666
+    assert list(batch.iter_proxies()) == [row["proxy"] for row in rows]
+    assert [(p.id, p.status) for p in batch] == [(r["id"], r["status"]) for r in rows]
+    # working.json is written from these dicts; ip and port are generated from proxy
+    active = proxy_db.load_batch(where="status = ?", params=["active"])
+    assert active.to_dicts() == [
+        {key: value for key, value in row.items() if key not in ("ip", "port")}
+        for page in proxy_db.iter_proxies(where="status = ?", params=["active"])
+        for row in page
+    ]
+
+    everything = proxy_db.load_batch()
+    assert len(everything) == 2500
+    assert everything[0].proxy == "10.253.0.0:8080"
+
+
+if __name__ == "__main__":
+    pytest.main(["-vvv", "-s", __file__])
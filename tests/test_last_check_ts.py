@@ -0,0 +1,130 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.func_date import rfc3339_to_epoch
+from src.migrations.migrate import set_migration_version
+from src.ProxyDB import SCHEMA_HASH_KEY, ProxyDB
+
+
+def hours_ago(hours: float, fmt: str = "rfc3339") -> str:
+    moment = datetime.now(timezone.utc) - timedelta(hours=hours)
+    if fmt == "naive":
+        return moment.strftime("%Y-%m-%dT%H:%M:%S")
+    if fmt == "zulu":
+        return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return moment.astimezone(timezone(timedelta(hours=7))).isoformat(timespec="seconds")
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    return str(tmp_path / "last_check_ts.sqlite")
+
+
+def test_rfc3339_to_epoch():
+    assert rfc3339_to_epoch("2024-05-06T12:34:56+07:00") == 1714973696
+    assert rfc3339_to_epoch("2024-05-06T12:34:56Z") == 1714998896
+    # naive values are UTC, like SQLite's strftime('%s', ...)
+    assert rfc3339_to_epoch("2024-05-06T12:34:56") == 1714998896
+    assert rfc3339_to_epoch("") is None
+    assert rfc3339_to_epoch("garbage") is None
+
+
+def test_write_paths_keep_epoch_in_sync(db_path):
+    proxy_db = ProxyDB(db_location=db_path, start=True)
+    try:
+        proxy_db.update("10.254.250.1:8080", status="active")
+        row = proxy_db.select("10.254.250.1:8080")[0]
+        assert row["last_check_ts"] == rfc3339_to_epoch(row["last_check"])
+
+        proxy_db.update_data("10.254.250.1:8080", {"last_check": hours_ago(30)})
+        row = proxy_db.select("10.254.250.1:8080")[0]
+        assert row["last_check_ts"] == rfc3339_to_epoch(row["last_check"])
+
+        # Raw SQL writers bypass ProxyDB; the SQLite triggers fill the column
+        conn = proxy_db.get_db().conn
+        conn.execute(
+            "UPDATE proxies SET last_check = ? WHERE proxy = ?",
+            (hours_ago(5, "zulu"), "10.254.250.1:8080"),
+        )
+        conn.execute(
+            "INSERT INTO proxies (proxy, status, last_check) VALUES (?, ?, ?)",
+            ("10.254.250.2:8080", "active", hours_ago(2, "naive")),
+        )
+        conn.commit()
+        for proxy in ("10.254.250.1:8080", "10.254.250.2:8080"):
+            row = proxy_db.select(proxy)[0]
+            assert row["last_check_ts"] == rfc3339_to_epoch(row["last_check"])
+    finally:
+        proxy_db.close()
+
+
+def test_migration_backfills_mixed_formats(db_path):
+    proxy_db = ProxyDB(db_location=db_path, start=True)
+    values = {
+        "10.254.250.3:8080": hours_ago(1),
+        "10.254.250.4:8080": hours_ago(1, "naive"),
+        "10.254.250.5:8080": hours_ago(1, "zulu"),
+        "10.254.250.6:8080": "not a date",
+    }
+    for proxy, last_check in values.items():
+        proxy_db.add(proxy)
+        proxy_db.update_data(proxy, {"last_check": last_check})
+    db = proxy_db.get_db()
+    db.conn.execute("DROP TRIGGER trg_proxies_last_check_ts_update")
+    db.conn.execute("UPDATE proxies SET last_check_ts = NULL")
+    db.conn.commit()
+    set_migration_version(db, 2)
+    # databases from before migration 3 carry an older schema hash
+    proxy_db.set_meta_value(SCHEMA_HASH_KEY, "")
+    proxy_db.close()
+
+    proxy_db = ProxyDB(db_location=db_path, start=True)
+    try:
+        for proxy, last_check in values.items():
+            row = proxy_db.select(proxy)[0]
+            assert row["last_check_ts"] == rfc3339_to_epoch(last_check)
+        assert proxy_db.select("10.254.250.6:8080")[0]["last_check_ts"] is None
+    finally:
+        proxy_db.close()
+
+
+def test_stale_filters_run_in_sql(db_path):
+    proxy_db = ProxyDB(db_location=db_path, start=True)
+    try:
+        for i, age in enumerate((1, 5, 30, 48), start=1):
+            proxy = f"10.254.250.{10 + i}:8080"
+            proxy_db.update(proxy, status="active")
+            proxy_db.update_data(proxy, {"last_check": hours_ago(age)})
+        proxy_db.update("10.254.250.20:8080", status="dead")
+
+        stale = proxy_db.get_working_proxies(stale_hours=4)
+        assert sorted(row["proxy"] for row in stale) == [
+            "10.254.250.12:8080",
+            "10.254.250.13:8080",
+            "10.254.250.14:8080",
+        ]
+        checked_before = proxy_db.get_all_proxies(
+            randomize=False, last_checked=hours_ago(24, "zulu")
+        )
+        assert sorted(row["proxy"] for row in checked_before) == [
+            "10.254.250.13:8080",
+            "10.254.250.14:8080",
+        ]
+
+        cursor = proxy_db.get_db().conn.cursor()
+        cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM proxies WHERE status = ? AND last_check_ts < ?",
+            ("active", 0),
+        )
+        plan = " | ".join(str(row[-1]) for row in cursor.fetchall())
+        assert "idx_proxies_status_last_check_ts" in plan
+    finally:
+        proxy_db.close()
+
+
+if __name__ == "__main__":
+    pytest.main(["-vvv", "-s", __file__])
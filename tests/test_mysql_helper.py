@@ -2,7 +2,6 @@ import os
 import sys
 import pytest
 
-
 # Add parent directory to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
@@ -90,5 +89,36 @@ def test_mysql_helper_crud(tmp_path):
     db.close()
 
 
+@pytest.mark.skipif(
+    not (MYSQL_HOST and MYSQL_USER and MYSQL_DB),
+    reason="MySQL credentials not set in environment",
+)
+def test_mysql_last_check_ts_matches_python():
+    from src.func_date import rfc3339_to_epoch
+    from src.migrations.ProxyDB_migration_5 import mysql_epoch_sql
+
+    host = MYSQL_HOST
+    if host == "localhost":
+        host = "127.0.0.1"
+    db = MySQLHelper(
+        host=host,
+        user=MYSQL_USER,
+        password=MYSQL_PASS or "",
+        database=MYSQL_DB,
+        port=MYSQL_PORT,
+    )
+    for value in (
+        "2024-07-29T10:36:02+07:00",
+        "2024-07-29T10:36:02-0330",
+        "2024-07-29T10:36:02.123Z",
+        "2024-07-29T10:36:02",
+        "not a date",
+    ):
+        # the STR_TO_DATE format holds % signs: inline the value, no params
+        rows = db.execute_query_fetch(f"SELECT {mysql_epoch_sql(repr(value))} AS ts")
+        assert rows[0]["ts"] == rfc3339_to_epoch(value), value
+    db.close()
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
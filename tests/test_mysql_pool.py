@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.MySQLHelper import MySQLConnectionPool, MySQLHelper
+
+# Simulated network round trip per statement
+LATENCY = 0.01
+
+
+class FakeCursor:
+    """Enough of a mysql-connector cursor, backed by SQLite."""
+
+    def __init__(self, conn: "FakeConnection", dictionary: bool, prepared: bool):
+        self.conn = conn
+        self.dictionary = dictionary
+        self.prepared = prepared
+        self.statement = None
+        self.rows = []
+        self.rowcount = -1
+
+    def execute(self, sql, params=()):
+        time.sleep(LATENCY)
+        if self.prepared and sql is not self.statement:
+            self.conn.stats["prepares"] += 1
+            self.statement = sql
+        cur = self.conn.db.execute(sql.replace("%s", "?"), tuple(params))
+        self.rowcount = cur.rowcount
+        names = [d[0] for d in cur.description or []]
+        rows = cur.fetchall()
+        self.rows = [dict(zip(names, r)) for r in rows] if self.dictionary else rows
+
+    def executemany(self, sql, seq_of_params):
+        time.sleep(LATENCY)
+        cur = self.conn.db.executemany(sql.replace("%s", "?"), seq_of_params)
+        self.rowcount = cur.rowcount
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchmany(self, size=1):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        self.rows = []
+
+
+class FakeConnection:
+    server_info = "8.0.0-fake"
+
+    def __init__(self, path: str, stats: dict):
+        time.sleep(LATENCY)  # TCP + auth handshake
+        stats["handshakes"] += 1
+        self.stats = stats
+        self.db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.autocommit = True
+        self.database = "fake"
+
+    @property
+    def in_transaction(self):
+        return self.db.in_transaction
+
+    def cursor(self, dictionary=False, prepared=False):
+        return FakeCursor(self, dictionary, prepared)
+
+    def start_transaction(self):
+        self.db.execute("BEGIN")
+
+    def commit(self):
+        if self.db.in_transaction:
+            self.db.execute("COMMIT")
+
+    def rollback(self):
+        if self.db.in_transaction:
+            self.db.execute("ROLLBACK")
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.db.close()
+
+
+@pytest.fixture()
+def make_pool(tmp_path):
+    path = str(tmp_path / "pool.sqlite")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+        conn.executemany(
+            "INSERT INTO items (id, name) VALUES (?, ?)",
+            [(i, f"item-{i}") for i in range(1, 101)],
+        )
+    pools = []
+
+    def factory(size: int) -> MySQLConnectionPool:
+        stats = {"handshakes": 0, "prepares": 0}
+        pool = MySQLConnectionPool(
+            size=size, connection_factory=lambda: FakeConnection(path, stats)
+        )
+        pool.stats = stats
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        pool.close()
+
+
+def run_queries(db: MySQLHelper, threads: int, per_thread: int) -> float:
+    def work(n):
+        for i in range(per_thread):
+            rows = db.select(
+                "items", "name", "id = %s", ((n * per_thread + i) % 100 + 1,)
+            )
+            assert len(rows) == 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(work, range(threads)))
+    return time.perf_counter() - start
+
+
+def test_concurrent_queries_scale_with_pool_size(make_pool):
+    single = MySQLHelper(pool=make_pool(1))
+    pooled = MySQLHelper(pool=make_pool(8))
+    single_time = run_queries(single, threads=8, per_thread=10)
+    pooled_time = run_queries(pooled, threads=8, per_thread=10)
+    # one connection serializes every round trip, eight overlap them
+    assert pooled_time * 3 < single_time, (pooled_time, single_time)
+    assert pooled.pool.stats["handshakes"] <= 8
+
+
+def test_helpers_reuse_pooled_connections(make_pool):
+    pool = make_pool(2)
+    for _ in range(5):
+        db = MySQLHelper(pool=pool)
+        assert db.count("items") == 100
+        db.close()
+    assert pool.stats["handshakes"] == 1
+
+
+def test_statements_are_prepared_once_per_connection(make_pool):
+    pool = make_pool(1)
+    db = MySQLHelper(pool=pool)
+    for i in range(1, 21):
+        db.update("items", {"name": f"renamed-{i}"}, "id = %s", (i,))
+        assert db.select("items", "name", "id = %s", (i,))[0]["name"] == f"renamed-{i}"
+    # one UPDATE and one SELECT template
+    assert pool.stats["prepares"] == 2
+
+    db_uncached = MySQLHelper(pool=pool, prepared_cache_size=0)
+    db_uncached.select("items", "name", "id = %s", (1,))
+    assert pool.stats["prepares"] == 2
+
+
+def test_transaction_holds_one_connection(make_pool):
+    pool = make_pool(2)
+    db = MySQLHelper(pool=pool)
+    seen = []
+    with db.transaction():
+        db.insert("items", {"id": 1001, "name": "a"})
+        seen.append(db.conn)
+        db.insert("items", {"id": 1002, "name": "b"})
+        seen.append(db.conn)
+        # another thread neither sees nor blocks on the open transaction
+        other = threading.Thread(
+            target=lambda: seen.append(db.count("items", "id > %s", (1000,)))
+        )
+        other.start()
+        other.join()
+    assert seen[0] is seen[1]
+    assert seen[2] == 0
+    assert db.count("items", "id > %s", (1000,)) == 2
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.insert("items", {"id": 1003, "name": "c"})
+            raise RuntimeError("boom")
+    assert db.count("items", "id > %s", (1000,)) == 2
+
+
+if __name__ == "__main__":
+    pytest.main(["-vvv", "-s", __file__])
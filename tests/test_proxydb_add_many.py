@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from proxy_hunter import Proxy
+from src.ProxyDB import ProxyDB
+
+
+@pytest.fixture()
+def proxy_db(tmp_path):
+    db = ProxyDB(db_location=str(tmp_path / "add_many.sqlite"), start=True)
+    yield db
+    db.close()
+
+
+def test_add_many_inserts_and_skips(proxy_db: ProxyDB):
+    proxy_db.add("10.254.253.1:8080")
+
+    counts = proxy_db.add_many(
+        [
+            "10.254.253.1:8080",  # already present
+            "10.254.253.2:3128",
+            "10.254.253.2:3128",  # duplicate within the batch
+            "not a proxy",
+            Proxy("10.254.253.3:1080"),
+        ],
+        chunk_size=2,
+    )
+
+    assert counts == {"added": 2, "skipped": 1, "credentials": 0}
+    for p in ("10.254.253.2:3128", "10.254.253.3:1080"):
+        rows = proxy_db.select(p)
+        assert rows and rows[0]["status"] == "untested"
+        assert proxy_db.is_already_added(p)
+
+
+def test_add_many_respects_added_proxies(proxy_db: ProxyDB):
+    proxy_db.mark_as_added("10.254.253.4:80")
+
+    counts = proxy_db.add_many(["10.254.253.4:80"])
+
+    assert counts == {"added": 0, "skipped": 1, "credentials": 0}
+    assert not proxy_db.select("10.254.253.4:80")
+
+
+def test_upsert_many_updates_credentials(proxy_db: ProxyDB):
+    proxy_db.add("10.254.253.5:8000")
+
+    counts = proxy_db.upsert_many(
+        ["10.254.253.5:8000@user:secret", "10.254.253.6:8001@other:pass"]
+    )
+
+    assert counts == {"added": 1, "skipped": 1, "credentials": 2}
+    row = proxy_db.select("10.254.253.5:8000")[0]
+    assert (row["username"], row["password"]) == ("user", "secret")
+    row = proxy_db.select("10.254.253.6:8001")[0]
+    assert (row["username"], row["password"]) == ("other", "pass")
+
+
+def test_add_many_rolls_back_failed_chunk(proxy_db: ProxyDB, monkeypatch):
+    db = proxy_db.get_db()
+    original = db.executemany
+    calls = {"n": 0}
+
+    def failing_executemany(sql, seq_of_params):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("boom")
+        return original(sql, seq_of_params)
+
+    monkeypatch.setattr(db, "executemany", failing_executemany)
+
+    with pytest.raises(RuntimeError):
+        proxy_db.add_many(["10.254.253.7:9000"])
+
+    # The proxies insert of the failed chunk must not be committed
+    assert not proxy_db.select("10.254.253.7:9000")
+
+
+if __name__ == "__main__":
+    pytest.main(["-vvv", "-s", __file__])
@@ -0,0 +1,127 @@
+import os
+import sys
+from typing import Callable, List
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.migrations.migrate import get_migration_version
+from src.ProxyDB import ProxyDB
+
+
+@pytest.fixture()
+def proxy_db(tmp_path):
+    db = ProxyDB(db_location=str(tmp_path / "indexes.sqlite"), start=True)
+    yield db
+    db.close()
+
+
+def query_plan(proxy_db: ProxyDB, sql: str, params=()) -> str:
+    cursor = proxy_db.get_db().conn.cursor()
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    return " | ".join(str(row[-1]) for row in cursor.fetchall())
+
+
+def test_migrations_add_generated_columns_and_indexes(proxy_db: ProxyDB):
+    db = proxy_db.get_db()
+    assert db.column_exists("proxies", "ip")
+    assert db.column_exists("proxies", "port")
+    assert db.index_exists("proxies", "idx_proxies_status_last_check")
+    assert db.index_exists("proxies", "idx_proxies_ip")
+    assert get_migration_version(db) >= 2
+
+
+def test_generated_columns_follow_proxy(proxy_db: ProxyDB):
+    proxy_db.add("10.254.252.1:8080")
+    proxy_db.update("10.254.252.1:8080", status="active")
+
+    row = proxy_db.select("10.254.252.1:8080")[0]
+    assert (row["ip"], row["port"], row["status"]) == ("10.254.252.1", 8080, "active")
+
+    # Rows read back from the table can be written again without touching generated columns
+    proxy_db.update_data("10.254.252.1:8080", dict(row))
+
+
+def traced_plans(proxy_db: ProxyDB, call: Callable[[], object]) -> List[str]:
+    """Query plans of the SELECTs on `proxies` that `call` sends to SQLite."""
+    conn = proxy_db.get_db().conn
+    statements: List[str] = []
+    # the trace callback gets the statements with their parameters bound
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [
+        query_plan(proxy_db, sql)
+        for sql in statements
+        if sql.lstrip().upper().startswith("SELECT") and " WHERE " in sql
+    ]
+
+
+def test_hot_queries_use_indexes(proxy_db: ProxyDB):
+    for proxy, status in [
+        ("10.254.251.1:8080", "active"),
+        ("10.254.251.2:8080", "dead"),
+        ("10.254.251.3:8080", "port-open"),
+        ("10.254.251.4:8080", None),
+    ]:
+        proxy_db.add(proxy)
+        if status:
+            proxy_db.update(proxy, status=status)
+
+    # the statements the builders actually send, not hand-written copies
+    for call in (
+        lambda: proxy_db.get_untested_proxies(randomize=False),
+        lambda: proxy_db.get_untested_proxies(),
+        lambda: proxy_db.get_working_proxies(randomize=False, limit=10),
+        lambda: proxy_db.get_working_proxies(randomize=False, stale_hours=4),
+        lambda: proxy_db.get_working_proxies(),
+    ):
+        plans = traced_plans(proxy_db, call)
+        assert plans
+        for plan in plans:
+            assert "SCAN proxies" not in plan and "TEMP B-TREE" not in plan, plan
+
+    # the per-IP queries of the Django port filter
+    plan = query_plan(proxy_db, "SELECT * FROM proxies WHERE ip = ?", ("10.0.0.1",))
+    assert "idx_proxies_ip" in plan
+
+    plan = query_plan(
+        proxy_db, "SELECT ip, COUNT(*) FROM proxies GROUP BY ip HAVING COUNT(*) > 1"
+    )
+    assert "idx_proxies_ip" in plan and "TEMP B-TREE" not in plan
+
+    plan = query_plan(
+        proxy_db, "SELECT status, COUNT(*) AS count FROM proxies GROUP BY status"
+    )
+    assert "idx_proxies_status_last_check" in plan and "TEMP B-TREE" not in plan
+
+
+def test_untested_proxies_keep_their_statuses(proxy_db: ProxyDB):
+    statuses = {
+        "10.254.249.1:8080": None,
+        "10.254.249.2:8080": "",
+        "10.254.249.3:8080": "untested",
+        "10.254.249.4:8080": "port-open",
+        "10.254.249.5:8080": "active",
+        "10.254.249.6:8080": "dead",
+        "10.254.249.7:8080": "port-closed",
+        "10.254.249.8:8080": "private",
+    }
+    for proxy, status in statuses.items():
+        proxy_db.add(proxy)
+        proxy_db.update_data(proxy, {"status": status})
+
+    expected = sorted(
+        proxy
+        for proxy, status in statuses.items()
+        if status not in ("active", "dead", "port-closed")
+    )
+    for randomize in (False, True):
+        rows = proxy_db.get_untested_proxies(randomize=randomize)
+        assert sorted(row["proxy"] for row in rows) == expected
+
+
+if __name__ == "__main__":
+    pytest.main(["-vvv", "-s", __file__])
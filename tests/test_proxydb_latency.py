@@ -0,0 +1,75 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from proxy_hunter import LatencyTracker
+from src.ProxyDB import ProxyDB
+
+
+def test_latency_stats_round_trip(tmp_path):
+    db = ProxyDB(str(tmp_path / "database.sqlite"), start=True)
+    tracker = LatencyTracker()
+    tracker.record("1.2.3.4:8080", 0.5, now=100)
+    tracker.record("1.2.3.5:8080", None, now=200)
+    assert db.save_latency_stats(tracker.to_rows()) == 3
+
+    # saving again replaces the rows of the same key
+    tracker.record("1.2.3.5:8080", None, now=300)
+    db.save_latency_stats(tracker.to_rows())
+    rows = db.get_latency_stats()
+    assert len(rows) == 3
+    assert rows[-1]["updated"] == 300
+
+    restored = LatencyTracker()
+    restored.load_rows(db.get_latency_stats(limit=2))
+    assert restored.stats("1.2.3.4:8080") is None
+    assert restored.stats("1.2.3.5:8080").dead
+    # the subnet row comes back too and covers unknown neighbours
+    assert restored.connect_timeout("1.2.3.99:80") == pytest.approx(1.5 * 1.5)
+    db.close()
+
+
+def test_latency_history_helpers(tmp_path):
+    db = ProxyDB(str(tmp_path / "database.sqlite"), start=True)
+    tracker = LatencyTracker()
+    tracker.record("1.2.3.4:8080", 0.5, now=100)
+    assert db.save_latency_history(tracker) == 2
+
+    # later saves only write what was recorded since
+    assert db.save_latency_history(tracker) == 0
+    tracker.record("1.2.3.4:8080", 0.7, now=200)
+    assert db.save_latency_history(tracker) == 2
+
+    restored = db.load_latency_history(LatencyTracker())
+    assert restored.stats("1.2.3.4:8080").samples == 2
+
+    # an unreadable table leaves the tracker as it was, still unsaved
+    db.get_db().execute_query("DROP TABLE proxy_latency")
+    assert db.load_latency_history(restored) is restored
+    assert len(restored) == 1
+    restored.record("1.2.3.4:8080", 0.5, now=300)
+    assert db.save_latency_history(restored) == 0
+    assert len(restored.to_rows(dirty_only=True)) == 2
+    db.close()
+
+
+def test_vacuum_prunes_latency_rows_outside_the_loaded_window(tmp_path):
+    db = ProxyDB(str(tmp_path / "database.sqlite"), start=True)
+    tracker = LatencyTracker()
+    for i in range(5):
+        tracker.record(f"1.2.{i}.4:8080", 0.5, now=100 + i)
+    db.save_latency_stats(tracker.to_rows())
+    assert len(db.get_latency_stats()) == 10
+
+    db.prune_latency_stats(keep=4)
+    rows = db.get_latency_stats()
+    assert [row["updated"] for row in rows] == [103, 103, 104, 104]
+
+    db.vacuum()
+    assert len(db.get_latency_stats()) == 4
+    db.close()
+
+
+if __name__ == "__main__":
+    pytest.main(["-vvv", "-s", __file__])
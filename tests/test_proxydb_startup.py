@@ -0,0 +1,95 @@
+import os
+import statistics
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from src.ProxyDB import SCHEMA_HASH_KEY, ProxyDB
+from src.SQLiteHelper import SQLiteHelper
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    path = str(tmp_path / "startup.sqlite")
+    ProxyDB(db_location=path, start=True).close()
+    return path
+
+
+def count_queries(monkeypatch) -> list:
+    queries = []
+    original = SQLiteHelper.execute_query
+
+    def execute_query(self, sql, *args, **kwargs):
+        queries.append(sql)
+        return original(self, sql, *args, **kwargs)
+
+    monkeypatch.setattr(SQLiteHelper, "execute_query", execute_query)
+    return queries
+
+
+def test_reopen_skips_schema_setup(db_path, monkeypatch):
+    queries = count_queries(monkeypatch)
+    monkeypatch.setattr(
+        ProxyDB, "vacuum", lambda self: pytest.fail("VACUUM must not run on open")
+    )
+
+    proxy_db = ProxyDB(db_location=db_path, start=True)
+    try:
+        assert proxy_db.get_meta_value(SCHEMA_HASH_KEY)
+        assert queries == []
+        # the stored setup is intact
+        proxy_db.add("10.254.249.1:8080")
+        assert proxy_db.select("10.254.249.1:8080")[0]["ip"] == "10.254.249.1"
+    finally:
+        proxy_db.close()
+
+
+def test_changed_schema_hash_runs_setup_again(db_path, monkeypatch):
+    proxy_db = ProxyDB(db_location=db_path, start=True)
+    proxy_db.set_meta_value(SCHEMA_HASH_KEY, "outdated")
+    proxy_db.close()
+
+    queries = count_queries(monkeypatch)
+    proxy_db = ProxyDB(db_location=db_path, start=True)
+    try:
+        assert any("CREATE TABLE" in sql for sql in queries)
+        assert proxy_db.get_meta_value(SCHEMA_HASH_KEY) != "outdated"
+        assert proxy_db.ensure_schema() is False
+        assert proxy_db.ensure_schema(force=True) is True
+    finally:
+        proxy_db.close()
+
+
+def test_vacuum_is_explicit(db_path):
+    proxy_db = ProxyDB(db_location=db_path, start=True)
+    try:
+        assert proxy_db.get_meta_value("last_vacuum_time") is None
+        assert proxy_db.run_daily_vacuum() is True
+        assert proxy_db.get_meta_value("last_vacuum_time")
+        assert proxy_db.run_daily_vacuum() is False
+    finally:
+        proxy_db.close()
+
+
+def test_open_is_faster_than_schema_setup(db_path):
+    def open_close(force: bool = False) -> float:
+        start = time.perf_counter()
+        proxy_db = ProxyDB(db_location=db_path, start=True)
+        if force:
+            proxy_db.ensure_schema(force=True)
+        proxy_db.close()
+        return time.perf_counter() - start
+
+    for _ in range(5):
+        open_close()  # warm up the page cache and the schema hash cache
+    fast = statistics.median(open_close() for _ in range(200))
+    full = statistics.median(open_close(force=True) for _ in range(20))
+    print(f"open: {fast * 1000:.3f} ms, with schema setup: {full * 1000:.3f} ms")
+    # relative only: absolute timings depend on the machine and its load
+    assert fast * 2 < full
+
+
+if __name__ == "__main__":
+    pytest.main(["-vvv", "-s", __file__])
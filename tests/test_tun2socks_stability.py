@@ -0,0 +1,148 @@
+import asyncio
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import ssl
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import artisan.proxy_tun2socks_stability as stability
+
+
+class Socks5Server:
+    """SOCKS5 stand-in routing the remote ports to local servers."""
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.connections = 0
+        self.names = []
+
+    async def __call__(self, reader, writer):
+        self.connections += 1
+        try:
+            await reader.readexactly((await reader.readexactly(2))[1])
+            writer.write(b"\x05\x00")
+            _, _, _, address_type = await reader.readexactly(4)
+            assert address_type == 3
+            name = await reader.readexactly((await reader.readexactly(1))[0])
+            (port,) = struct.unpack(">H", await reader.readexactly(2))
+            self.names.append(name.decode())
+            upstream_reader, upstream_writer = await asyncio.open_connection(
+                "127.0.0.1", self.routes[port]
+            )
+            writer.write(b"\x05\x00\x00\x01\x7f\x00\x00\x01\x00\x00")
+            await asyncio.gather(
+                pipe(reader, upstream_writer), pipe(upstream_reader, writer)
+            )
+        finally:
+            writer.close()
+
+
+async def pipe(reader, writer):
+    try:
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def handle_http(reader, writer):
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n")
+    await writer.drain()
+    writer.close()
+
+
+@pytest.fixture()
+def tls_context(tmp_path, monkeypatch):
+    if not shutil.which("openssl"):
+        pytest.skip("openssl is required to create a test certificate")
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1"]
+        + ["-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost"]
+        + ["-keyout", str(key), "-out", str(cert)],
+        check=True,
+        capture_output=True,
+    )
+    # trusted by ssl.create_default_context() in test_tls
+    monkeypatch.setenv("SSL_CERT_FILE", str(cert))
+    monkeypatch.setattr(stability, "TLS_HOST", "localhost")
+    monkeypatch.setattr(stability, "TARGET_HOST", "localhost")
+    monkeypatch.setattr(stability, "HOLD_SECONDS", 0.5)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+async def start(handler, ssl_context=None):
+    server = await asyncio.start_server(handler, "127.0.0.1", 0, ssl=ssl_context)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def test_score_reuses_one_tunnel(tls_context):
+    async def main():
+        https, https_port = await start(handle_http, tls_context)
+        http, http_port = await start(handle_http)
+        socks = Socks5Server({443: https_port, 80: http_port})
+        proxy_server, proxy_port = await start(socks)
+
+        result = await stability.score_proxy(("127.0.0.1", proxy_port))
+        assert result["tcp"] and result["tls"] and result["stability"]
+        assert result["score"] == 85
+        # TCP, latency, TLS and stability shared a single tunnel
+        assert socks.connections == 1
+        assert socks.names == ["localhost"]
+
+        # without TLS the stability stage opens its own plain tunnel
+        plain = Socks5Server({443: http_port, 80: http_port})
+        plain_server, plain_port = await start(plain)
+        result = await stability.score_proxy(("127.0.0.1", plain_port))
+        assert not result["tls"] and result["stability"]
+        assert result["score"] == 55
+        assert plain.connections == 2
+
+        # a closed port is a hard fail
+        proxy_server.close()
+        await proxy_server.wait_closed()
+        result = await stability.score_proxy(("127.0.0.1", proxy_port))
+        assert result["score"] == 0 and not result["tcp"]
+
+        for server in (https, http, plain_server):
+            server.close()
+
+    asyncio.run(main())
+
+
+def test_proxies_are_scored_concurrently(tls_context):
+    async def main():
+        https, https_port = await start(handle_http, tls_context)
+        http, http_port = await start(handle_http)
+        socks = Socks5Server({443: https_port, 80: http_port})
+        proxy_server, proxy_port = await start(socks)
+
+        start_time = time.perf_counter()
+        results = await asyncio.gather(
+            *(stability.score_proxy(("127.0.0.1", proxy_port)) for _ in range(50))
+        )
+        elapsed = time.perf_counter() - start_time
+        assert all(result["score"] == 85 for result in results)
+        # 50 proxies held for 0.5s each overlap instead of taking 25s
+        assert elapsed < 5
+        assert socks.connections == 50
+
+        for server in (https, http, proxy_server):
+            server.close()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    pytest.main(["-vvv", "-s", __file__])